@@ -0,0 +1 @@
+"""Offline analysis of the results test.py saves under RESULT_DIR."""
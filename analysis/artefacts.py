@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""Read the side artefacts of prepared snapshots, without the daemon.
+
+- the catalog index file, `<base_path>/catalog/<ssId>.idx`: the snapshot's
+  meta, REAP records, mincore layers, non-zero pages, and overlay and ws
+  regions, see daemon/catalog.go;
+- the ws file FaaSnap writes (`wsFile` of the meta), and REAP's
+  `<snapshotBase>/working_set`: the pages of their regions back to back,
+  raw or compressed, see wsfile/wsfile.go;
+- REAP's trace, `<snapshotBase>/trace`: one hex byte offset per line, in
+  fault order.
+
+Binary files are memory-mapped and their sections are NumPy views over the
+map, so opening even a large index or ws file copies nothing, and regions
+are read lazily:
+
+    from analysis.artefacts import SnapshotIndex
+    with SnapshotIndex(path) as index, index.ws_file() as ws:
+        for start, length, data in ws.iter_regions():
+            ...
+
+The views are read-only, and only valid while the file is open; copy what
+is kept beyond that.
+
+The index and compressed ws files start with a magic whose last character
+is the format version (`FSNPCAT1`, `FSNPWSZ1`). A file of another version
+raises FormatError rather than being misread. Raw ws files and traces have
+no header: the VMM maps raw ws files as they are, and their layout comes
+from the index or the trace.
+
+    python3 -m analysis.artefacts $BASE_PATH/catalog/*.idx
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+
+import numpy as np
+
+from analysis.results import print_table
+
+PAGE_SIZE = mmap.PAGESIZE
+
+CATALOG_MAGIC = b'FSNPCAT1'
+CATALOG_HEADER = struct.Struct('<8s6I')
+WS_MAGIC = b'FSNPWSZ1'
+WS_HEADER = struct.Struct('<8sIIQ')
+
+
+class FormatError(ValueError):
+    pass
+
+
+def _check_magic(path, data, magic, what):
+    if data[:len(magic)] == magic:
+        return
+    if data[:len(magic) - 1] == magic[:-1]:
+        raise FormatError('%s: %s of format version %s, only %s is supported' % (
+            path, what, data[len(magic) - 1:len(magic)].decode('ascii', 'replace'), magic[-1:].decode()))
+    raise FormatError('%s: not a %s' % (path, what))
+
+
+def _map(path):
+    with open(path, 'rb') as f:
+        if not os.fstat(f.fileno()).st_size:
+            return b''
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class _Mapped(object):
+    """A memory-mapped file, closed with close() or a with block."""
+
+    def _close_map(self):
+        mm, self._mm = self._mm, None
+        if isinstance(mm, mmap.mmap):
+            try:
+                mm.close()
+            except BufferError:
+                pass  # views of it are still held; unmapped once they are gone
+
+    def close(self):
+        self._close_map()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SnapshotIndex(_Mapped):
+    """A catalog index file of the daemon.
+
+    meta: dict of the snapshot's fields, e.g. 'snapshotId', 'memFilePath',
+    'size'; records: uint64 REAP fault offsets in bytes, in fault order;
+    layers: uint32 mincore layer per page, 0 if in none; nonzero_bits: the
+    non-zero page bitset, bit i of byte i // 8 for page i; overlay and ws:
+    (n, 2) uint64 regions of (start, length), in pages. overlay is in no
+    particular order, ws in the order of the ws file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._mm = _map(path)
+        try:
+            self._parse()
+        except Exception:
+            self._close_map()
+            raise
+
+    def _parse(self):
+        mm = self._mm
+        if len(mm) < CATALOG_HEADER.size:
+            raise FormatError('%s: not a snapshot index file' % self.path)
+        magic, meta_len, nrecords, npages, nnonzero, noverlay, nws = CATALOG_HEADER.unpack_from(mm)
+        _check_magic(self.path, magic, CATALOG_MAGIC, 'snapshot index file')
+        sections = [('records', '<u8', nrecords), ('layers', '<u4', npages),
+                    ('nonzero_bits', 'u1', (nnonzero + 7) // 8),
+                    ('overlay', '<u8', 2 * noverlay), ('ws', '<u8', 2 * nws)]
+        cur = CATALOG_HEADER.size + meta_len
+        end = cur + sum(np.dtype(t).itemsize * n for _, t, n in sections)
+        if len(mm) < end:
+            raise FormatError('%s: truncated, %d of %d bytes' % (self.path, len(mm), end))
+        self.meta = json.loads(bytes(mm[CATALOG_HEADER.size:cur]))
+        for name, dtype, count in sections:
+            setattr(self, name, np.frombuffer(mm, dtype=dtype, count=count, offset=cur))
+            cur += np.dtype(dtype).itemsize * count
+        self.overlay = self.overlay.reshape(noverlay, 2)
+        self.ws = self.ws.reshape(nws, 2)
+        self.nonzero_pages = nnonzero
+
+    def close(self):
+        for name in ('records', 'layers', 'nonzero_bits', 'overlay', 'ws'):
+            self.__dict__.pop(name, None)
+        self._close_map()
+
+    @property
+    def snapshot_id(self):
+        return self.meta.get('snapshotId')
+
+    @property
+    def pages(self):
+        return len(self.layers)
+
+    def nonzero(self):
+        """bool per page: whether it is not all zero. A copy, one byte per page."""
+        bits = np.unpackbits(self.nonzero_bits, count=self.nonzero_pages, bitorder='little')
+        return bits.view(bool)
+
+    def iter_overlay(self):
+        """(start, length) of the overlay regions in pages, by start."""
+        order = np.argsort(self.overlay[:, 0], kind='stable')
+        return iter_regions(self.overlay, order)
+
+    def iter_ws(self):
+        """(start, length) of the ws regions in pages, in ws file order."""
+        return iter_regions(self.ws)
+
+    def ws_file(self, path=None, page_size=PAGE_SIZE):
+        """The snapshot's FaaSnap ws file, its `wsFile` unless given."""
+        path = path or self.meta.get('wsFile')
+        if not path:
+            raise FormatError('%s: snapshot %s has no ws file' % (self.path, self.snapshot_id))
+        return WsFile(path, self.ws, page_size)
+
+    def reap_ws_file(self, path=None, page_size=PAGE_SIZE):
+        """The snapshot's REAP working set, `<snapshotBase>/working_set`
+        unless given, laid out by the records."""
+        path = path or os.path.join(self.meta.get('snapshotBase', ''), 'working_set')
+        return WsFile(path, reap_regions(self.records, page_size), page_size)
+
+
+def iter_regions(regions, order=None):
+    """Lazily yields (start, length) of regions as ints, in order if given."""
+    for i in (range(len(regions)) if order is None else order):
+        yield int(regions[i, 0]), int(regions[i, 1])
+
+
+class WsFile(_Mapped):
+    """A ws file: the pages of regions of a memory file back to back.
+
+    regions are the (start, length) pairs in pages in the order of the file:
+    the ws regions of the index for FaaSnap ws files, reap_regions of the
+    trace for REAP's. Compressed files (compressed: True) hold the same
+    bytes, cut into frames deflated independently.
+    """
+
+    def __init__(self, path, regions, page_size=PAGE_SIZE):
+        self.path = path
+        self.page_size = page_size
+        self.regions = np.asarray(regions, dtype=np.int64).reshape(-1, 2)
+        self.offsets = np.concatenate(([0], np.cumsum(self.regions[:, 1]))) * page_size
+        self._mm = _map(path)
+        self._frame = (-1, None)
+        try:
+            self._parse()
+        except Exception:
+            self._close_map()
+            raise
+
+    def _parse(self):
+        mm = self._mm
+        self.compressed = mm[:len(WS_MAGIC)] == WS_MAGIC
+        if not self.compressed:
+            if mm[:len(WS_MAGIC) - 1] == WS_MAGIC[:-1]:
+                _check_magic(self.path, mm[:len(WS_MAGIC)], WS_MAGIC, 'compressed ws file')
+            self.raw_size = len(mm)
+        else:
+            if len(mm) < WS_HEADER.size:
+                raise FormatError('%s: not a compressed ws file' % self.path)
+            _, nframes, _, self.raw_size = WS_HEADER.unpack_from(mm)
+            index = np.frombuffer(mm, dtype='<u4', count=2 * nframes, offset=WS_HEADER.size).reshape(nframes, 2)
+            self.frame_offsets = np.concatenate(([0], np.cumsum(index[:, 0], dtype=np.int64)))
+            self.frame_data = np.concatenate(([0], np.cumsum(index[:, 1], dtype=np.int64))) + \
+                WS_HEADER.size + index.nbytes
+            if self.frame_offsets[-1] != self.raw_size or self.frame_data[-1] > len(mm):
+                raise FormatError('%s: corrupt frame index' % self.path)
+        if self.raw_size != self.offsets[-1]:
+            raise FormatError('%s: holds %d bytes, its regions %d' % (self.path, self.raw_size, self.offsets[-1]))
+
+    def close(self):
+        self._frame = (-1, None)
+        self._close_map()
+
+    def _inflate(self, i):
+        if self._frame[0] != i:
+            start, end = self.frame_data[i], self.frame_data[i + 1]
+            size = int(self.frame_offsets[i + 1] - self.frame_offsets[i])
+            data = zlib.decompress(self._mm[start:end], -zlib.MAX_WBITS) if end > start else bytes(size)
+            if len(data) != size:
+                raise FormatError('%s: frame %d holds %d bytes, not %d' % (self.path, i, len(data), size))
+            self._frame = (i, data)
+        return self._frame[1]
+
+    def read(self, offset, size):
+        """size bytes of the file's data at offset: a view of the map if raw,
+        inflated bytes if compressed."""
+        if not self.compressed:
+            return memoryview(self._mm)[offset:offset + size]
+        out = []
+        i = int(np.searchsorted(self.frame_offsets, offset, side='right')) - 1
+        while size > 0 and i < len(self.frame_offsets) - 1:
+            data = self._inflate(i)
+            lo = offset - int(self.frame_offsets[i])
+            chunk = data[lo:lo + size]
+            out.append(chunk)
+            offset += len(chunk)
+            size -= len(chunk)
+            i += 1
+        return b''.join(out) if len(out) != 1 else out[0]
+
+    def iter_regions(self):
+        """Lazily yields (start, length, data) of each region, in the file."""
+        for i, (start, length) in enumerate(iter_regions(self.regions)):
+            yield start, length, self.read(int(self.offsets[i]), length * self.page_size)
+
+    def page(self, page):
+        """Data of a page of the memory file, None if not in the ws file."""
+        hit = np.flatnonzero((self.regions[:, 0] <= page) & (page < self.regions[:, 0] + self.regions[:, 1]))
+        if not len(hit):
+            return None
+        i = hit[0]
+        offset = int(self.offsets[i]) + (page - int(self.regions[i, 0])) * self.page_size
+        return self.read(offset, self.page_size)
+
+    def array(self):
+        """All the data as uint8: a view of the map if raw, else inflated."""
+        if not self.compressed:
+            return np.frombuffer(self._mm, dtype=np.uint8, count=self.raw_size)
+        return np.frombuffer(self.read(0, self.raw_size), dtype=np.uint8)
+
+
+_HEX = np.full(256, -1, dtype=np.int64)
+for _i, _c in enumerate(b'0123456789abcdef'):
+    _HEX[_c] = _i
+for _i, _c in enumerate(b'ABCDEF'):
+    _HEX[_c] = 10 + _i
+
+
+def parse_hex_lines(data):
+    """Values of the hex numbers of a text, one per line, e.g. a REAP trace."""
+    buf = np.frombuffer(data, dtype=np.uint8)
+    digits = _HEX[buf]
+    keep = digits >= 0
+    # line of each character; a line without digits yields no value
+    line = np.cumsum(buf == ord('\n')) - (buf == ord('\n'))
+    line, digits = line[keep], digits[keep]
+    if not len(line):
+        return np.zeros(0, dtype=np.int64)
+    starts = np.flatnonzero(np.concatenate(([True], line[1:] != line[:-1])))
+    ends = np.concatenate((starts[1:], [len(line)]))
+    pos = np.repeat(ends, ends - starts) - np.arange(len(line)) - 1
+    if pos.max() > 15:
+        raise ValueError('hex value of more than 64 bits')
+    values = digits.astype(np.uint64) << (4 * pos).astype(np.uint64)
+    return np.add.reduceat(values, starts).astype(np.int64)
+
+
+def read_trace(path):
+    """Byte offsets of a REAP trace file, in fault order."""
+    with open(path, 'rb') as f:
+        return parse_hex_lines(f.read())
+
+
+def reap_regions(offsets, page_size=PAGE_SIZE):
+    """(n, 2) regions (start, length) in pages of REAP's working set file,
+    as reap.Trace.buildRegions lays it out: the runs of consecutive pages
+    of the records, by offset."""
+    pages = np.unique(np.asarray(offsets, dtype=np.int64) // page_size)
+    if not len(pages):
+        return np.zeros((0, 2), dtype=np.int64)
+    first = np.flatnonzero(np.concatenate(([True], np.diff(pages) != 1)))
+    lengths = np.diff(np.concatenate((first, [len(pages)])))
+    return np.stack((pages[first], lengths), axis=1)
+
+
+def describe(path, page_size=PAGE_SIZE):
+    """A row about the artefact at path, which is checked on the way."""
+    with open(path, 'rb') as f:
+        head = f.read(len(CATALOG_MAGIC))
+    if head[:-1] == CATALOG_MAGIC[:-1]:
+        with SnapshotIndex(path) as index:
+            row = {'file': path, 'kind': 'index', 'snapshot': index.snapshot_id,
+                   'pages': index.pages, 'records': len(index.records),
+                   'layers': int(index.layers.max()) if index.pages else 0,
+                   'overlay': len(index.overlay), 'ws': len(index.ws)}
+            if index.meta.get('wsFile'):
+                with index.ws_file(page_size=page_size) as ws:
+                    row['ws_mb'] = ws.raw_size / 2**20
+                    row['compressed'] = ws.compressed
+            return row
+    if os.path.basename(path) == 'trace':
+        offsets = read_trace(path)
+        return {'file': path, 'kind': 'trace', 'records': len(offsets),
+                'ws': len(reap_regions(offsets, page_size))}
+    raise FormatError('%s: unknown artefact' % path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Check and summarize snapshot artefacts')
+    parser.add_argument('path', nargs='+', help='catalog index files or REAP trace files')
+    parser.add_argument('--page-size', type=int, default=PAGE_SIZE)
+    args = parser.parse_args(argv)
+    rows, failed = [], False
+    for path in args.path:
+        try:
+            rows.append(describe(path, args.page_size))
+        except (OSError, ValueError) as e:
+            rows.append({'file': path, 'kind': 'error: %s' % e})
+            failed = True
+    names = []
+    for row in rows:
+        names += [n for n in row if n not in names]
+    print_table([{n: row.get(n, '') for n in names} for row in rows], empty='no artefacts')
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
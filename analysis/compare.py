@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""Compare two test runs and fail on significant regressions.
+
+For each cell (setting x function x parallelism by default) present in both
+runs, and each metric, the relative change of the median from the baseline
+is estimated with a bootstrap confidence interval:
+
+    python3 -m analysis.compare $RESULT_DIR/base $RESULT_DIR/new --threshold 5 restore=10
+
+Metrics are spans and the rows derived by analysis.results (`restore`, the
+time until the VM resumed, and `function`, the latency the function reports
+itself), and `bpf:<map>` for the bpftrace maps of runs made with BPF set,
+e.g. `bpf:pf` for page faults. A metric regresses when the whole interval
+lies above zero and the median grew by more than its threshold, in percent.
+The command exits with status 1 if any metric regressed.
+"""
+
+import argparse
+import sys
+
+import numpy as np
+
+from analysis import results
+
+DEFAULT_METRICS = (results.RESTORE, results.FUNCTION, 'invoke')
+DEFAULT_THRESHOLD = 5.0  # percent
+
+REGRESSION = 'REGRESSION'
+IMPROVEMENT = 'improvement'
+
+
+def bootstrap_ci(base, new, resamples=2000, confidence=0.95, rng=None):
+    """Bootstrap interval of the relative change of the median, in percent.
+
+    :return: (change, low, high)
+    """
+    rng = np.random.default_rng(0) if rng is None else rng
+    base = np.asarray(base, dtype=np.float64)
+    new = np.asarray(new, dtype=np.float64)
+    base_medians = np.median(base[rng.integers(0, len(base), (resamples, len(base)))], axis=1)
+    new_medians = np.median(new[rng.integers(0, len(new), (resamples, len(new)))], axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        changes = (new_medians - base_medians) / base_medians * 100.0
+    changes = changes[np.isfinite(changes)]
+    base_median = np.median(base)
+    change = (np.median(new) - base_median) / base_median * 100.0 if base_median else np.nan
+    if not len(changes):
+        return change, np.nan, np.nan
+    alpha = (1.0 - confidence) / 2.0
+    low, high = np.quantile(changes, [alpha, 1.0 - alpha])
+    return change, low, high
+
+
+def samples(table, by, metrics):
+    """{(cell, metric): durations} of the span metrics in table."""
+    out = {}
+    keep = [m for m in metrics if not m.startswith('bpf:')]
+    codes = [table.code('span', m) for m in keep]
+    table = table.select(np.isin(table.span, codes))
+    if not len(table):
+        return out
+    keys = list(by) + ['span']
+    grouped = np.stack([table.columns[k] for k in keys], axis=1)
+    uniq, inverse = np.unique(grouped, axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    order = np.argsort(inverse, kind='stable')
+    bounds = np.searchsorted(inverse[order], np.arange(len(uniq) + 1))
+    for i, row in enumerate(uniq):
+        decoded = tuple(str(table.categories[k][v]) if k in table.categories else int(v)
+                        for k, v in zip(keys, row))
+        out[(decoded[:-1], decoded[-1])] = table.duration[order[bounds[i]:bounds[i + 1]]]
+    return out
+
+
+def bpf_samples(test_dir, by, metrics):
+    """{(cell, 'bpf:<map>'): totals} of the bpftrace sections of each run."""
+    out = {}
+    wanted = set(m[len('bpf:'):] for m in metrics if m.startswith('bpf:'))
+    for run_id, sections in results.read_bpftrace(test_dir).items():
+        setting, function, par, par_snap, record_input, test_input = \
+            results.parse_run_id(run_id)
+        fields = dict(setting=setting, function=function, par=par, par_snap=par_snap,
+                      record_input=record_input, test_input=test_input, run_id=run_id)
+        cell = tuple(fields[k] for k in by)
+        for section in sections:
+            for name, total in section.items():
+                if '*' in wanted or name in wanted:
+                    out.setdefault((cell, 'bpf:' + name), []).append(total)
+    return {k: np.array(v, dtype=np.float64) for k, v in out.items()}
+
+
+def compare(base_dir, new_dir, metrics=DEFAULT_METRICS, by=('setting', 'function', 'par'),
+            thresholds=None, resamples=2000, confidence=0.95, min_samples=3, cache=True):
+    """Compares the metrics of each cell present in both runs.
+
+    :param thresholds: {metric: percent}; the '' key is the default.
+    :return: list of dicts, one per cell and metric.
+    """
+    thresholds = dict(thresholds or {})
+    default = thresholds.pop('', DEFAULT_THRESHOLD)
+    base = samples(results.load(base_dir, cache=cache), by, metrics)
+    new = samples(results.load(new_dir, cache=cache), by, metrics)
+    base.update(bpf_samples(base_dir, by, metrics))
+    new.update(bpf_samples(new_dir, by, metrics))
+
+    rng = np.random.default_rng(0)
+    rows = []
+    for key in sorted(set(base) & set(new), key=lambda k: (tuple(map(str, k[0])), k[1])):
+        cell, metric = key
+        b, n = base[key], new[key]
+        row = dict(zip(by, cell))
+        row.update(metric=metric, n_base=len(b), n_new=len(n),
+                   base_p50=float(np.median(b)), new_p50=float(np.median(n)))
+        threshold = thresholds.get(metric, default)
+        if len(b) < min_samples or len(n) < min_samples:
+            row.update(change=np.nan, low=np.nan, high=np.nan, verdict='too few samples')
+        else:
+            change, low, high = bootstrap_ci(b, n, resamples, confidence, rng)
+            if low > 0 and change > threshold:
+                verdict = REGRESSION
+            elif high < 0 and -change > threshold:
+                verdict = IMPROVEMENT
+            else:
+                verdict = ''
+            row.update(change=float(change), low=float(low), high=float(high), verdict=verdict)
+        rows.append(row)
+    return rows
+
+
+def parse_thresholds(values):
+    """['5', 'restore=10'] -> {'': 5.0, 'restore': 10.0}"""
+    thresholds = {}
+    for value in values or []:
+        metric, _, percent = value.rpartition('=')
+        thresholds[metric] = float(percent.rstrip('%'))
+    return thresholds
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare two test runs and fail on regressions')
+    parser.add_argument('base', help='RESULT_DIR/TESTID of the baseline')
+    parser.add_argument('new', help='RESULT_DIR/TESTID to check')
+    parser.add_argument('--metric', nargs='+', default=list(DEFAULT_METRICS),
+                        help='spans, restore, function, or bpf:<map> (bpf:* for all maps)')
+    parser.add_argument('--by', nargs='+', default=['setting', 'function', 'par'],
+                        choices=['setting', 'function', 'par', 'par_snap',
+                                 'record_input', 'test_input', 'run_id'],
+                        help='columns that make a cell')
+    parser.add_argument('--threshold', nargs='+', default=[],
+                        help='allowed growth of the median in percent, as a default '
+                        'and/or per metric, e.g. 5 restore=10 (default %g)' % DEFAULT_THRESHOLD)
+    parser.add_argument('--confidence', type=float, default=0.95, help='confidence of the intervals')
+    parser.add_argument('--resamples', type=int, default=2000, help='bootstrap resamples')
+    parser.add_argument('--min-samples', type=int, default=3, help='skip cells with fewer samples')
+    parser.add_argument('--no-cache', action='store_true', help='parse every trace again')
+    parser.add_argument('--all', action='store_true', help='print every cell, not only flagged ones')
+    args = parser.parse_args(argv)
+
+    rows = compare(args.base, args.new, args.metric, args.by, parse_thresholds(args.threshold),
+                   args.resamples, args.confidence, args.min_samples, not args.no_cache)
+    shown = rows if args.all else [r for r in rows if r['verdict']]
+    results.print_table(shown, empty='nothing flagged')
+    regressions = sum(r['verdict'] == REGRESSION for r in rows)
+    print('%d cells x metrics compared, %d regressions' % (len(rows), regressions))
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""Analyze snapshot memory files offline, without booting VMs.
+
+A memfile (e.g. `Full.memfile` or `Warm.memfile`) is memory-mapped and
+scanned in chunks of pages, so multi-GB files are read in bounded memory.
+For each page the scan records whether it is all zero and a 128-bit content
+hash. From these:
+
+- the zero pages of each file, and the pages whose content repeats within a
+  file or appears in another one;
+- the non-zero region layout `record_regions` would compute for given
+  `size_threshold` and `interval_threshold`, as Snapshot.GetNonZeroRegions
+  does, and how it covers the pages an invocation touches, i.e. the mincore
+  layers or ws regions of the snapshot's index in `<base_path>/catalog`:
+
+    python3 -m analysis.memfile $TEST_DIR/*/Warm.memfile --index $BASE_PATH/catalog/*.idx \\
+        --size-threshold 0 8 32 --interval-threshold 0 32 128
+
+The hashes are linear combinations of the page's 64-bit words with random
+odd weights: fast, and good enough to count duplicates, but not
+cryptographic.
+"""
+
+import argparse
+import json
+import mmap
+import os
+import sys
+
+import numpy as np
+
+from analysis.artefacts import SnapshotIndex
+from analysis.results import print_table
+
+PAGE_SIZE = mmap.PAGESIZE
+CHUNK_MB = 64
+HASH_SEED = 0x6661736e6170  # fixed, so hashes compare across runs
+
+
+class MemfileScan(object):
+    """Per-page results of scanning one memfile.
+
+    nonzero: bool per page; hashes: (pages, 2) uint64, zero for zero pages.
+    """
+
+    def __init__(self, path, page_size, nonzero, hashes):
+        self.path = path
+        self.page_size = page_size
+        self.nonzero = nonzero
+        self.hashes = hashes
+
+    @property
+    def pages(self):
+        return len(self.nonzero)
+
+    def keys(self):
+        """Hashes of the non-zero pages as one sortable 16-byte value each."""
+        return np.ascontiguousarray(self.hashes[self.nonzero]).view('V16').ravel()
+
+
+def _weights(words):
+    rng = np.random.default_rng(HASH_SEED)
+    return rng.integers(0, 2**63, (words, 2), dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+
+
+def scan(path, page_size=PAGE_SIZE, chunk_mb=CHUNK_MB, hashes=True):
+    """Scan a memfile chunk by chunk; see MemfileScan."""
+    if page_size % 8:
+        raise ValueError('page size must be a multiple of 8')
+    words = page_size // 8
+    weights = _weights(words) if hashes else None
+    chunk_pages = max(1, (chunk_mb << 20) // page_size)
+    size = os.path.getsize(path)
+    pages = (size + page_size - 1) // page_size
+    nonzero = np.zeros(pages, dtype=bool)
+    out = np.zeros((pages, 2), dtype=np.uint64) if hashes else None
+    if not size:
+        return MemfileScan(path, page_size, nonzero, out)
+
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        advise = hasattr(mm, 'madvise') and page_size % mmap.PAGESIZE == 0
+        if advise:
+            mm.madvise(mmap.MADV_SEQUENTIAL)
+        full = size // page_size
+        for first in range(0, full, chunk_pages):
+            n = min(chunk_pages, full - first)
+            chunk = np.frombuffer(mm, dtype=np.uint64, count=n * words,
+                                  offset=first * page_size).reshape(n, words)
+            nonzero[first:first + n] = chunk.any(axis=1)
+            if hashes:
+                out[first:first + n] = chunk @ weights
+            del chunk
+            if advise:
+                # the pages were read once; keep the resident set bounded
+                mm.madvise(mmap.MADV_DONTNEED, first * page_size, n * page_size)
+        if full < pages:  # a partial last page, padded with zeros
+            tail = np.zeros(words, dtype=np.uint64)
+            tail.view(np.uint8)[:size - full * page_size] = np.frombuffer(mm, dtype=np.uint8, offset=full * page_size)
+            nonzero[full] = tail.any()
+            if hashes:
+                out[full] = tail @ weights
+    if hashes:
+        out[~nonzero] = 0
+    return MemfileScan(path, page_size, nonzero, out)
+
+
+def runs(mask):
+    """(starts, lengths) of the runs of True in a bool array."""
+    edges = np.diff(np.concatenate(([False], mask, [False])).astype(np.int8))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    return starts, ends - starts
+
+
+def nonzero_regions(nonzero, size_threshold=0, interval_threshold=0):
+    """(starts, lengths), in pages, of the regions record_regions keeps.
+
+    As Snapshot.GetNonZeroRegions: non-zero runs separated by fewer than
+    interval_threshold zero pages are merged, and merged regions of fewer
+    than size_threshold pages are dropped.
+    """
+    starts, lengths = runs(nonzero)
+    if not len(starts):
+        return starts, lengths
+    ends = starts + lengths
+    gaps = starts[1:] - ends[:-1]
+    first = np.concatenate(([True], gaps >= interval_threshold))
+    group = np.flatnonzero(first)
+    last = np.concatenate((group[1:], [len(starts)])) - 1
+    starts, lengths = starts[group], ends[last] - starts[group]
+    keep = lengths >= size_threshold
+    return starts[keep], lengths[keep]
+
+
+def region_mask(starts, lengths, pages):
+    """bool per page: whether it is in one of the regions."""
+    delta = np.zeros(pages + 1, dtype=np.int32)
+    np.add.at(delta, starts, 1)
+    np.add.at(delta, np.minimum(starts + lengths, pages), -1)
+    return np.cumsum(delta[:-1]) > 0
+
+
+def read_index(path):
+    """Decode a catalog index file of the daemon, see analysis.artefacts.
+
+    :return: dict with the snapshot's meta, 'records' (REAP fault offsets in
+        bytes, in fault order), 'layers' (mincore layer per page, 0 if in
+        none), 'overlay' and 'ws' ((starts, lengths) in pages, by start).
+    """
+    with SnapshotIndex(path) as ix:
+        index = dict(ix.meta)
+        index['records'] = ix.records.astype(np.int64)
+        index['layers'] = ix.layers.astype(np.int64)
+        for name in ('overlay', 'ws'):
+            pairs = getattr(ix, name).astype(np.int64)
+            order = np.argsort(pairs[:, 0], kind='stable')
+            index[name] = (pairs[order, 0], pairs[order, 1])
+    return index
+
+
+def touched_pages(index, pages, source='mincore'):
+    """bool per page of the pages an invocation of the snapshot touched:
+    those in a mincore layer, or in its ws regions."""
+    if source == 'ws':
+        return region_mask(*index['ws'], pages)
+    layers = index['layers']
+    mask = np.zeros(pages, dtype=bool)
+    n = min(len(layers), pages)
+    mask[:n] = layers[:n] > 0
+    return mask
+
+
+def summarize(scan_):
+    """Zero and duplicate pages of one memfile."""
+    nonzero = int(scan_.nonzero.sum())
+    unique = len(np.unique(scan_.keys()))
+    return {
+        'file': scan_.path,
+        'pages': scan_.pages,
+        'zero': scan_.pages - nonzero,
+        'zero_pct': 100.0 * (scan_.pages - nonzero) / scan_.pages if scan_.pages else 0.0,
+        'unique': unique,
+        'dup': nonzero - unique,
+    }
+
+
+def shared_pages(scans):
+    """Non-zero pages of each memfile whose content another one also holds,
+    and the distinct contents of all of them together."""
+    keys = [s.keys() for s in scans]
+    uniques = [np.unique(k) for k in keys]
+    rows = []
+    for i, s in enumerate(scans):
+        others = [u for j, u in enumerate(uniques) if j != i]
+        other = np.unique(np.concatenate(others)) if others else uniques[i][:0]
+        rows.append({
+            'file': s.path,
+            'nonzero': len(keys[i]),
+            'shared': int(np.isin(keys[i], other).sum()),
+        })
+    distinct = len(np.unique(np.concatenate(uniques))) if uniques else 0
+    return rows, distinct
+
+
+def layout(scan_, size_threshold, interval_threshold, touched=None, overlay=None):
+    """The region layout for one pair of thresholds and, given the touched
+    pages, how it covers them."""
+    starts, lengths = nonzero_regions(scan_.nonzero, size_threshold, interval_threshold)
+    row = {
+        'size': size_threshold,
+        'interval': interval_threshold,
+        'regions': len(starts),
+        'region_mb': float(lengths.sum()) * scan_.page_size / 2**20,
+    }
+    mask = region_mask(starts, lengths, scan_.pages)
+    row['zero_in_regions'] = int((mask & ~scan_.nonzero).sum())
+    if touched is not None:
+        needed = touched & scan_.nonzero
+        covered = int((needed & mask).sum())
+        row['touched'] = int(needed.sum())
+        row['covered_pct'] = 100.0 * covered / row['touched'] if row['touched'] else 100.0
+        row['untouched_mb'] = float((mask & ~touched).sum()) * scan_.page_size / 2**20
+    if overlay is not None:
+        # whether the daemon recorded the same layout for these thresholds
+        row['as_recorded'] = 'yes' if (np.array_equal(starts, overlay[0]) and
+                                       np.array_equal(lengths, overlay[1])) else 'no'
+    return row
+
+
+def _pair_indexes(paths, index_paths):
+    """Matches index files to memfiles by their memFilePath; a single index
+    goes with a single memfile."""
+    indexes = [read_index(p) for p in index_paths]
+    if len(paths) == 1 and len(indexes) == 1:
+        return {paths[0]: indexes[0]}
+    by_path = {os.path.realpath(ix.get('memFilePath', '')): ix for ix in indexes}
+    return {p: by_path.get(os.path.realpath(p)) for p in paths}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Analyze snapshot memory files offline')
+    parser.add_argument('memfile', nargs='+', help='memory files, e.g. Warm.memfile')
+    parser.add_argument('--index', nargs='+', default=[],
+                        help='catalog index files (<base_path>/catalog/<ssId>.idx) of the snapshots')
+    parser.add_argument('--touched', choices=['mincore', 'ws'], default='mincore',
+                        help='pages an invocation touched: the mincore layers or the ws regions of the index')
+    parser.add_argument('--size-threshold', type=int, nargs='+', default=[0])
+    parser.add_argument('--interval-threshold', type=int, nargs='+', default=[32])
+    parser.add_argument('--page-size', type=int, default=PAGE_SIZE)
+    parser.add_argument('--chunk-mb', type=int, default=CHUNK_MB, help='memory mapped at once per file')
+    parser.add_argument('--json', action='store_true', help='print the results as JSON')
+    args = parser.parse_args(argv)
+
+    scans = [scan(p, args.page_size, args.chunk_mb) for p in args.memfile]
+    indexes = _pair_indexes(args.memfile, args.index)
+    result = {'files': [summarize(s) for s in scans], 'layouts': {}}
+    if len(scans) > 1:
+        result['shared'], result['distinct'] = shared_pages(scans)
+    for s in scans:
+        index = indexes.get(s.path)
+        touched = touched_pages(index, s.pages, args.touched) if index is not None else None
+        overlay = index['overlay'] if index is not None else None
+        result['layouts'][s.path] = [
+            layout(s, size, interval, touched, overlay)
+            for size in args.size_threshold for interval in args.interval_threshold]
+
+    if args.json:
+        json.dump(result, sys.stdout, indent=2)
+        print()
+        return
+    print_table(result['files'])
+    if 'shared' in result:
+        print()
+        print_table(result['shared'])
+        print('distinct non-zero pages of all files:', result['distinct'])
+    for path, rows in result['layouts'].items():
+        print('\n%s' % path)
+        print_table(rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""Replay recorded page accesses against prefetch policies, without a VM.
+
+A workload is the order in which an invocation first touched the pages of a
+snapshot's memory file, and what was recorded to prefetch it: the REAP trace
+(`<snapshot base>/trace`, one hex byte offset per line, or the records of a
+catalog index file) and the mincore layers of the index. Each policy is
+simulated against a disk model, and reports faults, bytes read, I/O requests
+and the latency it adds to the invocation:
+
+    python3 -m analysis.prefetch_sim --index $BASE_PATH/catalog/*.idx \\
+        --policy none reap mincore readahead:8 readahead:32 hybrid:2:32 --bandwidth 500 2000
+
+Policies:
+
+- `none`: every page faults on its first access and is read alone.
+- `reap`: the recorded working set is read sequentially before the VM
+  resumes; the other pages fault one by one.
+- `mincore[:K]`: the pages of mincore layers 1..K (all by default) are read
+  in the background in layer order, in extents, while the function runs; a
+  page accessed before its extent is read waits for it or faults.
+- `readahead:W`: a fault reads the aligned window of W pages around it,
+  clipped to the overlay region of the page.
+- `hybrid:K:W`: mincore layers 1..K in the background, and windows of W
+  pages for the faults on the other pages.
+
+The function is assumed to touch a page every `--think-us` microseconds when
+it does not wait, so background prefetch races the accesses; waits do not
+delay the later accesses. With `--zero-regions` (the default when an index
+has overlay regions), pages outside the overlay regions are zero pages the
+guest gets without I/O, as in FaaSnap's overlay restore.
+
+Accesses replay the workload's own trace by default. `--replay` replays REAP
+traces recorded with another input instead, one per index, to measure how
+the recorded sets generalize.
+"""
+
+import argparse
+import csv
+import itertools
+import os
+from collections import namedtuple
+
+import numpy as np
+
+from analysis.artefacts import read_trace
+from analysis.memfile import PAGE_SIZE, read_index, region_mask
+from analysis.results import print_table
+
+Disk = namedtuple('Disk', 'bandwidth latency queue_depth max_request')
+Policy = namedtuple('Policy', 'name prefetch layers window')
+
+def first_touch(pages):
+    """pages without repeats, in the order of their first occurrence."""
+    _, first = np.unique(pages, return_index=True)
+    return pages[np.sort(first)]
+
+
+class Workload(object):
+    """What was recorded for one snapshot, and the accesses to replay.
+
+    pages: of the memory file; ws: first-touch order of the REAP trace;
+    layers: mincore layer per page, or None; regions: overlay regions
+    (starts, lengths), or None; accesses: first-touch order to replay.
+    """
+
+    def __init__(self, name, pages, ws=None, layers=None, regions=None, accesses=None):
+        self.name = name
+        self.pages = pages
+        self.ws = ws
+        self.layers = layers
+        self.regions = regions
+        if accesses is None:
+            accesses = ws if ws is not None and len(ws) else layer_order(layers)
+        self.accesses = accesses
+
+    @classmethod
+    def from_index(cls, path, page_size=PAGE_SIZE):
+        index = read_index(path)
+        pages = (index.get('size') or 0) // page_size or len(index['layers'])
+        ws = first_touch(index['records'] // page_size) if len(index['records']) else None
+        layers = index['layers'] if len(index['layers']) else None
+        regions = index['overlay'] if len(index['overlay'][0]) else None
+        name = index.get('function') or index.get('snapshotId') or os.path.basename(path)
+        return cls('%s/%s' % (name, index.get('snapshotId', '')), pages, ws, layers, regions)
+
+    @classmethod
+    def from_trace(cls, path, pages=None, page_size=PAGE_SIZE):
+        ws = first_touch(read_trace(path) // page_size)
+        if pages is None:
+            pages = int(ws.max()) + 1 if len(ws) else 0
+        return cls(path, pages, ws)
+
+
+def layer_order(layers, max_layer=None):
+    """Pages of the mincore layers 1..max_layer in layer order, and by offset
+    within a layer."""
+    if layers is None:
+        return np.zeros(0, dtype=np.int64)
+    pages = np.flatnonzero((layers > 0) & ((layers <= max_layer) if max_layer else True))
+    return pages[np.argsort(layers[pages], kind='stable')]
+
+
+def extents(order, keys=None):
+    """Split pages read in order into extents of consecutive pages, with the
+    same key (e.g. layer) each. :return: extent index of each page."""
+    if not len(order):
+        return np.zeros(0, dtype=np.int64)
+    brk = np.diff(order) != 1
+    if keys is not None:
+        brk |= np.diff(keys) != 0
+    return np.concatenate(([0], np.cumsum(brk)))
+
+
+def requests(lengths, disk, page_size):
+    """I/O requests to read extents of these lengths, in pages."""
+    per = max(1, disk.max_request // page_size)
+    return int(np.sum((np.asarray(lengths) + per - 1) // per))
+
+
+def parse_policy(text):
+    parts = text.split(':')
+    kind = parts[0]
+    try:
+        if kind == 'none' and len(parts) == 1:
+            return Policy(text, None, 0, 1)
+        if kind == 'reap' and len(parts) == 1:
+            return Policy(text, 'ws', 0, 1)
+        if kind == 'mincore' and len(parts) <= 2:
+            return Policy(text, 'layers', int(parts[1]) if len(parts) > 1 else 0, 1)
+        if kind == 'readahead' and len(parts) == 2:
+            return Policy(text, None, 0, int(parts[1]))
+        if kind == 'hybrid' and len(parts) == 3:
+            return Policy(text, 'layers', int(parts[1]), int(parts[2]))
+    except ValueError:
+        pass
+    raise argparse.ArgumentTypeError('unknown policy %r' % text)
+
+
+def simulate(workload, policy, disk, think=5e-6, zero_regions=True, page_size=PAGE_SIZE):
+    """Replays the accesses of workload under policy.
+
+    :return: dict of faults, MiB read and prefetched but never accessed,
+        I/O requests and the latency added, in ms; None if the workload has
+        nothing to prefetch for the policy.
+    """
+    npages = workload.pages
+    acc = workload.accesses
+    acc = acc[acc < npages]
+    t = np.arange(len(acc)) * think
+    page_time = page_size / disk.bandwidth
+    fault_cost = disk.latency + page_time
+    load_time = np.full(npages, np.inf)
+    prefetched = np.zeros(0, dtype=np.int64)
+    blocking = 0.0
+    nrequests = 0
+
+    if policy.prefetch == 'ws':
+        if workload.ws is None:
+            return None
+        prefetched = workload.ws[workload.ws < npages]
+        # one compact ws file, read sequentially before the VM resumes
+        nrequests = requests([len(prefetched)], disk, page_size)
+        blocking = nrequests * disk.latency + len(prefetched) * page_time
+        load_time[prefetched] = 0.0
+    elif policy.prefetch == 'layers':
+        if workload.layers is None:
+            return None
+        prefetched = layer_order(workload.layers[:npages], policy.layers)
+        ext = extents(prefetched, workload.layers[prefetched])
+        lengths = np.bincount(ext)
+        nrequests = requests(lengths, disk, page_size)
+        # extents are read by queue_depth workers in order, at the disk's bandwidth
+        done = (np.arange(len(lengths)) // disk.queue_depth + 1) * disk.latency + \
+            np.cumsum(lengths) * page_time
+        load_time[prefetched] = done[ext]
+
+    lt = load_time[acc]
+    late = np.isfinite(lt) & (lt > t)
+    stall = np.minimum(lt[late] - t[late], fault_cost).sum()
+    missed = acc[~np.isfinite(lt)]
+
+    # faults on pages that are not prefetched, in windows of policy.window pages
+    # clipped to the page's overlay region; zero pages outside regions cost nothing
+    region = None
+    if workload.regions is not None:
+        starts, lengths = workload.regions
+        idx = np.searchsorted(starts, missed, side='right') - 1
+        inside = (idx >= 0) & (missed < starts[np.maximum(idx, 0)] + lengths[np.maximum(idx, 0)])
+        if zero_regions:
+            missed, idx = missed[inside], idx[inside]
+        else:
+            idx = np.where(inside, idx, -1 - (missed // max(policy.window, 1)))
+        region = idx
+    window = max(policy.window, 1)
+    block = missed // window
+    key = np.stack((block, region), axis=1) if region is not None else block[:, None]
+    _, first = np.unique(key, axis=0, return_index=True)
+    faults = missed[first]
+    lo = faults // window * window
+    hi = np.minimum(lo + window, npages)
+    if region is not None and workload.regions is not None:
+        r = region[first]
+        inr = r >= 0
+        starts, lengths = workload.regions
+        lo = np.where(inr, np.maximum(lo, starts[np.maximum(r, 0)]), lo)
+        hi = np.where(inr, np.minimum(hi, starts[np.maximum(r, 0)] + lengths[np.maximum(r, 0)]), hi)
+    fault_pages = hi - lo
+    stall += np.sum(disk.latency + fault_pages * page_time)
+    nrequests += requests(fault_pages, disk, page_size)
+
+    touched = np.zeros(npages, dtype=bool)
+    touched[acc] = True
+    read = np.zeros(npages, dtype=bool)
+    read[prefetched] = True
+    read[region_mask(lo, fault_pages, npages)] = True
+    return {
+        'accesses': len(acc),
+        'faults': len(faults) + int(late.sum()),
+        'read_mb': (len(prefetched) + float(fault_pages.sum())) * page_size / 2**20,
+        'wasted_mb': float((read & ~touched).sum()) * page_size / 2**20,
+        'requests': nrequests,
+        'latency_ms': float(blocking + stall) * 1000,
+    }
+
+
+def run(workloads, policies, disks, think=5e-6, zero_regions=None, page_size=PAGE_SIZE):
+    """Rows of simulate for every workload x policy x disk."""
+    rows = []
+    for w, p, d in itertools.product(workloads, policies, disks):
+        zr = zero_regions if zero_regions is not None else w.regions is not None
+        stats = simulate(w, p, d, think, zr, page_size)
+        if stats is None:
+            continue
+        row = {'workload': w.name, 'policy': p.name,
+               'bandwidth': d.bandwidth / 1e6, 'latency_us': d.latency * 1e6}
+        row.update(stats)
+        rows.append(row)
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Replay recorded page accesses against prefetch policies')
+    parser.add_argument('--index', nargs='+', default=[], help='catalog index files of the snapshots')
+    parser.add_argument('--trace', nargs='+', default=[], help='REAP trace files of snapshots without an index')
+    parser.add_argument('--replay', nargs='+', default=[],
+                        help='REAP traces to replay instead, one per index, e.g. recorded with another input')
+    parser.add_argument('--policy', nargs='+', type=parse_policy,
+                        default=[parse_policy(p) for p in ('none', 'reap', 'mincore', 'readahead:32', 'hybrid:0:32')])
+    parser.add_argument('--bandwidth', type=float, nargs='+', default=[1000.0], help='disk bandwidth, MB/s')
+    parser.add_argument('--latency-us', type=float, nargs='+', default=[100.0], help='disk latency per request')
+    parser.add_argument('--queue-depth', type=int, default=8, help='parallel requests of the background loader')
+    parser.add_argument('--max-request-kb', type=int, default=1024)
+    parser.add_argument('--think-us', type=float, default=5.0, help='time between page accesses of the function')
+    parser.add_argument('--zero-regions', dest='zero_regions', action='store_true', default=None)
+    parser.add_argument('--no-zero-regions', dest='zero_regions', action='store_false')
+    parser.add_argument('--page-size', type=int, default=PAGE_SIZE)
+    parser.add_argument('--csv', help='write the results to this file instead')
+    args = parser.parse_args(argv)
+
+    if args.replay and len(args.replay) != len(args.index):
+        parser.error('--replay needs one trace per --index')
+    workloads = [Workload.from_index(p, args.page_size) for p in args.index]
+    for w, path in zip(workloads, args.replay):
+        w.accesses = first_touch(read_trace(path) // args.page_size)
+    workloads += [Workload.from_trace(p, page_size=args.page_size) for p in args.trace]
+    if not workloads:
+        parser.error('no workloads, give --index or --trace')
+    disks = [Disk(bw * 1e6, lat * 1e-6, args.queue_depth, args.max_request_kb << 10)
+             for bw, lat in itertools.product(args.bandwidth, args.latency_us)]
+
+    rows = run(workloads, args.policy, disks, args.think_us * 1e-6, args.zero_regions, args.page_size)
+    if args.csv:
+        with open(args.csv, 'w', newline='') as f:
+            if rows:
+                writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+                writer.writeheader()
+                writer.writerows(rows)
+    else:
+        print_table(rows, empty='no results')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,463 @@
+#!/usr/bin/env python3
+"""Load the traces of a test run into columns and summarize span latencies.
+
+test.py saves one zipkin trace, `<trace_id>.json`, per invocation under
+`RESULT_DIR/TESTID/<runId>/`, and the invocation result next to it.
+`load` flattens the spans of a whole TESTID tree into a `SpanTable` of numpy
+arrays, one row per span, and `summarize` computes latency percentiles per
+setting x function x parallelism x span:
+
+    python3 -m analysis.results $RESULT_DIR/$TESTID --span invoke load_mincore
+
+Parsed columns are cached per run directory in `<TESTID>/.cache/`, and a run
+is parsed again only when its files change.
+"""
+
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+from array import array
+
+import numpy as np
+
+CACHE_DIR = '.cache'
+CACHE_VERSION = 3
+
+# spans whose name carries the function, e.g. invoke_pyaes
+_FUNCTION_SPANS = re.compile(r'^(invoke|doStartVM)_.+$')
+_TRACE_FILE = re.compile(r'^[0-9a-f]+\.json$')
+_RESULT_FILE = re.compile(r'^([0-9a-f]+)-result\.json$')
+_BPF_HEADER = re.compile(r'^==== (\S+) ====$')
+_BPF_VALUE = re.compile(r'^@(\w+)(\[.*\])?: (-?\d+)$')
+
+# rows derived from each trace, besides its spans: the time until the VM
+# resumed, and the latency the function reported itself
+RESTORE = 'restore'
+FUNCTION = 'function'
+# and the phases the guest daemon timed, e.g. guest_import
+GUEST = 'guest_'
+
+# spans of interest on the restore path
+DEFAULT_SPANS = (
+    RESTORE,
+    FUNCTION,
+    GUEST + 'import',
+    GUEST + 'handler',
+    'invoke',
+    'request_load_snapshot',
+    'vm_resume',
+    'load_mincore',
+    'load_mincoreLayers',
+    'load_ws_file',
+    'inflate_ws_file',
+    'MemoryManager.FetchState',
+)
+
+STRING_COLUMNS = ('run_id', 'setting', 'function', 'trace_id', 'span')
+INT_COLUMNS = ('par', 'par_snap', 'record_input', 'test_input', 'depth')
+FLOAT_COLUMNS = ('start', 'duration')
+
+QUANTILES = (50, 90, 99)
+
+
+def parse_run_id(run_id):
+    """Split a runId of test.py into its settings.
+
+    runIds are `setting_function_par_parsnap` for parallel runs,
+    `setting_function_<record input><test input>` otherwise, and
+    `setting_function` for warm runs, whose parallelism is not recorded (-1).
+    A par_snap of 0 marks SHARED_VM runs, whose par invocations went to one VM.
+    """
+    parts = run_id.split('_')
+    setting, function = parts[0], parts[1] if len(parts) > 1 else ''
+    par, par_snap, record_input, test_input = 1, 1, -1, -1
+    if len(parts) == 4:
+        par, par_snap = int(parts[2]), int(parts[3])
+    elif len(parts) == 3 and len(parts[2]) == 2:
+        record_input, test_input = int(parts[2][0]), int(parts[2][1])
+    else:
+        par, par_snap = -1, -1
+    return setting, function, par, par_snap, record_input, test_input
+
+
+def span_name(name):
+    """Drops the function from span names such as invoke_<function>."""
+    m = _FUNCTION_SPANS.match(name)
+    return m.group(1) if m else name
+
+
+class SpanTable(object):
+    """Columns of equal length, one row per span.
+
+    String columns (see STRING_COLUMNS) are stored as int32 codes into a
+    sorted array of unique values, e.g. `table.setting` and
+    `table.categories['setting']`; `table.strings('setting')` decodes them.
+    `start` is the offset of a span from the start of its trace and
+    `duration` its length, both in milliseconds. `depth` is 0 for the root,
+    and -1 for the derived RESTORE, FUNCTION and GUEST rows.
+    """
+
+    def __init__(self, columns, categories):
+        self.columns = columns
+        self.categories = categories
+
+    def __len__(self):
+        return len(self.columns['duration'])
+
+    def __getattr__(self, name):
+        try:
+            return self.__dict__['columns'][name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def strings(self, name):
+        return self.categories[name][self.columns[name]]
+
+    def code(self, name, value):
+        """The code of value in a string column, or -1."""
+        cats = self.categories[name]
+        i = np.searchsorted(cats, value)
+        return int(i) if i < len(cats) and cats[i] == value else -1
+
+    def select(self, mask):
+        return SpanTable({k: v[mask] for k, v in self.columns.items()},
+                         self.categories)
+
+    def where(self, **values):
+        """Rows whose columns equal values, e.g. where(span='invoke')."""
+        mask = np.ones(len(self), dtype=bool)
+        for name, value in values.items():
+            if name in self.categories:
+                value = self.code(name, value)
+            mask &= self.columns[name] == value
+        return self.select(mask)
+
+    def to_pandas(self):
+        import pandas as pd
+        return pd.DataFrame({
+            name: (pd.Categorical.from_codes(col, self.categories[name])
+                   if name in self.categories else col)
+            for name, col in self.columns.items()})
+
+    @classmethod
+    def concat(cls, tables):
+        categories = {}
+        for name in STRING_COLUMNS:
+            categories[name] = np.unique(np.concatenate(
+                [t.categories[name] for t in tables] + [np.array([], dtype=str)]))
+        columns = {}
+        for name in INT_COLUMNS + FLOAT_COLUMNS:
+            columns[name] = np.concatenate(
+                [t.columns[name] for t in tables] +
+                [np.array([], dtype=_dtype(name))])
+        for name in STRING_COLUMNS:
+            # re-code each table against the merged categories
+            columns[name] = np.concatenate(
+                [np.searchsorted(categories[name], t.categories[name])
+                 .astype(np.int32)[t.columns[name]] for t in tables] +
+                [np.array([], dtype=np.int32)])
+        return cls(columns, categories)
+
+
+def _dtype(name):
+    if name in FLOAT_COLUMNS:
+        return np.float64
+    return np.int32
+
+
+class _Builder(object):
+    """Appends rows to compact arrays, and interns strings."""
+
+    def __init__(self):
+        self.values = {name: array('i') for name in INT_COLUMNS}
+        self.values.update({name: array('d') for name in FLOAT_COLUMNS})
+        self.strings = {name: {} for name in STRING_COLUMNS}
+        self.codes = {name: array('i') for name in STRING_COLUMNS}
+
+    def append(self, row):
+        for name in INT_COLUMNS + FLOAT_COLUMNS:
+            self.values[name].append(row[name])
+        for name in STRING_COLUMNS:
+            interned = self.strings[name]
+            self.codes[name].append(interned.setdefault(row[name], len(interned)))
+
+    def table(self):
+        columns = {name: np.frombuffer(values, dtype=_dtype(name)).copy()
+                   if len(values) else np.array([], dtype=_dtype(name))
+                   for name, values in self.values.items()}
+        categories = {}
+        for name in STRING_COLUMNS:
+            values = np.array(list(self.strings[name]), dtype=str)
+            order = np.argsort(values)
+            categories[name] = values[order]
+            remap = np.empty(len(values), dtype=np.int32)
+            remap[order] = np.arange(len(values), dtype=np.int32)
+            codes = np.frombuffer(self.codes[name], dtype=np.int32) \
+                if len(self.codes[name]) else np.array([], dtype=np.int32)
+            columns[name] = remap[codes] if len(values) else codes
+        return SpanTable(columns, categories)
+
+
+def read_trace(path):
+    """Rows of the spans of one trace file, with start relative to the root."""
+    with open(path) as f:
+        spans = json.load(f)
+    if not spans:
+        return []
+    ids = {span['id']: span for span in spans}
+    t0 = min(span['timestamp'] for span in spans if 'timestamp' in span)
+
+    def depth(span):
+        d = 0
+        while span.get('parentId') in ids and d < len(ids):
+            span = ids[span['parentId']]
+            d += 1
+        return d
+
+    rows = []
+    resumed = None
+    for span in spans:
+        if 'duration' not in span:
+            continue  # not finished when the trace was fetched
+        name = span_name(span.get('name', ''))
+        start = (span.get('timestamp', t0) - t0) / 1000.0
+        rows.append({
+            'trace_id': span['traceId'],
+            'span': name,
+            'start': start,
+            'duration': span['duration'] / 1000.0,
+            'depth': depth(span),
+        })
+        if name == 'vm_resume':
+            resumed = max(resumed or 0, start + rows[-1]['duration'])
+    if resumed is not None:
+        rows.append({'trace_id': spans[0]['traceId'], 'span': RESTORE,
+                     'start': 0.0, 'duration': resumed, 'depth': -1})
+    return rows
+
+
+def read_result(path, trace_id):
+    """The FUNCTION row of an invocation result, if it reports a latency, and
+    a GUEST row per phase the guest timed."""
+    with open(path) as f:
+        saved = json.load(f)
+    rows = [{'trace_id': trace_id, 'span': GUEST + phase, 'start': 0.0,
+             'duration': float(ms), 'depth': -1}
+            for phase, ms in sorted((saved.get('guest') or {}).items())]
+    try:
+        output = saved.get('output')
+        if output is None:  # result strings of string mode invocations
+            output = json.loads(saved.get('result'))
+        latency = output['latency']  # seconds
+    except (TypeError, ValueError, KeyError):
+        return rows
+    return [{'trace_id': trace_id, 'span': FUNCTION, 'start': 0.0,
+             'duration': float(latency) * 1000.0, 'depth': -1}] + rows
+
+
+def read_run(run_dir, run_id):
+    setting, function, par, par_snap, record_input, test_input = \
+        parse_run_id(run_id)
+    builder = _Builder()
+    for name in sorted(os.listdir(run_dir)):
+        result = _RESULT_FILE.match(name)
+        if not result and not _TRACE_FILE.match(name):
+            continue  # e.g. <trace_id>-mcstate.json
+        try:
+            if result:
+                rows = read_result(os.path.join(run_dir, name), result.group(1))
+            else:
+                rows = read_trace(os.path.join(run_dir, name))
+        except (ValueError, KeyError) as e:
+            print('skipping %s/%s: %s' % (run_id, name, e), file=sys.stderr)
+            continue
+        for row in rows:
+            row.update(run_id=run_id, setting=setting, function=function,
+                       par=par, par_snap=par_snap,
+                       record_input=record_input, test_input=test_input)
+            builder.append(row)
+    return builder.table()
+
+
+def _signature(run_dir):
+    """Changes whenever a trace file of the run is added or rewritten."""
+    count, latest = 0, 0
+    with os.scandir(run_dir) as entries:
+        for entry in entries:
+            if _TRACE_FILE.match(entry.name) or _RESULT_FILE.match(entry.name):
+                count += 1
+                latest = max(latest, entry.stat().st_mtime_ns)
+    return np.array([CACHE_VERSION, count, latest], dtype=np.int64)
+
+
+def _load_cached(path, signature):
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            if not np.array_equal(data['signature'], signature):
+                return None
+            columns = {name: data['col_' + name]
+                       for name in STRING_COLUMNS + INT_COLUMNS + FLOAT_COLUMNS}
+            categories = {name: data['cat_' + name] for name in STRING_COLUMNS}
+    except (OSError, KeyError, ValueError):
+        return None
+    return SpanTable(columns, categories)
+
+
+def _save_cached(path, signature, table):
+    arrays = {'signature': signature}
+    arrays.update(('col_' + k, v) for k, v in table.columns.items())
+    arrays.update(('cat_' + k, v) for k, v in table.categories.items())
+    tmp = path + '.tmp.npz'
+    np.savez(tmp, **arrays)
+    os.replace(tmp, path)
+
+
+def load(test_dir, cache=True):
+    """Loads all runs under a RESULT_DIR/TESTID directory into a SpanTable.
+
+    :param test_dir: the RESULT_DIR/TESTID directory.
+    :param cache: read and write the parsed columns of each run in
+        test_dir/.cache.
+    """
+    cache_dir = os.path.join(test_dir, CACHE_DIR)
+    tables = []
+    for run_id in sorted(os.listdir(test_dir)):
+        run_dir = os.path.join(test_dir, run_id)
+        if run_id.startswith('.') or not os.path.isdir(run_dir):
+            continue
+        if not cache:
+            tables.append(read_run(run_dir, run_id))
+            continue
+        signature = _signature(run_dir)
+        path = os.path.join(cache_dir, run_id + '.npz')
+        table = _load_cached(path, signature)
+        if table is None:
+            table = read_run(run_dir, run_id)
+            os.makedirs(cache_dir, exist_ok=True)
+            _save_cached(path, signature, table)
+        tables.append(table)
+    return SpanTable.concat(tables)
+
+
+def read_bpftrace(test_dir):
+    """Totals of the bpftrace maps test.py saved with BPF set.
+
+    Each invocation (or batch) of a run is one section of
+    `RESULT_DIR/TESTID/bpftrace`; the values of a map, e.g. the page faults
+    of each vCPU thread in @pf, are summed per section.
+
+    :return: dict of runId to a list of {map name: total}, one per section.
+    """
+    runs = {}
+    path = os.path.join(test_dir, 'bpftrace')
+    if not os.path.exists(path):
+        return runs
+    section = None
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            header = _BPF_HEADER.match(line)
+            if header:
+                section = {}
+                runs.setdefault(header.group(1), []).append(section)
+                continue
+            value = _BPF_VALUE.match(line)
+            if value and section is not None:
+                name = value.group(1)
+                section[name] = section.get(name, 0) + int(value.group(3))
+    return runs
+
+
+def summarize(table, spans=None, by=('setting', 'function', 'par'),
+              quantiles=QUANTILES):
+    """Latency percentiles of each span, per group.
+
+    :param table: SpanTable
+    :param spans: span names to keep, all if None.
+    :param by: columns to group by, besides the span.
+    :param quantiles: percentiles to compute, interpolated like
+        numpy.percentile.
+    :return: list of dicts with the group columns, span, count, p<q> and max.
+    """
+    if spans is not None:
+        codes = [table.code('span', s) for s in spans]
+        table = table.select(np.isin(table.span, codes))
+    if not len(table):
+        return []
+    keys = list(by) + ['span']
+    order = np.lexsort([table.duration] + [table.columns[k] for k in reversed(keys)])
+    durations = table.duration[order]
+    grouped = np.stack([table.columns[k][order] for k in keys])
+    starts = np.flatnonzero(np.concatenate(
+        ([True], np.any(grouped[:, 1:] != grouped[:, :-1], axis=0))))
+    counts = np.diff(np.append(starts, len(order)))
+
+    stats = {}
+    for q in quantiles:
+        # linear interpolation between the closest ranks of each group
+        h = (counts - 1) * (q / 100.0)
+        lo = np.floor(h).astype(np.int64)
+        hi = np.minimum(lo + 1, counts - 1)
+        stats['p%g' % q] = durations[starts + lo] + \
+            (h - lo) * (durations[starts + hi] - durations[starts + lo])
+    stats['max'] = durations[starts + counts - 1]
+
+    rows = []
+    for i, start in enumerate(starts):
+        row = {}
+        for j, k in enumerate(keys):
+            value = grouped[j, start]
+            row[k] = str(table.categories[k][value]) if k in table.categories else int(value)
+        row['count'] = int(counts[i])
+        for name, values in stats.items():
+            row[name] = float(values[i])
+        rows.append(row)
+    if spans is not None:
+        rank = {s: i for i, s in enumerate(spans)}
+        rows.sort(key=lambda r: tuple(r[k] for k in by) + (rank[r['span']],))
+    return rows
+
+
+def print_table(rows, file=sys.stdout, empty='no spans'):
+    if not rows:
+        print(empty, file=file)
+        return
+    names = list(rows[0])
+    cells = [[('%.2f' % v) if isinstance(v, float) else str(v) for v in r.values()]
+             for r in rows]
+    widths = [max(len(n), *(len(c[i]) for c in cells)) for i, n in enumerate(names)]
+    for line in [names] + cells:
+        print('  '.join(v.ljust(w) for v, w in zip(line, widths)).rstrip(), file=file)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Summarize span latencies of a test run')
+    parser.add_argument('test_dir', help='RESULT_DIR/TESTID directory')
+    parser.add_argument('--span', nargs='+', default=list(DEFAULT_SPANS),
+                        help='spans to summarize; "all" for every span')
+    parser.add_argument('--by', nargs='+', default=['setting', 'function', 'par'],
+                        choices=['setting', 'function', 'par', 'par_snap',
+                                 'record_input', 'test_input', 'run_id'],
+                        help='columns to group by')
+    parser.add_argument('--no-cache', action='store_true', help='parse every trace again')
+    parser.add_argument('--csv', help='write the summary to this file instead')
+    args = parser.parse_args(argv)
+
+    table = load(args.test_dir, cache=not args.no_cache)
+    spans = None if args.span == ['all'] else args.span
+    rows = summarize(table, spans, by=args.by)
+    if args.csv:
+        with open(args.csv, 'w', newline='') as f:
+            if rows:
+                writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+                writer.writeheader()
+                writer.writerows(rows)
+    else:
+        print_table(rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,225 @@
+"""analysis.artefacts against small files laid out as the daemon writes them.
+
+The writers here follow encodeIndex in daemon/catalog.go and Write in
+wsfile/wsfile.go; a change of either format must change them too.
+"""
+
+import json
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+import zlib
+
+import numpy as np
+
+from analysis import artefacts
+from analysis.artefacts import FormatError, SnapshotIndex, WsFile
+
+PAGE = 64  # small pages keep the files small; the readers take any size
+
+
+def encode_index(meta, records=(), layers=(), nonzero=(), overlay=(), ws=()):
+    """An FSNPCAT1 index file, as encodeIndex writes it."""
+    meta = json.dumps(meta).encode()
+    bits = bytearray((len(nonzero) + 7) // 8)
+    for i, nz in enumerate(nonzero):
+        if nz:
+            bits[i // 8] |= 1 << (i % 8)
+    head = struct.pack('<8s6I', b'FSNPCAT1', len(meta), len(records), len(layers),
+                       len(nonzero), len(overlay), len(ws))
+    return b''.join([
+        head, meta,
+        struct.pack('<%dQ' % len(records), *records),
+        struct.pack('<%dI' % len(layers), *layers),
+        bytes(bits),
+        struct.pack('<%dQ' % (2 * len(overlay)), *[v for r in overlay for v in r]),
+        struct.pack('<%dQ' % (2 * len(ws)), *[v for r in ws for v in r]),
+    ])
+
+
+def encode_ws(frames):
+    """An FSNPWSZ1 compressed ws file of the raw frames, as wsfile.Write
+    writes it: all-zero frames have no data."""
+    index, data = [], []
+    for raw in frames:
+        comp = b''
+        if raw.strip(b'\0'):
+            c = zlib.compressobj(6, zlib.DEFLATED, -zlib.MAX_WBITS)
+            comp = c.compress(raw) + c.flush()
+        index.append(struct.pack('<II', len(raw), len(comp)))
+        data.append(comp)
+    head = struct.pack('<8sIIQ', b'FSNPWSZ1', len(frames), 0, sum(len(f) for f in frames))
+    return head + b''.join(index) + b''.join(data)
+
+
+def pages(*fills):
+    """Pages filled with the given byte values, 0 for a zero page."""
+    return b''.join(bytes([v]) * PAGE for v in fills)
+
+
+class ArtefactsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def write(self, name, data):
+        path = os.path.join(self.dir, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+
+class TestSnapshotIndex(ArtefactsTest):
+
+    def test_sections(self):
+        nonzero = [True, False, False, True, True, False, False, False, False, True]
+        path = self.write('ss.idx', encode_index(
+            {'snapshotId': 'ss', 'size': 10 * PAGE},
+            records=[3 * PAGE, 0, 2**40 + 5],
+            layers=[1, 0, 0, 2, 2, 0, 0, 0, 0, 3],
+            nonzero=nonzero,
+            overlay=[(9, 1), (0, 1), (3, 2)],
+            ws=[(3, 2), (0, 1)]))
+        with SnapshotIndex(path) as index:
+            self.assertEqual(index.snapshot_id, 'ss')
+            self.assertEqual(index.meta['size'], 10 * PAGE)
+            self.assertEqual(index.records.tolist(), [3 * PAGE, 0, 2**40 + 5])
+            self.assertEqual(index.layers.tolist(), [1, 0, 0, 2, 2, 0, 0, 0, 0, 3])
+            self.assertEqual(index.pages, 10)
+            self.assertEqual(index.nonzero().tolist(), nonzero)
+            self.assertEqual(list(index.iter_overlay()), [(0, 1), (3, 2), (9, 1)])
+            self.assertEqual(list(index.iter_ws()), [(3, 2), (0, 1)])
+            self.assertEqual(index.ws.shape, (2, 2))
+
+    def test_empty_sections(self):
+        path = self.write('ss.idx', encode_index({'snapshotId': 'ss'}))
+        with SnapshotIndex(path) as index:
+            self.assertEqual(index.pages, 0)
+            self.assertEqual(len(index.records), 0)
+            self.assertEqual(index.nonzero().tolist(), [])
+            self.assertEqual(list(index.iter_overlay()), [])
+            self.assertEqual(index.overlay.shape, (0, 2))
+
+    def test_truncated(self):
+        data = encode_index({'snapshotId': 'ss'}, records=[1, 2], ws=[(0, 1)])
+        path = self.write('ss.idx', data[:-1])
+        with self.assertRaisesRegex(FormatError, 'truncated'):
+            SnapshotIndex(path)
+        path = self.write('short.idx', data[:10])
+        with self.assertRaises(FormatError):
+            SnapshotIndex(path)
+
+    def test_other_version(self):
+        data = encode_index({'snapshotId': 'ss'})
+        path = self.write('ss.idx', b'FSNPCAT2' + data[8:])
+        with self.assertRaisesRegex(FormatError, 'version 2'):
+            SnapshotIndex(path)
+        path = self.write('other.idx', b'ELF' + data[3:])
+        with self.assertRaisesRegex(FormatError, 'not a snapshot index'):
+            SnapshotIndex(path)
+
+    def test_ws_file(self):
+        ws = self.write('ws', pages(1, 2, 3))
+        path = self.write('ss.idx', encode_index({'snapshotId': 'ss', 'wsFile': ws},
+                                                 ws=[(5, 2), (1, 1)]))
+        with SnapshotIndex(path) as index, index.ws_file(page_size=PAGE) as f:
+            self.assertEqual([(s, n, bytes(d)) for s, n, d in f.iter_regions()],
+                             [(5, 2, pages(1, 2)), (1, 1, pages(3))])
+
+    def test_reap_ws_file(self):
+        base = os.path.join(self.dir, 'base')
+        os.mkdir(base)
+        with open(os.path.join(base, 'working_set'), 'wb') as f:
+            f.write(pages(7, 8, 9))
+        path = self.write('ss.idx', encode_index({'snapshotId': 'ss', 'snapshotBase': base},
+                                                 records=[4 * PAGE + 1, 0, 3 * PAGE]))
+        with SnapshotIndex(path) as index, index.reap_ws_file(page_size=PAGE) as f:
+            self.assertEqual(f.regions.tolist(), [[0, 1], [3, 2]])
+            self.assertEqual(bytes(f.page(4)), pages(9))
+
+
+class TestWsFile(ArtefactsTest):
+
+    def test_raw(self):
+        path = self.write('ws', pages(1, 0, 2, 3))
+        with WsFile(path, [(10, 1), (2, 3)], PAGE) as f:
+            self.assertFalse(f.compressed)
+            self.assertEqual(f.raw_size, 4 * PAGE)
+            self.assertEqual(bytes(f.page(10)), pages(1))
+            self.assertEqual(bytes(f.page(4)), pages(3))
+            self.assertIsNone(f.page(5))
+            self.assertIsNone(f.page(0))
+            self.assertEqual(f.array().tobytes(), pages(1, 0, 2, 3))
+
+    def test_compressed(self):
+        raw = pages(1, 0, 0, 2, 3, 4, 0)
+        # frames of uneven sizes, cut inside pages, with a zero frame
+        frames = [raw[:PAGE + 10], raw[PAGE + 10:3 * PAGE], raw[3 * PAGE:5 * PAGE + 1], raw[5 * PAGE + 1:]]
+        self.assertFalse(frames[1].strip(b'\0'))
+        path = self.write('ws', encode_ws(frames))
+        with WsFile(path, [(0, 4), (20, 3)], PAGE) as f:
+            self.assertTrue(f.compressed)
+            self.assertEqual(f.raw_size, len(raw))
+            self.assertEqual(f.array().tobytes(), raw)
+            for offset in range(0, len(raw), 7):
+                for size in (1, PAGE, 3 * PAGE):
+                    self.assertEqual(bytes(f.read(offset, size)), raw[offset:offset + size])
+            self.assertEqual([(s, n, bytes(d)) for s, n, d in f.iter_regions()],
+                             [(0, 4, raw[:4 * PAGE]), (20, 3, raw[4 * PAGE:])])
+            self.assertEqual(bytes(f.page(2)), pages(0))
+            self.assertEqual(bytes(f.page(21)), pages(4))
+
+    def test_empty(self):
+        path = self.write('ws', b'')
+        with WsFile(path, [], PAGE) as f:
+            self.assertEqual(f.raw_size, 0)
+            self.assertEqual(list(f.iter_regions()), [])
+
+    def test_size_mismatch(self):
+        path = self.write('ws', pages(1, 2))
+        with self.assertRaisesRegex(FormatError, 'regions'):
+            WsFile(path, [(0, 3)], PAGE)
+        path = self.write('wsz', encode_ws([pages(1, 2)]))
+        with self.assertRaisesRegex(FormatError, 'regions'):
+            WsFile(path, [(0, 1)], PAGE)
+
+    def test_corrupt(self):
+        data = encode_ws([pages(1), pages(2)])
+        path = self.write('ws', data[:-3])
+        with self.assertRaisesRegex(FormatError, 'frame index'):
+            WsFile(path, [(0, 2)], PAGE)
+        path = self.write('ws2', b'FSNPWSZ2' + data[8:])
+        with self.assertRaisesRegex(FormatError, 'version 2'):
+            WsFile(path, [(0, 2)], PAGE)
+
+
+class TestTrace(ArtefactsTest):
+
+    def test_parse_hex_lines(self):
+        text = b'0\n1000\nDEADbeef\n\n  7fffffffffffffff\r\nabc'
+        self.assertEqual(artefacts.parse_hex_lines(text).tolist(),
+                         [0, 0x1000, 0xdeadbeef, 0x7fffffffffffffff, 0xabc])
+        self.assertEqual(artefacts.parse_hex_lines(b'').tolist(), [])
+        self.assertEqual(artefacts.parse_hex_lines(b'\n\n').tolist(), [])
+
+    def test_parse_hex_lines_too_long(self):
+        with self.assertRaises(ValueError):
+            artefacts.parse_hex_lines(b'1\n10000000000000000\n')
+
+    def test_read_trace(self):
+        offsets = [5 * PAGE, 0, PAGE + 3, 6 * PAGE, PAGE]
+        path = self.write('trace', b''.join(b'%x\n' % o for o in offsets))
+        self.assertEqual(artefacts.read_trace(path).tolist(), offsets)
+        self.assertEqual(artefacts.reap_regions(offsets, PAGE).tolist(), [[0, 2], [5, 2]])
+        self.assertEqual(artefacts.reap_regions([], PAGE).shape, (0, 2))
+        row = artefacts.describe(path, PAGE)
+        self.assertEqual((row['kind'], row['records'], row['ws']), ('trace', 5, 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
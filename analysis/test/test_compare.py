@@ -0,0 +1,123 @@
+"""analysis.compare on two TESTID trees of synthetic traces.
+
+Each invocation of a run is a zipkin trace of an invoke_<function> root and
+a vm_resume child, so a run yields the `invoke` and `restore` metrics.
+The samples are close together, so shifting all of them moves the whole
+bootstrap interval.
+"""
+
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from analysis import compare
+
+RUN_ID = 'vanilla_hello_11'
+SAMPLES = 20
+
+
+def durations(median, shift=0.0):
+    """SAMPLES durations in ms around median, all grown by shift percent."""
+    return [(median + 0.1 * (i - SAMPLES // 2)) * (1 + shift / 100.0) for i in range(SAMPLES)]
+
+
+def write_run(test_dir, invoke, restore, run_id=RUN_ID):
+    """A run directory with one trace per invocation, durations in ms."""
+    run_dir = os.path.join(test_dir, run_id)
+    os.makedirs(run_dir)
+    for i, (invoke_ms, restore_ms) in enumerate(zip(invoke, restore)):
+        trace_id = '%016x' % (i + 1)
+        spans = [
+            {'traceId': trace_id, 'id': 'a', 'name': 'invoke_hello',
+             'timestamp': 1000000, 'duration': int(invoke_ms * 1000)},
+            {'traceId': trace_id, 'id': 'b', 'parentId': 'a', 'name': 'vm_resume',
+             'timestamp': 1000000, 'duration': int(restore_ms * 1000)},
+        ]
+        with open(os.path.join(run_dir, trace_id + '.json'), 'w') as f:
+            json.dump(spans, f)
+
+
+class TestCompare(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.base = os.path.join(self.dir, 'base')
+        self.new = os.path.join(self.dir, 'new')
+        write_run(self.base, durations(100), durations(50))
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def compare(self, *thresholds):
+        rows = compare.compare(self.base, self.new, metrics=('restore', 'invoke'),
+                               thresholds=compare.parse_thresholds(thresholds), cache=False)
+        return {r['metric']: r for r in rows}
+
+    def main(self, *args):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            status = compare.main([self.base, self.new, '--metric', 'restore', 'invoke',
+                                   '--no-cache'] + list(args))
+        return status, out.getvalue()
+
+    def test_identical(self):
+        write_run(self.new, durations(100), durations(50))
+        rows = self.compare()
+        self.assertEqual(sorted(rows), ['invoke', 'restore'])
+        for row in rows.values():
+            self.assertEqual((row['setting'], row['function'], row['par']), ('vanilla', 'hello', 1))
+            self.assertEqual((row['n_base'], row['n_new']), (SAMPLES, SAMPLES))
+            self.assertEqual(row['change'], 0)
+            self.assertEqual(row['verdict'], '')
+        status, out = self.main()
+        self.assertEqual(status, 0)
+        self.assertIn('0 regressions', out)
+
+    def test_regression(self):
+        write_run(self.new, durations(100, shift=20), durations(50))
+        rows = self.compare()
+        self.assertEqual(rows['invoke']['verdict'], compare.REGRESSION)
+        self.assertAlmostEqual(rows['invoke']['change'], 20, delta=0.5)
+        self.assertGreater(rows['invoke']['low'], 0)
+        self.assertEqual(rows['restore']['verdict'], '')
+        status, out = self.main()
+        self.assertEqual(status, 1)
+        self.assertIn('1 regressions', out)
+
+    def test_improvement(self):
+        write_run(self.new, durations(100, shift=-20), durations(50))
+        self.assertEqual(self.compare()['invoke']['verdict'], compare.IMPROVEMENT)
+        self.assertEqual(self.main()[0], 0)
+
+    def test_threshold_per_metric(self):
+        self.assertEqual(compare.parse_thresholds(['5', 'restore=10']), {'': 5.0, 'restore': 10.0})
+        self.assertEqual(compare.parse_thresholds(['restore=10%']), {'restore': 10.0})
+        # both metrics grow by 8%: over the default 5%, under restore's 10%
+        write_run(self.new, durations(100, shift=8), durations(50, shift=8))
+        rows = self.compare('restore=10')
+        self.assertEqual(rows['invoke']['verdict'], compare.REGRESSION)
+        self.assertEqual(rows['restore']['verdict'], '')
+        rows = self.compare('10', 'restore=5')
+        self.assertEqual(rows['invoke']['verdict'], '')
+        self.assertEqual(rows['restore']['verdict'], compare.REGRESSION)
+        self.assertEqual(self.main('--threshold', 'restore=10')[0], 1)
+        self.assertEqual(self.main('--threshold', '10')[0], 0)
+
+    def test_too_few_samples(self):
+        write_run(self.new, durations(100, shift=20)[:2], durations(50)[:2])
+        rows = self.compare()
+        self.assertEqual(rows['invoke']['verdict'], 'too few samples')
+        self.assertEqual(self.main()[0], 0)
+
+    def test_cells_in_one_run_only(self):
+        write_run(self.new, durations(100), durations(50), run_id='reap_hello_11')
+        self.assertEqual(self.compare(), {})
+        self.assertEqual(self.main(), (0, '0 cells x metrics compared, 0 regressions\n'))
+
+
+if __name__ == '__main__':
+    unittest.main()
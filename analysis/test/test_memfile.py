@@ -0,0 +1,88 @@
+"""analysis.memfile.nonzero_regions against layouts computed by hand from
+Snapshot.GetNonZeroRegions in daemon/snapshot.go: zero gaps between two
+non-zero runs shorter than interval_threshold are merged, the leading and
+trailing zeros never are, and regions shorter than size_threshold are
+dropped.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from analysis import memfile
+
+
+def mask(layout):
+    """bool per page of a layout string, '#' for a non-zero page."""
+    return np.array([c == '#' for c in layout], dtype=bool)
+
+
+class TestNonZeroRegions(unittest.TestCase):
+
+    def regions(self, layout, size_threshold=0, interval_threshold=0):
+        starts, lengths = memfile.nonzero_regions(mask(layout), size_threshold, interval_threshold)
+        return list(zip(starts.tolist(), lengths.tolist()))
+
+    def test_no_thresholds(self):
+        self.assertEqual(self.regions('##..#...###'), [(0, 2), (4, 1), (8, 3)])
+        self.assertEqual(self.regions('.....'), [])
+        self.assertEqual(self.regions(''), [])
+        self.assertEqual(self.regions('####'), [(0, 4)])
+
+    def test_edge_gaps(self):
+        # leading and trailing zeros stay out, whatever the interval
+        self.assertEqual(self.regions('...##..', interval_threshold=100), [(3, 2)])
+        self.assertEqual(self.regions('..#..#..', interval_threshold=3), [(2, 4)])
+
+    def test_interval_threshold(self):
+        # gaps of 2 and 3 pages
+        layout = '##..#...##'
+        self.assertEqual(self.regions(layout, interval_threshold=2), [(0, 2), (4, 1), (8, 2)])
+        self.assertEqual(self.regions(layout, interval_threshold=3), [(0, 5), (8, 2)])
+        self.assertEqual(self.regions(layout, interval_threshold=4), [(0, 10)])
+
+    def test_size_threshold(self):
+        layout = '#..##..###'
+        self.assertEqual(self.regions(layout, size_threshold=2), [(3, 2), (7, 3)])
+        self.assertEqual(self.regions(layout, size_threshold=3), [(7, 3)])
+        self.assertEqual(self.regions(layout, size_threshold=4), [])
+
+    def test_merge_then_drop(self):
+        # merged regions are measured with their gaps, then filtered
+        layout = '#.#....#'
+        self.assertEqual(self.regions(layout, size_threshold=3, interval_threshold=2), [(0, 3)])
+        self.assertEqual(self.regions(layout, size_threshold=4, interval_threshold=2), [])
+        self.assertEqual(self.regions(layout, size_threshold=8, interval_threshold=5), [(0, 8)])
+
+    def test_region_mask(self):
+        starts, lengths = memfile.nonzero_regions(mask('##..#...##'), 0, 3)
+        self.assertEqual(''.join('#' if m else '.' for m in memfile.region_mask(starts, lengths, 10)),
+                         '#####...##')
+
+
+class TestScan(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_nonzero_and_hashes(self):
+        page = 4096
+        data = bytearray(6 * page)
+        data[page + 100] = 1  # pages 1 and 4 hold the same content
+        data[4 * page + 100] = 1
+        data[6 * page - 1] = 2  # the last byte of the file
+        path = os.path.join(self.dir, 'memfile')
+        with open(path, 'wb') as f:
+            f.write(data)
+        scan = memfile.scan(path, page_size=page, chunk_mb=1)
+        self.assertEqual(scan.pages, 6)
+        self.assertEqual(scan.nonzero.tolist(), [False, True, False, False, True, True])
+        self.assertTrue((scan.hashes[1] == scan.hashes[4]).all())
+        self.assertFalse((scan.hashes[1] == scan.hashes[5]).all())
+        self.assertFalse(scan.hashes[0].any())
@@ -0,0 +1,114 @@
+"""analysis.prefetch_sim on a tiny workload whose results are computed by hand.
+
+The disk reads a page in 1 ms, adds 1 ms of latency per request, and reads
+at most 4 pages per request, one request at a time. The function touches
+pages 0, 1, 2 and 5 of 16, one per second, so only the first access races
+the background loader.
+"""
+
+import argparse
+import unittest
+
+import numpy as np
+
+from analysis import prefetch_sim
+from analysis.prefetch_sim import Disk, Workload, parse_policy
+
+PAGE = 4096
+DISK = Disk(bandwidth=PAGE * 1000.0, latency=1e-3, queue_depth=1, max_request=4 * PAGE)
+MB = PAGE / 2**20  # MiB per page
+
+
+def layers(**pages):
+    """mincore layers of the 16 pages, e.g. layers(p0=1, p5=2)."""
+    out = np.zeros(16, dtype=np.int64)
+    for name, layer in pages.items():
+        out[int(name[1:])] = layer
+    return out
+
+
+class TestSimulate(unittest.TestCase):
+
+    def setUp(self):
+        self.workload = Workload('w', 16, ws=np.array([0, 1, 2, 5]), layers=layers(p0=1, p1=1, p5=2))
+
+    def simulate(self, policy, workload=None, zero_regions=True):
+        return prefetch_sim.simulate(workload or self.workload, parse_policy(policy), DISK,
+                                     think=1.0, zero_regions=zero_regions, page_size=PAGE)
+
+    def check(self, stats, faults, requests, pages_read, latency_ms, wasted=0):
+        self.assertEqual(stats['accesses'], 4)
+        self.assertEqual(stats['faults'], faults)
+        self.assertEqual(stats['requests'], requests)
+        self.assertAlmostEqual(stats['read_mb'], pages_read * MB)
+        self.assertAlmostEqual(stats['wasted_mb'], wasted * MB)
+        self.assertAlmostEqual(stats['latency_ms'], latency_ms)
+        self.assertIs(type(stats['latency_ms']), float)
+        self.assertIs(type(stats['read_mb']), float)
+
+    def test_none(self):
+        # each page faults alone: 1 ms latency + 1 ms read
+        self.check(self.simulate('none'), faults=4, requests=4, pages_read=4, latency_ms=8)
+
+    def test_reap(self):
+        # the 4 ws pages in one request before resuming, then no faults
+        self.check(self.simulate('reap'), faults=0, requests=1, pages_read=4, latency_ms=5)
+
+    def test_mincore(self):
+        # extents [0, 1] (layer 1) done at 3 ms and [5] (layer 2) at 5 ms;
+        # page 0 is accessed at 0 and waits for a fault's worth, page 2 faults
+        self.check(self.simulate('mincore'), faults=2, requests=3, pages_read=4, latency_ms=4)
+
+    def test_mincore_layers(self):
+        # layer 1 only: pages 2 and 5 fault
+        self.check(self.simulate('mincore:1'), faults=3, requests=3, pages_read=4, latency_ms=6)
+
+    def test_readahead(self):
+        # faults on 0 and 5 read pages 0-3 and 4-7, a request each
+        self.check(self.simulate('readahead:4'), faults=2, requests=2, pages_read=8, latency_ms=10, wasted=4)
+
+    def test_hybrid(self):
+        # layer 1 in the background, and the faults on pages 2 and 5 read
+        # windows 0-3 and 4-7; read_mb counts pages 0 and 1 twice
+        self.check(self.simulate('hybrid:1:4'), faults=3, requests=3, pages_read=10, latency_ms=12, wasted=4)
+
+    def test_empty_prefetch(self):
+        # layers present but all 0: nothing is prefetched, no phantom extent
+        workload = Workload('w', 16, ws=np.array([0, 1, 2, 5]), layers=layers())
+        self.check(self.simulate('mincore', workload), faults=4, requests=4, pages_read=4, latency_ms=8)
+        workload = Workload('w', 16, ws=np.array([0, 1, 2, 5]), layers=layers(p0=3))
+        self.check(self.simulate('mincore:2', workload), faults=4, requests=4, pages_read=4, latency_ms=8)
+
+    def test_zero_regions(self):
+        # page 5 is outside the overlay region [0, 3): a zero page, no I/O;
+        # the window of page 0 is clipped to the region
+        workload = Workload('w', 16, ws=np.array([0, 1, 2, 5]), regions=(np.array([0]), np.array([3])))
+        self.check(self.simulate('none', workload), faults=3, requests=3, pages_read=3, latency_ms=6)
+        self.check(self.simulate('readahead:4', workload), faults=1, requests=1, pages_read=3, latency_ms=4)
+
+    def test_no_prefetch_data(self):
+        workload = Workload('w', 16, accesses=np.array([0, 1, 2, 5]))
+        self.assertIsNone(self.simulate('reap', workload))
+        self.assertIsNone(self.simulate('mincore', workload))
+
+    def test_extents(self):
+        self.assertEqual(prefetch_sim.extents(np.array([3, 4, 5, 9, 10]), np.array([1, 1, 2, 2, 2])).tolist(),
+                         [0, 0, 1, 2, 2])
+        self.assertEqual(prefetch_sim.extents(np.zeros(0, dtype=np.int64)).tolist(), [])
+
+
+class TestParsePolicy(unittest.TestCase):
+
+    def test_policies(self):
+        self.assertEqual(parse_policy('none').prefetch, None)
+        self.assertEqual(parse_policy('reap').prefetch, 'ws')
+        self.assertEqual(parse_policy('mincore:2')[1:], ('layers', 2, 1))
+        self.assertEqual(parse_policy('readahead:8')[1:], (None, 0, 8))
+        self.assertEqual(parse_policy('hybrid:1:32')[1:], ('layers', 1, 32))
+        for bad in ('mincore:x', 'readahead', 'hybrid:1', 'lru'):
+            with self.assertRaises(argparse.ArgumentTypeError):
+                parse_policy(bad)
+
+
+if __name__ == '__main__':
+    unittest.main()
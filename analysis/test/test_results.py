@@ -0,0 +1,78 @@
+"""analysis.results: the runIds of test.py, and summarize against
+numpy.percentile."""
+
+import unittest
+
+import numpy as np
+
+from analysis import results
+from analysis.results import parse_run_id
+
+
+class TestParseRunId(unittest.TestCase):
+
+    def test_parallel(self):
+        self.assertEqual(parse_run_id('faasnap_hello_8_4'), ('faasnap', 'hello', 8, 4, -1, -1))
+        # SHARED_VM runs
+        self.assertEqual(parse_run_id('faasnap_hello_8_0'), ('faasnap', 'hello', 8, 0, -1, -1))
+
+    def test_inputs(self):
+        self.assertEqual(parse_run_id('reap_json_12'), ('reap', 'json', 1, 1, 1, 2))
+        self.assertEqual(parse_run_id('reap_json_00'), ('reap', 'json', 1, 1, 0, 0))
+
+    def test_warm(self):
+        self.assertEqual(parse_run_id('warm_hello'), ('warm', 'hello', -1, -1, -1, -1))
+        self.assertEqual(parse_run_id('warm'), ('warm', '', -1, -1, -1, -1))
+
+
+class TestSummarize(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        builder = results._Builder()
+        self.groups = {}
+        # groups of 1 to 40 samples, appended interleaved and unsorted
+        for i in range(40):
+            for setting in ('vanilla', 'faasnap'):
+                for par, span in ((1, 'invoke'), (4, 'invoke'), (1, 'restore')):
+                    if i >= {'vanilla': 40, 'faasnap': 7}[setting] // par:
+                        continue
+                    duration = float(rng.lognormal(3, 1))
+                    self.groups.setdefault((setting, 'hello', par, span), []).append(duration)
+                    builder.append(dict(
+                        run_id='%s_hello_%d_%d' % (setting, par, par), setting=setting,
+                        function='hello', trace_id='%x' % i, span=span, par=par, par_snap=par,
+                        record_input=-1, test_input=-1, depth=0, start=0.0, duration=duration))
+        self.table = builder.table()
+        self.assertIn(1, [len(v) for v in self.groups.values()])
+
+    def test_percentiles(self):
+        rows = results.summarize(self.table)
+        self.assertEqual(len(rows), len(self.groups))
+        for row in rows:
+            values = self.groups[(row['setting'], row['function'], row['par'], row['span'])]
+            self.assertEqual(row['count'], len(values))
+            for q in results.QUANTILES:
+                self.assertAlmostEqual(row['p%g' % q], np.percentile(values, q))
+            self.assertEqual(row['max'], max(values))
+
+    def test_quantiles_and_by(self):
+        rows = results.summarize(self.table, by=('setting',), quantiles=(0, 25, 100))
+        self.assertEqual(len(rows), 4)
+        for row in rows:
+            values = [v for k, vs in self.groups.items()
+                      if (k[0], k[3]) == (row['setting'], row['span']) for v in vs]
+            self.assertEqual(row['count'], len(values))
+            np.testing.assert_allclose([row['p0'], row['p25'], row['p100']],
+                                       np.percentile(values, [0, 25, 100]))
+
+    def test_spans(self):
+        rows = results.summarize(self.table, spans=['restore', 'invoke', 'missing'])
+        self.assertEqual([(r['setting'], r['par'], r['span']) for r in rows], [
+            ('faasnap', 1, 'restore'), ('faasnap', 1, 'invoke'), ('faasnap', 4, 'invoke'),
+            ('vanilla', 1, 'restore'), ('vanilla', 1, 'invoke'), ('vanilla', 4, 'invoke')])
+        self.assertEqual(results.summarize(self.table, spans=['missing']), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""Compare the result modes of invocations on large function outputs.
+
+Boots one warm VM of a function and invokes it repeatedly in each result
+mode, for outputs of increasing size, e.g. Chameleon tables of a few MiB:
+
+- string: the body comes back escaped in the result string, and is parsed
+  twice, the response and then the result;
+- json: the body is embedded as is in output and parsed once;
+- raw: the body is streamed as the response and parsed once.
+
+Reported per output size and mode: the round trip until the function's
+output is a Python object, and the bytes of the response.
+
+The daemon must be running with the config's "faasnap" section:
+
+    sudo ./bench-results.py test-2inputs.json --function chameleon --rows 100 400 1600
+"""
+
+import argparse
+import json
+import sys
+import time
+
+sys.path.extend(["./python_client"])
+from swagger_client.api.default_api import DefaultApi
+import swagger_client as faasnap
+from swagger_client.configuration import Configuration
+from swagger_client import wait
+from swagger_client.rest import ApiException
+
+MODES = ["string", "json", "raw"]
+
+
+def setup(client: DefaultApi, params, func):
+    client.net_ifaces_namespace_put(
+        namespace="fc1",
+        interface={
+            "host_dev_name": "vmtap0",
+            "iface_id": "eth0",
+            "guest_mac": "AA:FC:00:00:00:01",
+            "guest_addr": "172.16.0.2",
+            "unique_addr": "192.168.1.4",
+        },
+    )
+    try:
+        client.functions_post(
+            function=faasnap.Function(
+                func_name=func["name"],
+                image=func["image"],
+                overlay=func.get("overlay"),
+                kernel=params["settings"]["warm"]["kernel"],
+                vcpu=params["vcpu"],
+            )
+        )
+    except ApiException as e:
+        print("function not created, using the existing one:", e.body)
+    vm = client.vms_post(vm={"func_name": func["name"], "namespace": "fc1"})
+    wait.wait_for_vm_state(client, vm.vm_id, "running", timeout=params.get("wait_timeout", 60))
+    return vm.vm_id
+
+
+def invoke(client: DefaultApi, vm_id, name, func_params, mode):
+    """Invokes once; returns (seconds until the output is parsed, response bytes)."""
+    invoc = faasnap.Invocation(func_name=name, vm_id=vm_id, params=func_params, mincore=-1, enable_reap=False, result_mode=mode)
+    t1 = time.perf_counter()
+    ret = client.invocations_post(invocation=invoc)
+    if mode == "raw":
+        data = ret.data
+        output = json.loads(data)
+    else:
+        data = client.api_client.last_response.data
+        output = ret.output if ret.output is not None else json.loads(ret.result)
+    elapsed = time.perf_counter() - t1
+    if "latency" not in output:
+        raise RuntimeError("unexpected output of %s: %.100s" % (name, output))
+    return elapsed, len(data)
+
+
+def bench(client: DefaultApi, vm_id, name, func_params, modes, requests):
+    results = []
+    for mode in modes:
+        invoke(client, vm_id, name, func_params, mode)  # warm the handler and the connection
+        times, size = [], 0
+        for _ in range(requests):
+            elapsed, size = invoke(client, vm_id, name, func_params, mode)
+            times.append(elapsed)
+        times.sort()
+        results.append({
+            "params": func_params,
+            "mode": mode,
+            "p50_ms": times[len(times) // 2] * 1000,
+            "p99_ms": times[int(len(times) * 0.99)] * 1000,
+            "response_mib": size / 2**20,
+        })
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the result modes of invocations on large function outputs")
+    parser.add_argument("config", help="test config, e.g. test-2inputs.json")
+    parser.add_argument("--function", default="chameleon")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 400, 1600],
+                        help="table rows of the chameleon outputs, 400 columns each")
+    parser.add_argument("--params", nargs="+", help="request bodies to use instead of --rows")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES)
+    parser.add_argument("--requests", type=int, default=20, help="invocations timed per size and mode")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args(argv)
+
+    with open(args.config) as f:
+        params = json.load(f)
+    func = params["functions"][args.function]
+    bodies = args.params or [json.dumps({"num_of_rows": rows, "num_of_cols": 400}) for rows in args.rows]
+
+    conf = Configuration()
+    conf.host = params["host"]
+    client = faasnap.DefaultApi(faasnap.ApiClient(conf))
+    wait.wait_for_daemon(client, timeout=params.get("wait_timeout", 60))
+    vm_id = setup(client, params, func)
+    try:
+        results = []
+        for body in bodies:
+            results.extend(bench(client, vm_id, func["name"], body, args.modes, args.requests))
+    finally:
+        client.vms_vm_id_delete(vm_id=vm_id)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print("%-40s %-7s %10s %10s %13s" % ("params", "mode", "p50 ms", "p99 ms", "response MiB"))
+    for r in results:
+        print("%-40s %-7s %10.1f %10.1f %13.2f" % (
+            r["params"][:40], r["mode"], r["p50_ms"], r["p99_ms"], r["response_mib"]))
+
+
+if __name__ == "__main__":
+    main()
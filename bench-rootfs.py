@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""Compare the host page cache the rootfs layouts take for cold boots.
+
+For each layout, drops the host page cache of its drive files and
+cold-boots one VM per function in turn, each invoked once and stopped:
+
+- full: the function's image, e.g. debian-python-rootfs.ext4;
+- slim: the shared base (--slim-image) and the function's overlay drive,
+  the entry of "overlays" named as the function, if any.
+
+Reported per function: the bytes its VMM read from storage (read volume),
+and the page cache all the layout's drives take once it ran (footprint).
+Functions after the first find the files they share in the cache already,
+so the footprint of the last function is that of the whole layout. With
+--isolated the cache is dropped before each function instead.
+
+The daemon must be running with the config's "faasnap" section, which has
+both layouts, see rootfs/README.md:
+
+    sudo ./bench-rootfs.py test-2inputs.json --functions image-recognition video-processing pagerank
+"""
+
+import argparse
+import ctypes
+import json
+import os
+import sys
+
+sys.path.extend(["./python_client"])
+from swagger_client.api.default_api import DefaultApi
+import swagger_client as faasnap
+from swagger_client.configuration import Configuration
+from swagger_client import wait
+from swagger_client.rest import ApiException
+
+LAYOUTS = ["full", "slim"]
+
+_libc = ctypes.CDLL(None, use_errno=True)
+_libc.mmap.restype = ctypes.c_void_p
+_libc.mmap.argtypes = [ctypes.c_void_p, ctypes.c_size_t, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_long]
+_libc.munmap.argtypes = [ctypes.c_void_p, ctypes.c_size_t]
+_libc.mincore.argtypes = [ctypes.c_void_p, ctypes.c_size_t, ctypes.c_void_p]
+PROT_READ, MAP_SHARED = 1, 1
+
+
+def cached_bytes(path):
+    """Bytes of the file in the host page cache, by mincore."""
+    size = os.path.getsize(path)
+    if not size:
+        return 0
+    page = os.sysconf("SC_PAGE_SIZE")
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        addr = _libc.mmap(None, size, PROT_READ, MAP_SHARED, fd, 0)
+        if addr in (None, ctypes.c_void_p(-1).value):
+            raise OSError(ctypes.get_errno(), "mmap " + path)
+        try:
+            vec = (ctypes.c_ubyte * ((size + page - 1) // page))()
+            if _libc.mincore(addr, size, vec) != 0:
+                raise OSError(ctypes.get_errno(), "mincore " + path)
+            return sum(b & 1 for b in vec) * page
+        finally:
+            _libc.munmap(addr, size)
+    finally:
+        os.close(fd)
+
+
+def drop_cache(path):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fdatasync(fd)  # dirty pages are not dropped
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+
+
+def read_bytes(pid):
+    with open("/proc/%d/io" % pid) as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key == "read_bytes":
+                return int(value)
+    return 0
+
+
+def drives(config, func, layout, slim_image):
+    """(image alias, overlay alias or None) of func in layout."""
+    if layout == "full":
+        return func["image"], None
+    overlay = func["name"] if func["name"] in config.get("overlays", {}) else None
+    return slim_image, overlay
+
+
+def boot(client: DefaultApi, params, func, image, overlay):
+    """Cold-boots a VM of func, invokes it once and stops it; returns the
+    bytes its VMM read."""
+    client.functions_post(function=faasnap.Function(
+        func_name=func["name"], image=image, overlay=overlay,
+        kernel=params["settings"]["warm"]["kernel"], vcpu=params["vcpu"]))
+    vm = client.vms_post(vm={"func_name": func["name"], "namespace": "fc1"})
+    try:
+        wait.wait_for_vm_state(client, vm.vm_id, "running", timeout=params.get("wait_timeout", 60))
+        pid = client.vms_vm_id_get(vm_id=vm.vm_id).pid
+        client.invocations_post(invocation=faasnap.Invocation(
+            func_name=func["name"], vm_id=vm.vm_id, params=func["params"][0], mincore=-1, enable_reap=False,
+            result_mode="json"))
+        return read_bytes(pid)
+    finally:
+        client.vms_vm_id_delete(vm_id=vm.vm_id)
+        wait.wait_for_vm_stopped(client, vm.vm_id, timeout=params.get("wait_timeout", 60))
+
+
+def bench(client: DefaultApi, params, names, layout, slim_image, isolated):
+    config = params["faasnap"]
+    funcs = [params["functions"][name] for name in names]
+    files = set()
+    for func in funcs:
+        image, overlay = drives(config, func, layout, slim_image)
+        files.add(config["images"][image])
+        if overlay:
+            files.add(config["overlays"][overlay])
+    results = []
+    for i, func in enumerate(funcs):
+        if isolated or i == 0:
+            for path in files:
+                drop_cache(path)
+        image, overlay = drives(config, func, layout, slim_image)
+        read = boot(client, params, func, image, overlay)
+        results.append({
+            "layout": layout,
+            "function": func["name"],
+            "drives": image + ("+" + overlay if overlay else ""),
+            "read_mib": read / 2**20,
+            "footprint_mib": sum(cached_bytes(p) for p in files) / 2**20,
+        })
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the host page cache the rootfs layouts take for cold boots")
+    parser.add_argument("config", help="test config, e.g. test-2inputs.json")
+    parser.add_argument("--functions", nargs="+", default=["image-recognition", "video-processing", "pagerank"])
+    parser.add_argument("--layouts", nargs="+", choices=LAYOUTS, default=LAYOUTS)
+    parser.add_argument("--slim-image", default="debian-python-base", help="image alias of the shared base")
+    parser.add_argument("--isolated", action="store_true", help="drop the page cache before each function")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args(argv)
+
+    with open(args.config) as f:
+        params = json.load(f)
+    conf = Configuration()
+    conf.host = params["host"]
+    client = faasnap.DefaultApi(faasnap.ApiClient(conf))
+    wait.wait_for_daemon(client, timeout=params.get("wait_timeout", 60))
+    client.net_ifaces_namespace_put(
+        namespace="fc1",
+        interface={
+            "host_dev_name": "vmtap0",
+            "iface_id": "eth0",
+            "guest_mac": "AA:FC:00:00:00:01",
+            "guest_addr": "172.16.0.2",
+            "unique_addr": "192.168.1.4",
+        },
+    )
+    results = []
+    try:
+        for layout in args.layouts:
+            results.extend(bench(client, params, args.functions, layout, args.slim_image, args.isolated))
+    except ApiException as e:
+        sys.exit("benchmark failed: %s" % e.body)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print("%-7s %-20s %-42s %10s %14s" % ("layout", "function", "drives", "read MiB", "footprint MiB"))
+    for r in results:
+        print("%-7s %-20s %-42s %10.1f %14.1f" % (
+            r["layout"], r["function"], r["drives"][:42], r["read_mib"], r["footprint_mib"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -28,12 +28,16 @@ import (
 	"encoding/json"
 	"errors"
 	"fmt"
+	"io"
 	"io/ioutil"
 	"log"
 	"net"
 	"net/http"
+	"net/http/httptrace"
+	"net/url"
 	"os"
 	"os/exec"
+	"strconv"
 	"strings"
 	"sync"
 	"syscall"
@@ -79,6 +83,14 @@ type VmConfig struct {
 	Networks      []Network     `json:"network-interfaces"`
 }
 
+// time allowed for a cold-booted guest to start serving before it is left
+// in the "starting" state
+const guestReadyTimeout = 60 * time.Second
+
+// line the guest function daemon writes to its serial console (ttyS0) once
+// its server socket is bound; firecracker forwards the console to stdout
+const guestReadyMarker = "faasnap-guest-ready"
+
 type VM struct {
 	sync.Mutex
 	VmId        string      `json:"vmId"`
@@ -93,6 +105,49 @@ type VM struct {
 	Process     *os.Process `json:"-"`
 	httpc       *http.Client
 	Snapshot    *Snapshot
+	// closed once the guest of a cold-booted VM can serve; nil for VMs
+	// restored from a snapshot, which were serving when it was taken
+	ready     chan struct{}
+	readyOnce sync.Once
+	// keep-alive connections to the guest daemon, shared by invocations
+	guestc    *http.Client
+	guestOnce sync.Once
+	// called once the VMM process exited, e.g. by the pool the VM is from
+	onExit func()
+}
+
+// idle connections kept open to each guest daemon, enough for the parallel
+// invocations a VM serves
+const guestIdleConns = 16
+
+func (vm *VM) markReady() {
+	vm.readyOnce.Do(func() { close(vm.ready) })
+}
+
+// guestClient returns the client of the guest daemon, whose connections are
+// reused across invocations. The daemons keep idle connections for 60s or
+// more, so they are dropped here first.
+func (vm *VM) guestClient() *http.Client {
+	vm.guestOnce.Do(func() {
+		vm.guestc = &http.Client{
+			Transport: &http.Transport{
+				DialContext:         (&net.Dialer{Timeout: 5 * time.Second, KeepAlive: 30 * time.Second}).DialContext,
+				MaxIdleConns:        guestIdleConns,
+				MaxIdleConnsPerHost: guestIdleConns,
+				IdleConnTimeout:     50 * time.Second,
+			},
+		}
+	})
+	return vm.guestc
+}
+
+// closeGuest closes the idle connections to the guest daemon once the VM
+// stops.
+func (vm *VM) closeGuest() {
+	vm.guestOnce.Do(func() {})
+	if vm.guestc != nil {
+		vm.guestc.CloseIdleConnections()
+	}
 }
 
 func (vm *VM) Dial() error {
@@ -139,6 +194,7 @@ type VMController struct {
 	Machines map[string]*VM      `json:"machines"`
 	Networks map[string]*Network `json:"netInterfaces"`
 	VMMPool  map[string]*VM      `json:"vmmPool"`
+	invokes  *invokeLogger
 }
 
 func NewVMController(config *Config) *VMController {
@@ -149,6 +205,7 @@ func NewVMController(config *Config) *VMController {
 	vc.Machines = make(map[string]*VM)
 	vc.Networks = make(map[string]*Network)
 	vc.VMMPool = make(map[string]*VM)
+	vc.invokes = newInvokeLogger(config.InvokeLogSample)
 	return vc
 }
 
@@ -167,7 +224,7 @@ func (vc *VMController) AddNetwork(req *http.Request, namespace, hostDevName, if
 	return nil
 }
 
-func (vc *VMController) StartVM(ctx *context.Context, function, kernel, image, namespace string, vcpu, memSize int) (string, error) {
+func (vc *VMController) StartVM(ctx *context.Context, function, kernel, image, overlay, namespace string, vcpu, memSize int) (string, error) {
 	_, span := trace.StartSpan(*ctx, "startVM_setup")
 	vc.Lock()
 	netIface, ok := vc.Networks[namespace]
@@ -194,6 +251,15 @@ func (vc *VMController) StartVM(ctx *context.Context, function, kernel, image, n
 		},
 		Networks: []Network{*netIface},
 	}
+	if overlay != "" {
+		// mounted by the guest over the image, see rootfs/scripts/layer-debian-rootfs.sh
+		conf.Drives = append(conf.Drives, Drive{
+			DriveId:      "overlay",
+			PathOnHost:   overlay,
+			IsRootDevice: false,
+			IsReadOnly:   true,
+		})
+	}
 
 	id := RandStringRunes(8)
 	vmPath := vc.BasePath + "/" + id
@@ -230,6 +296,17 @@ func (vc *VMController) StartVM(ctx *context.Context, function, kernel, image, n
 	}
 	span.End()
 
+	newVM := &VM{
+		VmId:      id,
+		Function:  function,
+		State:     "starting",
+		Socket:    apiSock,
+		VMNetwork: netIface,
+		VmConf:    conf,
+		VmPath:    vmPath,
+		ready:     make(chan struct{}),
+	}
+
 	cmd := &exec.Cmd{
 		Path: ip,
 		Args: []string{
@@ -241,7 +318,7 @@ func (vc *VMController) StartVM(ctx *context.Context, function, kernel, image, n
 			"--api-sock", apiSock,
 			"--config-file", configFile,
 		},
-		Stdout: outFile,
+		Stdout: &serialWatcher{w: outFile, marker: []byte(guestReadyMarker), found: newVM.markReady},
 		Stderr: errFile,
 	}
 
@@ -255,17 +332,7 @@ func (vc *VMController) StartVM(ctx *context.Context, function, kernel, image, n
 	}
 
 	log.Println("vmID:", id, "Started")
-
-	newVM := &VM{
-		VmId:      id,
-		Function:  function,
-		State:     "uninitialized",
-		Socket:    apiSock,
-		VMNetwork: netIface,
-		VmConf:    conf,
-		VmPath:    vmPath,
-		Process:   cmd.Process,
-	}
+	newVM.Process = cmd.Process
 
 	vc.Lock()
 	vc.Machines[id] = newVM
@@ -277,12 +344,141 @@ func (vc *VMController) StartVM(ctx *context.Context, function, kernel, image, n
 		}
 		log.Println("vmID:", vm.VmId, "Stopped")
 		vc.Lock()
+		vm.State = "stopped"
+		vm.closeGuest()
 		delete(vc.Machines, vm.VmId)
 		vc.Unlock()
 	}(newVM)
+	go vc.waitGuestReady(newVM)
 	return id, nil
 }
 
+// waitGuestReady marks a cold-booted VM running once its guest reports ready
+// on the serial console, or gives up when the VM goes away. Connections are
+// still probed now and then for root filesystems whose daemon does not write
+// the marker.
+func (vc *VMController) waitGuestReady(vm *VM) {
+	addr := vm.VMNetwork.UniqueAddr + ":5000"
+	start := time.Now()
+	timeout := time.After(guestReadyTimeout)
+	probe := time.NewTicker(250 * time.Millisecond)
+	defer probe.Stop()
+	for {
+		select {
+		case <-vm.ready:
+			if vc.setState(vm, "starting", "running") {
+				log.Println("vmID:", vm.VmId, "ready after", time.Since(start))
+			}
+			return
+		case <-probe.C:
+			if vc.getState(vm) != "starting" {
+				return
+			}
+			if conn, err := net.DialTimeout("tcp", addr, 100*time.Millisecond); err == nil {
+				conn.Close()
+				vm.markReady()
+			}
+		case <-timeout:
+			log.Println("vmID:", vm.VmId, "not ready after", guestReadyTimeout)
+			return
+		}
+	}
+}
+
+// serialWatcher passes the serial console output of a VM through to w and
+// calls found the first time marker appears in it.
+type serialWatcher struct {
+	w      io.Writer
+	marker []byte
+	found  func()
+	tail   []byte // end of the output so far, in case marker spans writes
+	done   bool
+}
+
+func (s *serialWatcher) Write(p []byte) (int, error) {
+	if !s.done {
+		buf := append(s.tail, p...)
+		if bytes.Contains(buf, s.marker) {
+			s.done = true
+			s.tail = nil
+			s.found()
+		} else if keep := len(s.marker) - 1; len(buf) > keep {
+			s.tail = append(s.tail[:0], buf[len(buf)-keep:]...)
+		} else {
+			s.tail = buf
+		}
+	}
+	return s.w.Write(p)
+}
+
+// setState moves vm to state if it is currently in one of from (any state if
+// from is empty). It reports whether the state was changed.
+func (vc *VMController) setState(vm *VM, state string, from ...string) bool {
+	vc.Lock()
+	defer vc.Unlock()
+	if len(from) > 0 {
+		ok := false
+		for _, f := range from {
+			if vm.State == f {
+				ok = true
+				break
+			}
+		}
+		if !ok {
+			return false
+		}
+	}
+	vm.State = state
+	return true
+}
+
+func (vc *VMController) getState(vm *VM) string {
+	vc.Lock()
+	defer vc.Unlock()
+	return vm.State
+}
+
+func (vc *VMController) describe(vm *VM) *models.VM {
+	vmId := vm.VmId
+	ret := &models.VM{
+		VMID:   &vmId,
+		State:  vm.State,
+		VMPath: vm.VmPath,
+	}
+	if vm.VmConf != nil {
+		ret.VMConf = vm.VmConf
+	}
+	if vm.Process != nil {
+		ret.Pid = int64(vm.Process.Pid)
+	}
+	if vm.VMNetwork != nil {
+		ret.IP = vm.VMNetwork.UniqueAddr
+	}
+	return ret
+}
+
+// DescribeVM returns the current state of a VM. VMs that have exited are no
+// longer known to the controller.
+func (vc *VMController) DescribeVM(vmID string) (*models.VM, error) {
+	vc.Lock()
+	defer vc.Unlock()
+	vm, ok := vc.Machines[vmID]
+	if !ok {
+		return nil, fmt.Errorf("vmID %v not exists", vmID)
+	}
+	return vc.describe(vm), nil
+}
+
+func (vc *VMController) ListVMs() []*models.VM {
+	vc.Lock()
+	defer vc.Unlock()
+	vms := make([]*models.VM, 0, len(vc.Machines))
+	for _, vm := range vc.Machines {
+		vms = append(vms, vc.describe(vm))
+	}
+	return vms
+}
+
 func (vc *VMController) StopVM(req *http.Request, vmID string) error {
 	vc.Lock()
 	vm, ok := vc.Machines[vmID]
@@ -296,9 +492,18 @@ func (vc *VMController) StopVM(req *http.Request, vmID string) error {
 				return err
 			}
 			log.Println("Deactivating Reap finish: ", vmID)
-			vm.Snapshot.records = make([]uint64, len(records))
-			copy(vm.Snapshot.records, records)
+			snapshot := vm.Snapshot
+			snapshot.Lock()
+			recorded := len(snapshot.records) == 0
+			snapshot.records = make([]uint64, len(records))
+			copy(snapshot.records, records)
+			snapshot.Unlock()
+			if recorded {
+				ssManager.persist(snapshot)
+			}
 		}
+		vc.setState(vm, "stopping")
+		vm.closeGuest()
 		if err := vm.Process.Signal(syscall.SIGTERM); err != nil {
 			log.Println("Error calling Signal:", err)
 			log.Println("Not critical if 'process already finished' because userpagefault already deactivated")
@@ -310,6 +515,24 @@ func (vc *VMController) StopVM(req *http.Request, vmID string) error {
 	}
 }
 
+// StopVMs stops every VM, including the idle VMMs of the pool. VMs are
+// removed once their process has exited.
+func (vc *VMController) StopVMs(req *http.Request) error {
+	vc.Lock()
+	ids := make([]string, 0, len(vc.Machines))
+	for id := range vc.Machines {
+		ids = append(ids, id)
+	}
+	vc.Unlock()
+	var lastErr error
+	for _, id := range ids {
+		if err := vc.StopVM(req, id); err != nil {
+			lastErr = err
+		}
+	}
+	return lastErr
+}
+
 func (vc *VMController) TakeSnapshot(r *http.Request, vmID string, snap *Snapshot) error {
 	vc.Lock()
 	vm, ok := vc.Machines[vmID]
@@ -343,6 +566,7 @@ func (vc *VMController) TakeSnapshot(r *http.Request, vmID string, snap *Snapsho
 		return err
 	}
 	if resp.StatusCode < 300 {
+		vc.setState(vm, "paused")
 		log.Println(vmID, "paused")
 	} else {
 		log.Println("pausing", vmID, "response:", resp)
@@ -402,6 +626,7 @@ func (vc *VMController) TakeSnapshot(r *http.Request, vmID string, snap *Snapsho
 		return err
 	}
 	if resp.StatusCode < 300 {
+		vc.setState(vm, "running", "paused")
 		log.Println(vmID, "resumed")
 	} else {
 		log.Println("resuming", vmID, "response:", resp)
@@ -439,23 +664,7 @@ func (vc *VMController) LoadSnapshot(r *http.Request, snapshot *Snapshot, invoc
 	)
 
 	if snapshot.mincoreLayers != nil {
-		go func() {
-			if invoc.UseWsFile {
-				if true {
-					snapshot.loadOnce.Do(func() {
-						if err := snapshot.loadWsFile(r.Context()); err != nil {
-							log.Println(err)
-						}
-					})
-				}
-			} else {
-				snapshot.loadOnce.Do(func() {
-					if err := snapshot.loadMincore(r.Context(), invoc.LoadMincore, false); err != nil {
-						log.Println(err)
-					}
-				})
-			}
-		}()
+		go snapshot.prefetch(r.Context(), invoc)
 	}
 
 	vc.Lock()
@@ -489,11 +698,13 @@ func (vc *VMController) LoadSnapshot(r *http.Request, snapshot *Snapshot, invoc
 
 	log.Println("VM pid:", vm.Process.Pid)
 	// time.Sleep(20 * time.Second)
-	return vm, vc.loadSnapshot(r.Context(), vm, snapshot, invoc, reapId)
+	return vm, vc.loadSnapshot(r.Context(), vm, snapshot, invoc, reapId, true)
 
 }
 
-func (vc *VMController) loadSnapshot(ctx context.Context, vm *VM, snapshot *Snapshot, invoc *models.Invocation, reapId string) error {
+// loadSnapshot restores snapshot into the VMM of vm, and resumes it if
+// resume is set; otherwise the VM stays paused until resumeVM.
+func (vc *VMController) loadSnapshot(ctx context.Context, vm *VM, snapshot *Snapshot, invoc *models.Invocation, reapId string, resume bool) error {
 	var (
 		err       error
 		span      *trace.Span
@@ -559,6 +770,11 @@ func (vc *VMController) loadSnapshot(ctx context.Context, vm *VM, snapshot *Snap
 		}
 		if invoc.UseWsFile {
 			params.WsFilePath = snapshot.WsFile
+			if snapshot.WsCompressed {
+				if params.WsFilePath, err = snapshot.inflateWs(ctx); err != nil {
+					return err
+				}
+			}
 			params.WsRegions = snapshot.wsRegions
 		}
 
@@ -589,29 +805,38 @@ func (vc *VMController) loadSnapshot(ctx context.Context, vm *VM, snapshot *Snap
 		log.Println(resp)
 		return errors.New("loading snapshot failed")
 	}
+	vm.Snapshot = snapshot
+	if !resume {
+		vc.setState(vm, "paused")
+		return nil
+	}
+	return vc.resumeVM(ctx, vm)
+}
 
+// resumeVM resumes a VM whose snapshot is loaded.
+func (vc *VMController) resumeVM(ctx context.Context, vm *VM) error {
 	data := "{\"state\": \"Resumed\"}"
-	req, err = http.NewRequest("PATCH", "http://localhost/vm", strings.NewReader(data))
+	req, err := http.NewRequest("PATCH", "http://localhost/vm", strings.NewReader(data))
 	if err != nil {
 		log.Println(err)
 		return err
 	}
 	req.Header.Add("Accept", "application/json")
 	req.Header.Add("Content-Type", "application/json")
-	_, span = trace.StartSpan(ctx, "vm_resume")
-	resp, err = vm.httpc.Do(req)
+	_, span := trace.StartSpan(ctx, "vm_resume")
+	resp, err := vm.httpc.Do(req)
 	span.End()
 	if err != nil {
 		log.Println(err)
 		return err
 	}
 	if resp.StatusCode < 300 {
+		vc.setState(vm, "running")
 		log.Println(vm.VmId, "resumed")
 	} else {
 		log.Println("resuming", vm.VmId, "response:", resp)
 		return errors.New("resuming failed")
 	}
-	vm.Snapshot = snapshot
 	return nil
 }
 
@@ -684,7 +909,7 @@ func (vc *VMController) startVMM(ctx context.Context, fcExecutable, namespace st
 	newVM := &VM{
 		VmId:      id,
 		Function:  "",
-		State:     "uninitialized",
+		State:     "idle",
 		Socket:    apiSock,
 		VMNetwork: netIface,
 		VmConf:    nil,
@@ -702,67 +927,167 @@ func (vc *VMController) startVMM(ctx context.Context, fcExecutable, namespace st
 		}
 		log.Println("vmID:", vm.VmId, "Stopped")
 		vc.Lock()
+		vm.State = "stopped"
+		vm.closeGuest()
 		delete(vc.Machines, vm.VmId)
 		delete(vc.VMMPool, vm.VmId)
+		onExit := vm.onExit
 		vc.Unlock()
+		if onExit != nil {
+			onExit()
+		}
 	}(newVM)
 
 	return newVM, nil
 }
 
-func (vc *VMController) InvokeFunction(r *http.Request, vmID string, function string, params string) (string, error) {
+// Result is what a guest daemon returned for an invocation: its body, read
+// in full, or in the raw result mode the unread body, which the caller
+// streams and closes.
+type Result struct {
+	Body        []byte
+	ContentType string
+	Stream      io.ReadCloser
+}
+
+// String is the body as the result string of a response.
+func (res *Result) String() string {
+	if res == nil {
+		return ""
+	}
+	return string(res.Body)
+}
+
+// Output is the body, if it is JSON, to be embedded in a response as is;
+// nil otherwise.
+func (res *Result) Output() interface{} {
+	if res == nil || !json.Valid(res.Body) {
+		return nil
+	}
+	return json.RawMessage(res.Body)
+}
+
+func (vc *VMController) InvokeFunction(r *http.Request, vmID string, function string, params string, stream bool) (*Result, error) {
 	vc.Lock()
 	vm, ok := vc.Machines[vmID]
 	vc.Unlock()
 	if !ok {
 		log.Println("vmID ", vmID, " not exists")
-		return "", errors.New("vmID not exists")
+		return nil, errors.New("vmID not exists")
 	}
 
-	client := &http.Client{}
-	url := fmt.Sprintf("%s://%s/invoke?function=%s&redishost=%s&redispasswd=%s", "http", vm.VMNetwork.UniqueAddr+":5000", function, vc.config.RedisHost, vc.config.RedisPasswd)
-	log.Println("requesting ", url, " with params: ", params)
-	newReq, err := http.NewRequest("POST", url, bytes.NewReader([]byte(params)))
-	newReq.Header.Set("Content-Type", "application/json; charset=utf-8")
-	if err != nil {
-		log.Println(err)
-		return "", err
+	query := url.Values{"function": {function}, "redishost": {vc.config.RedisHost}, "redispasswd": {vc.config.RedisPasswd}}
+	target := "http://" + vm.VMNetwork.UniqueAddr + ":5000/invoke?" + query.Encode()
+	if vm.ready != nil {
+		select {
+		case <-vm.ready:
+			// ready already, e.g. a warm invocation: no span
+		default:
+			// cold boot: send the request as soon as the guest reports ready
+			_, span := trace.StartSpan(r.Context(), "wait_guest_ready")
+			select {
+			case <-vm.ready:
+			case <-time.After(guestReadyTimeout):
+				log.Println("vmID:", vmID, "not ready after", guestReadyTimeout, ", invoking anyway")
+			}
+			span.End()
+		}
 	}
-	time.Sleep(4 * time.Second)
-	_, span := trace.StartSpan(r.Context(), "invoke_"+function)
+	ctx, span := trace.StartSpan(r.Context(), "invoke_"+function)
+	var reused bool
+	ctx = httptrace.WithClientTrace(ctx, &httptrace.ClientTrace{
+		GotConn: func(info httptrace.GotConnInfo) { reused = info.Reused },
+	})
+	client := vm.guestClient()
+	start := time.Now()
 	var resp *http.Response
-	for i := 0; i <= 1000; i++ {
+	var err error
+	retries := 0
+	for ; retries <= 1000; retries++ {
+		// a new request each attempt: the body of a failed one may be consumed
+		newReq, rerr := http.NewRequestWithContext(ctx, "POST", target, strings.NewReader(params))
+		if rerr != nil {
+			span.End()
+			return nil, rerr
+		}
+		newReq.Header.Set("Content-Type", "application/json; charset=utf-8")
 		resp, err = client.Do(newReq)
 		if err == nil {
 			break
 		}
-		log.Printf("Request failed: %s, retrying %d", err, i+1)
+		if retries%20 == 0 {
+			vc.invokes.Log(true, "invoke vm=%s function=%s retry=%d err=%q", vmID, function, retries+1, errors.Unwrap(err))
+		}
 		time.Sleep(50 * time.Millisecond)
 	}
+	if err == nil {
+		span.AddAttributes(guestTimings(resp.Header)...)
+	}
+	span.AddAttributes(trace.BoolAttribute("reused", reused), trace.Int64Attribute("retries", int64(retries)))
 	span.End()
 	if err != nil {
-		log.Println(err)
-		return "", err
+		recordInvocation(function, time.Since(start), retries, reused, err)
+		vc.invokes.Log(true, "invoke vm=%s function=%s retries=%d err=%q", vmID, function, retries, errors.Unwrap(err))
+		return nil, err
+	}
+	res := &Result{ContentType: resp.Header.Get("Content-Type")}
+	if stream && resp.StatusCode < 300 {
+		// timed up to the response header; the body is copied by the caller
+		res.Stream = resp.Body
+		elapsed := time.Since(start)
+		recordInvocation(function, elapsed, retries, reused, nil)
+		vc.invokes.Log(false, "invoke vm=%s function=%s status=%d ms=%.3f retries=%d reused=%t stream=true",
+			vmID, function, resp.StatusCode, float64(elapsed.Microseconds())/1000, retries, reused)
+		return res, nil
 	}
 	defer resp.Body.Close()
+	var buf bytes.Buffer
+	if resp.ContentLength > 0 {
+		buf.Grow(int(resp.ContentLength)) // large outputs are read without regrowing
+	}
+	_, err = buf.ReadFrom(resp.Body)
+	res.Body = buf.Bytes()
+	elapsed := time.Since(start)
 	if resp.StatusCode < 300 {
-		log.Println(function, "invoked")
-		body, err := ioutil.ReadAll(resp.Body)
+		recordInvocation(function, elapsed, retries, reused, err)
+		vc.invokes.Log(err != nil, "invoke vm=%s function=%s status=%d ms=%.3f retries=%d reused=%t bytes=%d",
+			vmID, function, resp.StatusCode, float64(elapsed.Microseconds())/1000, retries, reused, len(res.Body))
 		if err != nil {
 			log.Println("read body failed", err)
 		}
-		return string(body), nil
-	} else {
-		log.Println("invoking", function, "response:", resp)
-		if body, err := ioutil.ReadAll(resp.Body); err == nil {
-			log.Println("response body:", string(body))
+		return res, nil
+	}
+	body := res.Body
+	if len(body) > 4096 {
+		body = body[:4096]
+	}
+	recordInvocation(function, elapsed, retries, reused, errors.New("invoking failed"))
+	vc.invokes.Log(true, "invoke vm=%s function=%s status=%d ms=%.3f retries=%d reused=%t body=%q",
+		vmID, function, resp.StatusCode, float64(elapsed.Microseconds())/1000, retries, reused, body)
+	return nil, errors.New("invoking failed")
+}
+
+// guestTimings turns the X-Faasnap-<Phase>-Ms headers of a guest response,
+// e.g. the import, handler and serialization times of the Python daemon,
+// into guest.<phase>_ms span attributes.
+func guestTimings(header http.Header) []trace.Attribute {
+	var attrs []trace.Attribute
+	for key, values := range header {
+		if !strings.HasPrefix(key, "X-Faasnap-") || !strings.HasSuffix(key, "-Ms") || len(values) == 0 {
+			continue
+		}
+		ms, err := strconv.ParseFloat(values[0], 64)
+		if err != nil {
+			continue
 		}
-		return "", errors.New("invoking failed")
+		phase := strings.ToLower(strings.TrimSuffix(strings.TrimPrefix(key, "X-Faasnap-"), "-Ms"))
+		attrs = append(attrs, trace.Float64Attribute("guest."+phase+"_ms", ms))
 	}
+	return attrs
 }
 
 func (vm *VM) getDmesg(context context.Context) ([]byte, error) {
-	client := &http.Client{}
+	client := vm.guestClient()
 	url := fmt.Sprintf("%s://%s/%s", "http", vm.VMNetwork.UniqueAddr+":5000", "dmesg")
 	newReq, err := http.NewRequest("GET", url, bytes.NewReader([]byte{}))
 	if err != nil {
@@ -776,6 +1101,7 @@ func (vm *VM) getDmesg(context context.Context) ([]byte, error) {
 		log.Println(err)
 		return nil, err
 	}
+	defer resp.Body.Close()
 	if resp.StatusCode > 300 {
 		log.Println("invoking dmesg failed. response:", resp)
 		return nil, fmt.Errorf("invoking dmesg failed for vm %v: %v", vm.VmId, resp.StatusCode)
@@ -0,0 +1,291 @@
+// MIT License
+//
+// Copyright (c) 2022 Lixiang Ao
+//
+// Permission is hereby granted, free of charge, to any person obtaining a copy
+// of this software and associated documentation files (the "Software"), to deal
+// in the Software without restriction, including without limitation the rights
+// to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+// copies of the Software, and to permit persons to whom the Software is
+// furnished to do so, subject to the following conditions:
+//
+// The above copyright notice and this permission notice shall be included in all
+// copies or substantial portions of the Software.
+//
+// THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+// IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+// FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+// AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+// LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+// OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+// SOFTWARE.
+
+package daemon
+
+// The snapshot catalog keeps every snapshot the daemon knows on disk, one
+// index file per snapshot in <base_path>/catalog, so that a restarted daemon
+// serves them again without preparing them anew. An index file is
+//
+//	header   magic[8] metaLen:u32 records:u32 pages:u32 nonZero:u32 overlay:u32 ws:u32
+//	meta     JSON of the exported fields and the current mincore layer
+//	records  records * offset:u64          REAP trace, in fault order
+//	layers   pages * layer:u32             mincore layer of each page
+//	nonzero  (nonZero+7)/8 bytes           bit i is set if page i is not all zero
+//	overlay  overlay * (offset:u64 length:u64)
+//	ws       ws * (offset:u64 length:u64)
+//
+// All integers are little endian.
+
+import (
+	"bytes"
+	"encoding/binary"
+	"encoding/json"
+	"errors"
+	"fmt"
+	"log"
+	"os"
+	"path/filepath"
+	"sort"
+	"strings"
+	"sync"
+	"time"
+
+	"github.com/ucsdsysnet/faasnap/models"
+	"github.com/ucsdsysnet/faasnap/reap"
+	"golang.org/x/sys/unix"
+)
+
+const (
+	catalogMagic      = "FSNPCAT1"
+	catalogHeaderSize = 32
+	catalogSuffix     = ".idx"
+)
+
+var errCatalogFormat = errors.New("not a snapshot index file")
+
+type catalogMeta struct {
+	*Snapshot
+	MincoreCurrentLayer int `json:"mincoreCurrentLayer"`
+}
+
+func (sm *SnapshotManager) catalogDir() string {
+	return filepath.Join(sm.config.BasePath, "catalog")
+}
+
+// persist writes the index file of snapshot. Failures are logged only: the
+// snapshot stays usable until the daemon restarts.
+func (sm *SnapshotManager) persist(snapshot *Snapshot) {
+	if sm.config.BasePath == "" {
+		return
+	}
+	snapshot.Lock()
+	defer snapshot.Unlock()
+	data, err := encodeIndex(snapshot)
+	if err != nil {
+		log.Println("encode index of", snapshot.SnapshotId, "failed:", err)
+		return
+	}
+	if err := os.MkdirAll(sm.catalogDir(), 0755); err != nil {
+		log.Println("MkdirAll:", err)
+		return
+	}
+	path := filepath.Join(sm.catalogDir(), snapshot.SnapshotId+catalogSuffix)
+	if err := os.WriteFile(path+".tmp", data, 0644); err != nil {
+		log.Println("write index of", snapshot.SnapshotId, "failed:", err)
+		return
+	}
+	if err := os.Rename(path+".tmp", path); err != nil {
+		log.Println("Rename:", err)
+	}
+}
+
+// LoadCatalog registers the snapshots of the catalog whose memory files are
+// still in place, and their REAP working sets.
+func (sm *SnapshotManager) LoadCatalog() error {
+	if sm.config.BasePath == "" {
+		return nil
+	}
+	start := time.Now()
+	entries, err := os.ReadDir(sm.catalogDir())
+	if os.IsNotExist(err) {
+		return nil
+	} else if err != nil {
+		log.Println("ReadDir:", err)
+		return err
+	}
+	loaded := 0
+	for _, entry := range entries {
+		if !strings.HasSuffix(entry.Name(), catalogSuffix) {
+			continue
+		}
+		path := filepath.Join(sm.catalogDir(), entry.Name())
+		snapshot, err := readIndex(path)
+		if err != nil {
+			log.Println("read", path, "failed:", err)
+			continue
+		}
+		if fi, err := os.Stat(snapshot.MemFilePath); err != nil || int(fi.Size()) != snapshot.Size {
+			log.Println("skipping", snapshot.SnapshotId, "from the catalog: memory file", snapshot.MemFilePath, "missing or changed")
+			continue
+		}
+		if len(snapshot.records) > 0 {
+			if err := reap.Restore(snapshot.SnapshotId, snapshot.SnapshotBase, snapshot.SnapshotPath, snapshot.MemFilePath, snapshot.Size, snapshot.CompressWs, snapshot.records); err != nil {
+				log.Println("REAP working set of", snapshot.SnapshotId, "not restored:", err)
+			}
+		}
+		sm.Lock()
+		sm.Snapshots[snapshot.SnapshotId] = snapshot
+		sm.Unlock()
+		loaded += 1
+	}
+	log.Println("loaded", loaded, "snapshots from the catalog in", time.Since(start))
+	return nil
+}
+
+// GetSnapshots lists the snapshots, ordered by id.
+func (sm *SnapshotManager) GetSnapshots() []*models.SnapshotInfo {
+	sm.Lock()
+	defer sm.Unlock()
+	ret := make([]*models.SnapshotInfo, 0, len(sm.Snapshots))
+	for _, snapshot := range sm.Snapshots {
+		ret = append(ret, &models.SnapshotInfo{
+			SsID:         snapshot.SnapshotId,
+			Function:     snapshot.Function,
+			SnapshotType: snapshot.SnapshotType,
+			SnapshotPath: snapshot.SnapshotPath,
+			MemFilePath:  snapshot.MemFilePath,
+			Version:      snapshot.Version,
+			Size:         int64(snapshot.Size),
+			WsFile:       snapshot.WsFile,
+			WsCompressed: snapshot.WsCompressed,
+			Nlayers:      int64(snapshot.mincoreCurrentLayer),
+			Records:      int64(len(snapshot.records)),
+			CopiedFrom:   snapshot.CopiedFrom,
+		})
+	}
+	sort.Slice(ret, func(i, j int) bool { return ret[i].SsID < ret[j].SsID })
+	return ret
+}
+
+func encodeIndex(snapshot *Snapshot) ([]byte, error) {
+	meta, err := json.Marshal(catalogMeta{snapshot, snapshot.mincoreCurrentLayer})
+	if err != nil {
+		return nil, err
+	}
+	layers := make([]uint32, len(snapshot.mincoreLayers))
+	for i, l := range snapshot.mincoreLayers {
+		layers[i] = uint32(l)
+	}
+	nonZero := make([]byte, (len(snapshot.nonZero)+7)/8)
+	for i, nz := range snapshot.nonZero {
+		if nz {
+			nonZero[i/8] |= 1 << (i % 8)
+		}
+	}
+	overlay := make([]uint64, 0, 2*len(snapshot.overlayRegions))
+	for offset, length := range snapshot.overlayRegions {
+		overlay = append(overlay, uint64(offset), uint64(length))
+	}
+	ws := make([]uint64, 0, 2*len(snapshot.wsRegions))
+	for _, region := range snapshot.wsRegions {
+		ws = append(ws, uint64(region[0]), uint64(region[1]))
+	}
+
+	var buf bytes.Buffer
+	header := make([]byte, catalogHeaderSize)
+	copy(header, catalogMagic)
+	for i, n := range []int{len(meta), len(snapshot.records), len(layers), len(snapshot.nonZero), len(overlay) / 2, len(ws) / 2} {
+		binary.LittleEndian.PutUint32(header[8+4*i:], uint32(n))
+	}
+	buf.Write(header)
+	buf.Write(meta)
+	for _, section := range []interface{}{snapshot.records, layers, nonZero, overlay, ws} {
+		if err := binary.Write(&buf, binary.LittleEndian, section); err != nil {
+			return nil, err
+		}
+	}
+	return buf.Bytes(), nil
+}
+
+// readIndex maps an index file and decodes the snapshot it holds.
+func readIndex(path string) (*Snapshot, error) {
+	f, err := os.Open(path)
+	if err != nil {
+		return nil, err
+	}
+	defer f.Close()
+	fi, err := f.Stat()
+	if err != nil {
+		return nil, err
+	}
+	if fi.Size() < catalogHeaderSize {
+		return nil, errCatalogFormat
+	}
+	data, err := unix.Mmap(int(f.Fd()), 0, int(fi.Size()), unix.PROT_READ, unix.MAP_SHARED)
+	if err != nil {
+		return nil, err
+	}
+	defer unix.Munmap(data)
+	return decodeIndex(data)
+}
+
+func decodeIndex(data []byte) (*Snapshot, error) {
+	le := binary.LittleEndian
+	if len(data) < catalogHeaderSize || string(data[:8]) != catalogMagic {
+		return nil, errCatalogFormat
+	}
+	var n [6]int
+	for i := range n {
+		n[i] = int(le.Uint32(data[8+4*i:]))
+	}
+	metaLen, nrecords, npages, nnonZero, noverlay, nws := n[0], n[1], n[2], n[3], n[4], n[5]
+	size := catalogHeaderSize + metaLen + 8*nrecords + 4*npages + (nnonZero+7)/8 + 16*noverlay + 16*nws
+	if len(data) != size {
+		return nil, fmt.Errorf("index is %d bytes, its header describes %d", len(data), size)
+	}
+
+	snapshot := &Snapshot{
+		loadOnce:       new(sync.Once),
+		overlayRegions: make(map[int]int, noverlay),
+		wsRegions:      make([][]int, 0, nws),
+	}
+	meta := catalogMeta{Snapshot: snapshot}
+	cur := catalogHeaderSize
+	if err := json.Unmarshal(data[cur:cur+metaLen], &meta); err != nil {
+		return nil, err
+	}
+	snapshot.mincoreCurrentLayer = meta.MincoreCurrentLayer
+	cur += metaLen
+
+	if nrecords > 0 {
+		snapshot.records = make([]uint64, nrecords)
+		for i := range snapshot.records {
+			snapshot.records[i] = le.Uint64(data[cur:])
+			cur += 8
+		}
+	}
+	if npages > 0 {
+		// the extents are indexed on the first load, see loadMincore
+		snapshot.mincoreLayers = make([]int, npages)
+		for i := range snapshot.mincoreLayers {
+			snapshot.mincoreLayers[i] = int(le.Uint32(data[cur:]))
+			cur += 4
+		}
+	}
+	if nnonZero > 0 {
+		snapshot.nonZero = make([]bool, nnonZero)
+		for i := range snapshot.nonZero {
+			snapshot.nonZero[i] = data[cur+i/8]&(1<<(i%8)) != 0
+		}
+	}
+	cur += (nnonZero + 7) / 8
+	for i := 0; i < noverlay; i++ {
+		snapshot.overlayRegions[int(le.Uint64(data[cur:]))] = int(le.Uint64(data[cur+8:]))
+		cur += 16
+	}
+	for i := 0; i < nws; i++ {
+		snapshot.wsRegions = append(snapshot.wsRegions, []int{int(le.Uint64(data[cur:])), int(le.Uint64(data[cur+8:]))})
+		cur += 16
+	}
+	return snapshot, nil
+}
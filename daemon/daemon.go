@@ -49,10 +49,17 @@ type Config struct {
 	LogLevel    string            `json:"log_level"`
 	BasePath    string            `json:"base_path"`
 	Images      map[string]string `json:"images"`
+	Overlays    map[string]string `json:"overlays"` // per-function drives over an image, see rootfs/README.md
 	Kernels     map[string]string `json:"kernels"`
 	Executables map[string]string `json:"executables"`
 	RedisHost   string            `json:"redis_host"`
 	RedisPasswd string            `json:"redis_passwd"`
+	// log one in this many successful invocations (default 100); failed
+	// ones are always logged
+	InvokeLogSample int `json:"invoke_log_sample"`
+	// guest memory of idle and restoring VMs of all snapshot pools, in MiB
+	// (0 is unlimited)
+	PoolMemoryMB int `json:"pool_memory_mb"`
 }
 
 type DaemonState struct {
@@ -65,6 +72,7 @@ type DaemonState struct {
 var fnManager *FunctionManager
 var vmController *VMController
 var ssManager *SnapshotManager
+var poolManager *PoolManager
 
 func registerPrometheus() *prometheus.Exporter {
 	pe, err := prometheus.NewExporter(prometheus.Options{Namespace: "daemon"})
@@ -113,6 +121,7 @@ func Setup(s *http.Server, scheme, addr string) *DaemonState {
 	}
 
 	verifyResource("images", &config.Images)
+	verifyResource("overlays", &config.Overlays)
 	verifyResource("kernels", &config.Kernels)
 	verifyResource("executables", &config.Executables)
 
@@ -121,6 +130,7 @@ func Setup(s *http.Server, scheme, addr string) *DaemonState {
 	fnManager = NewFunctionManager(&config)
 	vmController = NewVMController(&config)
 	ssManager = NewSnapshotManager(&config)
+	poolManager = NewPoolManager(&config, vmController)
 
 	state := &DaemonState{
 		FnManager:       fnManager,
@@ -128,7 +138,7 @@ func Setup(s *http.Server, scheme, addr string) *DaemonState {
 		SnapshotManager: ssManager,
 	}
 
-	// pe := registerPrometheus()
+	setupMetrics()
 	// registerZipkin(zipkinHost, port)
 	// mux := http.NewServeMux()
 
@@ -142,7 +152,6 @@ func Setup(s *http.Server, scheme, addr string) *DaemonState {
 	// mux.HandleFunc("/prewarm", preWarm)
 	// http.HandleFunc("/ui/data", handleUiData(state))
 	// http.Handle("/ui/", http.StripPrefix("/ui/", http.FileServer(http.Dir("./ui/build/"))))
-	// http.Handle("/metrics", pe)
 	// mux.Handle("/", http.RedirectHandler("/ui/", http.StatusMovedPermanently))
 
 	// h := &ochttp.Handler{Handler: mux}
@@ -153,6 +162,7 @@ func Setup(s *http.Server, scheme, addr string) *DaemonState {
 	// log.Printf("Server listening at %v! ...", address)
 	// log.Fatal(http.ListenAndServe(address, h))
 	reap.Setup()
+	ssManager.LoadCatalog()
 
 	return state
 }
@@ -178,7 +188,11 @@ func Setup(s *http.Server, scheme, addr string) *DaemonState {
 // }
 
 func CreateFunction(params operations.PostFunctionsParams) error {
-	return fnManager.CreateFunction(*params.Function.FuncName, params.Function.Kernel, params.Function.Image, int(params.Function.Vcpu), int(params.Function.MemSize))
+	return fnManager.CreateFunction(*params.Function.FuncName, params.Function.Kernel, params.Function.Image, params.Function.Overlay, int(params.Function.Vcpu), int(params.Function.MemSize))
+}
+
+func GetFunctions(req *http.Request) []*models.Function {
+	return fnManager.ListFunctions()
 }
 
 func StartVM(req *http.Request, name, ssId, namespace string) (string, error) {
@@ -193,7 +207,7 @@ func DoStartVM(ctx context.Context, function, namespace string) (string, error)
 	_, span := trace.StartSpan(ctx, fmt.Sprintf("doStartVM_%v", function))
 	defer span.End()
 	if fn, ok := fnManager.Functions[function]; ok {
-		if id, err := vmController.StartVM(&ctx, fn.Name, fn.Kernel, fn.Image, namespace, fn.Vcpu, fn.MemSize); err != nil {
+		if id, err := vmController.StartVM(&ctx, fn.Name, fn.Kernel, fn.Image, fn.Overlay, namespace, fn.Vcpu, fn.MemSize); err != nil {
 			return "", err
 		} else {
 			return id, nil
@@ -208,13 +222,27 @@ func StopVM(req *http.Request, vmID string) error {
 	return vmController.StopVM(req, vmID)
 }
 
+func StopVMs(req *http.Request) error {
+	// or the pools would restore their VMs again
+	poolManager.DeletePools()
+	return vmController.StopVMs(req)
+}
+
+func GetVMs(req *http.Request) []*models.VM {
+	return vmController.ListVMs()
+}
+
+func GetVM(req *http.Request, vmID string) (*models.VM, error) {
+	return vmController.DescribeVM(vmID)
+}
+
 func StartVMM(ctx context.Context, enableReap bool, namespace string) (string, error) {
 	_, span := trace.StartSpan(ctx, "start_vmm")
 	defer span.End()
 	return vmController.StartVMM(ctx, enableReap, namespace)
 }
 
-func TakeSnapshot(req *http.Request, vmID string, snapshotType string, snapshotPath string, memFilePath string, version string, recordRegions bool, sizeThreshold, intervalThreshold int) (string, error) {
+func TakeSnapshot(req *http.Request, vmID string, snapshotType string, snapshotPath string, memFilePath string, version string, recordRegions bool, sizeThreshold, intervalThreshold int, compressWs bool) (string, error) {
 	vmController.Lock()
 	vm, ok := vmController.Machines[vmID]
 	vmController.Unlock()
@@ -235,6 +263,7 @@ func TakeSnapshot(req *http.Request, vmID string, snapshotType string, snapshotP
 		MemFilePath:    memFilePath,
 		SnapshotPath:   snapshotPath,
 		Version:        version,
+		CompressWs:     compressWs,
 		overlayRegions: map[int]int{},
 		wsRegions:      [][]int{},
 		loadOnce:       new(sync.Once),
@@ -257,6 +286,7 @@ func TakeSnapshot(req *http.Request, vmID string, snapshotType string, snapshotP
 			return "", err
 		}
 	}
+	ssManager.persist(snap)
 
 	return snap.SnapshotId, nil
 }
@@ -283,7 +313,7 @@ func LoadSnapshotReap(req *http.Request, invoc *models.Invocation) (*VM, error)
 		return nil, errors.New("Snapshot not exists")
 	}
 
-	reapId, err := reap.Register(req.Context(), invoc.SsID, snapshot.SnapshotBase, snapshot.SnapshotPath, snapshot.MemFilePath, snapshot.Size, invoc.WsFileDirectIo, invoc.WsSingleRead)
+	reapId, err := reap.Register(req.Context(), invoc.SsID, snapshot.SnapshotBase, snapshot.SnapshotPath, snapshot.MemFilePath, snapshot.Size, invoc.WsFileDirectIo, invoc.WsSingleRead, snapshot.CompressWs)
 	if err != nil {
 		log.Println("Register REAP failed", err.Error())
 		return nil, err
@@ -319,15 +349,42 @@ func ChangeSnapshot(req *http.Request, ssID string, digHole, loadCache, dropCach
 	return snapshot.UpdateCacheState(digHole, loadCache, dropCache)
 }
 
-func CopySnapshot(ctx context.Context, fromSnapshot, memFilePath string) (*models.Snapshot, error) {
-	return ssManager.CopySnapshot(ctx, fromSnapshot, memFilePath)
+func GetSnapshotStatus(req *http.Request, ssID string) (*models.SnapshotStatus, error) {
+	return ssManager.Status(ssID)
+}
+
+func GetSnapshots(req *http.Request) []*models.SnapshotInfo {
+	return ssManager.GetSnapshots()
+}
+
+func CopySnapshot(ctx context.Context, fromSnapshot, memFilePath, copyMode string) (*models.Snapshot, error) {
+	return ssManager.CopySnapshot(ctx, fromSnapshot, memFilePath, copyMode)
+}
+
+func PutPool(req *http.Request, ssID string, pool *models.PoolConfig) (*models.PoolStatus, error) {
+	ssManager.Lock()
+	snapshot, ok := ssManager.Snapshots[ssID]
+	ssManager.Unlock()
+	if !ok {
+		log.Println("snapshot not exists")
+		return nil, errors.New("snapshot not exists")
+	}
+	return poolManager.SetPool(snapshot, pool.Namespaces, pool.Invocation)
+}
+
+func GetPool(req *http.Request, ssID string) (*models.PoolStatus, error) {
+	return poolManager.Status(ssID)
+}
+
+func DeletePool(req *http.Request, ssID string) error {
+	return poolManager.DeletePool(ssID)
 }
 
 func PutNetwork(req *http.Request, namespace, hostDevName, ifaceId, guestMac, guestAddr, uniqueAddr string) error {
 	return vmController.AddNetwork(req, namespace, hostDevName, ifaceId, guestMac, guestAddr, uniqueAddr)
 }
 
-func InvokeFunction(req *http.Request, invoc *models.Invocation) (string, string, string, error) {
+func InvokeFunction(req *http.Request, invoc *models.Invocation) (*Result, string, string, error) {
 	var vmId string
 	var snapshot *Snapshot
 	var finished chan bool
@@ -345,24 +402,28 @@ func InvokeFunction(req *http.Request, invoc *models.Invocation) (string, string
 		vmController.Unlock()
 		if !ok {
 			log.Println("VM not exists")
-			return "", "", traceId, errors.New("VM not exists")
+			return nil, "", traceId, errors.New("VM not exists")
 		}
 		vmId = invoc.VMID
 	case invoc.SsID != "":
 		// snapshot start
+		if vm := poolManager.claim(req.Context(), invoc.SsID); vm != nil {
+			vmId = vm.VmId
+			break
+		}
 		var err error
 		resultChan := make(chan error)
 		snapshot, ok := ssManager.Snapshots[invoc.SsID]
 		if !ok {
 			log.Println("Snapshot not exists")
-			return "", "", traceId, errors.New("Snapshot not exists")
+			return nil, "", traceId, errors.New("Snapshot not exists")
 		}
 
 		if invoc.EnableReap {
-			reapId, err = reap.Register(req.Context(), invoc.SsID, snapshot.SnapshotBase, snapshot.SnapshotPath, snapshot.MemFilePath, snapshot.Size, invoc.WsFileDirectIo, invoc.WsSingleRead)
+			reapId, err = reap.Register(req.Context(), invoc.SsID, snapshot.SnapshotBase, snapshot.SnapshotPath, snapshot.MemFilePath, snapshot.Size, invoc.WsFileDirectIo, invoc.WsSingleRead, snapshot.CompressWs)
 			if err != nil {
 				log.Println("Register REAP failed", err.Error())
-				return "", "", traceId, err
+				return nil, "", traceId, err
 			}
 			go func() {
 				err := reap.Activate(req, reapId)
@@ -375,10 +436,10 @@ func InvokeFunction(req *http.Request, invoc *models.Invocation) (string, string
 			vmId = vm.VmId
 			if err != nil {
 				log.Println("Snapshot start invocation failed")
-				return "", "", traceId, err
+				return nil, "", traceId, err
 			}
 			if err := <-resultChan; err != nil {
-				return "", "", traceId, err
+				return nil, "", traceId, err
 			}
 			vmController.Machines[vmId].ReapId = reapId
 		} else {
@@ -386,7 +447,7 @@ func InvokeFunction(req *http.Request, invoc *models.Invocation) (string, string
 			vmId = vm.VmId
 			if err != nil {
 				log.Println("Snapshot start invocation failed")
-				return "", "", traceId, err
+				return nil, "", traceId, err
 			}
 		}
 	default:
@@ -394,14 +455,14 @@ func InvokeFunction(req *http.Request, invoc *models.Invocation) (string, string
 		var err error
 		if vmId, err = DoStartVM(req.Context(), *invoc.FuncName, invoc.Namespace); err != nil {
 			log.Println("Cold start invocation failed")
-			return "", "", traceId, err
+			return nil, "", traceId, err
 		}
 	}
 
 	if invoc.SsID != "" && (*invoc.Mincore >= 0 || invoc.MincoreSize > 0) {
 		if *invoc.Mincore >= 0 && invoc.MincoreSize > 0 {
 			log.Println("both mincore modes specified")
-			return "", "", traceId, errors.New("both mincore modes specified")
+			return nil, "", traceId, errors.New("both mincore modes specified")
 		}
 		snapshot = ssManager.Snapshots[invoc.SsID]
 		if snapshot.mincoreLayers == nil {
@@ -411,7 +472,11 @@ func InvokeFunction(req *http.Request, invoc *models.Invocation) (string, string
 
 	if scan {
 		finished = make(chan bool)
-		go snapshot.ScanMincore(req, vmController.Machines[vmId].Process.Pid, int(*invoc.Mincore), int(invoc.MincoreSize), finished)
+		go func() {
+			if err := snapshot.ScanMincore(req, vmController.Machines[vmId].Process.Pid, int(*invoc.Mincore), int(invoc.MincoreSize), finished); err == nil {
+				ssManager.persist(snapshot)
+			}
+		}()
 		defer func() {
 			go func() {
 				finished <- true
@@ -419,9 +484,9 @@ func InvokeFunction(req *http.Request, invoc *models.Invocation) (string, string
 		}()
 	}
 
-	resp, err := vmController.InvokeFunction(req, vmId, *invoc.FuncName, invoc.Params)
+	resp, err := vmController.InvokeFunction(req, vmId, *invoc.FuncName, invoc.Params, invoc.ResultMode == ResultRaw)
 	if err != nil {
-		return "", "", traceId, err
+		return nil, "", traceId, err
 	}
 
 	// if enableReap {
@@ -435,6 +500,53 @@ func InvokeFunction(req *http.Request, invoc *models.Invocation) (string, string
 	return resp, vmId, traceId, nil
 }
 
+// Result modes of an invocation: how the guest's body is returned. The
+// string mode, the default, returns it as the result string; json embeds it
+// as is as the output object when it is JSON; raw streams it as the
+// response body.
+const (
+	ResultString = "string"
+	ResultJSON   = "json"
+	ResultRaw    = "raw"
+)
+
+// BatchResult is the outcome of one invocation of a batch.
+type BatchResult struct {
+	Index    int
+	Result   *Result
+	VmId     string
+	TraceId  string
+	Duration time.Duration
+	Err      error
+}
+
+// InvokeFunctions starts all invocations of a batch concurrently and sends
+// each result on the returned channel as soon as it completes. Every
+// invocation runs under its own root span so that it gets its own trace.
+// The channel is closed after the last result.
+func InvokeFunctions(req *http.Request, invocs []*models.Invocation) <-chan *BatchResult {
+	results := make(chan *BatchResult, len(invocs))
+	var wg sync.WaitGroup
+	for i, invoc := range invocs {
+		wg.Add(1)
+		go func(i int, invoc *models.Invocation) {
+			defer wg.Done()
+			_, span := trace.StartSpan(context.Background(), "/invocations/batch")
+			defer span.End()
+			span.AddAttributes(trace.Int64Attribute("index", int64(i)))
+			itemReq := req.WithContext(trace.NewContext(req.Context(), span))
+			start := time.Now()
+			result, vmId, traceId, err := InvokeFunction(itemReq, invoc)
+			results <- &BatchResult{Index: i, Result: result, VmId: vmId, TraceId: traceId, Duration: time.Since(start), Err: err}
+		}(i, invoc)
+	}
+	go func() {
+		wg.Wait()
+		close(results)
+	}()
+	return results
+}
+
 func ChangeReapCacheState(req *http.Request, ssID string, cache bool) error {
 	if !cache {
 		if err := reap.ClearCache(req.Context(), ssID); err != nil {
@@ -447,13 +559,19 @@ func ChangeReapCacheState(req *http.Request, ssID string, cache bool) error {
 	}
 }
 
-func ChangeMincoreState(ctx context.Context, ssID string, fromRecordSize int, trimRegions bool, toWsFile string, inactiveWs, zeroWs bool, sizeThreshold, intervalThreshold int, nlayers []int64, dropWsCache bool) error {
+func ChangeMincoreState(ctx context.Context, ssID string, fromRecordSize int, trimRegions bool, toWsFile string, compressWs, inactiveWs, zeroWs bool, sizeThreshold, intervalThreshold int, nlayers []int64, dropWsCache, resetLoad bool) error {
 	log.Println("ChangeMincoreState", nlayers, trimRegions)
 	snapshot, ok := ssManager.Snapshots[ssID]
 	if !ok {
 		log.Println("snapshot", ssID, "not exists")
 		return errors.New("snapshot not exists")
 	}
+	if resetLoad {
+		// load the mincore layers or ws file again on the next invocation
+		snapshot.Lock()
+		snapshot.loadOnce = new(sync.Once)
+		snapshot.Unlock()
+	}
 	if fromRecordSize > 0 {
 		if err := snapshot.EmulateMincore(ctx, fromRecordSize); err != nil {
 			return err
@@ -465,10 +583,13 @@ func ChangeMincoreState(ctx context.Context, ssID string, fromRecordSize int, tr
 		}
 	}
 	if toWsFile != "" {
-		if err := snapshot.createWsFile(ctx, toWsFile, inactiveWs, zeroWs, sizeThreshold, intervalThreshold); err != nil {
+		if err := snapshot.createWsFile(ctx, toWsFile, compressWs, inactiveWs, zeroWs, sizeThreshold, intervalThreshold); err != nil {
 			return err
 		}
 	}
+	if fromRecordSize > 0 || trimRegions || toWsFile != "" {
+		ssManager.persist(snapshot)
+	}
 	if len(nlayers) > 0 {
 		return snapshot.PreWarmMincore(ctx, nlayers)
 	}
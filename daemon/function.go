@@ -28,14 +28,19 @@ import (
 	"sync"
 
 	log "github.com/sirupsen/logrus"
+	"github.com/ucsdsysnet/faasnap/models"
 )
 
 type Function struct {
-	Name    string `json:"name"`
-	Kernel  string `json:"kernel"`
-	Image   string `json:"image"`
-	Vcpu    int    `json:"vcpu"`
-	MemSize int    `json:"memSize"`
+	Name         string `json:"name"`
+	Kernel       string `json:"kernel"`
+	Image        string `json:"image"`
+	Overlay      string `json:"overlay"`
+	Vcpu         int    `json:"vcpu"`
+	MemSize      int    `json:"memSize"`
+	kernelAlias  string
+	imageAlias   string
+	overlayAlias string
 }
 
 type FunctionManager struct {
@@ -51,16 +56,15 @@ func NewFunctionManager(config *Config) *FunctionManager {
 	}
 }
 
-func (fm *FunctionManager) CreateFunction(name string, kernel string, image string, vcpu, memSize int) error {
+// CreateFunction adds a function, or replaces the definition of an existing
+// one. VMs already started keep the definition they were started with.
+func (fm *FunctionManager) CreateFunction(name string, kernel string, image string, overlay string, vcpu, memSize int) error {
 	fm.Lock()
 	defer fm.Unlock()
 
-	// verify image
-	if _, ok := fm.Functions[name]; ok {
-		log.Error("function exists")
-		return errors.New("function exists")
+	if name == "" {
+		return errors.New("function name must be populated")
 	}
-
 	if kernel == "" || image == "" {
 		return fmt.Errorf("kernel and image must both be populated")
 	}
@@ -73,6 +77,12 @@ func (fm *FunctionManager) CreateFunction(name string, kernel string, image stri
 	if !ok {
 		return fmt.Errorf("could not find kernel with alias %v", kernel)
 	}
+	var overlayPath string
+	if overlay != "" {
+		if overlayPath, ok = fm.config.Overlays[overlay]; !ok {
+			return fmt.Errorf("could not find overlay with alias %v", overlay)
+		}
+	}
 
 	if vcpu == 0 {
 		vcpu = 2
@@ -81,15 +91,44 @@ func (fm *FunctionManager) CreateFunction(name string, kernel string, image stri
 		memSize = 2048
 	}
 	newFunc := &Function{
-		Name:    name,
-		Kernel:  kernelPath,
-		Image:   imagePath,
-		Vcpu:    vcpu,
-		MemSize: memSize,
+		Name:         name,
+		Kernel:       kernelPath,
+		Image:        imagePath,
+		Overlay:      overlayPath,
+		Vcpu:         vcpu,
+		MemSize:      memSize,
+		kernelAlias:  kernel,
+		imageAlias:   image,
+		overlayAlias: overlay,
 	}
 
-	log.Println("adding function:", *newFunc)
+	if old, ok := fm.Functions[name]; ok {
+		if *old == *newFunc {
+			return nil
+		}
+		log.Println("updating function:", *newFunc)
+	} else {
+		log.Println("adding function:", *newFunc)
+	}
 
 	fm.Functions[name] = newFunc
 	return nil
 }
+
+func (fm *FunctionManager) ListFunctions() []*models.Function {
+	fm.Lock()
+	defer fm.Unlock()
+	funcs := make([]*models.Function, 0, len(fm.Functions))
+	for _, fn := range fm.Functions {
+		name := fn.Name
+		funcs = append(funcs, &models.Function{
+			FuncName: &name,
+			Kernel:   fn.kernelAlias,
+			Image:    fn.imageAlias,
+			Overlay:  fn.overlayAlias,
+			Vcpu:     int64(fn.Vcpu),
+			MemSize:  int64(fn.MemSize),
+		})
+	}
+	return funcs
+}
@@ -0,0 +1,171 @@
+// MIT License
+//
+// Copyright (c) 2022 Lixiang Ao
+//
+// Permission is hereby granted, free of charge, to any person obtaining a copy
+// of this software and associated documentation files (the "Software"), to deal
+// in the Software without restriction, including without limitation the rights
+// to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+// copies of the Software, and to permit persons to whom the Software is
+// furnished to do so, subject to the following conditions:
+//
+// The above copyright notice and this permission notice shall be included in all
+// copies or substantial portions of the Software.
+//
+// THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+// IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+// FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+// AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+// LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+// OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+// SOFTWARE.
+
+package daemon
+
+import (
+	"context"
+	"fmt"
+	"log"
+	"net/http"
+	"sync/atomic"
+	"time"
+
+	"go.opencensus.io/stats"
+	"go.opencensus.io/stats/view"
+	"go.opencensus.io/tag"
+)
+
+// invocations of guest daemons, served on /metrics
+var (
+	mInvokeLatency = stats.Float64("daemon/invoke_latency", "Round trip of invocations to guest daemons", stats.UnitMilliseconds)
+	mInvokeRetries = stats.Int64("daemon/invoke_retries", "Invocation requests retried", stats.UnitDimensionless)
+	mGuestConns    = stats.Int64("daemon/guest_connections", "Connections to guest daemons invocations were sent on", stats.UnitDimensionless)
+	mPoolClaims    = stats.Int64("daemon/pool_claims", "Invocations of snapshots with a pool", stats.UnitDimensionless)
+	mPoolRefill    = stats.Float64("daemon/pool_refill", "Restores of pooled VMs", stats.UnitMilliseconds)
+	mLogDropped    = stats.Int64("daemon/invoke_log_dropped", "Invocation log records dropped", stats.UnitDimensionless)
+
+	keyFunction = tag.MustNewKey("function")
+	keyResult   = tag.MustNewKey("result")
+	keyReused   = tag.MustNewKey("reused")
+	keyHit      = tag.MustNewKey("hit")
+
+	invokeViews = []*view.View{
+		{
+			Name:        "invoke_latency",
+			Description: "Round trip of invocations to guest daemons, in ms",
+			Measure:     mInvokeLatency,
+			TagKeys:     []tag.Key{keyFunction, keyResult},
+			Aggregation: view.Distribution(0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000),
+		},
+		{
+			Name:        "invoke_retries",
+			Description: "Invocation requests retried",
+			Measure:     mInvokeRetries,
+			Aggregation: view.Sum(),
+		},
+		{
+			Name:        "guest_connections",
+			Description: "Connections to guest daemons by whether they were reused",
+			Measure:     mGuestConns,
+			TagKeys:     []tag.Key{keyReused},
+			Aggregation: view.Count(),
+		},
+		{
+			Name:        "pool_claims",
+			Description: "Invocations of snapshots with a pool by whether a pooled VM was resumed",
+			Measure:     mPoolClaims,
+			TagKeys:     []tag.Key{keyFunction, keyHit},
+			Aggregation: view.Count(),
+		},
+		{
+			Name:        "pool_refill_latency",
+			Description: "Restores of pooled VMs, prefetch included, in ms",
+			Measure:     mPoolRefill,
+			TagKeys:     []tag.Key{keyFunction},
+			Aggregation: view.Distribution(10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000),
+		},
+		{
+			Name:        "invoke_log_dropped",
+			Description: "Invocation log records dropped while the logger was behind",
+			Measure:     mLogDropped,
+			Aggregation: view.Sum(),
+		},
+	}
+)
+
+var metricsHandler http.Handler = http.NotFoundHandler()
+
+// MetricsHandler serves the metrics in the Prometheus text format.
+func MetricsHandler() http.Handler {
+	return metricsHandler
+}
+
+func setupMetrics() {
+	if err := view.Register(invokeViews...); err != nil {
+		log.Fatalf("Failed to register views: %v", err)
+	}
+	metricsHandler = registerPrometheus()
+}
+
+func recordInvocation(function string, latency time.Duration, retries int, reused bool, err error) {
+	result := "ok"
+	if err != nil {
+		result = "error"
+	}
+	ctx, _ := tag.New(context.Background(), tag.Upsert(keyFunction, function), tag.Upsert(keyResult, result))
+	stats.Record(ctx, mInvokeLatency.M(float64(latency.Microseconds())/1000))
+	if retries > 0 {
+		stats.Record(ctx, mInvokeRetries.M(int64(retries)))
+	}
+	ctx, _ = tag.New(context.Background(), tag.Upsert(keyReused, fmt.Sprint(reused)))
+	stats.Record(ctx, mGuestConns.M(1))
+}
+
+func recordPoolClaim(function string, hit bool) {
+	ctx, _ := tag.New(context.Background(), tag.Upsert(keyFunction, function), tag.Upsert(keyHit, fmt.Sprint(hit)))
+	stats.Record(ctx, mPoolClaims.M(1))
+}
+
+func recordPoolRefill(function string, latency time.Duration) {
+	ctx, _ := tag.New(context.Background(), tag.Upsert(keyFunction, function))
+	stats.Record(ctx, mPoolRefill.M(float64(latency.Microseconds())/1000))
+}
+
+// invokeLogger logs one invocation in every sample, and every failed one,
+// from its own goroutine, so the invoke path never waits on the log. Records
+// are dropped while the goroutine is behind; the drops are counted on
+// /metrics and logged once it catches up.
+type invokeLogger struct {
+	sample  uint64
+	count   uint64
+	dropped uint64
+	records chan string
+}
+
+func newInvokeLogger(sample int) *invokeLogger {
+	if sample <= 0 {
+		sample = 100
+	}
+	l := &invokeLogger{sample: uint64(sample), records: make(chan string, 256)}
+	go func() {
+		for record := range l.records {
+			log.Println(record)
+			if dropped := atomic.SwapUint64(&l.dropped, 0); dropped > 0 {
+				log.Println(dropped, "invocation log records dropped")
+			}
+		}
+	}()
+	return l
+}
+
+func (l *invokeLogger) Log(failed bool, format string, args ...interface{}) {
+	if n := atomic.AddUint64(&l.count, 1); !failed && n%l.sample != 0 {
+		return
+	}
+	select {
+	case l.records <- fmt.Sprintf(format, args...):
+	default:
+		atomic.AddUint64(&l.dropped, 1)
+		stats.Record(context.Background(), mLogDropped.M(1))
+	}
+}
@@ -0,0 +1,450 @@
+// MIT License
+//
+// Copyright (c) 2022 Lixiang Ao
+//
+// Permission is hereby granted, free of charge, to any person obtaining a copy
+// of this software and associated documentation files (the "Software"), to deal
+// in the Software without restriction, including without limitation the rights
+// to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+// copies of the Software, and to permit persons to whom the Software is
+// furnished to do so, subject to the following conditions:
+//
+// The above copyright notice and this permission notice shall be included in all
+// copies or substantial portions of the Software.
+//
+// THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+// IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+// FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+// AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+// LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+// OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+// SOFTWARE.
+
+package daemon
+
+// A snapshot pool keeps VMs restored from one snapshot and paused, with the
+// snapshot's pages prefetched, so that an invocation of the snapshot only
+// resumes one instead of restoring it. Each pooled VM has a network namespace
+// of its own for as long as it runs; once a claimed VM exits, the pool
+// restores a new one in its namespace in the background. Idle and restoring
+// VMs of all pools hold at most pool_memory_mb of guest memory.
+
+import (
+	"context"
+	"errors"
+	"fmt"
+	"log"
+	"sync"
+	"time"
+
+	"github.com/ucsdsysnet/faasnap/models"
+	"github.com/ucsdsysnet/faasnap/reap"
+	"go.opencensus.io/trace"
+)
+
+type PoolManager struct {
+	sync.Mutex
+	config   *Config
+	vc       *VMController
+	pools    map[string]*VMPool
+	reserved int // bytes of guest memory of idle and restoring VMs
+}
+
+type VMPool struct {
+	sync.Mutex
+	pm         *PoolManager
+	snapshot   *Snapshot
+	invoc      *models.Invocation
+	namespaces []string
+	busy       map[string]string // namespace -> id of the VM in it, "" while restoring
+	idle       []*VM
+	restoring  int
+	closed     bool
+	wake       chan struct{}
+
+	hits, misses, refills  int64
+	refillTime, lastRefill time.Duration
+	// consecutive failed restores, and when the next one may start
+	failures int
+	retryAt  time.Time
+}
+
+// bounds of the backoff between failed restores of a pool, doubling per
+// failure
+const (
+	poolRetryMin = 100 * time.Millisecond
+	poolRetryMax = 30 * time.Second
+)
+
+func NewPoolManager(config *Config, vc *VMController) *PoolManager {
+	return &PoolManager{config: config, vc: vc, pools: make(map[string]*VMPool)}
+}
+
+func (pm *PoolManager) reserve(size int) bool {
+	pm.Lock()
+	defer pm.Unlock()
+	if budget := pm.config.PoolMemoryMB << 20; budget > 0 && pm.reserved+size > budget {
+		return false
+	}
+	pm.reserved += size
+	return true
+}
+
+// release returns memory to the budget, and wakes up the pools, which may be
+// waiting for it, if kick is set.
+func (pm *PoolManager) release(size int, kick bool) {
+	pm.Lock()
+	pm.reserved -= size
+	pools := make([]*VMPool, 0, len(pm.pools))
+	for _, p := range pm.pools {
+		pools = append(pools, p)
+	}
+	pm.Unlock()
+	if kick {
+		for _, p := range pools {
+			p.kick()
+		}
+	}
+}
+
+// SetPool replaces the pool of a snapshot with one of a VM per namespace,
+// restored as invoc describes, e.g. with its ws file or mincore layers.
+func (pm *PoolManager) SetPool(snapshot *Snapshot, namespaces []string, invoc *models.Invocation) (*models.PoolStatus, error) {
+	if len(namespaces) == 0 {
+		return nil, errors.New("no namespaces for the pool")
+	}
+	if invoc == nil {
+		invoc = &models.Invocation{UseMemFile: true}
+	}
+	if invoc.EnableReap && len(namespaces) > 1 {
+		// REAP serves one VM of a snapshot at a time
+		return nil, errors.New("a pool with enable_reap takes one namespace")
+	}
+	pm.vc.Lock()
+	for _, ns := range namespaces {
+		if _, ok := pm.vc.Networks[ns]; !ok {
+			pm.vc.Unlock()
+			return nil, fmt.Errorf("network %s not found", ns)
+		}
+	}
+	pm.vc.Unlock()
+
+	p := &VMPool{
+		pm:         pm,
+		snapshot:   snapshot,
+		invoc:      invoc,
+		namespaces: namespaces,
+		busy:       make(map[string]string),
+		wake:       make(chan struct{}, 1),
+	}
+	pm.Lock()
+	for ssId, other := range pm.pools {
+		if ssId == snapshot.SnapshotId {
+			continue
+		}
+		for _, ns := range other.namespaces {
+			for _, n := range namespaces {
+				if ns == n {
+					pm.Unlock()
+					return nil, fmt.Errorf("namespace %s is in the pool of %s", ns, ssId)
+				}
+			}
+		}
+	}
+	old := pm.pools[snapshot.SnapshotId]
+	pm.pools[snapshot.SnapshotId] = p
+	pm.Unlock()
+	if old != nil {
+		old.close()
+	}
+	go p.run()
+	p.kick()
+	return p.status(), nil
+}
+
+func (pm *PoolManager) pool(ssId string) *VMPool {
+	pm.Lock()
+	defer pm.Unlock()
+	return pm.pools[ssId]
+}
+
+func (pm *PoolManager) Status(ssId string) (*models.PoolStatus, error) {
+	p := pm.pool(ssId)
+	if p == nil {
+		return nil, fmt.Errorf("snapshot %s has no pool", ssId)
+	}
+	return p.status(), nil
+}
+
+// DeletePool stops the idle VMs of the pool of a snapshot and removes it.
+func (pm *PoolManager) DeletePool(ssId string) error {
+	pm.Lock()
+	p, ok := pm.pools[ssId]
+	delete(pm.pools, ssId)
+	pm.Unlock()
+	if !ok {
+		return fmt.Errorf("snapshot %s has no pool", ssId)
+	}
+	p.close()
+	return nil
+}
+
+// DeletePools removes all pools.
+func (pm *PoolManager) DeletePools() {
+	pm.Lock()
+	pools := pm.pools
+	pm.pools = make(map[string]*VMPool)
+	pm.Unlock()
+	for _, p := range pools {
+		p.close()
+	}
+}
+
+// claim resumes a pooled VM of the snapshot, or returns nil if the
+// snapshot has no pool or its pool is empty.
+func (pm *PoolManager) claim(ctx context.Context, ssId string) *VM {
+	p := pm.pool(ssId)
+	if p == nil {
+		return nil
+	}
+	_, span := trace.StartSpan(ctx, "pool_claim")
+	defer span.End()
+	for {
+		p.Lock()
+		if len(p.idle) == 0 {
+			p.misses++
+			p.Unlock()
+			recordPoolClaim(p.snapshot.Function, false)
+			span.AddAttributes(trace.BoolAttribute("hit", false))
+			return nil
+		}
+		vm := p.idle[len(p.idle)-1]
+		p.idle = p.idle[:len(p.idle)-1]
+		p.Unlock()
+		pm.release(p.snapshot.Size, true)
+		if err := pm.vc.resumeVM(ctx, vm); err != nil {
+			log.Println("resuming pooled VM", vm.VmId, "failed:", err)
+			pm.vc.StopVM(nil, vm.VmId)
+			continue
+		}
+		p.Lock()
+		p.hits++
+		p.Unlock()
+		recordPoolClaim(p.snapshot.Function, true)
+		span.AddAttributes(trace.BoolAttribute("hit", true))
+		return vm
+	}
+}
+
+func (p *VMPool) kick() {
+	p.Lock()
+	defer p.Unlock()
+	if p.closed {
+		return
+	}
+	select {
+	case p.wake <- struct{}{}:
+	default:
+	}
+}
+
+func (p *VMPool) run() {
+	for range p.wake {
+		for p.refill() {
+		}
+	}
+}
+
+// refill restores a VM in a free namespace, if the memory budget allows.
+// It returns whether one was added.
+func (p *VMPool) refill() bool {
+	p.Lock()
+	if p.closed || time.Now().Before(p.retryAt) {
+		p.Unlock()
+		return false
+	}
+	namespace := ""
+	for _, ns := range p.namespaces {
+		if _, ok := p.busy[ns]; !ok {
+			namespace = ns
+			break
+		}
+	}
+	if namespace == "" {
+		p.Unlock()
+		return false
+	}
+	p.busy[namespace] = ""
+	p.restoring++
+	p.Unlock()
+
+	size := p.snapshot.Size
+	if !p.pm.reserve(size) {
+		p.Lock()
+		delete(p.busy, namespace)
+		p.restoring--
+		p.Unlock()
+		return false
+	}
+	start := time.Now()
+	vm, err := p.restore(namespace)
+	elapsed := time.Since(start)
+
+	p.Lock()
+	p.restoring--
+	if err != nil {
+		if p.busy[namespace] == "" {
+			delete(p.busy, namespace)
+		}
+		// retried after a backoff, not right away
+		p.failures++
+		backoff := poolRetryMax
+		if p.failures <= 8 {
+			backoff = poolRetryMin << (p.failures - 1)
+		}
+		if backoff > poolRetryMax {
+			backoff = poolRetryMax
+		}
+		p.retryAt = time.Now().Add(backoff)
+		p.Unlock()
+		time.AfterFunc(backoff, p.kick)
+		p.pm.release(size, false)
+		log.Println("restoring a pooled VM of", p.snapshot.SnapshotId, "failed:", err, "retrying in", backoff)
+		return false
+	}
+	p.failures = 0
+	if p.closed {
+		p.Unlock()
+		p.pm.release(size, false)
+		p.pm.vc.StopVM(nil, vm.VmId)
+		return false
+	}
+	p.busy[namespace] = vm.VmId
+	p.idle = append(p.idle, vm)
+	p.refills++
+	p.refillTime += elapsed
+	p.lastRefill = elapsed
+	p.Unlock()
+	recordPoolRefill(p.snapshot.Function, elapsed)
+	log.Println("pooled VM", vm.VmId, "of", p.snapshot.SnapshotId, "restored in", elapsed)
+	return true
+}
+
+// restore restores a paused VM of the pool in namespace, after prefetching
+// the snapshot's pages.
+func (p *VMPool) restore(namespace string) (*VM, error) {
+	vc := p.pm.vc
+	snapshot, invoc := p.snapshot, p.invoc
+	ctx, span := trace.StartSpan(context.Background(), "pool_refill")
+	defer span.End()
+	span.AddAttributes(trace.StringAttribute("ssId", snapshot.SnapshotId), trace.StringAttribute("namespace", namespace))
+
+	if snapshot.mincoreLayers != nil {
+		snapshot.prefetch(ctx, invoc)
+	}
+	var reapId string
+	var activated chan error
+	fcExecutable := vc.config.Executables["vanilla"]
+	if invoc.EnableReap {
+		var err error
+		reapId, err = reap.Register(ctx, snapshot.SnapshotId, snapshot.SnapshotBase, snapshot.SnapshotPath, snapshot.MemFilePath, snapshot.Size, invoc.WsFileDirectIo, invoc.WsSingleRead, snapshot.CompressWs)
+		if err != nil {
+			return nil, err
+		}
+		activated = make(chan error, 1)
+		go func() {
+			activated <- reap.ActivateContext(ctx, reapId)
+		}()
+		fcExecutable = vc.config.Executables["uffd"]
+	}
+	vm, err := vc.startVMM(ctx, fcExecutable, namespace)
+	if err != nil {
+		return nil, err
+	}
+	vm.Function = snapshot.Function
+	vm.Dial()
+	err = vc.loadSnapshot(ctx, vm, snapshot, invoc, reapId, false)
+	if activated != nil {
+		if aerr := <-activated; err == nil {
+			err = aerr
+		}
+	}
+	if err != nil {
+		vc.StopVM(nil, vm.VmId)
+		return nil, err
+	}
+	vm.ReapId = reapId
+	// only VMs that were restored free their namespace on exit; a failed
+	// restore is retried by refill
+	vc.Lock()
+	if vm.State == "stopped" {
+		vc.Unlock()
+		return nil, fmt.Errorf("VM %s exited while restoring", vm.VmId)
+	}
+	vm.onExit = func() { p.exited(vm) }
+	vc.Unlock()
+	return vm, nil
+}
+
+// exited frees the namespace of a pooled VM whose VMM exited, idle or
+// claimed, so that the pool restores another one in it.
+func (p *VMPool) exited(vm *VM) {
+	ns := vm.VMNetwork.namespace
+	p.Lock()
+	wasIdle := false
+	for i, v := range p.idle {
+		if v == vm {
+			p.idle = append(p.idle[:i], p.idle[i+1:]...)
+			wasIdle = true
+			break
+		}
+	}
+	if p.busy[ns] == vm.VmId {
+		delete(p.busy, ns)
+	}
+	p.Unlock()
+	if wasIdle {
+		p.pm.release(p.snapshot.Size, true)
+	} else {
+		p.kick()
+	}
+}
+
+// close stops refilling the pool and stops its idle VMs. Claimed VMs run on.
+func (p *VMPool) close() {
+	p.Lock()
+	if p.closed {
+		p.Unlock()
+		return
+	}
+	p.closed = true
+	close(p.wake)
+	idle := p.idle
+	p.idle = nil
+	p.Unlock()
+	for _, vm := range idle {
+		p.pm.release(p.snapshot.Size, false)
+		p.pm.vc.StopVM(nil, vm.VmId)
+	}
+}
+
+func (p *VMPool) status() *models.PoolStatus {
+	p.Lock()
+	defer p.Unlock()
+	ms := func(d time.Duration) float64 { return float64(d.Microseconds()) / 1000 }
+	status := &models.PoolStatus{
+		SsID:         p.snapshot.SnapshotId,
+		Size:         int64(len(p.namespaces)),
+		Idle:         int64(len(p.idle)),
+		Restoring:    int64(p.restoring),
+		Hits:         p.hits,
+		Misses:       p.misses,
+		Refills:      p.refills,
+		LastRefillMs: ms(p.lastRefill),
+		MemoryMb:     int64((len(p.idle) + p.restoring) * p.snapshot.Size >> 20),
+	}
+	if p.refills > 0 {
+		status.RefillMs = ms(p.refillTime) / float64(p.refills)
+	}
+	return status
+}
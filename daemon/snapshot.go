@@ -37,23 +37,39 @@ import (
 	"syscall"
 
 	"github.com/ucsdsysnet/faasnap/models"
+	"github.com/ucsdsysnet/faasnap/reap"
 	"github.com/ucsdsysnet/faasnap/restapi/operations"
+	"github.com/ucsdsysnet/faasnap/wsfile"
 	"go.opencensus.io/trace"
 	"golang.org/x/sys/unix"
 )
 
+// where compressed ws files are inflated for the VMM to map
+const wsInflateDir = "/dev/shm"
+
+// goroutines that prefetch the pages of mincore layers
+const mincoreLoadWorkers = 8
+
+// largest piece of an extent a prefetch worker takes at once, in pages
+const mincoreLoadChunk = 512
+
 type Snapshot struct {
 	sync.Mutex
 	Function            string `json:"function"`
 	MemFilePath         string `json:"memFilePath"`
 	loadOnce            *sync.Once
+	inflateLock         sync.Mutex
 	records             []uint64
 	mincoreLayers       []int
+	mincoreExtents      map[int][][]int // layer->[[first page, pages]...]
 	mincoreCurrentLayer int
 	nonZero             []bool
 	overlayRegions      map[int]int // offset->length
 	wsRegions           [][]int     // [[offset, length]...]
+	wsInflated          string      // inflated copy of a compressed ws file
 	WsFile              string      `json:"wsFile"`
+	WsCompressed        bool        `json:"wsCompressed"`
+	CompressWs          bool        `json:"compressWs"`
 	Size                int         `json:"size"`
 	BlockSize           int         `json:"blockSize"`
 	SnapshotBase        string      `json:"snapshotBase"`
@@ -61,6 +77,8 @@ type Snapshot struct {
 	SnapshotId          string      `json:"snapshotId"`
 	SnapshotPath        string      `json:"snapshotPath"`
 	Version             string      `json:"functionVersion"`
+	CopiedFrom          string      `json:"copiedFrom"`
+	CopyMethod          string      `json:"copyMethod"`
 }
 
 type SnapshotManager struct {
@@ -77,7 +95,7 @@ func NewSnapshotManager(config *Config) *SnapshotManager {
 	}
 }
 
-func (sm *SnapshotManager) CopySnapshot(ctx context.Context, src, memFilePath string) (*models.Snapshot, error) {
+func (sm *SnapshotManager) CopySnapshot(ctx context.Context, src, memFilePath, copyMode string) (*models.Snapshot, error) {
 	oldSnap, ok := sm.Snapshots[src]
 	if !ok {
 		log.Println("snapshot not exists")
@@ -91,11 +109,14 @@ func (sm *SnapshotManager) CopySnapshot(ctx context.Context, src, memFilePath st
 		loadOnce:            new(sync.Once),
 		records:             oldSnap.records,
 		mincoreLayers:       oldSnap.mincoreLayers,
+		mincoreExtents:      oldSnap.mincoreExtents,
 		mincoreCurrentLayer: oldSnap.mincoreCurrentLayer,
 		nonZero:             oldSnap.nonZero,
 		overlayRegions:      oldSnap.overlayRegions,
 		wsRegions:           oldSnap.wsRegions,
 		WsFile:              oldSnap.WsFile,
+		WsCompressed:        oldSnap.WsCompressed,
+		CompressWs:          oldSnap.CompressWs,
 		Size:                oldSnap.Size,
 		BlockSize:           oldSnap.BlockSize,
 		SnapshotBase:        oldSnap.SnapshotBase,
@@ -103,15 +124,19 @@ func (sm *SnapshotManager) CopySnapshot(ctx context.Context, src, memFilePath st
 		SnapshotId:          newSsId,
 		SnapshotPath:        oldSnap.SnapshotPath,
 		Version:             oldSnap.Version,
+		CopiedFrom:          src,
 	}
 
-	if err := CopyFile(newSnap.MemFilePath, oldSnap.MemFilePath); err != nil {
+	method, err := CopyFile(newSnap.MemFilePath, oldSnap.MemFilePath, copyMode)
+	if err != nil {
 		return nil, err
 	}
+	newSnap.CopyMethod = method
+	log.Println("copied", oldSnap.MemFilePath, "to", newSnap.MemFilePath, "by", method)
 
 	if oldSnap.WsFile != "" {
 		newSnap.WsFile = oldSnap.WsFile + "." + newSsId
-		if err := CopyFile(newSnap.WsFile, oldSnap.WsFile); err != nil {
+		if _, err := CopyFile(newSnap.WsFile, oldSnap.WsFile, copyMode); err != nil {
 			return nil, err
 		}
 	}
@@ -119,6 +144,7 @@ func (sm *SnapshotManager) CopySnapshot(ctx context.Context, src, memFilePath st
 	sm.Lock()
 	sm.Snapshots[newSsId] = newSnap
 	sm.Unlock()
+	sm.persist(newSnap)
 	vmId := ""
 	return &models.Snapshot{SsID: newSsId, MemFilePath: newSnap.MemFilePath, VMID: &vmId}, nil
 }
@@ -181,14 +207,16 @@ func (sm *SnapshotManager) CopyMincore(r *http.Request, dst string, src string)
 		return errors.New("snapshot not exists")
 	}
 	source.Lock()
-	defer source.Unlock()
 	dest.Lock()
-	defer dest.Unlock()
 	if len(source.mincoreLayers) > 0 {
-		dest.mincoreLayers = make([]int, len(source.mincoreLayers))
-		copy(dest.mincoreLayers, source.mincoreLayers)
+		layers := make([]int, len(source.mincoreLayers))
+		copy(layers, source.mincoreLayers)
+		dest.setMincoreLayers(layers)
 	}
 	dest.mincoreCurrentLayer = source.mincoreCurrentLayer
+	dest.Unlock()
+	source.Unlock()
+	sm.persist(dest)
 	// sum := func(list []int) int {
 	// 	ret := 0
 	// 	for _, v := range list {
@@ -265,35 +293,92 @@ func (sm *SnapshotManager) AddMincoreLayer(req *http.Request, ssID string, posit
 	}
 	log.Println("inserting", true_count, "pages to layer", position)
 
-	return snapshot.InsertMincoreLayer(result, position)
+	if err := snapshot.InsertMincoreLayer(result, position); err != nil {
+		return err
+	}
+	sm.persist(snapshot)
+	return nil
 }
 
 func (snapshot *Snapshot) InsertMincoreLayer(layer []bool, position int) error {
 	if position < 1 {
 		return errors.New("position must >= 1")
 	}
-	if snapshot.mincoreLayers == nil {
-		snapshot.mincoreLayers = make([]int, len(layer))
+	layers := snapshot.mincoreLayers
+	if layers == nil {
+		layers = make([]int, len(layer))
+	} else {
+		// snapshot copies share the vector of their source
+		layers = make([]int, len(snapshot.mincoreLayers))
+		copy(layers, snapshot.mincoreLayers)
 	}
 	for i, v := range layer {
 		if v {
 			switch {
-			case snapshot.mincoreLayers[i] == 0:
-				snapshot.mincoreLayers[i] = position
-			case snapshot.mincoreLayers[i] > position:
-				snapshot.mincoreLayers[i] = position
+			case layers[i] == 0:
+				layers[i] = position
+			case layers[i] > position:
+				layers[i] = position
 			default:
 			}
 		} else {
-			if snapshot.mincoreLayers[i] >= position {
-				snapshot.mincoreLayers[i] += 1
+			if layers[i] >= position {
+				layers[i] += 1
 			}
 		}
 	}
+	snapshot.Lock()
+	snapshot.setMincoreLayers(layers)
 	snapshot.mincoreCurrentLayer += 1
+	snapshot.Unlock()
 	return nil
 }
 
+// setMincoreLayers sets the layer of each page and indexes the extents of
+// each layer, so loading layers does not scan the whole vector per layer.
+// The caller holds the snapshot's lock.
+func (snapshot *Snapshot) setMincoreLayers(layers []int) {
+	snapshot.mincoreLayers = layers
+	snapshot.mincoreExtents = indexMincoreLayers(layers)
+}
+
+// indexMincoreLayers returns the runs of consecutive pages of each layer.
+func indexMincoreLayers(layers []int) map[int][][]int {
+	index := map[int][][]int{}
+	for cur := 0; cur < len(layers); {
+		end := cur + 1
+		for end < len(layers) && layers[end] == layers[cur] {
+			end++
+		}
+		if layers[cur] > 0 {
+			index[layers[cur]] = append(index[layers[cur]], []int{cur, end - cur})
+		}
+		cur = end
+	}
+	return index
+}
+
+// layerExtents merges the extents of layers in index into sorted, coalesced
+// extents.
+func layerExtents(index map[int][][]int, layers []int64) [][]int {
+	var extents [][]int
+	for _, layer := range layers {
+		extents = append(extents, index[int(layer)]...)
+	}
+	sort.Slice(extents, func(i, j int) bool { return extents[i][0] < extents[j][0] })
+	merged := [][]int{}
+	for _, e := range extents {
+		if last := len(merged) - 1; last >= 0 && merged[last][0]+merged[last][1] >= e[0] {
+			if end := e[0] + e[1]; end > merged[last][0]+merged[last][1] {
+				merged[last][1] = end - merged[last][0]
+			}
+			continue
+		}
+		merged = append(merged, []int{e[0], e[1]})
+	}
+	return merged
+}
+
 func (snapshot *Snapshot) UpdateCacheState(digHole, loadCache, dropCache bool) error {
 	if digHole {
 		fallocate, err := exec.LookPath("fallocate")
@@ -341,11 +426,104 @@ func (snapshot *Snapshot) UpdateCacheState(digHole, loadCache, dropCache bool) e
 	}
 	if dropCache {
 		log.Println("dropping cache of", snapshot.MemFilePath)
-		return unix.Fadvise(int(f.Fd()), 0, int64(snapshot.Size), unix.FADV_DONTNEED)
+		return dropFileCache(f, int64(snapshot.Size))
 	}
 	return nil
 }
 
+// dropFileCache evicts a file from the page cache. Dirty pages are written
+// back first, as FADV_DONTNEED only drops clean ones, so the file is fully
+// uncached when it returns.
+func dropFileCache(f *os.File, size int64) error {
+	if err := unix.Fdatasync(int(f.Fd())); err != nil {
+		log.Println("fdatasync", f.Name(), "failed:", err)
+		return err
+	}
+	return unix.Fadvise(int(f.Fd()), 0, size, unix.FADV_DONTNEED)
+}
+
+// cachedPages returns the number of pages of path that are in the page
+// cache, and the total number of pages of the file.
+func cachedPages(path string) (int64, int64, error) {
+	f, err := os.Open(path)
+	if err != nil {
+		return 0, 0, err
+	}
+	defer f.Close()
+	fi, err := f.Stat()
+	if err != nil {
+		return 0, 0, err
+	}
+	mc, err := FileMincore(f, fi.Size())
+	if err != nil {
+		return 0, 0, err
+	}
+	var cached int64
+	for _, in := range mc {
+		if in {
+			cached++
+		}
+	}
+	return cached, int64(len(mc)), nil
+}
+
+// Status reports how much of the snapshot's memory file and working set file
+// is currently in the page cache.
+func (sm *SnapshotManager) Status(ssID string) (*models.SnapshotStatus, error) {
+	sm.Lock()
+	snapshot, ok := sm.Snapshots[ssID]
+	sm.Unlock()
+	if !ok {
+		log.Println("snapshot not exists")
+		return nil, errors.New("snapshot not exists")
+	}
+	status := &models.SnapshotStatus{
+		SsID:        ssID,
+		MemFilePath: snapshot.MemFilePath,
+		WsFile:      snapshot.WsFile,
+		CopiedFrom:  snapshot.CopiedFrom,
+		CopyMethod:  snapshot.CopyMethod,
+		DedupRatio:  1,
+	}
+	var err error
+	if status.CachedPages, status.TotalPages, err = cachedPages(snapshot.MemFilePath); err != nil {
+		log.Println("mincore", snapshot.MemFilePath, "failed:", err)
+		return nil, err
+	}
+	if f, err := os.Open(snapshot.MemFilePath); err == nil {
+		// not every filesystem supports FIEMAP; the dedup fields stay unset then
+		if status.AllocatedBytes, status.SharedBytes, err = FileExtents(f); err != nil {
+			log.Println(err)
+		}
+		f.Close()
+	}
+	// a copy saves the bytes it still shares; the source is charged for them
+	if snapshot.CopiedFrom != "" && status.SharedBytes > 0 {
+		status.BytesSaved = status.SharedBytes
+		if status.AllocatedBytes > status.SharedBytes {
+			status.DedupRatio = float64(status.AllocatedBytes) / float64(status.AllocatedBytes-status.SharedBytes)
+		} else {
+			status.DedupRatio = 0 // fully shared: the copy costs no data blocks
+		}
+	}
+	wsPath := snapshot.WsFile
+	if wsPath == "" {
+		wsPath = reap.WorkingSetPath(snapshot.SnapshotBase)
+	}
+	if raw, compressed, err := wsfile.Stat(wsPath); err == nil {
+		status.WsCompressed = true
+		status.WsRawBytes = raw
+		status.WsCompressRatio = float64(raw) / float64(compressed)
+	}
+	if snapshot.WsFile != "" {
+		if status.WsCachedPages, status.WsTotalPages, err = cachedPages(snapshot.WsFile); err != nil {
+			log.Println("mincore", snapshot.WsFile, "failed:", err)
+			return nil, err
+		}
+	}
+	return status, nil
+}
+
 // func (snapshot *Snapshot) loadMincore(r *http.Request) error {
 // 	_, span := trace.StartSpan(r.Context(), "load_mincore")
 // 	defer span.End()
@@ -450,8 +628,10 @@ func (snapshot *Snapshot) EmulateMincore(ctx context.Context, mincoreSize int) e
 		}
 		log.Println("layers:", i, "count:", count)
 	}
-	snapshot.mincoreLayers = layers
+	snapshot.Lock()
+	snapshot.setMincoreLayers(layers)
 	snapshot.mincoreCurrentLayer = curLayer
+	snapshot.Unlock()
 	log.Println("Emulated mincore, layers:", curLayer)
 	return nil
 }
@@ -481,7 +661,9 @@ func (snapshot *Snapshot) ScanMincore(r *http.Request, pid, scanInterval, sizeIn
 		return err
 	}
 	log.Println(cur-snapshot.mincoreCurrentLayer, "layers scanned")
-	snapshot.mincoreLayers = mincore
+	snapshot.Lock()
+	snapshot.setMincoreLayers(mincore)
+	snapshot.Unlock()
 	count := 0
 	for _, b := range snapshot.mincoreLayers {
 		if b > 0 {
@@ -522,26 +704,37 @@ func (snapshot *Snapshot) loadMincore(ctx context.Context, layers []int64, retai
 	pagesize := os.Getpagesize()
 
 	if snapshot.mincoreLayers != nil { // mincore layers
-		value := byte(0)
-		vecsize := len(snapshot.mincoreLayers)
 		_, span2 := trace.StartSpan(ctx, "load_mincoreLayers")
-		count := 0
 		defer span2.End()
+		snapshot.Lock()
+		if snapshot.mincoreExtents == nil { // loaded from the catalog
+			snapshot.mincoreExtents = indexMincoreLayers(snapshot.mincoreLayers)
+		}
+		// InsertMincoreLayer replaces the index, never changes it
+		index := snapshot.mincoreExtents
+		snapshot.Unlock()
 		for _, layer := range layers {
 			layerCount := 0
-			for cur := 0; cur < vecsize; cur++ {
-				if snapshot.mincoreLayers[cur] == int(layer) {
-					if (cur*pagesize) >= snapshot.Size || cur*pagesize < 0 {
-						log.Fatal("cur*pagesize out of range: ", cur*pagesize)
-					}
-					value ^= mmap[cur*pagesize]
-					count += 1
-					layerCount += 1
-				}
+			for _, e := range index[int(layer)] {
+				layerCount += e[1]
 			}
 			log.Printf("layer %d: %d pages\n", layer, layerCount)
 		}
-		log.Printf("loaded nlayers: %d, pages: %d; value: %d; \n", len(layers), count, value)
+		extents := layerExtents(index, layers)
+		npages := (snapshot.Size + pagesize - 1) / pagesize
+		for len(extents) > 0 && extents[len(extents)-1][0]+extents[len(extents)-1][1] > npages {
+			last := extents[len(extents)-1]
+			log.Println("mincore extent", last, "beyond", npages, "pages of the memory file")
+			if last[0] >= npages {
+				extents = extents[:len(extents)-1]
+			} else {
+				last[1] = npages - last[0]
+				break
+			}
+		}
+		count, value := prefetchExtents(mmap, extents, pagesize, mincoreLoadWorkers)
+		span2.AddAttributes(trace.Int64Attribute("pages", int64(count)), trace.Int64Attribute("extents", int64(len(extents))))
+		log.Printf("loaded nlayers: %d, pages: %d, extents: %d; value: %d; \n", len(layers), count, len(extents), value)
 		return nil
 	} else {
 		log.Println("mincore and mincoreLayers not exist!")
@@ -549,6 +742,58 @@ func (snapshot *Snapshot) loadMincore(ctx context.Context, layers []int64, retai
 	}
 }
 
+// prefetchExtents reads the pages of extents of mm into the page cache with
+// several workers. Each worker advises the kernel to read ahead the piece
+// it takes, then touches its pages.
+func prefetchExtents(mm []byte, extents [][]int, pagesize, workers int) (int, byte) {
+	pieces := make(chan []int, workers)
+	go func() {
+		for _, e := range extents {
+			for start := e[0]; start < e[0]+e[1]; start += mincoreLoadChunk {
+				n := e[0] + e[1] - start
+				if n > mincoreLoadChunk {
+					n = mincoreLoadChunk
+				}
+				pieces <- []int{start, n}
+			}
+		}
+		close(pieces)
+	}()
+	var (
+		wg    sync.WaitGroup
+		mu    sync.Mutex
+		count int
+		value byte
+	)
+	for i := 0; i < workers; i++ {
+		wg.Add(1)
+		go func() {
+			defer wg.Done()
+			c, v := 0, byte(0)
+			for p := range pieces {
+				end := (p[0] + p[1]) * pagesize
+				if end > len(mm) { // partial last page
+					end = len(mm)
+				}
+				region := mm[p[0]*pagesize : end]
+				if err := unix.Madvise(region, unix.MADV_WILLNEED); err != nil {
+					log.Println("Madvise:", err)
+				}
+				for off := 0; off < len(region); off += pagesize {
+					v ^= region[off]
+					c += 1
+				}
+			}
+			mu.Lock()
+			count += c
+			value ^= v
+			mu.Unlock()
+		}()
+	}
+	wg.Wait()
+	return count, value
+}
+
 func (snapshot *Snapshot) PreWarmMincore(ctx context.Context, nlayers []int64) error {
 	snapshot.UpdateCacheState(false, false, true)
 	return snapshot.loadMincore(ctx, nlayers, false)
@@ -826,7 +1071,7 @@ func (snapshot *Snapshot) createWsRegions(ctx context.Context, withInactive, wit
 	log.Println("created", len(snapshot.wsRegions), "Ws Regions")
 }
 
-func (snapshot *Snapshot) createWsFile(ctx context.Context, wsFilePath string, withInactive, withZero bool, sizeThreshold, intervalThreshold int) error {
+func (snapshot *Snapshot) createWsFile(ctx context.Context, wsFilePath string, compress, withInactive, withZero bool, sizeThreshold, intervalThreshold int) error {
 	snapshot.createWsRegions(ctx, withInactive, withZero, sizeThreshold, intervalThreshold)
 	f, err := os.OpenFile(snapshot.MemFilePath, os.O_RDONLY, 0644)
 	if err != nil {
@@ -850,18 +1095,126 @@ func (snapshot *Snapshot) createWsFile(ctx context.Context, wsFilePath string, w
 
 	page_size := os.Getpagesize()
 	pageCount := 0
+	regions := make([][]byte, 0, len(snapshot.wsRegions))
 	for _, region := range snapshot.wsRegions {
-		if _, err := wsFile.Write(mmSrc[region[0]*page_size : (region[0]+region[1])*page_size]); err != nil {
-			log.Println("Write failed:", err)
+		regions = append(regions, mmSrc[region[0]*page_size:(region[0]+region[1])*page_size])
+		pageCount += region[1]
+	}
+	if compress {
+		raw, compressed, err := wsfile.Write(wsFile, regions)
+		if err != nil {
+			log.Println("Write compressed ws file failed:", err)
 			return err
 		}
-		pageCount += region[1]
+		log.Printf("compressed ws file %d -> %d bytes (%.2fx)", raw, compressed, float64(raw)/float64(compressed))
+	} else {
+		for _, region := range regions {
+			if _, err := wsFile.Write(region); err != nil {
+				log.Println("Write failed:", err)
+				return err
+			}
+		}
 	}
 	snapshot.WsFile = wsFilePath
+	snapshot.WsCompressed = compress
+	snapshot.releaseInflatedWs()
 	log.Println("wsfile created, pages:", pageCount, ", bytes:", pageCount*page_size)
 	return nil
 }
 
+// inflateWs decompresses a compressed ws file into shared memory, once, and
+// returns the path of the inflated copy. The VMM maps the ws file over guest
+// memory, so it is always given the inflated copy.
+func (snapshot *Snapshot) inflateWs(ctx context.Context) (string, error) {
+	snapshot.inflateLock.Lock()
+	defer snapshot.inflateLock.Unlock()
+	if snapshot.wsInflated != "" {
+		return snapshot.wsInflated, nil
+	}
+	_, span := trace.StartSpan(ctx, "inflate_ws_file")
+	defer span.End()
+
+	src, err := os.ReadFile(snapshot.WsFile)
+	if err != nil {
+		log.Println("ReadFile:", err)
+		return "", err
+	}
+	rawSize, err := wsfile.RawSize(src)
+	if err != nil {
+		log.Println(snapshot.WsFile, err)
+		return "", err
+	}
+	path := wsInflateDir + "/faasnap-" + snapshot.SnapshotId + ".ws"
+	f, err := os.OpenFile(path, os.O_RDWR|os.O_CREATE|os.O_TRUNC, 0644)
+	if err != nil {
+		log.Println("OpenFile", path, "failed:", err)
+		return "", err
+	}
+	defer f.Close()
+	if err := f.Truncate(rawSize); err != nil {
+		log.Println("Truncate:", err)
+		return "", err
+	}
+	if rawSize > 0 {
+		dst, err := unix.Mmap(int(f.Fd()), 0, int(rawSize), unix.PROT_READ|unix.PROT_WRITE, unix.MAP_SHARED)
+		if err != nil {
+			log.Println("Mmap:", err)
+			return "", err
+		}
+		defer unix.Munmap(dst)
+		if err := wsfile.Inflate(src, dst); err != nil {
+			log.Println("Inflate", snapshot.WsFile, "failed:", err)
+			os.Remove(path)
+			return "", err
+		}
+	}
+	snapshot.wsInflated = path
+	log.Println("ws file inflated,", len(src), "->", rawSize, "bytes")
+	return path, nil
+}
+
+func (snapshot *Snapshot) releaseInflatedWs() {
+	snapshot.inflateLock.Lock()
+	defer snapshot.inflateLock.Unlock()
+	if snapshot.wsInflated == "" {
+		return
+	}
+	if err := os.Remove(snapshot.wsInflated); err != nil {
+		log.Println("Remove:", err)
+	}
+	snapshot.wsInflated = ""
+}
+
+// prefetch brings the pages invocations of the snapshot touch into memory
+// before its VM runs: the ws file (inflated, if compressed), or the mincore
+// layers the invocation loads. Loading happens once per snapshot until
+// reset_load.
+func (snapshot *Snapshot) prefetch(ctx context.Context, invoc *models.Invocation) {
+	snapshot.Lock()
+	loadOnce := snapshot.loadOnce
+	snapshot.Unlock()
+	if invoc.UseWsFile {
+		if snapshot.WsCompressed {
+			// inflate while the VMM starts; loadSnapshot waits for it
+			if _, err := snapshot.inflateWs(ctx); err != nil {
+				log.Println(err)
+			}
+		} else {
+			loadOnce.Do(func() {
+				if err := snapshot.loadWsFile(ctx); err != nil {
+					log.Println(err)
+				}
+			})
+		}
+	} else {
+		loadOnce.Do(func() {
+			if err := snapshot.loadMincore(ctx, invoc.LoadMincore, false); err != nil {
+				log.Println(err)
+			}
+		})
+	}
+}
+
 func (snapshot *Snapshot) loadWsFile(ctx context.Context) error {
 	_, span := trace.StartSpan(ctx, "load_ws_file")
 	defer span.End()
@@ -911,6 +1264,8 @@ func (snapshot *Snapshot) dropWsCache(ctx context.Context) error {
 	if snapshot.WsFile == "" {
 		return nil
 	}
+	// the inflated copy lives in memory, so dropping it is the cache drop
+	snapshot.releaseInflatedWs()
 	f, err := os.OpenFile(snapshot.WsFile, os.O_RDWR, 0644)
 	if err != nil {
 		log.Println("OpenFile:", err)
@@ -922,5 +1277,5 @@ func (snapshot *Snapshot) dropWsCache(ctx context.Context) error {
 		log.Println("Stat ws file:", err)
 		return err
 	}
-	return unix.Fadvise(int(f.Fd()), 0, fi.Size(), unix.FADV_DONTNEED)
+	return dropFileCache(f, fi.Size())
 }
@@ -47,20 +47,123 @@ func RandStringRunes(n int) string {
 	return string(b)
 }
 
-func CopyFile(dst, src string) error {
+// copy modes of CopyFile
+const (
+	CopyModeAuto = "auto" // share data extents where the filesystem allows
+	CopyModeFull = "full" // always write a full copy
+)
+
+// copy methods reported by CopyFile
+const (
+	CopyMethodReflink   = "reflink"
+	CopyMethodCopyRange = "copy_file_range"
+	CopyMethodCopy      = "copy"
+)
+
+// CopyFile copies src to dst and returns the method used. In CopyModeAuto it
+// first clones src's extents (FICLONE), so the copy shares all of its data
+// blocks until either file is written, then tries copy_file_range, which lets
+// the filesystem share or offload the copy, and falls back to a plain copy.
+func CopyFile(dst, src, mode string) (string, error) {
 	source, err := os.Open(src)
 	if err != nil {
-		return err
+		return "", err
 	}
 	defer source.Close()
 
 	destination, err := os.Create(dst)
 	if err != nil {
-		return err
+		return "", err
 	}
 	defer destination.Close()
-	_, err = io.Copy(destination, source)
-	return err
+
+	if mode != CopyModeFull {
+		if err := unix.IoctlFileClone(int(destination.Fd()), int(source.Fd())); err == nil {
+			return CopyMethodReflink, nil
+		}
+		fi, err := source.Stat()
+		if err != nil {
+			return "", err
+		}
+		if copied, err := copyFileRange(destination, source, fi.Size()); err == nil {
+			return CopyMethodCopyRange, nil
+		} else if copied > 0 {
+			return "", err
+		}
+	}
+	if _, err = io.Copy(destination, source); err != nil {
+		return "", err
+	}
+	return CopyMethodCopy, nil
+}
+
+func copyFileRange(dst, src *os.File, size int64) (int64, error) {
+	var copied int64
+	for copied < size {
+		n, err := unix.CopyFileRange(int(src.Fd()), nil, int(dst.Fd()), nil, int(size-copied), 0)
+		if err != nil {
+			return copied, err
+		}
+		if n == 0 {
+			break
+		}
+		copied += int64(n)
+	}
+	return copied, nil
+}
+
+const (
+	fsIocFiemap         = 0xc020660b // _IOWR('f', 11, struct fiemap)
+	fiemapFlagSync      = 0x1
+	fiemapExtentLast    = 0x1
+	fiemapExtentShared  = 0x2000
+	fiemapExtentsPerMap = 256
+)
+
+type fiemapExtent struct {
+	Logical    uint64
+	Physical   uint64
+	Length     uint64
+	reserved64 [2]uint64
+	Flags      uint32
+	reserved   [3]uint32
+}
+
+type fiemap struct {
+	Start         uint64
+	Length        uint64
+	Flags         uint32
+	MappedExtents uint32
+	ExtentCount   uint32
+	reserved      uint32
+	Extents       [fiemapExtentsPerMap]fiemapExtent
+}
+
+// FileExtents returns the bytes of disk extents allocated to f, and how many
+// of them are shared with other files, e.g. by reflink copies.
+func FileExtents(f *os.File) (allocated, shared int64, err error) {
+	fm := new(fiemap)
+	var start uint64
+	for {
+		*fm = fiemap{Start: start, Length: ^uint64(0), Flags: fiemapFlagSync, ExtentCount: fiemapExtentsPerMap}
+		_, _, errno := unix.Syscall(unix.SYS_IOCTL, f.Fd(), fsIocFiemap, uintptr(unsafe.Pointer(fm)))
+		if errno != 0 {
+			return 0, 0, fmt.Errorf("FIEMAP %s failed: %v", f.Name(), errno)
+		}
+		if fm.MappedExtents == 0 {
+			return allocated, shared, nil
+		}
+		for _, e := range fm.Extents[:fm.MappedExtents] {
+			allocated += int64(e.Length)
+			if e.Flags&fiemapExtentShared != 0 {
+				shared += int64(e.Length)
+			}
+			if e.Flags&fiemapExtentLast != 0 {
+				return allocated, shared, nil
+			}
+			start = e.Logical + e.Length
+		}
+	}
 }
 
 func FileMincore(f *os.File, size int64) ([]bool, error) {
@@ -1,14 +1,19 @@
 #!/usr/bin/env python3
 import os
-import time
 import sys
 import json
 import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 sys.path.extend(["./python_client"])
 from swagger_client.api.default_api import DefaultApi
 import swagger_client as faasnap
 from swagger_client.configuration import Configuration
+from swagger_client import wait
+from swagger_client import guest
+from swagger_client.rest import ApiException
 
 os.umask(0o777)
 
@@ -30,130 +35,308 @@ def add_network(client: DefaultApi, idx: int):
     )
 
 
-def prepare_faasnap(
-    params, client: DefaultApi, setting, func_name, func_param, namespace
-):
-    vm = client.vms_post(vm={"func_name": func_name, "namespace": namespace})
-    time.sleep(5)
-    base_snap = client.snapshots_post(
-        snapshot=faasnap.Snapshot(
+def preload(client: DefaultApi, vm_id, func_name):
+    """Imports and warms the handler in a freshly booted VM before its snapshot is taken."""
+    try:
+        print(f"[{func_name}] " + guest.preload(client, vm_id, func_name))
+    except Exception as e:
+        print(f"[{func_name}] preload err: {e}")
+
+
+def quiesce(client: DefaultApi, vm_id, func_name):
+    """Freezes the guest heap after the function ran, before a warm snapshot is taken."""
+    try:
+        print(f"[{func_name}] " + guest.quiesce(client, vm_id, func_name))
+    except Exception as e:
+        print(f"[{func_name}] quiesce err: {e}")
+
+
+# step classes, each capped separately: VM boots and invocations, and
+# I/O-heavy steps that write snapshot or ws files or drop caches
+VM = "vm"
+IO = "io"
+
+# seconds a REAP recording VM runs on after answering, before it is stopped:
+# stopping it ends the recording, and the guest still faults pages in after
+# the response
+REAP_TAIL = 1
+
+
+class Checkpoint:
+    """Progress of the preparation, saved to snapshots_{mode}.json after every step.
+
+    Prepared functions map to their snapshot id, as before. Functions still
+    in progress are kept under "_progress" with the steps done so far and the
+    ids they produced, so that --incremental can resume them.
+    """
+
+    def __init__(self, path, state=None):
+        self.path = path
+        self.lock = threading.Lock()
+        self.state = state if state is not None else {}
+        self.state.setdefault("_progress", {})
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r") as f:
+            return cls(path, json.load(f))
+
+    def prepared(self):
+        return {k: v for k, v in self.state.items() if k != "_progress"}
+
+    def progress(self, func):
+        with self.lock:
+            return dict(self.state["_progress"].get(func, {"done": []}))
+
+    def step_done(self, func, ctx):
+        with self.lock:
+            self.state["_progress"][func] = ctx
+            self.save()
+
+    def finish(self, func, ss_id):
+        with self.lock:
+            self.state["_progress"].pop(func, None)
+            self.state[func] = ss_id
+            self.save()
+
+    def forget(self, func):
+        with self.lock:
+            self.state.pop(func, None)
+            self.save()
+
+    def save(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.state, f)
+        os.replace(tmp, self.path)
+
+
+def faasnap_steps(params, client: DefaultApi, setting, func_name, func_param, namespace):
+    timeout = params.get("wait_timeout", 60)
+
+    def boot(ctx):
+        vm = client.vms_post(vm={"func_name": func_name, "namespace": namespace})
+        ctx["boot_vm"] = vm.vm_id
+        wait.wait_for_vm_state(client, vm.vm_id, "running", timeout=timeout)
+        if params.get("preload", False):
+            preload(client, vm.vm_id, func_name)
+
+    def base_snapshot(ctx):
+        base_snap = client.snapshots_post(
+            snapshot=faasnap.Snapshot(
+                vm_id=ctx["boot_vm"],
+                snapshot_type="Full",
+                snapshot_path=params["test_dir"] + f"/{func_name}_full.snapshot",
+                mem_file_path=params["test_dir"] + f"/{func_name}_full.memfile",
+                version="0.23.0",
+            )
+        )
+        ctx["base_ss"] = base_snap.ss_id
+        client.vms_vm_id_delete(vm_id=ctx["boot_vm"])
+        wait.wait_for_vm_stopped(client, ctx.pop("boot_vm"), timeout=timeout)
+
+    def drop_base_cache(ctx):
+        client.snapshots_ss_id_patch(
+            ss_id=ctx["base_ss"], state=setting["patch_base_state"]
+        )  # drop cache
+        if setting["patch_base_state"].get("drop_cache"):
+            wait.wait_for_snapshot_cache_dropped(
+                client, ctx["base_ss"], timeout=timeout
+            )
+
+    def record(ctx):
+        if setting["mincore_size"] > 0:
+            mincore = -1
+        else:
+            mincore = 100
+        invoc = faasnap.Invocation(
+            func_name=func_name,
+            ss_id=ctx["base_ss"],
+            params=func_param,
+            mincore=mincore,
+            mincore_size=setting["mincore_size"],
+            enable_reap=False,
+            namespace=namespace,
+            use_mem_file=True,
+        )
+        ret = client.invocations_post(invocation=invoc)
+        ctx["record_vm"] = ret.vm_id
+        print(f"[{func_name}] prepare invoc ret:", ret)
+        if params.get("quiesce", False):
+            quiesce(client, ret.vm_id, func_name)
+        ret = client.invocations_post(
+            invocation=faasnap.Invocation(
+                func_name="run",
+                vm_id=ret.vm_id,
+                params='{"command": "echo 8 > /proc/sys/vm/drop_caches"}',
+                mincore=-1,
+                enable_reap=False,
+            )
+        )  # disable sanitizing
+
+    def warm_snapshot(ctx):
+        warm_snap = client.snapshots_post(
+            snapshot=faasnap.Snapshot(
+                vm_id=ctx["record_vm"],
+                snapshot_type="Full",
+                snapshot_path=params["test_dir"] + f"/{func_name}_warm.snapshot",
+                mem_file_path=params["test_dir"] + f"/{func_name}_warm.memfile",
+                version="0.23.0",
+                **setting["record_regions"],
+            )
+        )
+        ctx["warm_ss"] = warm_snap.ss_id
+        client.vms_vm_id_delete(vm_id=ctx["record_vm"])
+        wait.wait_for_vm_stopped(client, ctx.pop("record_vm"), timeout=timeout)
+
+    def copy_mincore(ctx):
+        client.snapshots_ss_id_mincore_put(
+            ss_id=ctx["warm_ss"], source=ctx["base_ss"]
+        )  # carry over mincore to new snapshot
+
+    def ws_file(ctx):
+        state = dict(setting["patch_mincore"])
+        state["to_ws_file"] = params["test_dir"] + f"/{func_name}_wsfile"
+        client.snapshots_ss_id_mincore_patch(ss_id=ctx["warm_ss"], state=state)
+
+    def drop_cache(ctx):
+        client.snapshots_ss_id_patch(
+            ss_id=ctx["base_ss"], state=setting["patch_base_state"]
+        )  # drop cache
+        client.snapshots_ss_id_patch(
+            ss_id=ctx["warm_ss"], state=setting["patch_state"]
+        )  # drop cache
+        client.snapshots_ss_id_mincore_patch(
+            ss_id=ctx["warm_ss"], state={"drop_ws_cache": True}
+        )
+        return ctx["warm_ss"]
+
+    return [
+        ("boot", VM, boot),
+        ("base_snapshot", IO, base_snapshot),
+        ("drop_base_cache", IO, drop_base_cache),
+        ("record", VM, record),
+        ("warm_snapshot", IO, warm_snapshot),
+        ("copy_mincore", VM, copy_mincore),
+        ("ws_file", IO, ws_file),
+        ("drop_cache", IO, drop_cache),
+    ]
+
+
+def reap_steps(params, client: DefaultApi, setting, func_name, func_param, namespace):
+    timeout = params.get("wait_timeout", 60)
+
+    def boot(ctx):
+        vm = client.vms_post(vm={"func_name": func_name, "namespace": namespace})
+        ctx["boot_vm"] = vm.vm_id
+        wait.wait_for_vm_state(client, vm.vm_id, "running", timeout=timeout)
+        invoc = faasnap.Invocation(
+            func_name=func_name,
             vm_id=vm.vm_id,
+            params=func_param,
+            mincore=-1,
+            enable_reap=False,
+        )
+        ret = client.invocations_post(invocation=invoc)
+        print(f"[{func_name}] 1st prepare invoc ret:", ret)
+        if params.get("quiesce", False):
+            quiesce(client, vm.vm_id, func_name)
+
+    def base_snapshot(ctx):
+        base = faasnap.Snapshot(
+            vm_id=ctx["boot_vm"],
             snapshot_type="Full",
             snapshot_path=params["test_dir"] + f"/{func_name}_full.snapshot",
             mem_file_path=params["test_dir"] + f"/{func_name}_full.memfile",
             version="0.23.0",
+            compress_ws=setting.get("compress_ws", False),
         )
-    )
-    client.vms_vm_id_delete(vm_id=vm.vm_id)
-    client.snapshots_ss_id_patch(
-        ss_id=base_snap.ss_id, state=setting["patch_base_state"]
-    )  # drop cache
-    time.sleep(2)
-    if setting["mincore_size"] > 0:
-        mincore = -1
-    else:
-        mincore = 100
-    invoc = faasnap.Invocation(
-        func_name=func_name,
-        ss_id=base_snap.ss_id,
-        params=func_param,
-        mincore=mincore,
-        mincore_size=setting["mincore_size"],
-        enable_reap=False,
-        namespace=namespace,
-        use_mem_file=True,
-    )
-    ret = client.invocations_post(invocation=invoc)
-    newVmID = ret.vm_id
-    print("prepare invoc ret:", ret)
-    ret = client.invocations_post(
-        invocation=faasnap.Invocation(
-            func_name="run",
-            vm_id=newVmID,
-            params='{"command": "echo 8 > /proc/sys/vm/drop_caches"}',
+        ctx["base_ss"] = client.snapshots_post(snapshot=base).ss_id
+        client.vms_vm_id_delete(vm_id=ctx["boot_vm"])
+        wait.wait_for_vm_stopped(client, ctx.pop("boot_vm"), timeout=timeout)
+
+    def drop_base_cache(ctx):
+        client.snapshots_ss_id_patch(
+            ss_id=ctx["base_ss"], state=setting["patch_state"]
+        )  # drop cache
+        if setting["patch_state"].get("drop_cache"):
+            wait.wait_for_snapshot_cache_dropped(
+                client, ctx["base_ss"], timeout=timeout
+            )
+
+    def record(ctx):
+        invoc = faasnap.Invocation(
+            func_name=func_name,
+            ss_id=ctx["base_ss"],
+            params=func_param,
             mincore=-1,
-            enable_reap=False,
-        )
-    )  # disable sanitizing
-    warm_snap = client.snapshots_post(
-        snapshot=faasnap.Snapshot(
-            vm_id=newVmID,
-            snapshot_type="Full",
-            snapshot_path=params["test_dir"] + f"/{func_name}_warm.snapshot",
-            mem_file_path=params["test_dir"] + f"/{func_name}_warm.memfile",
-            version="0.23.0",
-            **setting["record_regions"],
+            enable_reap=True,
+            ws_file_direct_io=setting["ws_file_direct_io"],
+            namespace=namespace,
         )
-    )
-    client.vms_vm_id_delete(vm_id=newVmID)
-    time.sleep(2)
-    client.snapshots_ss_id_mincore_put(
-        ss_id=warm_snap.ss_id, source=base_snap.ss_id
-    )  # carry over mincore to new snapshot
-    state = setting["patch_mincore"]
-    state["to_ws_file"] = params["test_dir"] + f"/{func_name}_wsfile"
-    client.snapshots_ss_id_mincore_patch(ss_id=warm_snap.ss_id, state=state)
-    client.snapshots_ss_id_patch(
-        ss_id=base_snap.ss_id, state=setting["patch_base_state"]
-    )  # drop cache
-    client.snapshots_ss_id_patch(
-        ss_id=warm_snap.ss_id, state=setting["patch_state"]
-    )  # drop cache
-    client.snapshots_ss_id_mincore_patch(
-        ss_id=warm_snap.ss_id, state={"drop_ws_cache": True}
-    )
+        ret = client.invocations_post(invocation=invoc)
+        print(f"[{func_name}] 2nd prepare invoc ret:", ret)
+        time.sleep(REAP_TAIL)
+        client.vms_vm_id_delete(vm_id=ret.vm_id)
+        wait.wait_for_vm_stopped(client, ret.vm_id, timeout=timeout)
 
-    return warm_snap.ss_id
+    def drop_cache(ctx):
+        client.snapshots_ss_id_patch(
+            ss_id=ctx["base_ss"], state=setting["patch_state"]
+        )  # drop cache
+        client.snapshots_ss_id_reap_patch(
+            ss_id=ctx["base_ss"], cache=False
+        )  # drop reap cache
+        return ctx["base_ss"]
 
+    return [
+        ("boot", VM, boot),
+        ("base_snapshot", IO, base_snapshot),
+        ("drop_base_cache", IO, drop_base_cache),
+        ("record", VM, record),
+        ("drop_cache", IO, drop_cache),
+    ]
 
-def prepare_reap(params, client: DefaultApi, setting, func_name, func_param, namespace):
-    vm = client.vms_post(vm={"func_name": func_name, "namespace": namespace})
-    time.sleep(5)
-    invoc = faasnap.Invocation(
-        func_name=func_name,
-        vm_id=vm.vm_id,
-        params=func_param,
-        mincore=-1,
-        enable_reap=False,
-    )
-    ret = client.invocations_post(invocation=invoc)
-    print("1st prepare invoc ret:", ret)
-    base = faasnap.Snapshot(
-        vm_id=vm.vm_id,
-        snapshot_type="Full",
-        snapshot_path=params["test_dir"] + f"/{func_name}_full.snapshot",
-        mem_file_path=params["test_dir"] + f"/{func_name}_full.memfile",
-        version="0.23.0",
-    )
-    base_snap = client.snapshots_post(snapshot=base)
-    client.vms_vm_id_delete(vm_id=vm.vm_id)
-    time.sleep(1)
-    client.snapshots_ss_id_patch(
-        ss_id=base_snap.ss_id, state=setting["patch_state"]
-    )  # drop cache
-    time.sleep(1)
-    invoc = faasnap.Invocation(
-        func_name=func_name,
-        ss_id=base_snap.ss_id,
-        params=func_param,
-        mincore=-1,
-        enable_reap=True,
-        ws_file_direct_io=setting["ws_file_direct_io"],
-        namespace=namespace,
-    )
-    ret = client.invocations_post(invocation=invoc)
-    print("2nd prepare invoc ret:", ret)
-    time.sleep(1)
-    client.vms_vm_id_delete(vm_id=ret.vm_id)
-    time.sleep(2)
-    client.snapshots_ss_id_patch(
-        ss_id=base_snap.ss_id, state=setting["patch_state"]
-    )  # drop cache
-    client.snapshots_ss_id_reap_patch(
-        ss_id=base_snap.ss_id, cache=False
-    )  # drop reap cache
 
-    return base_snap.ss_id
+def resumable(client: DefaultApi, ctx):
+    """Whether the VMs and snapshots a partially prepared function refers to still exist."""
+    try:
+        for key, value in ctx.items():
+            if key.endswith("_vm"):
+                client.vms_vm_id_get(value)
+            elif key.endswith("_ss"):
+                client.snapshots_ss_id_get(value)
+    except ApiException:
+        return False
+    return True
+
+
+def verify(client: DefaultApi, checkpoint):
+    """Forgets prepared functions whose snapshot is not in the daemon's catalog,
+    e.g. because its memory file was removed, so they are prepared again."""
+    served = {s.ss_id for s in client.snapshots_get()}
+    for func, ss_id in checkpoint.prepared().items():
+        if ss_id not in served:
+            print(f"[{func}] {ss_id} is not in the daemon's catalog, preparing again")
+            checkpoint.forget(func)
+
+
+def prepare_function(client: DefaultApi, checkpoint, limits, func, steps):
+    ctx = checkpoint.progress(func)
+    if ctx["done"] and not resumable(client, ctx):
+        print(f"[{func}] progress refers to a previous daemon, starting over")
+        ctx = {"done": []}
+    ss_id = None
+    for name, kind, step in steps:
+        if name in ctx["done"]:
+            continue
+        with limits[kind]:
+            print(f"[{func}] {name}")
+            ss_id = step(ctx)
+        ctx["done"].append(name)
+        checkpoint.step_done(func, ctx)
+    checkpoint.finish(func, ss_id)
+    return ss_id
 
 
 if __name__ == "__main__":
@@ -166,6 +349,18 @@ if __name__ == "__main__":
         help="incremental prepare",
     )
     parser.add_argument("--exclude", "-e", nargs="+", help="exclude functions")
+    parser.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=1,
+        help="functions prepared concurrently, and cap on concurrent VM steps",
+    )
+    parser.add_argument(
+        "--io-jobs",
+        type=int,
+        default=1,
+        help="cap on concurrent I/O-heavy steps (snapshot and ws file writes, cache drops)",
+    )
     args = parser.parse_args()
 
     mode = args.mode
@@ -174,6 +369,7 @@ if __name__ == "__main__":
         params = json.load(f)
     conf = Configuration()
     conf.host = params["host"]
+    conf.connection_pool_maxsize = max(conf.connection_pool_maxsize, args.jobs)
 
     with open("/etc/faasnap.json", "w") as f:
         json.dump(params["faasnap"], f, sort_keys=False, indent=4)
@@ -181,6 +377,7 @@ if __name__ == "__main__":
     print("mode:", mode)
     print("config:", args.config)
     print("incremental:", args.incremental)
+    print("jobs:", args.jobs, "io jobs:", args.io_jobs)
     if args.exclude:
         print("exclude:", args.exclude)
         for func in args.exclude:
@@ -188,61 +385,56 @@ if __name__ == "__main__":
     print("kernels:", params["faasnap"]["kernels"])
     print("vcpu:", params["vcpu"])
 
+    checkpoint_path = os.path.join(params["test_dir"], f"snapshots_{mode}.json")
+    if not os.path.isdir(params["test_dir"]):
+        os.mkdir(params["test_dir"])
     if args.incremental:
-        with open(os.path.join(params["test_dir"], f"snapshots_{mode}.json"), "r") as f:
-            ssIds = json.load(f)
+        checkpoint = Checkpoint.load(checkpoint_path)
     else:
-        ssIds = {}
+        checkpoint = Checkpoint(checkpoint_path)
     setting = params["settings"][mode]
     client = faasnap.DefaultApi(faasnap.ApiClient(conf))
+    wait.wait_for_daemon(client, timeout=params.get("wait_timeout", 60))
+    if args.incremental:
+        verify(client, checkpoint)
+    limits = {VM: threading.Semaphore(args.jobs), IO: threading.Semaphore(args.io_jobs)}
 
-    for index, func in enumerate(params["function"], start=1):
-        if func in ssIds:
-            print(f"========== {func} already prepared ==========")
-            continue
-        try:
-            print(f"========== preparing: {func} ==========")
-            add_network(client, index)
-            func_config = params["functions"][func]
-            func_param = func_config["params"][0]
-            namespace = f"fc{index}"
-
-            client.functions_post(
-                function=faasnap.Function(
-                    func_name=func_config["name"],
-                    image=func_config["image"],
-                    kernel=setting["kernel"],
-                    vcpu=params["vcpu"],
-                )
+    def prepare(index, func):
+        print(f"========== preparing: {func} ==========")
+        add_network(client, index)
+        func_config = params["functions"][func]
+        func_param = func_config["params"][0]
+        namespace = f"fc{index}"
+
+        client.functions_post(
+            function=faasnap.Function(
+                func_name=func_config["name"],
+                image=func_config["image"],
+                overlay=func_config.get("overlay"),
+                kernel=setting["kernel"],
+                vcpu=params["vcpu"],
             )
+        )
 
-            if mode == "faasnap":
-                ssIds[func] = prepare_faasnap(
-                    params=params,
-                    client=client,
-                    setting=setting,
-                    func_name=func,
-                    func_param=func_param,
-                    namespace=namespace,
-                )
-            elif mode == "reap":
-                ssIds[func] = prepare_reap(
-                    params=params,
-                    client=client,
-                    setting=setting,
-                    func_name=func,
-                    func_param=func_param,
-                    namespace=namespace,
-                )
-
-            time.sleep(1)
-        except Exception as e:
-            print(e)
+        if mode == "faasnap":
+            steps = faasnap_steps(params, client, setting, func, func_param, namespace)
+        elif mode == "reap":
+            steps = reap_steps(params, client, setting, func, func_param, namespace)
+        prepare_function(client, checkpoint, limits, func, steps)
+        print(f"========== prepared: {func} ==========")
 
-    print("========== DONE ==========")
-    print("ssIds:", ssIds)
+    with ThreadPoolExecutor(max_workers=args.jobs) as executor:
+        futures = {}
+        for index, func in enumerate(params["function"], start=1):
+            if func in checkpoint.prepared():
+                print(f"========== {func} already prepared ==========")
+                continue
+            futures[executor.submit(prepare, index, func)] = func
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                print(f"[{futures[future]}]", e)
 
-    if not os.path.isdir(params["test_dir"]):
-        os.mkdir(params["test_dir"])
-    with open(os.path.join(params["test_dir"], f"snapshots_{mode}.json"), "w") as f:
-        json.dump(ssIds, f)
+    print("========== DONE ==========")
+    print("ssIds:", checkpoint.prepared())
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""Micro-benchmark for response deserialization.
+
+Compares the compiled, cached deserializers of ApiClient with the original
+generated path (type strings re-parsed and a fresh Configuration built for
+every object), using GET /vms and GET /functions shaped listings.
+
+    python benchmarks/bench_deserialize.py [--count 5000] [--repeat 5]
+"""
+
+import argparse
+import datetime
+import json
+import os
+import re
+import sys
+import timeit
+
+import six
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import swagger_client  # noqa: E402
+from swagger_client.api_client import ApiClient  # noqa: E402
+from swagger_client.configuration import Configuration  # noqa: E402
+
+
+class Response(object):
+
+    def __init__(self, data):
+        self.data = json.dumps(data)
+
+
+def legacy_deserialize(data, klass):
+    """The deserializer as generated, kept here as the baseline."""
+    if data is None:
+        return None
+    if type(klass) == str:
+        if klass.startswith('list['):
+            sub_kls = re.match(r'list\[(.*)\]', klass).group(1)
+            return [legacy_deserialize(sub_data, sub_kls) for sub_data in data]
+        if klass.startswith('dict('):
+            sub_kls = re.match(r'dict\(([^,]*), (.*)\)', klass).group(2)
+            return {k: legacy_deserialize(v, sub_kls)
+                    for k, v in six.iteritems(data)}
+        if klass in ApiClient.NATIVE_TYPES_MAPPING:
+            klass = ApiClient.NATIVE_TYPES_MAPPING[klass]
+        else:
+            klass = getattr(swagger_client.models, klass)
+    if klass in ApiClient.PRIMITIVE_TYPES:
+        try:
+            return klass(data)
+        except TypeError:
+            return data
+    elif klass in (object, datetime.date, datetime.datetime):
+        return data
+    kwargs = {}
+    for attr, attr_type in six.iteritems(klass.swagger_types):
+        if klass.attribute_map[attr] in data and isinstance(data, (list, dict)):
+            kwargs[attr] = legacy_deserialize(data[klass.attribute_map[attr]],
+                                              attr_type)
+    # every model used to build its own Configuration
+    return klass(_configuration=Configuration(), **kwargs)
+
+
+def listings(count):
+    vms = [{'vmId': 'vm-%d' % i, 'state': 'running',
+            'vmConf': {'vcpu_count': 2, 'mem_size_mib': 2048},
+            'vmPath': '/tmp/vm-%d' % i} for i in range(count)]
+    functions = [{'func_name': 'f%d' % i, 'image': 'debian-python',
+                  'kernel': 'vmlinux', 'vcpu': 2, 'mem_size': 2048}
+                 for i in range(count)]
+    return [(Response(vms), 'list[VM]'),
+            (Response(functions), 'list[Function]')]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--count', type=int, default=5000,
+                        help='objects per listing')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    client = ApiClient()
+    cases = listings(args.count)
+    nobjs = args.count * len(cases)
+
+    def legacy():
+        for resp, rtype in cases:
+            legacy_deserialize(json.loads(resp.data), rtype)
+
+    def compiled():
+        for resp, rtype in cases:
+            client.deserialize(resp, rtype)
+
+    # sanity check: both paths agree
+    for resp, rtype in cases:
+        assert ([o.to_dict() for o in client.deserialize(resp, rtype)] ==
+                [o.to_dict() for o in
+                 legacy_deserialize(json.loads(resp.data), rtype)])
+
+    results = {}
+    for name, fn in (('before', legacy), ('after', compiled)):
+        best = min(timeit.repeat(fn, number=1, repeat=args.repeat))
+        results[name] = best / nobjs * 1e6
+        print('%-6s %8.2f us/object' % (name, results[name]))
+    print('speedup %.1fx' % (results['before'] / results['after']))
+
+
+if __name__ == '__main__':
+    main()
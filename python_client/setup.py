@@ -28,6 +28,11 @@ REQUIRES = [
     "six>=1.10",
     "urllib3>=1.23"
 ]
+
+EXTRAS = {
+    # AsyncApiClient / AsyncDefaultApi
+    "asyncio": ["aiohttp>=3.6"],
+}
     
 
 setup(
@@ -38,6 +43,7 @@ setup(
     url="",
     keywords=["Swagger", "faasnap"],
     install_requires=REQUIRES,
+    extras_require=EXTRAS,
     packages=find_packages(),
     include_package_data=True,
     long_description="""\
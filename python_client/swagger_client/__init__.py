@@ -21,7 +21,14 @@ from swagger_client.api.default_api import DefaultApi
 # import ApiClient
 from swagger_client.api_client import ApiClient
 from swagger_client.configuration import Configuration
+# import the asyncio client when its optional dependency (aiohttp) is present
+try:
+    from swagger_client.api.async_default_api import AsyncDefaultApi
+    from swagger_client.async_api_client import AsyncApiClient
+except ImportError:
+    pass
 # import models into sdk package
+from swagger_client.models.batch_invocation_result import BatchInvocationResult
 from swagger_client.models.function import Function
 from swagger_client.models.inline_response200 import InlineResponse200
 from swagger_client.models.inline_response2001 import InlineResponse2001
@@ -29,7 +36,11 @@ from swagger_client.models.inline_response400 import InlineResponse400
 from swagger_client.models.interface import Interface
 from swagger_client.models.invocation import Invocation
 from swagger_client.models.layer import Layer
+from swagger_client.models.pool_config import PoolConfig
+from swagger_client.models.pool_status import PoolStatus
 from swagger_client.models.snapshot import Snapshot
+from swagger_client.models.snapshot_info import SnapshotInfo
+from swagger_client.models.snapshot_status import SnapshotStatus
 from swagger_client.models.state import State
 from swagger_client.models.state1 import State1
 from swagger_client.models.vm import VM
@@ -4,3 +4,7 @@ from __future__ import absolute_import
 
 # import apis into api package
 from swagger_client.api.default_api import DefaultApi
+try:
+    from swagger_client.api.async_default_api import AsyncDefaultApi
+except ImportError:
+    pass
@@ -0,0 +1,39 @@
+# coding: utf-8
+
+"""
+    faasnap
+
+    FaaSnap API  # noqa: E501
+
+    OpenAPI spec version: 1.0.0
+
+    Generated by: https://github.com/swagger-api/swagger-codegen.git
+"""
+
+
+from __future__ import absolute_import
+
+from swagger_client.api.default_api import DefaultApi
+from swagger_client.async_api_client import AsyncApiClient
+
+
+class AsyncDefaultApi(DefaultApi):
+    """asyncio flavour of DefaultApi.
+
+    Every operation keeps the signature and return type of its DefaultApi
+    counterpart but returns a coroutine, since all requests go through
+    AsyncApiClient.call_api:
+
+    >>> api = AsyncDefaultApi()
+    >>> result = await api.invocations_post(invocation=invocation)
+    >>> await api.api_client.close()
+
+    `async_req` is accepted for compatibility and ignored.
+    """
+
+    def __init__(self, api_client=None):
+        if api_client is None:
+            api_client = AsyncApiClient()
+        if not isinstance(api_client, AsyncApiClient):
+            raise TypeError("AsyncDefaultApi requires an AsyncApiClient")
+        self.api_client = api_client
@@ -119,7 +119,7 @@ class DefaultApi(object):
     def functions_post(self, **kwargs):  # noqa: E501
         """functions_post  # noqa: E501
 
-        Create a new function  # noqa: E501
+        Create a new function, or update an existing one  # noqa: E501
         This method makes a synchronous HTTP request by default. To make an
         asynchronous HTTP request, please pass async_req=True
         >>> thread = api.functions_post(async_req=True)
@@ -141,7 +141,7 @@ class DefaultApi(object):
     def functions_post_with_http_info(self, **kwargs):  # noqa: E501
         """functions_post  # noqa: E501
 
-        Create a new function  # noqa: E501
+        Create a new function, or update an existing one  # noqa: E501
         This method makes a synchronous HTTP request by default. To make an
         asynchronous HTTP request, please pass async_req=True
         >>> thread = api.functions_post_with_http_info(async_req=True)
@@ -203,6 +203,104 @@ class DefaultApi(object):
             _request_timeout=params.get('_request_timeout'),
             collection_formats=collection_formats)
 
+    def invocations_batch_post(self, **kwargs):  # noqa: E501
+        """invocations_batch_post  # noqa: E501
+
+        Post a batch of invocations  # noqa: E501
+        This method makes a synchronous HTTP request by default. To make an
+        asynchronous HTTP request, please pass async_req=True
+        >>> thread = api.invocations_batch_post(async_req=True)
+        >>> result = thread.get()
+
+        Pass _stream=True to get a generator that yields each
+        BatchInvocationResult as soon as its invocation completes instead
+        of a list once the whole batch is done.
+        >>> for result in api.invocations_batch_post(invocations=invocs, _stream=True):
+        >>>     print(result.index, result.trace_id)
+
+        :param async_req bool
+        :param bool _stream: stream results in completion order
+        :param list[Invocation] invocations:
+        :return: list[BatchInvocationResult]
+                 If the method is called asynchronously,
+                 returns the request thread.
+        """
+        kwargs['_return_http_data_only'] = True
+        if kwargs.pop('_stream', False):
+            kwargs['_preload_content'] = False
+            resp = self.invocations_batch_post_with_http_info(**kwargs)  # noqa: E501
+            return self.api_client.deserialize_stream(resp, 'BatchInvocationResult')  # noqa: E501
+        if kwargs.get('async_req'):
+            return self.invocations_batch_post_with_http_info(**kwargs)  # noqa: E501
+        else:
+            (data) = self.invocations_batch_post_with_http_info(**kwargs)  # noqa: E501
+            return data
+
+    def invocations_batch_post_with_http_info(self, **kwargs):  # noqa: E501
+        """invocations_batch_post  # noqa: E501
+
+        Post a batch of invocations  # noqa: E501
+        This method makes a synchronous HTTP request by default. To make an
+        asynchronous HTTP request, please pass async_req=True
+        >>> thread = api.invocations_batch_post_with_http_info(async_req=True)
+        >>> result = thread.get()
+
+        :param async_req bool
+        :param list[Invocation] invocations:
+        :return: list[BatchInvocationResult]
+                 If the method is called asynchronously,
+                 returns the request thread.
+        """
+
+        all_params = ['invocations']  # noqa: E501
+        all_params.append('async_req')
+        all_params.append('_return_http_data_only')
+        all_params.append('_preload_content')
+        all_params.append('_request_timeout')
+
+        params = locals()
+        for key, val in six.iteritems(params['kwargs']):
+            if key not in all_params:
+                raise TypeError(
+                    "Got an unexpected keyword argument '%s'"
+                    " to method invocations_batch_post" % key
+                )
+            params[key] = val
+        del params['kwargs']
+
+        collection_formats = {}
+
+        path_params = {}
+
+        query_params = []
+
+        header_params = {}
+
+        form_params = []
+        local_var_files = {}
+
+        body_params = None
+        if 'invocations' in params:
+            body_params = params['invocations']
+        # Authentication setting
+        auth_settings = []  # noqa: E501
+
+        return self.api_client.call_api(
+            '/invocations/batch', 'POST',
+            path_params,
+            query_params,
+            header_params,
+            body=body_params,
+            post_params=form_params,
+            files=local_var_files,
+            response_type='list[BatchInvocationResult]',  # noqa: E501
+            auth_settings=auth_settings,
+            async_req=params.get('async_req'),
+            _return_http_data_only=params.get('_return_http_data_only'),
+            _preload_content=params.get('_preload_content', True),
+            _request_timeout=params.get('_request_timeout'),
+            collection_formats=collection_formats)
+
     def invocations_post(self, **kwargs):  # noqa: E501
         """invocations_post  # noqa: E501
 
@@ -212,6 +310,12 @@ class DefaultApi(object):
         >>> thread = api.invocations_post(async_req=True)
         >>> result = thread.get()
 
+        With result_mode='json' the function's JSON body is returned
+        parsed in output, decoded once. With result_mode='raw' the HTTP
+        response is returned unread, its body the function's:
+        >>> resp = api.invocations_post(invocation=Invocation(func_name=f, vm_id=vm, result_mode='raw'))
+        >>> body, vm_id = resp.data, resp.headers['X-Faasnap-Vm-Id']
+
         :param async_req bool
         :param Invocation invocation:
         :return: InlineResponse2001
@@ -219,6 +323,8 @@ class DefaultApi(object):
                  returns the request thread.
         """
         kwargs['_return_http_data_only'] = True
+        if getattr(kwargs.get('invocation'), 'result_mode', None) == 'raw':
+            kwargs['_preload_content'] = False
         if kwargs.get('async_req'):
             return self.invocations_post_with_http_info(**kwargs)  # noqa: E501
         else:
@@ -356,7 +462,7 @@ class DefaultApi(object):
         body_params = None
         # HTTP header `Accept`
         header_params['Accept'] = self.api_client.select_header_accept(
-            ['application/json'])  # noqa: E501
+            ['text/plain'])  # noqa: E501
 
         # Authentication setting
         auth_settings = []  # noqa: E501
@@ -472,6 +578,89 @@ class DefaultApi(object):
             _request_timeout=params.get('_request_timeout'),
             collection_formats=collection_formats)
 
+    def snapshots_get(self, **kwargs):  # noqa: E501
+        """snapshots_get  # noqa: E501
+
+        Returns the snapshots in the catalog, including those loaded from disk at startup  # noqa: E501
+        This method makes a synchronous HTTP request by default. To make an
+        asynchronous HTTP request, please pass async_req=True
+        >>> thread = api.snapshots_get(async_req=True)
+        >>> result = thread.get()
+
+        :param async_req bool
+        :return: list[SnapshotInfo]
+                 If the method is called asynchronously,
+                 returns the request thread.
+        """
+        kwargs['_return_http_data_only'] = True
+        if kwargs.get('async_req'):
+            return self.snapshots_get_with_http_info(**kwargs)  # noqa: E501
+        else:
+            (data) = self.snapshots_get_with_http_info(**kwargs)  # noqa: E501
+            return data
+
+    def snapshots_get_with_http_info(self, **kwargs):  # noqa: E501
+        """snapshots_get  # noqa: E501
+
+        Returns the snapshots in the catalog, including those loaded from disk at startup  # noqa: E501
+        This method makes a synchronous HTTP request by default. To make an
+        asynchronous HTTP request, please pass async_req=True
+        >>> thread = api.snapshots_get_with_http_info(async_req=True)
+        >>> result = thread.get()
+
+        :param async_req bool
+        :return: list[SnapshotInfo]
+                 If the method is called asynchronously,
+                 returns the request thread.
+        """
+
+        all_params = []  # noqa: E501
+        all_params.append('async_req')
+        all_params.append('_return_http_data_only')
+        all_params.append('_preload_content')
+        all_params.append('_request_timeout')
+
+        params = locals()
+        for key, val in six.iteritems(params['kwargs']):
+            if key not in all_params:
+                raise TypeError(
+                    "Got an unexpected keyword argument '%s'"
+                    " to method snapshots_get" % key
+                )
+            params[key] = val
+        del params['kwargs']
+
+        collection_formats = {}
+
+        path_params = {}
+
+        query_params = []
+
+        header_params = {}
+
+        form_params = []
+        local_var_files = {}
+
+        body_params = None
+        # Authentication setting
+        auth_settings = []  # noqa: E501
+
+        return self.api_client.call_api(
+            '/snapshots', 'GET',
+            path_params,
+            query_params,
+            header_params,
+            body=body_params,
+            post_params=form_params,
+            files=local_var_files,
+            response_type='list[SnapshotInfo]',  # noqa: E501
+            auth_settings=auth_settings,
+            async_req=params.get('async_req'),
+            _return_http_data_only=params.get('_return_http_data_only'),
+            _preload_content=params.get('_preload_content', True),
+            _request_timeout=params.get('_request_timeout'),
+            collection_formats=collection_formats)
+
     def snapshots_post(self, **kwargs):  # noqa: E501
         """snapshots_post  # noqa: E501
 
@@ -571,6 +760,7 @@ class DefaultApi(object):
         :param async_req bool
         :param str from_snapshot: (required)
         :param str mem_file_path: (required)
+        :param str copy_mode: auto shares data extents with the source where the filesystem allows, full always writes a full copy
         :return: Snapshot
                  If the method is called asynchronously,
                  returns the request thread.
@@ -594,12 +784,13 @@ class DefaultApi(object):
         :param async_req bool
         :param str from_snapshot: (required)
         :param str mem_file_path: (required)
+        :param str copy_mode: auto shares data extents with the source where the filesystem allows, full always writes a full copy
         :return: Snapshot
                  If the method is called asynchronously,
                  returns the request thread.
         """
 
-        all_params = ['from_snapshot', 'mem_file_path']  # noqa: E501
+        all_params = ['from_snapshot', 'mem_file_path', 'copy_mode']  # noqa: E501
         all_params.append('async_req')
         all_params.append('_return_http_data_only')
         all_params.append('_preload_content')
@@ -632,6 +823,8 @@ class DefaultApi(object):
             query_params.append(('from_snapshot', params['from_snapshot']))  # noqa: E501
         if 'mem_file_path' in params:
             query_params.append(('mem_file_path', params['mem_file_path']))  # noqa: E501
+        if 'copy_mode' in params:
+            query_params.append(('copy_mode', params['copy_mode']))  # noqa: E501
 
         header_params = {}
 
@@ -658,6 +851,97 @@ class DefaultApi(object):
             _request_timeout=params.get('_request_timeout'),
             collection_formats=collection_formats)
 
+    def snapshots_ss_id_get(self, ss_id, **kwargs):  # noqa: E501
+        """snapshots_ss_id_get  # noqa: E501
+
+        Get snapshot page cache status  # noqa: E501
+        This method makes a synchronous HTTP request by default. To make an
+        asynchronous HTTP request, please pass async_req=True
+        >>> thread = api.snapshots_ss_id_get(ss_id, async_req=True)
+        >>> result = thread.get()
+
+        :param async_req bool
+        :param str ss_id: (required)
+        :return: SnapshotStatus
+                 If the method is called asynchronously,
+                 returns the request thread.
+        """
+        kwargs['_return_http_data_only'] = True
+        if kwargs.get('async_req'):
+            return self.snapshots_ss_id_get_with_http_info(ss_id, **kwargs)  # noqa: E501
+        else:
+            (data) = self.snapshots_ss_id_get_with_http_info(ss_id, **kwargs)  # noqa: E501
+            return data
+
+    def snapshots_ss_id_get_with_http_info(self, ss_id, **kwargs):  # noqa: E501
+        """snapshots_ss_id_get  # noqa: E501
+
+        Get snapshot page cache status  # noqa: E501
+        This method makes a synchronous HTTP request by default. To make an
+        asynchronous HTTP request, please pass async_req=True
+        >>> thread = api.snapshots_ss_id_get_with_http_info(ss_id, async_req=True)
+        >>> result = thread.get()
+
+        :param async_req bool
+        :param str ss_id: (required)
+        :return: SnapshotStatus
+                 If the method is called asynchronously,
+                 returns the request thread.
+        """
+
+        all_params = ['ss_id']  # noqa: E501
+        all_params.append('async_req')
+        all_params.append('_return_http_data_only')
+        all_params.append('_preload_content')
+        all_params.append('_request_timeout')
+
+        params = locals()
+        for key, val in six.iteritems(params['kwargs']):
+            if key not in all_params:
+                raise TypeError(
+                    "Got an unexpected keyword argument '%s'"
+                    " to method snapshots_ss_id_get" % key
+                )
+            params[key] = val
+        del params['kwargs']
+        # verify the required parameter 'ss_id' is set
+        if self.api_client.client_side_validation and ('ss_id' not in params or
+                                                       params['ss_id'] is None):  # noqa: E501
+            raise ValueError("Missing the required parameter `ss_id` when calling `snapshots_ss_id_get`")  # noqa: E501
+
+        collection_formats = {}
+
+        path_params = {}
+        if 'ss_id' in params:
+            path_params['ssId'] = params['ss_id']  # noqa: E501
+
+        query_params = []
+
+        header_params = {}
+
+        form_params = []
+        local_var_files = {}
+
+        body_params = None
+        # Authentication setting
+        auth_settings = []  # noqa: E501
+
+        return self.api_client.call_api(
+            '/snapshots/{ssId}', 'GET',
+            path_params,
+            query_params,
+            header_params,
+            body=body_params,
+            post_params=form_params,
+            files=local_var_files,
+            response_type='SnapshotStatus',  # noqa: E501
+            auth_settings=auth_settings,
+            async_req=params.get('async_req'),
+            _return_http_data_only=params.get('_return_http_data_only'),
+            _preload_content=params.get('_preload_content', True),
+            _request_timeout=params.get('_request_timeout'),
+            collection_formats=collection_formats)
+
     def snapshots_ss_id_mincore_get(self, ss_id, **kwargs):  # noqa: E501
         """snapshots_ss_id_mincore_get  # noqa: E501
 
@@ -1137,6 +1421,287 @@ class DefaultApi(object):
             _request_timeout=params.get('_request_timeout'),
             collection_formats=collection_formats)
 
+    def snapshots_ss_id_pool_delete(self, ss_id, **kwargs):  # noqa: E501
+        """snapshots_ss_id_pool_delete  # noqa: E501
+
+        Stop the idle VMs of the pool and remove it  # noqa: E501
+        This method makes a synchronous HTTP request by default. To make an
+        asynchronous HTTP request, please pass async_req=True
+        >>> thread = api.snapshots_ss_id_pool_delete(ss_id, async_req=True)
+        >>> result = thread.get()
+
+        :param async_req bool
+        :param str ss_id: (required)
+        :return: None
+                 If the method is called asynchronously,
+                 returns the request thread.
+        """
+        kwargs['_return_http_data_only'] = True
+        if kwargs.get('async_req'):
+            return self.snapshots_ss_id_pool_delete_with_http_info(ss_id, **kwargs)  # noqa: E501
+        else:
+            (data) = self.snapshots_ss_id_pool_delete_with_http_info(ss_id, **kwargs)  # noqa: E501
+            return data
+
+    def snapshots_ss_id_pool_delete_with_http_info(self, ss_id, **kwargs):  # noqa: E501
+        """snapshots_ss_id_pool_delete  # noqa: E501
+
+        Stop the idle VMs of the pool and remove it  # noqa: E501
+        This method makes a synchronous HTTP request by default. To make an
+        asynchronous HTTP request, please pass async_req=True
+        >>> thread = api.snapshots_ss_id_pool_delete_with_http_info(ss_id, async_req=True)
+        >>> result = thread.get()
+
+        :param async_req bool
+        :param str ss_id: (required)
+        :return: None
+                 If the method is called asynchronously,
+                 returns the request thread.
+        """
+
+        all_params = ['ss_id']  # noqa: E501
+        all_params.append('async_req')
+        all_params.append('_return_http_data_only')
+        all_params.append('_preload_content')
+        all_params.append('_request_timeout')
+
+        params = locals()
+        for key, val in six.iteritems(params['kwargs']):
+            if key not in all_params:
+                raise TypeError(
+                    "Got an unexpected keyword argument '%s'"
+                    " to method snapshots_ss_id_pool_delete" % key
+                )
+            params[key] = val
+        del params['kwargs']
+        # verify the required parameter 'ss_id' is set
+        if self.api_client.client_side_validation and ('ss_id' not in params or
+                                                       params['ss_id'] is None):  # noqa: E501
+            raise ValueError("Missing the required parameter `ss_id` when calling `snapshots_ss_id_pool_delete`")  # noqa: E501
+
+        collection_formats = {}
+
+        path_params = {}
+        if 'ss_id' in params:
+            path_params['ssId'] = params['ss_id']  # noqa: E501
+
+        query_params = []
+
+        header_params = {}
+
+        form_params = []
+        local_var_files = {}
+
+        body_params = None
+        # Authentication setting
+        auth_settings = []  # noqa: E501
+
+        return self.api_client.call_api(
+            '/snapshots/{ssId}/pool', 'DELETE',
+            path_params,
+            query_params,
+            header_params,
+            body=body_params,
+            post_params=form_params,
+            files=local_var_files,
+            response_type=None,  # noqa: E501
+            auth_settings=auth_settings,
+            async_req=params.get('async_req'),
+            _return_http_data_only=params.get('_return_http_data_only'),
+            _preload_content=params.get('_preload_content', True),
+            _request_timeout=params.get('_request_timeout'),
+            collection_formats=collection_formats)
+
+    def snapshots_ss_id_pool_get(self, ss_id, **kwargs):  # noqa: E501
+        """snapshots_ss_id_pool_get  # noqa: E501
+
+        Get the pool of restored, paused VMs of the snapshot  # noqa: E501
+        This method makes a synchronous HTTP request by default. To make an
+        asynchronous HTTP request, please pass async_req=True
+        >>> thread = api.snapshots_ss_id_pool_get(ss_id, async_req=True)
+        >>> result = thread.get()
+
+        :param async_req bool
+        :param str ss_id: (required)
+        :return: PoolStatus
+                 If the method is called asynchronously,
+                 returns the request thread.
+        """
+        kwargs['_return_http_data_only'] = True
+        if kwargs.get('async_req'):
+            return self.snapshots_ss_id_pool_get_with_http_info(ss_id, **kwargs)  # noqa: E501
+        else:
+            (data) = self.snapshots_ss_id_pool_get_with_http_info(ss_id, **kwargs)  # noqa: E501
+            return data
+
+    def snapshots_ss_id_pool_get_with_http_info(self, ss_id, **kwargs):  # noqa: E501
+        """snapshots_ss_id_pool_get  # noqa: E501
+
+        Get the pool of restored, paused VMs of the snapshot  # noqa: E501
+        This method makes a synchronous HTTP request by default. To make an
+        asynchronous HTTP request, please pass async_req=True
+        >>> thread = api.snapshots_ss_id_pool_get_with_http_info(ss_id, async_req=True)
+        >>> result = thread.get()
+
+        :param async_req bool
+        :param str ss_id: (required)
+        :return: PoolStatus
+                 If the method is called asynchronously,
+                 returns the request thread.
+        """
+
+        all_params = ['ss_id']  # noqa: E501
+        all_params.append('async_req')
+        all_params.append('_return_http_data_only')
+        all_params.append('_preload_content')
+        all_params.append('_request_timeout')
+
+        params = locals()
+        for key, val in six.iteritems(params['kwargs']):
+            if key not in all_params:
+                raise TypeError(
+                    "Got an unexpected keyword argument '%s'"
+                    " to method snapshots_ss_id_pool_get" % key
+                )
+            params[key] = val
+        del params['kwargs']
+        # verify the required parameter 'ss_id' is set
+        if self.api_client.client_side_validation and ('ss_id' not in params or
+                                                       params['ss_id'] is None):  # noqa: E501
+            raise ValueError("Missing the required parameter `ss_id` when calling `snapshots_ss_id_pool_get`")  # noqa: E501
+
+        collection_formats = {}
+
+        path_params = {}
+        if 'ss_id' in params:
+            path_params['ssId'] = params['ss_id']  # noqa: E501
+
+        query_params = []
+
+        header_params = {}
+
+        form_params = []
+        local_var_files = {}
+
+        body_params = None
+        # Authentication setting
+        auth_settings = []  # noqa: E501
+
+        return self.api_client.call_api(
+            '/snapshots/{ssId}/pool', 'GET',
+            path_params,
+            query_params,
+            header_params,
+            body=body_params,
+            post_params=form_params,
+            files=local_var_files,
+            response_type='PoolStatus',  # noqa: E501
+            auth_settings=auth_settings,
+            async_req=params.get('async_req'),
+            _return_http_data_only=params.get('_return_http_data_only'),
+            _preload_content=params.get('_preload_content', True),
+            _request_timeout=params.get('_request_timeout'),
+            collection_formats=collection_formats)
+
+    def snapshots_ss_id_pool_put(self, ss_id, pool, **kwargs):  # noqa: E501
+        """snapshots_ss_id_pool_put  # noqa: E501
+
+        Keep VMs restored from the snapshot and paused, one per namespace, with the snapshot's pages prefetched. Invocations of the snapshot claim and resume one of them instead of restoring a VM, and the pool restores a new one in the background. Replaces the pool of the snapshot, if any.  # noqa: E501
+        This method makes a synchronous HTTP request by default. To make an
+        asynchronous HTTP request, please pass async_req=True
+        >>> thread = api.snapshots_ss_id_pool_put(ss_id, pool, async_req=True)
+        >>> result = thread.get()
+
+        :param async_req bool
+        :param str ss_id: (required)
+        :param PoolConfig pool: (required)
+        :return: PoolStatus
+                 If the method is called asynchronously,
+                 returns the request thread.
+        """
+        kwargs['_return_http_data_only'] = True
+        if kwargs.get('async_req'):
+            return self.snapshots_ss_id_pool_put_with_http_info(ss_id, pool, **kwargs)  # noqa: E501
+        else:
+            (data) = self.snapshots_ss_id_pool_put_with_http_info(ss_id, pool, **kwargs)  # noqa: E501
+            return data
+
+    def snapshots_ss_id_pool_put_with_http_info(self, ss_id, pool, **kwargs):  # noqa: E501
+        """snapshots_ss_id_pool_put  # noqa: E501
+
+        Keep VMs restored from the snapshot and paused, one per namespace, with the snapshot's pages prefetched. Invocations of the snapshot claim and resume one of them instead of restoring a VM, and the pool restores a new one in the background. Replaces the pool of the snapshot, if any.  # noqa: E501
+        This method makes a synchronous HTTP request by default. To make an
+        asynchronous HTTP request, please pass async_req=True
+        >>> thread = api.snapshots_ss_id_pool_put_with_http_info(ss_id, pool, async_req=True)
+        >>> result = thread.get()
+
+        :param async_req bool
+        :param str ss_id: (required)
+        :param PoolConfig pool: (required)
+        :return: PoolStatus
+                 If the method is called asynchronously,
+                 returns the request thread.
+        """
+
+        all_params = ['ss_id', 'pool']  # noqa: E501
+        all_params.append('async_req')
+        all_params.append('_return_http_data_only')
+        all_params.append('_preload_content')
+        all_params.append('_request_timeout')
+
+        params = locals()
+        for key, val in six.iteritems(params['kwargs']):
+            if key not in all_params:
+                raise TypeError(
+                    "Got an unexpected keyword argument '%s'"
+                    " to method snapshots_ss_id_pool_put" % key
+                )
+            params[key] = val
+        del params['kwargs']
+        # verify the required parameter 'ss_id' is set
+        if self.api_client.client_side_validation and ('ss_id' not in params or
+                                                       params['ss_id'] is None):  # noqa: E501
+            raise ValueError("Missing the required parameter `ss_id` when calling `snapshots_ss_id_pool_put`")  # noqa: E501
+        # verify the required parameter 'pool' is set
+        if self.api_client.client_side_validation and ('pool' not in params or
+                                                       params['pool'] is None):  # noqa: E501
+            raise ValueError("Missing the required parameter `pool` when calling `snapshots_ss_id_pool_put`")  # noqa: E501
+
+        collection_formats = {}
+
+        path_params = {}
+        if 'ss_id' in params:
+            path_params['ssId'] = params['ss_id']  # noqa: E501
+
+        query_params = []
+
+        header_params = {}
+
+        form_params = []
+        local_var_files = {}
+
+        body_params = None
+        if 'pool' in params:
+            body_params = params['pool']
+        # Authentication setting
+        auth_settings = []  # noqa: E501
+
+        return self.api_client.call_api(
+            '/snapshots/{ssId}/pool', 'PUT',
+            path_params,
+            query_params,
+            header_params,
+            body=body_params,
+            post_params=form_params,
+            files=local_var_files,
+            response_type='PoolStatus',  # noqa: E501
+            auth_settings=auth_settings,
+            async_req=params.get('async_req'),
+            _return_http_data_only=params.get('_return_http_data_only'),
+            _preload_content=params.get('_preload_content', True),
+            _request_timeout=params.get('_request_timeout'),
+            collection_formats=collection_formats)
+
     def snapshots_ss_id_reap_delete(self, ss_id, **kwargs):  # noqa: E501
         """snapshots_ss_id_reap_delete  # noqa: E501
 
@@ -1675,6 +2240,89 @@ class DefaultApi(object):
             _request_timeout=params.get('_request_timeout'),
             collection_formats=collection_formats)
 
+    def vms_delete(self, **kwargs):  # noqa: E501
+        """vms_delete  # noqa: E501
+
+        Stop all VMs, including pooled VMMs  # noqa: E501
+        This method makes a synchronous HTTP request by default. To make an
+        asynchronous HTTP request, please pass async_req=True
+        >>> thread = api.vms_delete(async_req=True)
+        >>> result = thread.get()
+
+        :param async_req bool
+        :return: None
+                 If the method is called asynchronously,
+                 returns the request thread.
+        """
+        kwargs['_return_http_data_only'] = True
+        if kwargs.get('async_req'):
+            return self.vms_delete_with_http_info(**kwargs)  # noqa: E501
+        else:
+            (data) = self.vms_delete_with_http_info(**kwargs)  # noqa: E501
+            return data
+
+    def vms_delete_with_http_info(self, **kwargs):  # noqa: E501
+        """vms_delete  # noqa: E501
+
+        Stop all VMs, including pooled VMMs  # noqa: E501
+        This method makes a synchronous HTTP request by default. To make an
+        asynchronous HTTP request, please pass async_req=True
+        >>> thread = api.vms_delete_with_http_info(async_req=True)
+        >>> result = thread.get()
+
+        :param async_req bool
+        :return: None
+                 If the method is called asynchronously,
+                 returns the request thread.
+        """
+
+        all_params = []  # noqa: E501
+        all_params.append('async_req')
+        all_params.append('_return_http_data_only')
+        all_params.append('_preload_content')
+        all_params.append('_request_timeout')
+
+        params = locals()
+        for key, val in six.iteritems(params['kwargs']):
+            if key not in all_params:
+                raise TypeError(
+                    "Got an unexpected keyword argument '%s'"
+                    " to method vms_delete" % key
+                )
+            params[key] = val
+        del params['kwargs']
+
+        collection_formats = {}
+
+        path_params = {}
+
+        query_params = []
+
+        header_params = {}
+
+        form_params = []
+        local_var_files = {}
+
+        body_params = None
+        # Authentication setting
+        auth_settings = []  # noqa: E501
+
+        return self.api_client.call_api(
+            '/vms', 'DELETE',
+            path_params,
+            query_params,
+            header_params,
+            body=body_params,
+            post_params=form_params,
+            files=local_var_files,
+            response_type=None,  # noqa: E501
+            auth_settings=auth_settings,
+            async_req=params.get('async_req'),
+            _return_http_data_only=params.get('_return_http_data_only'),
+            _preload_content=params.get('_preload_content', True),
+            _request_timeout=params.get('_request_timeout'),
+            collection_formats=collection_formats)
+
     def vms_get(self, **kwargs):  # noqa: E501
         """vms_get  # noqa: E501
 
@@ -18,6 +18,7 @@ from multiprocessing.pool import ThreadPool
 import os
 import re
 import tempfile
+import threading
 
 # python 2 and python 3 compatibility library
 import six
@@ -59,6 +60,10 @@ class ApiClient(object):
         'datetime': datetime.datetime,
         'object': object,
     }
+    # Compiled deserializers keyed by type string or class literal, see
+    # __deserializer. Only finished deserializers are published in it.
+    _deserializers = {}
+    _deserializers_lock = threading.Lock()
 
     def __init__(self, configuration=None, header_name=None, header_value=None,
                  cookie=None):
@@ -241,6 +246,54 @@ class ApiClient(object):
 
         return self.__deserialize(data, response_type)
 
+    def deserialize_stream(self, response, response_type):
+        """Deserializes a streamed JSON array element by element.
+
+        The response must not be preloaded (`_preload_content=False`) and
+        the server must write one array element per line, as
+        POST /invocations/batch does. Each element is yielded as soon as
+        its line arrives.
+
+        :param response: urllib3.HTTPResponse object.
+        :param response_type: element type, class literal or string of
+            class name.
+        :return: generator of deserialized objects.
+        """
+        if response.chunked and response.supports_chunked_reads():
+            chunks = response.read_chunked(decode_content=True)
+        else:
+            chunks = response.stream(decode_content=True)
+        try:
+            buf = b''
+            for chunk in chunks:
+                buf += chunk
+                lines = buf.split(b'\n')
+                buf = lines.pop()
+                for line in lines:
+                    item = self.parse_stream_line(line)
+                    if item is not None:
+                        yield self.__deserialize(item, response_type)
+            item = self.parse_stream_line(buf)
+            if item is not None:
+                yield self.__deserialize(item, response_type)
+        finally:
+            response.release_conn()
+
+    @staticmethod
+    def parse_stream_line(line):
+        """Parses one line of a streamed JSON array.
+
+        :param line: bytes or str, one array element, the opening or the
+            closing bracket.
+        :return: decoded element, or None for lines without one.
+        """
+        if isinstance(line, bytes):
+            line = line.decode('utf8')
+        line = line.strip().strip('[],').strip()
+        if not line:
+            return None
+        return json.loads(line)
+
     def __deserialize(self, data, klass):
         """Deserializes dict, list, str into an object.
 
@@ -252,33 +305,149 @@ class ApiClient(object):
         if data is None:
             return None
 
+        return self.__deserializer(klass)(self, data)
+
+    def __deserializer(self, klass):
+        """Returns the compiled deserializer for a type.
+
+        Deserializers are compiled once per type string or class and
+        cached on the class, so they are shared by all clients and
+        threads. A compilation publishes the deserializers it built only
+        once all are complete, so other threads never see a model
+        deserializer whose fields are still being compiled.
+
+        :param klass: class literal, or string of class name.
+        :return: callable taking (api_client, data).
+        """
+        try:
+            return self._deserializers[klass]
+        except KeyError:
+            pass
+        with self._deserializers_lock:
+            try:
+                return self._deserializers[klass]
+            except KeyError:
+                pass
+            pending = {}
+            deserializer = self.__resolve(klass, pending)
+            self._deserializers.update(pending)
+            return deserializer
+
+    def __resolve(self, klass, pending):
+        """Returns the deserializer for a type within a compilation.
+
+        :param klass: class literal, or string of class name.
+        :param pending: deserializers built by this compilation and not
+            published yet, including models still being compiled.
+        :return: callable taking (api_client, data).
+        """
+        deserializer = (self._deserializers.get(klass) or
+                        pending.get(klass))
+        if deserializer is None:
+            deserializer = self.__compile_deserializer(klass, pending)
+            pending[klass] = deserializer
+        return deserializer
+
+    def __compile_deserializer(self, klass, pending):
+        """Builds a deserializer for a type.
+
+        Type strings such as `list[VM]` are parsed here rather than per
+        object, and model attribute maps are flattened into a list of
+        (attribute, json key, deserializer) once per model class.
+
+        :param klass: class literal, or string of class name.
+        :param pending: see __resolve.
+        :return: callable taking (api_client, data).
+        """
         if type(klass) == str:
             if klass.startswith('list['):
                 sub_kls = re.match(r'list\[(.*)\]', klass).group(1)
-                return [self.__deserialize(sub_data, sub_kls)
-                        for sub_data in data]
+                sub = self.__resolve(sub_kls, pending)
+
+                def deserialize_list(client, data):
+                    if data is None:
+                        return None
+                    return [sub(client, sub_data) for sub_data in data]
+                return deserialize_list
 
             if klass.startswith('dict('):
                 sub_kls = re.match(r'dict\(([^,]*), (.*)\)', klass).group(2)
-                return {k: self.__deserialize(v, sub_kls)
-                        for k, v in six.iteritems(data)}
+                sub = self.__resolve(sub_kls, pending)
+
+                def deserialize_dict(client, data):
+                    if data is None:
+                        return None
+                    return {k: sub(client, v) for k, v in six.iteritems(data)}
+                return deserialize_dict
 
             # convert str to class
             if klass in self.NATIVE_TYPES_MAPPING:
                 klass = self.NATIVE_TYPES_MAPPING[klass]
             else:
                 klass = getattr(swagger_client.models, klass)
+            return self.__resolve(klass, pending)
 
         if klass in self.PRIMITIVE_TYPES:
-            return self.__deserialize_primitive(data, klass)
+            def deserialize_primitive(client, data):
+                if data is None:
+                    return None
+                try:
+                    return klass(data)
+                except UnicodeEncodeError:
+                    return six.text_type(data)
+                except TypeError:
+                    return data
+            return deserialize_primitive
         elif klass == object:
-            return self.__deserialize_object(data)
+            return lambda client, data: data
         elif klass == datetime.date:
-            return self.__deserialize_date(data)
+            return (lambda client, data: None if data is None
+                    else client.__deserialize_date(data))
         elif klass == datetime.datetime:
-            return self.__deserialize_datatime(data)
+            return (lambda client, data: None if data is None
+                    else client.__deserialize_datatime(data))
         else:
-            return self.__deserialize_model(data, klass)
+            return self.__compile_model(klass, pending)
+
+    def __compile_model(self, klass, pending):
+        """Builds a deserializer for a model class.
+
+        Models that resolve a subclass at runtime or that are dicts
+        themselves keep going through __deserialize_model.
+
+        :param klass: class literal.
+        :param pending: see __resolve.
+        :return: callable taking (api_client, data).
+        """
+        if (not klass.swagger_types and
+                not self.__hasattr(klass, 'get_real_child_model')):
+            return lambda client, data: data
+
+        if (self.__hasattr(klass, 'get_real_child_model') or
+                issubclass(klass, dict)):
+            return (lambda client, data: None if data is None
+                    else client.__deserialize_model(data, klass))
+
+        fields = []
+
+        def deserialize_model(client, data):
+            if data is None:
+                return None
+            if type(data) is not dict:
+                return client.__deserialize_model(data, klass)
+            kwargs = {}
+            for attr, key, sub in fields:
+                if key in data:
+                    kwargs[attr] = sub(client, data[key])
+            return klass(**kwargs)
+
+        # Pending before compiling attributes so that models referring
+        # to themselves resolve to this deserializer.
+        pending[klass] = deserialize_model
+        for attr, attr_type in six.iteritems(klass.swagger_types):
+            fields.append((attr, klass.attribute_map[attr],
+                           self.__resolve(attr_type, pending)))
+        return deserialize_model
 
     def call_api(self, resource_path, method,
                  path_params=None, query_params=None, header_params=None,
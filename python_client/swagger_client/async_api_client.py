@@ -0,0 +1,237 @@
+# coding: utf-8
+"""
+    faasnap
+
+    FaaSnap API  # noqa: E501
+
+    OpenAPI spec version: 1.0.0
+
+    Generated by: https://github.com/swagger-api/swagger-codegen.git
+"""
+
+from __future__ import absolute_import
+
+import inspect
+
+from six.moves.urllib.parse import quote
+
+from swagger_client.api_client import ApiClient
+from swagger_client.configuration import Configuration
+from swagger_client import async_rest
+
+
+class AsyncApiClient(ApiClient):
+    """asyncio API client for Swagger client library builds.
+
+    Drop-in counterpart of ApiClient whose `call_api` is a coroutine.
+    All requests share one aiohttp session, so a single event loop can keep
+    many requests in flight over a bounded keep-alive connection pool
+    (`Configuration.connection_pool_maxsize`, 0 for unbounded) without a
+    thread per request. Responses are deserialized into the same model
+    classes as the synchronous client.
+
+    Cancelling the awaiting task aborts the request and returns its
+    connection to the pool. `_request_timeout` is honoured per call.
+
+    The client should be closed when no longer needed, either with
+    `await client.close()` or by using it as an async context manager:
+
+    >>> async with AsyncApiClient() as client:
+    ...     api = AsyncDefaultApi(client)
+    ...     vms = await api.vms_get()
+
+    :param configuration: .Configuration object for this client
+    :param header_name: a header to pass when making calls to the API.
+    :param header_value: a header value to pass when making calls to
+        the API.
+    :param cookie: a cookie to include in the header when making calls
+        to the API
+    """
+
+    def __init__(self, configuration=None, header_name=None, header_value=None,
+                 cookie=None):
+        if configuration is None:
+            configuration = Configuration()
+        self.configuration = configuration
+
+        # Never used, requests are multiplexed on the event loop instead.
+        self._pool = None
+        self.rest_client = async_rest.RESTClientObject(configuration)
+        self.default_headers = {}
+        if header_name is not None:
+            self.default_headers[header_name] = header_value
+        self.cookie = cookie
+        # Set default User-Agent.
+        self.user_agent = 'Swagger-Codegen/1.0.0/python'
+        self.client_side_validation = configuration.client_side_validation
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self):
+        """Closes the underlying session and its pooled connections."""
+        await self.rest_client.close()
+
+    async def deserialize_stream(self, response, response_type):
+        """Deserializes a streamed JSON array element by element.
+
+        Async counterpart of ApiClient.deserialize_stream.
+
+        :param response: aiohttp.ClientResponse, or an awaitable of one
+            such as the coroutine returned by an operation called with
+            `_preload_content=False`.
+        :param response_type: element type, class literal or string of
+            class name.
+        :return: async generator of deserialized objects.
+        """
+        if inspect.isawaitable(response):
+            response = await response
+        try:
+            async for line in response.content:
+                item = self.parse_stream_line(line)
+                if item is not None:
+                    yield self._ApiClient__deserialize(item, response_type)
+        finally:
+            response.release()
+
+    async def __call_api(
+            self, resource_path, method, path_params=None,
+            query_params=None, header_params=None, body=None, post_params=None,
+            files=None, response_type=None, auth_settings=None,
+            _return_http_data_only=None, collection_formats=None,
+            _preload_content=True, _request_timeout=None):
+
+        config = self.configuration
+
+        # header parameters
+        header_params = header_params or {}
+        header_params.update(self.default_headers)
+        if self.cookie:
+            header_params['Cookie'] = self.cookie
+        if header_params:
+            header_params = self.sanitize_for_serialization(header_params)
+            header_params = dict(self.parameters_to_tuples(header_params,
+                                                           collection_formats))
+
+        # path parameters
+        if path_params:
+            path_params = self.sanitize_for_serialization(path_params)
+            path_params = self.parameters_to_tuples(path_params,
+                                                    collection_formats)
+            for k, v in path_params:
+                # specified safe chars, encode everything
+                resource_path = resource_path.replace(
+                    '{%s}' % k,
+                    quote(str(v), safe=config.safe_chars_for_path_param)
+                )
+
+        # query parameters
+        if query_params:
+            query_params = self.sanitize_for_serialization(query_params)
+            query_params = self.parameters_to_tuples(query_params,
+                                                     collection_formats)
+
+        # post parameters
+        if post_params or files:
+            post_params = self.prepare_post_parameters(post_params, files)
+            post_params = self.sanitize_for_serialization(post_params)
+            post_params = self.parameters_to_tuples(post_params,
+                                                    collection_formats)
+
+        # auth setting
+        self.update_params_for_auth(header_params, query_params, auth_settings)
+
+        # body
+        if body:
+            body = self.sanitize_for_serialization(body)
+
+        # request url
+        url = self.configuration.host + resource_path
+
+        # perform request and return response
+        response_data = await self.request(
+            method, url, query_params=query_params, headers=header_params,
+            post_params=post_params, body=body,
+            _preload_content=_preload_content,
+            _request_timeout=_request_timeout)
+
+        self.last_response = response_data
+
+        return_data = response_data
+        if _preload_content:
+            # deserialize response data
+            if response_type:
+                return_data = self.deserialize(response_data, response_type)
+            else:
+                return_data = None
+
+        if _return_http_data_only:
+            return (return_data)
+        else:
+            return (return_data, response_data.status,
+                    response_data.getheaders())
+
+    async def call_api(self, resource_path, method,
+                       path_params=None, query_params=None, header_params=None,
+                       body=None, post_params=None, files=None,
+                       response_type=None, auth_settings=None, async_req=None,
+                       _return_http_data_only=None, collection_formats=None,
+                       _preload_content=True, _request_timeout=None):
+        """Makes the HTTP request and returns deserialized data.
+
+        :param resource_path: Path to method endpoint.
+        :param method: Method to call.
+        :param path_params: Path parameters in the url.
+        :param query_params: Query parameters in the url.
+        :param header_params: Header parameters to be
+            placed in the request header.
+        :param body: Request body.
+        :param post_params dict: Request post form parameters,
+            for `application/x-www-form-urlencoded`, `multipart/form-data`.
+        :param auth_settings list: Auth Settings names for the request.
+        :param response: Response data type.
+        :param files dict: key -> filename, value -> filepath,
+            for `multipart/form-data`.
+        :param async_req bool: ignored, every call is already a coroutine.
+        :param _return_http_data_only: response data without head status code
+                                       and headers
+        :param collection_formats: dict of collection formats for path, query,
+            header, and post parameters.
+        :param _preload_content: if False, the aiohttp.ClientResponse object
+                                 will be returned without reading/decoding
+                                 response data. Default is True.
+        :param _request_timeout: timeout setting for this request. If one
+                                 number provided, it will be total request
+                                 timeout. It can also be a pair (tuple) of
+                                 (connection, read) timeouts.
+        :return: the response, once awaited.
+        """
+        return (await self.__call_api(resource_path, method,
+                                      path_params, query_params, header_params,
+                                      body, post_params, files,
+                                      response_type, auth_settings,
+                                      _return_http_data_only,
+                                      collection_formats,
+                                      _preload_content, _request_timeout))
+
+    async def request(self, method, url, query_params=None, headers=None,
+                      post_params=None, body=None, _preload_content=True,
+                      _request_timeout=None):
+        """Makes the HTTP request using the asyncio RESTClient."""
+        if method not in ("GET", "HEAD", "OPTIONS", "POST", "PUT", "PATCH",
+                          "DELETE"):
+            raise ValueError(
+                "http method must be `GET`, `HEAD`, `OPTIONS`,"
+                " `POST`, `PATCH`, `PUT` or `DELETE`."
+            )
+        return (await self.rest_client.request(
+            method, url,
+            query_params=query_params,
+            headers=headers,
+            post_params=post_params,
+            _preload_content=_preload_content,
+            _request_timeout=_request_timeout,
+            body=body))
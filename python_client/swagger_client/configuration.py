@@ -31,6 +31,7 @@ class Configuration(object):
     """
 
     _default = None
+    _shared = None
 
     def __init__(self):
         """Constructor"""
@@ -103,6 +104,22 @@ class Configuration(object):
     def set_default(cls, default):
         cls._default = default
 
+    @classmethod
+    def get_default(cls):
+        """Returns the configuration shared by models built without one.
+
+        This is the instance passed to `set_default` if any, otherwise a
+        single lazily created Configuration. Models only read from it, so
+        they do not need a private copy each.
+
+        :return: Configuration
+        """
+        if cls._default is not None:
+            return cls._default
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
     @property
     def logger_file(self):
         """The logger file.
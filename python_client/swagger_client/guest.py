@@ -0,0 +1,58 @@
+# coding: utf-8
+
+"""
+    faasnap
+
+    Helpers for the routes of the guest function daemon built on top of
+    DefaultApi.
+
+    The host reaches the guest daemon only through invocations, so the
+    routes are invoked as functions named after them, with the function they
+    act on in the body. Errors of the daemon are raised as ApiException.
+"""
+
+from __future__ import absolute_import
+
+import json
+
+from swagger_client.models.invocation import Invocation
+
+
+def call_route(api, vm_id, route, function):
+    """Invokes a route of the guest daemon of a VM for a function.
+
+    :param api: DefaultApi of the daemon.
+    :param vm_id: the VM, running.
+    :param route: 'quiesce' or 'preload'.
+    :param function: the function the route acts on.
+    :return: the JSON body of the route.
+    """
+    ret = api.invocations_post(invocation=Invocation(
+        func_name=route, vm_id=vm_id,
+        params=json.dumps({'function': function}), mincore=-1,
+        enable_reap=False, result_mode='json'))
+    if ret.output is not None:
+        return ret.output
+    return json.loads(ret.result)
+
+
+def quiesce(api, vm_id, function):
+    """Freezes the guest heap after the function ran, before a warm snapshot
+    is taken.
+
+    :return: a line describing what was frozen.
+    """
+    r = call_route(api, vm_id, 'quiesce', function)
+    return 'quiesced %s: %d objects frozen, rss %+d KiB' % (
+        r['handler'], r['frozen'], r['rss_delta_kb']['VmRSS'])
+
+
+def preload(api, vm_id, function):
+    """Imports and warms the handler in a freshly booted VM before its
+    snapshot is taken.
+
+    :return: a line describing the import and warm-up times.
+    """
+    r = call_route(api, vm_id, 'preload', function)
+    return 'preloaded %s: import %.1f ms, warm %.1f ms' % (
+        r['handler'], r['import'] * 1000, r['warm'] * 1000)
@@ -15,6 +15,7 @@
 from __future__ import absolute_import
 
 # import models into model package
+from swagger_client.models.batch_invocation_result import BatchInvocationResult
 from swagger_client.models.function import Function
 from swagger_client.models.inline_response200 import InlineResponse200
 from swagger_client.models.inline_response2001 import InlineResponse2001
@@ -22,7 +23,11 @@ from swagger_client.models.inline_response400 import InlineResponse400
 from swagger_client.models.interface import Interface
 from swagger_client.models.invocation import Invocation
 from swagger_client.models.layer import Layer
+from swagger_client.models.pool_config import PoolConfig
+from swagger_client.models.pool_status import PoolStatus
 from swagger_client.models.snapshot import Snapshot
+from swagger_client.models.snapshot_info import SnapshotInfo
+from swagger_client.models.snapshot_status import SnapshotStatus
 from swagger_client.models.state import State
 from swagger_client.models.state1 import State1
 from swagger_client.models.vm import VM
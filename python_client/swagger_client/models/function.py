@@ -35,6 +35,7 @@ class Function(object):
     swagger_types = {
         'func_name': 'str',
         'image': 'str',
+        'overlay': 'str',
         'kernel': 'str',
         'vcpu': 'int',
         'mem_size': 'int'
@@ -43,19 +44,21 @@ class Function(object):
     attribute_map = {
         'func_name': 'func_name',
         'image': 'image',
+        'overlay': 'overlay',
         'kernel': 'kernel',
         'vcpu': 'vcpu',
         'mem_size': 'mem_size'
     }
 
-    def __init__(self, func_name=None, image=None, kernel=None, vcpu=None, mem_size=None, _configuration=None):  # noqa: E501
+    def __init__(self, func_name=None, image=None, overlay=None, kernel=None, vcpu=None, mem_size=None, _configuration=None):  # noqa: E501
         """Function - a model defined in Swagger"""  # noqa: E501
         if _configuration is None:
-            _configuration = Configuration()
+            _configuration = Configuration.get_default()
         self._configuration = _configuration
 
         self._func_name = None
         self._image = None
+        self._overlay = None
         self._kernel = None
         self._vcpu = None
         self._mem_size = None
@@ -64,6 +67,8 @@ class Function(object):
         self.func_name = func_name
         if image is not None:
             self.image = image
+        if overlay is not None:
+            self.overlay = overlay
         if kernel is not None:
             self.kernel = kernel
         if vcpu is not None:
@@ -115,6 +120,29 @@ class Function(object):
 
         self._image = image
 
+    @property
+    def overlay(self):
+        """Gets the overlay of this Function.  # noqa: E501
+
+        alias of a per-function overlay drive mounted over the image, in the daemon's overlays  # noqa: E501
+
+        :return: The overlay of this Function.  # noqa: E501
+        :rtype: str
+        """
+        return self._overlay
+
+    @overlay.setter
+    def overlay(self, overlay):
+        """Sets the overlay of this Function.
+
+        alias of a per-function overlay drive mounted over the image, in the daemon's overlays  # noqa: E501
+
+        :param overlay: The overlay of this Function.  # noqa: E501
+        :type: str
+        """
+
+        self._overlay = overlay
+
     @property
     def kernel(self):
         """Gets the kernel of this Function.  # noqa: E501
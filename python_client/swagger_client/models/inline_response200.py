@@ -51,7 +51,7 @@ class InlineResponse200(object):
     def __init__(self, nlayers=None, n_nz_regions=None, nz_region_size=None, n_ws_regions=None, ws_region_size=None, _configuration=None):  # noqa: E501
         """InlineResponse200 - a model defined in Swagger"""  # noqa: E501
         if _configuration is None:
-            _configuration = Configuration()
+            _configuration = Configuration.get_default()
         self._configuration = _configuration
 
         self._nlayers = None
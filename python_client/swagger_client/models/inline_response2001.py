@@ -35,6 +35,7 @@ class InlineResponse2001(object):
     swagger_types = {
         'duration': 'float',
         'result': 'str',
+        'output': 'object',
         'vm_id': 'str',
         'trace_id': 'str'
     }
@@ -42,18 +43,20 @@ class InlineResponse2001(object):
     attribute_map = {
         'duration': 'duration',
         'result': 'result',
+        'output': 'output',
         'vm_id': 'vmId',
         'trace_id': 'traceId'
     }
 
-    def __init__(self, duration=None, result=None, vm_id=None, trace_id=None, _configuration=None):  # noqa: E501
+    def __init__(self, duration=None, result=None, output=None, vm_id=None, trace_id=None, _configuration=None):  # noqa: E501
         """InlineResponse2001 - a model defined in Swagger"""  # noqa: E501
         if _configuration is None:
-            _configuration = Configuration()
+            _configuration = Configuration.get_default()
         self._configuration = _configuration
 
         self._duration = None
         self._result = None
+        self._output = None
         self._vm_id = None
         self._trace_id = None
         self.discriminator = None
@@ -62,6 +65,8 @@ class InlineResponse2001(object):
             self.duration = duration
         if result is not None:
             self.result = result
+        if output is not None:
+            self.output = output
         if vm_id is not None:
             self.vm_id = vm_id
         if trace_id is not None:
@@ -109,6 +114,29 @@ class InlineResponse2001(object):
 
         self._result = result
 
+    @property
+    def output(self):
+        """Gets the output of this InlineResponse2001.  # noqa: E501
+
+        the function's JSON body, in the json result mode  # noqa: E501
+
+        :return: The output of this InlineResponse2001.  # noqa: E501
+        :rtype: object
+        """
+        return self._output
+
+    @output.setter
+    def output(self, output):
+        """Sets the output of this InlineResponse2001.
+
+        the function's JSON body, in the json result mode  # noqa: E501
+
+        :param output: The output of this InlineResponse2001.  # noqa: E501
+        :type: object
+        """
+
+        self._output = output
+
     @property
     def vm_id(self):
         """Gets the vm_id of this InlineResponse2001.  # noqa: E501
@@ -43,7 +43,7 @@ class InlineResponse400(object):
     def __init__(self, message=None, _configuration=None):  # noqa: E501
         """InlineResponse400 - a model defined in Swagger"""  # noqa: E501
         if _configuration is None:
-            _configuration = Configuration()
+            _configuration = Configuration.get_default()
         self._configuration = _configuration
 
         self._message = None
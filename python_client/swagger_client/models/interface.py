@@ -51,7 +51,7 @@ class Interface(object):
     def __init__(self, host_dev_name=None, iface_id=None, guest_mac=None, guest_addr=None, unique_addr=None, _configuration=None):  # noqa: E501
         """Interface - a model defined in Swagger"""  # noqa: E501
         if _configuration is None:
-            _configuration = Configuration()
+            _configuration = Configuration.get_default()
         self._configuration = _configuration
 
         self._host_dev_name = None
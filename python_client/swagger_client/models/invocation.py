@@ -47,7 +47,8 @@ class Invocation(object):
         'enable_reap': 'bool',
         'ws_file_direct_io': 'bool',
         'ws_single_read': 'bool',
-        'namespace': 'str'
+        'namespace': 'str',
+        'result_mode': 'str'
     }
 
     attribute_map = {
@@ -65,13 +66,14 @@ class Invocation(object):
         'enable_reap': 'enableReap',
         'ws_file_direct_io': 'wsFileDirectIo',
         'ws_single_read': 'wsSingleRead',
-        'namespace': 'namespace'
+        'namespace': 'namespace',
+        'result_mode': 'result_mode'
     }
 
-    def __init__(self, func_name=None, vm_id=None, ss_id=None, params=None, mincore=None, mincore_size=None, load_mincore=None, use_mem_file=None, overlay_regions=None, use_ws_file=None, vmm_load_ws=None, enable_reap=None, ws_file_direct_io=None, ws_single_read=None, namespace=None, _configuration=None):  # noqa: E501
+    def __init__(self, func_name=None, vm_id=None, ss_id=None, params=None, mincore=None, mincore_size=None, load_mincore=None, use_mem_file=None, overlay_regions=None, use_ws_file=None, vmm_load_ws=None, enable_reap=None, ws_file_direct_io=None, ws_single_read=None, namespace=None, result_mode=None, _configuration=None):  # noqa: E501
         """Invocation - a model defined in Swagger"""  # noqa: E501
         if _configuration is None:
-            _configuration = Configuration()
+            _configuration = Configuration.get_default()
         self._configuration = _configuration
 
         self._func_name = None
@@ -89,6 +91,7 @@ class Invocation(object):
         self._ws_file_direct_io = None
         self._ws_single_read = None
         self._namespace = None
+        self._result_mode = None
         self.discriminator = None
 
         self.func_name = func_name
@@ -120,6 +123,8 @@ class Invocation(object):
             self.ws_single_read = ws_single_read
         if namespace is not None:
             self.namespace = namespace
+        if result_mode is not None:
+            self.result_mode = result_mode
 
     @property
     def func_name(self):
@@ -438,6 +443,36 @@ class Invocation(object):
 
         self._namespace = namespace
 
+    @property
+    def result_mode(self):
+        """Gets the result_mode of this Invocation.  # noqa: E501
+
+        How the function's body is returned. string (the default) returns it in result. json returns a JSON body as is in output, without encoding it into a string, and falls back to result otherwise. raw streams the body as the response, with its content type, and the VM and trace ids in the X-Faasnap-Vm-Id and X-Faasnap-Trace-Id headers; not supported in batches.  # noqa: E501
+
+        :return: The result_mode of this Invocation.  # noqa: E501
+        :rtype: str
+        """
+        return self._result_mode
+
+    @result_mode.setter
+    def result_mode(self, result_mode):
+        """Sets the result_mode of this Invocation.
+
+        How the function's body is returned. string (the default) returns it in result. json returns a JSON body as is in output, without encoding it into a string, and falls back to result otherwise. raw streams the body as the response, with its content type, and the VM and trace ids in the X-Faasnap-Vm-Id and X-Faasnap-Trace-Id headers; not supported in batches.  # noqa: E501
+
+        :param result_mode: The result_mode of this Invocation.  # noqa: E501
+        :type: str
+        """
+        allowed_values = ["string", "json", "raw"]  # noqa: E501
+        if (self._configuration.client_side_validation and
+                result_mode not in allowed_values):
+            raise ValueError(
+                "Invalid value for `result_mode` ({0}), must be one of {1}"  # noqa: E501
+                .format(result_mode, allowed_values)
+            )
+
+        self._result_mode = result_mode
+
     def to_dict(self):
         """Returns the model properties as a dict"""
         result = {}
@@ -45,7 +45,7 @@ class Layer(object):
     def __init__(self, position=None, from_diff=None, _configuration=None):  # noqa: E501
         """Layer - a model defined in Swagger"""  # noqa: E501
         if _configuration is None:
-            _configuration = Configuration()
+            _configuration = Configuration.get_default()
         self._configuration = _configuration
 
         self._position = None
@@ -0,0 +1,152 @@
+# coding: utf-8
+
+"""
+    faasnap
+
+    FaaSnap API  # noqa: E501
+
+    OpenAPI spec version: 1.0.0
+    
+    Generated by: https://github.com/swagger-api/swagger-codegen.git
+"""
+
+
+import pprint
+import re  # noqa: F401
+
+import six
+
+from swagger_client.configuration import Configuration
+
+
+class PoolConfig(object):
+    """NOTE: This class is auto generated by the swagger code generator program.
+
+    Do not edit the class manually.
+    """
+
+    """
+    Attributes:
+      swagger_types (dict): The key is attribute name
+                            and the value is attribute type.
+      attribute_map (dict): The key is attribute name
+                            and the value is json key in definition.
+    """
+    swagger_types = {
+        'namespaces': 'list[str]',
+        'invocation': 'Invocation'
+    }
+
+    attribute_map = {
+        'namespaces': 'namespaces',
+        'invocation': 'invocation'
+    }
+
+    def __init__(self, namespaces=None, invocation=None, _configuration=None):  # noqa: E501
+        """PoolConfig - a model defined in Swagger"""  # noqa: E501
+        if _configuration is None:
+            _configuration = Configuration.get_default()
+        self._configuration = _configuration
+
+        self._namespaces = None
+        self._invocation = None
+        self.discriminator = None
+
+        self.namespaces = namespaces
+        if invocation is not None:
+            self.invocation = invocation
+
+    @property
+    def namespaces(self):
+        """Gets the namespaces of this PoolConfig.  # noqa: E501
+
+        network namespaces of the pooled VMs, one VM each; not to be used by other VMs  # noqa: E501
+
+        :return: The namespaces of this PoolConfig.  # noqa: E501
+        :rtype: list[str]
+        """
+        return self._namespaces
+
+    @namespaces.setter
+    def namespaces(self, namespaces):
+        """Sets the namespaces of this PoolConfig.
+
+        network namespaces of the pooled VMs, one VM each; not to be used by other VMs  # noqa: E501
+
+        :param namespaces: The namespaces of this PoolConfig.  # noqa: E501
+        :type: list[str]
+        """
+        if self._configuration.client_side_validation and namespaces is None:
+            raise ValueError("Invalid value for `namespaces`, must not be `None`")  # noqa: E501
+
+        self._namespaces = namespaces
+
+    @property
+    def invocation(self):
+        """Gets the invocation of this PoolConfig.  # noqa: E501
+
+
+        :return: The invocation of this PoolConfig.  # noqa: E501
+        :rtype: Invocation
+        """
+        return self._invocation
+
+    @invocation.setter
+    def invocation(self, invocation):
+        """Sets the invocation of this PoolConfig.
+
+
+        :param invocation: The invocation of this PoolConfig.  # noqa: E501
+        :type: Invocation
+        """
+
+        self._invocation = invocation
+
+    def to_dict(self):
+        """Returns the model properties as a dict"""
+        result = {}
+
+        for attr, _ in six.iteritems(self.swagger_types):
+            value = getattr(self, attr)
+            if isinstance(value, list):
+                result[attr] = list(map(
+                    lambda x: x.to_dict() if hasattr(x, "to_dict") else x,
+                    value
+                ))
+            elif hasattr(value, "to_dict"):
+                result[attr] = value.to_dict()
+            elif isinstance(value, dict):
+                result[attr] = dict(map(
+                    lambda item: (item[0], item[1].to_dict())
+                    if hasattr(item[1], "to_dict") else item,
+                    value.items()
+                ))
+            else:
+                result[attr] = value
+        if issubclass(PoolConfig, dict):
+            for key, value in self.items():
+                result[key] = value
+
+        return result
+
+    def to_str(self):
+        """Returns the string representation of the model"""
+        return pprint.pformat(self.to_dict())
+
+    def __repr__(self):
+        """For `print` and `pprint`"""
+        return self.to_str()
+
+    def __eq__(self, other):
+        """Returns true if both objects are equal"""
+        if not isinstance(other, PoolConfig):
+            return False
+
+        return self.to_dict() == other.to_dict()
+
+    def __ne__(self, other):
+        """Returns true if both objects are not equal"""
+        if not isinstance(other, PoolConfig):
+            return True
+
+        return self.to_dict() != other.to_dict()
@@ -0,0 +1,367 @@
+# coding: utf-8
+
+"""
+    faasnap
+
+    FaaSnap API  # noqa: E501
+
+    OpenAPI spec version: 1.0.0
+    
+    Generated by: https://github.com/swagger-api/swagger-codegen.git
+"""
+
+
+import pprint
+import re  # noqa: F401
+
+import six
+
+from swagger_client.configuration import Configuration
+
+
+class PoolStatus(object):
+    """NOTE: This class is auto generated by the swagger code generator program.
+
+    Do not edit the class manually.
+    """
+
+    """
+    Attributes:
+      swagger_types (dict): The key is attribute name
+                            and the value is attribute type.
+      attribute_map (dict): The key is attribute name
+                            and the value is json key in definition.
+    """
+    swagger_types = {
+        'ss_id': 'str',
+        'size': 'int',
+        'idle': 'int',
+        'restoring': 'int',
+        'hits': 'int',
+        'misses': 'int',
+        'refills': 'int',
+        'refill_ms': 'float',
+        'last_refill_ms': 'float',
+        'memory_mb': 'int'
+    }
+
+    attribute_map = {
+        'ss_id': 'ssId',
+        'size': 'size',
+        'idle': 'idle',
+        'restoring': 'restoring',
+        'hits': 'hits',
+        'misses': 'misses',
+        'refills': 'refills',
+        'refill_ms': 'refill_ms',
+        'last_refill_ms': 'last_refill_ms',
+        'memory_mb': 'memory_mb'
+    }
+
+    def __init__(self, ss_id=None, size=None, idle=None, restoring=None, hits=None, misses=None, refills=None, refill_ms=None, last_refill_ms=None, memory_mb=None, _configuration=None):  # noqa: E501
+        """PoolStatus - a model defined in Swagger"""  # noqa: E501
+        if _configuration is None:
+            _configuration = Configuration.get_default()
+        self._configuration = _configuration
+
+        self._ss_id = None
+        self._size = None
+        self._idle = None
+        self._restoring = None
+        self._hits = None
+        self._misses = None
+        self._refills = None
+        self._refill_ms = None
+        self._last_refill_ms = None
+        self._memory_mb = None
+        self.discriminator = None
+
+        if ss_id is not None:
+            self.ss_id = ss_id
+        if size is not None:
+            self.size = size
+        if idle is not None:
+            self.idle = idle
+        if restoring is not None:
+            self.restoring = restoring
+        if hits is not None:
+            self.hits = hits
+        if misses is not None:
+            self.misses = misses
+        if refills is not None:
+            self.refills = refills
+        if refill_ms is not None:
+            self.refill_ms = refill_ms
+        if last_refill_ms is not None:
+            self.last_refill_ms = last_refill_ms
+        if memory_mb is not None:
+            self.memory_mb = memory_mb
+
+    @property
+    def ss_id(self):
+        """Gets the ss_id of this PoolStatus.  # noqa: E501
+
+
+        :return: The ss_id of this PoolStatus.  # noqa: E501
+        :rtype: str
+        """
+        return self._ss_id
+
+    @ss_id.setter
+    def ss_id(self, ss_id):
+        """Sets the ss_id of this PoolStatus.
+
+
+        :param ss_id: The ss_id of this PoolStatus.  # noqa: E501
+        :type: str
+        """
+
+        self._ss_id = ss_id
+
+    @property
+    def size(self):
+        """Gets the size of this PoolStatus.  # noqa: E501
+
+
+        :return: The size of this PoolStatus.  # noqa: E501
+        :rtype: int
+        """
+        return self._size
+
+    @size.setter
+    def size(self, size):
+        """Sets the size of this PoolStatus.
+
+
+        :param size: The size of this PoolStatus.  # noqa: E501
+        :type: int
+        """
+
+        self._size = size
+
+    @property
+    def idle(self):
+        """Gets the idle of this PoolStatus.  # noqa: E501
+
+        VMs restored and paused, ready to be claimed  # noqa: E501
+
+        :return: The idle of this PoolStatus.  # noqa: E501
+        :rtype: int
+        """
+        return self._idle
+
+    @idle.setter
+    def idle(self, idle):
+        """Sets the idle of this PoolStatus.
+
+        VMs restored and paused, ready to be claimed  # noqa: E501
+
+        :param idle: The idle of this PoolStatus.  # noqa: E501
+        :type: int
+        """
+
+        self._idle = idle
+
+    @property
+    def restoring(self):
+        """Gets the restoring of this PoolStatus.  # noqa: E501
+
+
+        :return: The restoring of this PoolStatus.  # noqa: E501
+        :rtype: int
+        """
+        return self._restoring
+
+    @restoring.setter
+    def restoring(self, restoring):
+        """Sets the restoring of this PoolStatus.
+
+
+        :param restoring: The restoring of this PoolStatus.  # noqa: E501
+        :type: int
+        """
+
+        self._restoring = restoring
+
+    @property
+    def hits(self):
+        """Gets the hits of this PoolStatus.  # noqa: E501
+
+        invocations that claimed a pooled VM  # noqa: E501
+
+        :return: The hits of this PoolStatus.  # noqa: E501
+        :rtype: int
+        """
+        return self._hits
+
+    @hits.setter
+    def hits(self, hits):
+        """Sets the hits of this PoolStatus.
+
+        invocations that claimed a pooled VM  # noqa: E501
+
+        :param hits: The hits of this PoolStatus.  # noqa: E501
+        :type: int
+        """
+
+        self._hits = hits
+
+    @property
+    def misses(self):
+        """Gets the misses of this PoolStatus.  # noqa: E501
+
+        invocations that found the pool empty and restored a VM  # noqa: E501
+
+        :return: The misses of this PoolStatus.  # noqa: E501
+        :rtype: int
+        """
+        return self._misses
+
+    @misses.setter
+    def misses(self, misses):
+        """Sets the misses of this PoolStatus.
+
+        invocations that found the pool empty and restored a VM  # noqa: E501
+
+        :param misses: The misses of this PoolStatus.  # noqa: E501
+        :type: int
+        """
+
+        self._misses = misses
+
+    @property
+    def refills(self):
+        """Gets the refills of this PoolStatus.  # noqa: E501
+
+
+        :return: The refills of this PoolStatus.  # noqa: E501
+        :rtype: int
+        """
+        return self._refills
+
+    @refills.setter
+    def refills(self, refills):
+        """Sets the refills of this PoolStatus.
+
+
+        :param refills: The refills of this PoolStatus.  # noqa: E501
+        :type: int
+        """
+
+        self._refills = refills
+
+    @property
+    def refill_ms(self):
+        """Gets the refill_ms of this PoolStatus.  # noqa: E501
+
+        mean time to restore a pooled VM, prefetch included  # noqa: E501
+
+        :return: The refill_ms of this PoolStatus.  # noqa: E501
+        :rtype: float
+        """
+        return self._refill_ms
+
+    @refill_ms.setter
+    def refill_ms(self, refill_ms):
+        """Sets the refill_ms of this PoolStatus.
+
+        mean time to restore a pooled VM, prefetch included  # noqa: E501
+
+        :param refill_ms: The refill_ms of this PoolStatus.  # noqa: E501
+        :type: float
+        """
+
+        self._refill_ms = refill_ms
+
+    @property
+    def last_refill_ms(self):
+        """Gets the last_refill_ms of this PoolStatus.  # noqa: E501
+
+
+        :return: The last_refill_ms of this PoolStatus.  # noqa: E501
+        :rtype: float
+        """
+        return self._last_refill_ms
+
+    @last_refill_ms.setter
+    def last_refill_ms(self, last_refill_ms):
+        """Sets the last_refill_ms of this PoolStatus.
+
+
+        :param last_refill_ms: The last_refill_ms of this PoolStatus.  # noqa: E501
+        :type: float
+        """
+
+        self._last_refill_ms = last_refill_ms
+
+    @property
+    def memory_mb(self):
+        """Gets the memory_mb of this PoolStatus.  # noqa: E501
+
+        guest memory of the idle and restoring VMs, counted against pool_memory_mb  # noqa: E501
+
+        :return: The memory_mb of this PoolStatus.  # noqa: E501
+        :rtype: int
+        """
+        return self._memory_mb
+
+    @memory_mb.setter
+    def memory_mb(self, memory_mb):
+        """Sets the memory_mb of this PoolStatus.
+
+        guest memory of the idle and restoring VMs, counted against pool_memory_mb  # noqa: E501
+
+        :param memory_mb: The memory_mb of this PoolStatus.  # noqa: E501
+        :type: int
+        """
+
+        self._memory_mb = memory_mb
+
+    def to_dict(self):
+        """Returns the model properties as a dict"""
+        result = {}
+
+        for attr, _ in six.iteritems(self.swagger_types):
+            value = getattr(self, attr)
+            if isinstance(value, list):
+                result[attr] = list(map(
+                    lambda x: x.to_dict() if hasattr(x, "to_dict") else x,
+                    value
+                ))
+            elif hasattr(value, "to_dict"):
+                result[attr] = value.to_dict()
+            elif isinstance(value, dict):
+                result[attr] = dict(map(
+                    lambda item: (item[0], item[1].to_dict())
+                    if hasattr(item[1], "to_dict") else item,
+                    value.items()
+                ))
+            else:
+                result[attr] = value
+        if issubclass(PoolStatus, dict):
+            for key, value in self.items():
+                result[key] = value
+
+        return result
+
+    def to_str(self):
+        """Returns the string representation of the model"""
+        return pprint.pformat(self.to_dict())
+
+    def __repr__(self):
+        """For `print` and `pprint`"""
+        return self.to_str()
+
+    def __eq__(self, other):
+        """Returns true if both objects are equal"""
+        if not isinstance(other, PoolStatus):
+            return False
+
+        return self.to_dict() == other.to_dict()
+
+    def __ne__(self, other):
+        """Returns true if both objects are not equal"""
+        if not isinstance(other, PoolStatus):
+            return True
+
+        return self.to_dict() != other.to_dict()
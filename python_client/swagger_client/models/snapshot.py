@@ -41,7 +41,8 @@ class Snapshot(object):
         'version': 'str',
         'record_regions': 'bool',
         'size_threshold': 'int',
-        'interval_threshold': 'int'
+        'interval_threshold': 'int',
+        'compress_ws': 'bool'
     }
 
     attribute_map = {
@@ -53,13 +54,14 @@ class Snapshot(object):
         'version': 'version',
         'record_regions': 'record_regions',
         'size_threshold': 'size_threshold',
-        'interval_threshold': 'interval_threshold'
+        'interval_threshold': 'interval_threshold',
+        'compress_ws': 'compress_ws'
     }
 
-    def __init__(self, vm_id=None, ss_id=None, snapshot_type=None, snapshot_path=None, mem_file_path=None, version=None, record_regions=None, size_threshold=None, interval_threshold=None, _configuration=None):  # noqa: E501
+    def __init__(self, vm_id=None, ss_id=None, snapshot_type=None, snapshot_path=None, mem_file_path=None, version=None, record_regions=None, size_threshold=None, interval_threshold=None, compress_ws=None, _configuration=None):  # noqa: E501
         """Snapshot - a model defined in Swagger"""  # noqa: E501
         if _configuration is None:
-            _configuration = Configuration()
+            _configuration = Configuration.get_default()
         self._configuration = _configuration
 
         self._vm_id = None
@@ -71,6 +73,7 @@ class Snapshot(object):
         self._record_regions = None
         self._size_threshold = None
         self._interval_threshold = None
+        self._compress_ws = None
         self.discriminator = None
 
         self.vm_id = vm_id
@@ -90,6 +93,8 @@ class Snapshot(object):
             self.size_threshold = size_threshold
         if interval_threshold is not None:
             self.interval_threshold = interval_threshold
+        if compress_ws is not None:
+            self.compress_ws = compress_ws
 
     @property
     def vm_id(self):
@@ -282,6 +287,27 @@ class Snapshot(object):
 
         self._interval_threshold = interval_threshold
 
+    @property
+    def compress_ws(self):
+        """Gets the compress_ws of this Snapshot.  # noqa: E501
+
+
+        :return: The compress_ws of this Snapshot.  # noqa: E501
+        :rtype: bool
+        """
+        return self._compress_ws
+
+    @compress_ws.setter
+    def compress_ws(self, compress_ws):
+        """Sets the compress_ws of this Snapshot.
+
+
+        :param compress_ws: The compress_ws of this Snapshot.  # noqa: E501
+        :type: bool
+        """
+
+        self._compress_ws = compress_ws
+
     def to_dict(self):
         """Returns the model properties as a dict"""
         result = {}
@@ -0,0 +1,409 @@
+# coding: utf-8
+
+"""
+    faasnap
+
+    FaaSnap API  # noqa: E501
+
+    OpenAPI spec version: 1.0.0
+    
+    Generated by: https://github.com/swagger-api/swagger-codegen.git
+"""
+
+
+import pprint
+import re  # noqa: F401
+
+import six
+
+from swagger_client.configuration import Configuration
+
+
+class SnapshotInfo(object):
+    """NOTE: This class is auto generated by the swagger code generator program.
+
+    Do not edit the class manually.
+    """
+
+    """
+    Attributes:
+      swagger_types (dict): The key is attribute name
+                            and the value is attribute type.
+      attribute_map (dict): The key is attribute name
+                            and the value is json key in definition.
+    """
+    swagger_types = {
+        'ss_id': 'str',
+        'function': 'str',
+        'snapshot_type': 'str',
+        'snapshot_path': 'str',
+        'mem_file_path': 'str',
+        'version': 'str',
+        'size': 'int',
+        'ws_file': 'str',
+        'ws_compressed': 'bool',
+        'nlayers': 'int',
+        'records': 'int',
+        'copied_from': 'str'
+    }
+
+    attribute_map = {
+        'ss_id': 'ssId',
+        'function': 'function',
+        'snapshot_type': 'snapshot_type',
+        'snapshot_path': 'snapshot_path',
+        'mem_file_path': 'mem_file_path',
+        'version': 'version',
+        'size': 'size',
+        'ws_file': 'ws_file',
+        'ws_compressed': 'ws_compressed',
+        'nlayers': 'nlayers',
+        'records': 'records',
+        'copied_from': 'copied_from'
+    }
+
+    def __init__(self, ss_id=None, function=None, snapshot_type=None, snapshot_path=None, mem_file_path=None, version=None, size=None, ws_file=None, ws_compressed=None, nlayers=None, records=None, copied_from=None, _configuration=None):  # noqa: E501
+        """SnapshotInfo - a model defined in Swagger"""  # noqa: E501
+        if _configuration is None:
+            _configuration = Configuration.get_default()
+        self._configuration = _configuration
+
+        self._ss_id = None
+        self._function = None
+        self._snapshot_type = None
+        self._snapshot_path = None
+        self._mem_file_path = None
+        self._version = None
+        self._size = None
+        self._ws_file = None
+        self._ws_compressed = None
+        self._nlayers = None
+        self._records = None
+        self._copied_from = None
+        self.discriminator = None
+
+        if ss_id is not None:
+            self.ss_id = ss_id
+        if function is not None:
+            self.function = function
+        if snapshot_type is not None:
+            self.snapshot_type = snapshot_type
+        if snapshot_path is not None:
+            self.snapshot_path = snapshot_path
+        if mem_file_path is not None:
+            self.mem_file_path = mem_file_path
+        if version is not None:
+            self.version = version
+        if size is not None:
+            self.size = size
+        if ws_file is not None:
+            self.ws_file = ws_file
+        if ws_compressed is not None:
+            self.ws_compressed = ws_compressed
+        if nlayers is not None:
+            self.nlayers = nlayers
+        if records is not None:
+            self.records = records
+        if copied_from is not None:
+            self.copied_from = copied_from
+
+    @property
+    def ss_id(self):
+        """Gets the ss_id of this SnapshotInfo.  # noqa: E501
+
+
+        :return: The ss_id of this SnapshotInfo.  # noqa: E501
+        :rtype: str
+        """
+        return self._ss_id
+
+    @ss_id.setter
+    def ss_id(self, ss_id):
+        """Sets the ss_id of this SnapshotInfo.
+
+
+        :param ss_id: The ss_id of this SnapshotInfo.  # noqa: E501
+        :type: str
+        """
+
+        self._ss_id = ss_id
+
+    @property
+    def function(self):
+        """Gets the function of this SnapshotInfo.  # noqa: E501
+
+
+        :return: The function of this SnapshotInfo.  # noqa: E501
+        :rtype: str
+        """
+        return self._function
+
+    @function.setter
+    def function(self, function):
+        """Sets the function of this SnapshotInfo.
+
+
+        :param function: The function of this SnapshotInfo.  # noqa: E501
+        :type: str
+        """
+
+        self._function = function
+
+    @property
+    def snapshot_type(self):
+        """Gets the snapshot_type of this SnapshotInfo.  # noqa: E501
+
+
+        :return: The snapshot_type of this SnapshotInfo.  # noqa: E501
+        :rtype: str
+        """
+        return self._snapshot_type
+
+    @snapshot_type.setter
+    def snapshot_type(self, snapshot_type):
+        """Sets the snapshot_type of this SnapshotInfo.
+
+
+        :param snapshot_type: The snapshot_type of this SnapshotInfo.  # noqa: E501
+        :type: str
+        """
+
+        self._snapshot_type = snapshot_type
+
+    @property
+    def snapshot_path(self):
+        """Gets the snapshot_path of this SnapshotInfo.  # noqa: E501
+
+
+        :return: The snapshot_path of this SnapshotInfo.  # noqa: E501
+        :rtype: str
+        """
+        return self._snapshot_path
+
+    @snapshot_path.setter
+    def snapshot_path(self, snapshot_path):
+        """Sets the snapshot_path of this SnapshotInfo.
+
+
+        :param snapshot_path: The snapshot_path of this SnapshotInfo.  # noqa: E501
+        :type: str
+        """
+
+        self._snapshot_path = snapshot_path
+
+    @property
+    def mem_file_path(self):
+        """Gets the mem_file_path of this SnapshotInfo.  # noqa: E501
+
+
+        :return: The mem_file_path of this SnapshotInfo.  # noqa: E501
+        :rtype: str
+        """
+        return self._mem_file_path
+
+    @mem_file_path.setter
+    def mem_file_path(self, mem_file_path):
+        """Sets the mem_file_path of this SnapshotInfo.
+
+
+        :param mem_file_path: The mem_file_path of this SnapshotInfo.  # noqa: E501
+        :type: str
+        """
+
+        self._mem_file_path = mem_file_path
+
+    @property
+    def version(self):
+        """Gets the version of this SnapshotInfo.  # noqa: E501
+
+
+        :return: The version of this SnapshotInfo.  # noqa: E501
+        :rtype: str
+        """
+        return self._version
+
+    @version.setter
+    def version(self, version):
+        """Sets the version of this SnapshotInfo.
+
+
+        :param version: The version of this SnapshotInfo.  # noqa: E501
+        :type: str
+        """
+
+        self._version = version
+
+    @property
+    def size(self):
+        """Gets the size of this SnapshotInfo.  # noqa: E501
+
+
+        :return: The size of this SnapshotInfo.  # noqa: E501
+        :rtype: int
+        """
+        return self._size
+
+    @size.setter
+    def size(self, size):
+        """Sets the size of this SnapshotInfo.
+
+
+        :param size: The size of this SnapshotInfo.  # noqa: E501
+        :type: int
+        """
+
+        self._size = size
+
+    @property
+    def ws_file(self):
+        """Gets the ws_file of this SnapshotInfo.  # noqa: E501
+
+
+        :return: The ws_file of this SnapshotInfo.  # noqa: E501
+        :rtype: str
+        """
+        return self._ws_file
+
+    @ws_file.setter
+    def ws_file(self, ws_file):
+        """Sets the ws_file of this SnapshotInfo.
+
+
+        :param ws_file: The ws_file of this SnapshotInfo.  # noqa: E501
+        :type: str
+        """
+
+        self._ws_file = ws_file
+
+    @property
+    def ws_compressed(self):
+        """Gets the ws_compressed of this SnapshotInfo.  # noqa: E501
+
+
+        :return: The ws_compressed of this SnapshotInfo.  # noqa: E501
+        :rtype: bool
+        """
+        return self._ws_compressed
+
+    @ws_compressed.setter
+    def ws_compressed(self, ws_compressed):
+        """Sets the ws_compressed of this SnapshotInfo.
+
+
+        :param ws_compressed: The ws_compressed of this SnapshotInfo.  # noqa: E501
+        :type: bool
+        """
+
+        self._ws_compressed = ws_compressed
+
+    @property
+    def nlayers(self):
+        """Gets the nlayers of this SnapshotInfo.  # noqa: E501
+
+
+        :return: The nlayers of this SnapshotInfo.  # noqa: E501
+        :rtype: int
+        """
+        return self._nlayers
+
+    @nlayers.setter
+    def nlayers(self, nlayers):
+        """Sets the nlayers of this SnapshotInfo.
+
+
+        :param nlayers: The nlayers of this SnapshotInfo.  # noqa: E501
+        :type: int
+        """
+
+        self._nlayers = nlayers
+
+    @property
+    def records(self):
+        """Gets the records of this SnapshotInfo.  # noqa: E501
+
+
+        :return: The records of this SnapshotInfo.  # noqa: E501
+        :rtype: int
+        """
+        return self._records
+
+    @records.setter
+    def records(self, records):
+        """Sets the records of this SnapshotInfo.
+
+
+        :param records: The records of this SnapshotInfo.  # noqa: E501
+        :type: int
+        """
+
+        self._records = records
+
+    @property
+    def copied_from(self):
+        """Gets the copied_from of this SnapshotInfo.  # noqa: E501
+
+
+        :return: The copied_from of this SnapshotInfo.  # noqa: E501
+        :rtype: str
+        """
+        return self._copied_from
+
+    @copied_from.setter
+    def copied_from(self, copied_from):
+        """Sets the copied_from of this SnapshotInfo.
+
+
+        :param copied_from: The copied_from of this SnapshotInfo.  # noqa: E501
+        :type: str
+        """
+
+        self._copied_from = copied_from
+
+    def to_dict(self):
+        """Returns the model properties as a dict"""
+        result = {}
+
+        for attr, _ in six.iteritems(self.swagger_types):
+            value = getattr(self, attr)
+            if isinstance(value, list):
+                result[attr] = list(map(
+                    lambda x: x.to_dict() if hasattr(x, "to_dict") else x,
+                    value
+                ))
+            elif hasattr(value, "to_dict"):
+                result[attr] = value.to_dict()
+            elif isinstance(value, dict):
+                result[attr] = dict(map(
+                    lambda item: (item[0], item[1].to_dict())
+                    if hasattr(item[1], "to_dict") else item,
+                    value.items()
+                ))
+            else:
+                result[attr] = value
+        if issubclass(SnapshotInfo, dict):
+            for key, value in self.items():
+                result[key] = value
+
+        return result
+
+    def to_str(self):
+        """Returns the string representation of the model"""
+        return pprint.pformat(self.to_dict())
+
+    def __repr__(self):
+        """For `print` and `pprint`"""
+        return self.to_str()
+
+    def __eq__(self, other):
+        """Returns true if both objects are equal"""
+        if not isinstance(other, SnapshotInfo):
+            return False
+
+        return self.to_dict() == other.to_dict()
+
+    def __ne__(self, other):
+        """Returns true if both objects are not equal"""
+        if not isinstance(other, SnapshotInfo):
+            return True
+
+        return self.to_dict() != other.to_dict()
@@ -0,0 +1,513 @@
+# coding: utf-8
+
+"""
+    faasnap
+
+    FaaSnap API  # noqa: E501
+
+    OpenAPI spec version: 1.0.0
+    
+    Generated by: https://github.com/swagger-api/swagger-codegen.git
+"""
+
+
+import pprint
+import re  # noqa: F401
+
+import six
+
+from swagger_client.configuration import Configuration
+
+
+class SnapshotStatus(object):
+    """NOTE: This class is auto generated by the swagger code generator program.
+
+    Do not edit the class manually.
+    """
+
+    """
+    Attributes:
+      swagger_types (dict): The key is attribute name
+                            and the value is attribute type.
+      attribute_map (dict): The key is attribute name
+                            and the value is json key in definition.
+    """
+    swagger_types = {
+        'ss_id': 'str',
+        'mem_file_path': 'str',
+        'cached_pages': 'int',
+        'total_pages': 'int',
+        'ws_file': 'str',
+        'ws_cached_pages': 'int',
+        'ws_total_pages': 'int',
+        'copied_from': 'str',
+        'copy_method': 'str',
+        'allocated_bytes': 'int',
+        'shared_bytes': 'int',
+        'bytes_saved': 'int',
+        'dedup_ratio': 'float',
+        'ws_compressed': 'bool',
+        'ws_raw_bytes': 'int',
+        'ws_compress_ratio': 'float'
+    }
+
+    attribute_map = {
+        'ss_id': 'ssId',
+        'mem_file_path': 'memFilePath',
+        'cached_pages': 'cachedPages',
+        'total_pages': 'totalPages',
+        'ws_file': 'wsFile',
+        'ws_cached_pages': 'wsCachedPages',
+        'ws_total_pages': 'wsTotalPages',
+        'copied_from': 'copiedFrom',
+        'copy_method': 'copyMethod',
+        'allocated_bytes': 'allocatedBytes',
+        'shared_bytes': 'sharedBytes',
+        'bytes_saved': 'bytesSaved',
+        'dedup_ratio': 'dedupRatio',
+        'ws_compressed': 'wsCompressed',
+        'ws_raw_bytes': 'wsRawBytes',
+        'ws_compress_ratio': 'wsCompressRatio'
+    }
+
+    def __init__(self, ss_id=None, mem_file_path=None, cached_pages=None, total_pages=None, ws_file=None, ws_cached_pages=None, ws_total_pages=None, copied_from=None, copy_method=None, allocated_bytes=None, shared_bytes=None, bytes_saved=None, dedup_ratio=None, ws_compressed=None, ws_raw_bytes=None, ws_compress_ratio=None, _configuration=None):  # noqa: E501
+        """SnapshotStatus - a model defined in Swagger"""  # noqa: E501
+        if _configuration is None:
+            _configuration = Configuration.get_default()
+        self._configuration = _configuration
+
+        self._ss_id = None
+        self._mem_file_path = None
+        self._cached_pages = None
+        self._total_pages = None
+        self._ws_file = None
+        self._ws_cached_pages = None
+        self._ws_total_pages = None
+        self._copied_from = None
+        self._copy_method = None
+        self._allocated_bytes = None
+        self._shared_bytes = None
+        self._bytes_saved = None
+        self._dedup_ratio = None
+        self._ws_compressed = None
+        self._ws_raw_bytes = None
+        self._ws_compress_ratio = None
+        self.discriminator = None
+
+        if ss_id is not None:
+            self.ss_id = ss_id
+        if mem_file_path is not None:
+            self.mem_file_path = mem_file_path
+        if cached_pages is not None:
+            self.cached_pages = cached_pages
+        if total_pages is not None:
+            self.total_pages = total_pages
+        if ws_file is not None:
+            self.ws_file = ws_file
+        if ws_cached_pages is not None:
+            self.ws_cached_pages = ws_cached_pages
+        if ws_total_pages is not None:
+            self.ws_total_pages = ws_total_pages
+        if copied_from is not None:
+            self.copied_from = copied_from
+        if copy_method is not None:
+            self.copy_method = copy_method
+        if allocated_bytes is not None:
+            self.allocated_bytes = allocated_bytes
+        if shared_bytes is not None:
+            self.shared_bytes = shared_bytes
+        if bytes_saved is not None:
+            self.bytes_saved = bytes_saved
+        if dedup_ratio is not None:
+            self.dedup_ratio = dedup_ratio
+        if ws_compressed is not None:
+            self.ws_compressed = ws_compressed
+        if ws_raw_bytes is not None:
+            self.ws_raw_bytes = ws_raw_bytes
+        if ws_compress_ratio is not None:
+            self.ws_compress_ratio = ws_compress_ratio
+
+    @property
+    def ss_id(self):
+        """Gets the ss_id of this SnapshotStatus.  # noqa: E501
+
+
+        :return: The ss_id of this SnapshotStatus.  # noqa: E501
+        :rtype: str
+        """
+        return self._ss_id
+
+    @ss_id.setter
+    def ss_id(self, ss_id):
+        """Sets the ss_id of this SnapshotStatus.
+
+
+        :param ss_id: The ss_id of this SnapshotStatus.  # noqa: E501
+        :type: str
+        """
+
+        self._ss_id = ss_id
+
+    @property
+    def mem_file_path(self):
+        """Gets the mem_file_path of this SnapshotStatus.  # noqa: E501
+
+
+        :return: The mem_file_path of this SnapshotStatus.  # noqa: E501
+        :rtype: str
+        """
+        return self._mem_file_path
+
+    @mem_file_path.setter
+    def mem_file_path(self, mem_file_path):
+        """Sets the mem_file_path of this SnapshotStatus.
+
+
+        :param mem_file_path: The mem_file_path of this SnapshotStatus.  # noqa: E501
+        :type: str
+        """
+
+        self._mem_file_path = mem_file_path
+
+    @property
+    def cached_pages(self):
+        """Gets the cached_pages of this SnapshotStatus.  # noqa: E501
+
+
+        :return: The cached_pages of this SnapshotStatus.  # noqa: E501
+        :rtype: int
+        """
+        return self._cached_pages
+
+    @cached_pages.setter
+    def cached_pages(self, cached_pages):
+        """Sets the cached_pages of this SnapshotStatus.
+
+
+        :param cached_pages: The cached_pages of this SnapshotStatus.  # noqa: E501
+        :type: int
+        """
+
+        self._cached_pages = cached_pages
+
+    @property
+    def total_pages(self):
+        """Gets the total_pages of this SnapshotStatus.  # noqa: E501
+
+
+        :return: The total_pages of this SnapshotStatus.  # noqa: E501
+        :rtype: int
+        """
+        return self._total_pages
+
+    @total_pages.setter
+    def total_pages(self, total_pages):
+        """Sets the total_pages of this SnapshotStatus.
+
+
+        :param total_pages: The total_pages of this SnapshotStatus.  # noqa: E501
+        :type: int
+        """
+
+        self._total_pages = total_pages
+
+    @property
+    def ws_file(self):
+        """Gets the ws_file of this SnapshotStatus.  # noqa: E501
+
+
+        :return: The ws_file of this SnapshotStatus.  # noqa: E501
+        :rtype: str
+        """
+        return self._ws_file
+
+    @ws_file.setter
+    def ws_file(self, ws_file):
+        """Sets the ws_file of this SnapshotStatus.
+
+
+        :param ws_file: The ws_file of this SnapshotStatus.  # noqa: E501
+        :type: str
+        """
+
+        self._ws_file = ws_file
+
+    @property
+    def ws_cached_pages(self):
+        """Gets the ws_cached_pages of this SnapshotStatus.  # noqa: E501
+
+
+        :return: The ws_cached_pages of this SnapshotStatus.  # noqa: E501
+        :rtype: int
+        """
+        return self._ws_cached_pages
+
+    @ws_cached_pages.setter
+    def ws_cached_pages(self, ws_cached_pages):
+        """Sets the ws_cached_pages of this SnapshotStatus.
+
+
+        :param ws_cached_pages: The ws_cached_pages of this SnapshotStatus.  # noqa: E501
+        :type: int
+        """
+
+        self._ws_cached_pages = ws_cached_pages
+
+    @property
+    def ws_total_pages(self):
+        """Gets the ws_total_pages of this SnapshotStatus.  # noqa: E501
+
+
+        :return: The ws_total_pages of this SnapshotStatus.  # noqa: E501
+        :rtype: int
+        """
+        return self._ws_total_pages
+
+    @ws_total_pages.setter
+    def ws_total_pages(self, ws_total_pages):
+        """Sets the ws_total_pages of this SnapshotStatus.
+
+
+        :param ws_total_pages: The ws_total_pages of this SnapshotStatus.  # noqa: E501
+        :type: int
+        """
+
+        self._ws_total_pages = ws_total_pages
+
+    @property
+    def copied_from(self):
+        """Gets the copied_from of this SnapshotStatus.  # noqa: E501
+
+
+        :return: The copied_from of this SnapshotStatus.  # noqa: E501
+        :rtype: str
+        """
+        return self._copied_from
+
+    @copied_from.setter
+    def copied_from(self, copied_from):
+        """Sets the copied_from of this SnapshotStatus.
+
+
+        :param copied_from: The copied_from of this SnapshotStatus.  # noqa: E501
+        :type: str
+        """
+
+        self._copied_from = copied_from
+
+    @property
+    def copy_method(self):
+        """Gets the copy_method of this SnapshotStatus.  # noqa: E501
+
+
+        :return: The copy_method of this SnapshotStatus.  # noqa: E501
+        :rtype: str
+        """
+        return self._copy_method
+
+    @copy_method.setter
+    def copy_method(self, copy_method):
+        """Sets the copy_method of this SnapshotStatus.
+
+
+        :param copy_method: The copy_method of this SnapshotStatus.  # noqa: E501
+        :type: str
+        """
+
+        self._copy_method = copy_method
+
+    @property
+    def allocated_bytes(self):
+        """Gets the allocated_bytes of this SnapshotStatus.  # noqa: E501
+
+
+        :return: The allocated_bytes of this SnapshotStatus.  # noqa: E501
+        :rtype: int
+        """
+        return self._allocated_bytes
+
+    @allocated_bytes.setter
+    def allocated_bytes(self, allocated_bytes):
+        """Sets the allocated_bytes of this SnapshotStatus.
+
+
+        :param allocated_bytes: The allocated_bytes of this SnapshotStatus.  # noqa: E501
+        :type: int
+        """
+
+        self._allocated_bytes = allocated_bytes
+
+    @property
+    def shared_bytes(self):
+        """Gets the shared_bytes of this SnapshotStatus.  # noqa: E501
+
+
+        :return: The shared_bytes of this SnapshotStatus.  # noqa: E501
+        :rtype: int
+        """
+        return self._shared_bytes
+
+    @shared_bytes.setter
+    def shared_bytes(self, shared_bytes):
+        """Sets the shared_bytes of this SnapshotStatus.
+
+
+        :param shared_bytes: The shared_bytes of this SnapshotStatus.  # noqa: E501
+        :type: int
+        """
+
+        self._shared_bytes = shared_bytes
+
+    @property
+    def bytes_saved(self):
+        """Gets the bytes_saved of this SnapshotStatus.  # noqa: E501
+
+
+        :return: The bytes_saved of this SnapshotStatus.  # noqa: E501
+        :rtype: int
+        """
+        return self._bytes_saved
+
+    @bytes_saved.setter
+    def bytes_saved(self, bytes_saved):
+        """Sets the bytes_saved of this SnapshotStatus.
+
+
+        :param bytes_saved: The bytes_saved of this SnapshotStatus.  # noqa: E501
+        :type: int
+        """
+
+        self._bytes_saved = bytes_saved
+
+    @property
+    def dedup_ratio(self):
+        """Gets the dedup_ratio of this SnapshotStatus.  # noqa: E501
+
+
+        :return: The dedup_ratio of this SnapshotStatus.  # noqa: E501
+        :rtype: float
+        """
+        return self._dedup_ratio
+
+    @dedup_ratio.setter
+    def dedup_ratio(self, dedup_ratio):
+        """Sets the dedup_ratio of this SnapshotStatus.
+
+
+        :param dedup_ratio: The dedup_ratio of this SnapshotStatus.  # noqa: E501
+        :type: float
+        """
+
+        self._dedup_ratio = dedup_ratio
+
+    @property
+    def ws_compressed(self):
+        """Gets the ws_compressed of this SnapshotStatus.  # noqa: E501
+
+
+        :return: The ws_compressed of this SnapshotStatus.  # noqa: E501
+        :rtype: bool
+        """
+        return self._ws_compressed
+
+    @ws_compressed.setter
+    def ws_compressed(self, ws_compressed):
+        """Sets the ws_compressed of this SnapshotStatus.
+
+
+        :param ws_compressed: The ws_compressed of this SnapshotStatus.  # noqa: E501
+        :type: bool
+        """
+
+        self._ws_compressed = ws_compressed
+
+    @property
+    def ws_raw_bytes(self):
+        """Gets the ws_raw_bytes of this SnapshotStatus.  # noqa: E501
+
+
+        :return: The ws_raw_bytes of this SnapshotStatus.  # noqa: E501
+        :rtype: int
+        """
+        return self._ws_raw_bytes
+
+    @ws_raw_bytes.setter
+    def ws_raw_bytes(self, ws_raw_bytes):
+        """Sets the ws_raw_bytes of this SnapshotStatus.
+
+
+        :param ws_raw_bytes: The ws_raw_bytes of this SnapshotStatus.  # noqa: E501
+        :type: int
+        """
+
+        self._ws_raw_bytes = ws_raw_bytes
+
+    @property
+    def ws_compress_ratio(self):
+        """Gets the ws_compress_ratio of this SnapshotStatus.  # noqa: E501
+
+
+        :return: The ws_compress_ratio of this SnapshotStatus.  # noqa: E501
+        :rtype: float
+        """
+        return self._ws_compress_ratio
+
+    @ws_compress_ratio.setter
+    def ws_compress_ratio(self, ws_compress_ratio):
+        """Sets the ws_compress_ratio of this SnapshotStatus.
+
+
+        :param ws_compress_ratio: The ws_compress_ratio of this SnapshotStatus.  # noqa: E501
+        :type: float
+        """
+
+        self._ws_compress_ratio = ws_compress_ratio
+
+    def to_dict(self):
+        """Returns the model properties as a dict"""
+        result = {}
+
+        for attr, _ in six.iteritems(self.swagger_types):
+            value = getattr(self, attr)
+            if isinstance(value, list):
+                result[attr] = list(map(
+                    lambda x: x.to_dict() if hasattr(x, "to_dict") else x,
+                    value
+                ))
+            elif hasattr(value, "to_dict"):
+                result[attr] = value.to_dict()
+            elif isinstance(value, dict):
+                result[attr] = dict(map(
+                    lambda item: (item[0], item[1].to_dict())
+                    if hasattr(item[1], "to_dict") else item,
+                    value.items()
+                ))
+            else:
+                result[attr] = value
+        if issubclass(SnapshotStatus, dict):
+            for key, value in self.items():
+                result[key] = value
+
+        return result
+
+    def to_str(self):
+        """Returns the string representation of the model"""
+        return pprint.pformat(self.to_dict())
+
+    def __repr__(self):
+        """For `print` and `pprint`"""
+        return self.to_str()
+
+    def __eq__(self, other):
+        """Returns true if both objects are equal"""
+        if not isinstance(other, SnapshotStatus):
+            return False
+
+        return self.to_dict() == other.to_dict()
+
+    def __ne__(self, other):
+        """Returns true if both objects are not equal"""
+        if not isinstance(other, SnapshotStatus):
+            return True
+
+        return self.to_dict() != other.to_dict()
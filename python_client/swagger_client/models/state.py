@@ -47,7 +47,7 @@ class State(object):
     def __init__(self, dig_hole=None, load_cache=None, drop_cache=None, _configuration=None):  # noqa: E501
         """State - a model defined in Swagger"""  # noqa: E501
         if _configuration is None:
-            _configuration = Configuration()
+            _configuration = Configuration.get_default()
         self._configuration = _configuration
 
         self._dig_hole = None
@@ -41,7 +41,9 @@ class State1(object):
         'size_threshold': 'int',
         'interval_threshold': 'int',
         'mincore_cache': 'list[int]',
-        'drop_ws_cache': 'bool'
+        'drop_ws_cache': 'bool',
+        'compress_ws': 'bool',
+        'reset_load': 'bool'
     }
 
     attribute_map = {
@@ -53,13 +55,15 @@ class State1(object):
         'size_threshold': 'size_threshold',
         'interval_threshold': 'interval_threshold',
         'mincore_cache': 'mincore_cache',
-        'drop_ws_cache': 'drop_ws_cache'
+        'drop_ws_cache': 'drop_ws_cache',
+        'compress_ws': 'compress_ws',
+        'reset_load': 'reset_load'
     }
 
-    def __init__(self, from_records_size=None, trim_regions=None, to_ws_file=None, inactive_ws=None, zero_ws=None, size_threshold=None, interval_threshold=None, mincore_cache=None, drop_ws_cache=None, _configuration=None):  # noqa: E501
+    def __init__(self, from_records_size=None, trim_regions=None, to_ws_file=None, inactive_ws=None, zero_ws=None, size_threshold=None, interval_threshold=None, mincore_cache=None, drop_ws_cache=None, compress_ws=None, reset_load=None, _configuration=None):  # noqa: E501
         """State1 - a model defined in Swagger"""  # noqa: E501
         if _configuration is None:
-            _configuration = Configuration()
+            _configuration = Configuration.get_default()
         self._configuration = _configuration
 
         self._from_records_size = None
@@ -71,6 +75,8 @@ class State1(object):
         self._interval_threshold = None
         self._mincore_cache = None
         self._drop_ws_cache = None
+        self._compress_ws = None
+        self._reset_load = None
         self.discriminator = None
 
         if from_records_size is not None:
@@ -91,6 +97,10 @@ class State1(object):
             self.mincore_cache = mincore_cache
         if drop_ws_cache is not None:
             self.drop_ws_cache = drop_ws_cache
+        if compress_ws is not None:
+            self.compress_ws = compress_ws
+        if reset_load is not None:
+            self.reset_load = reset_load
 
     @property
     def from_records_size(self):
@@ -281,6 +291,48 @@ class State1(object):
 
         self._drop_ws_cache = drop_ws_cache
 
+    @property
+    def compress_ws(self):
+        """Gets the compress_ws of this State1.  # noqa: E501
+
+
+        :return: The compress_ws of this State1.  # noqa: E501
+        :rtype: bool
+        """
+        return self._compress_ws
+
+    @compress_ws.setter
+    def compress_ws(self, compress_ws):
+        """Sets the compress_ws of this State1.
+
+
+        :param compress_ws: The compress_ws of this State1.  # noqa: E501
+        :type: bool
+        """
+
+        self._compress_ws = compress_ws
+
+    @property
+    def reset_load(self):
+        """Gets the reset_load of this State1.  # noqa: E501
+
+
+        :return: The reset_load of this State1.  # noqa: E501
+        :rtype: bool
+        """
+        return self._reset_load
+
+    @reset_load.setter
+    def reset_load(self, reset_load):
+        """Sets the reset_load of this State1.
+
+
+        :param reset_load: The reset_load of this State1.  # noqa: E501
+        :type: bool
+        """
+
+        self._reset_load = reset_load
+
     def to_dict(self):
         """Returns the model properties as a dict"""
         result = {}
@@ -49,7 +49,7 @@ class VM(object):
     def __init__(self, vm_id=None, state=None, vm_conf=None, vm_path=None, _configuration=None):  # noqa: E501
         """VM - a model defined in Swagger"""  # noqa: E501
         if _configuration is None:
-            _configuration = Configuration()
+            _configuration = Configuration.get_default()
         self._configuration = _configuration
 
         self._vm_id = None
@@ -47,7 +47,7 @@ class VM1(object):
     def __init__(self, func_name=None, ss_id=None, namespace=None, _configuration=None):  # noqa: E501
         """VM1 - a model defined in Swagger"""  # noqa: E501
         if _configuration is None:
-            _configuration = Configuration()
+            _configuration = Configuration.get_default()
         self._configuration = _configuration
 
         self._func_name = None
@@ -45,7 +45,7 @@ class VMM(object):
     def __init__(self, namespace=None, enable_reap=None, _configuration=None):  # noqa: E501
         """VMM - a model defined in Swagger"""  # noqa: E501
         if _configuration is None:
-            _configuration = Configuration()
+            _configuration = Configuration.get_default()
         self._configuration = _configuration
 
         self._namespace = None
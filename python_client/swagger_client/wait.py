@@ -0,0 +1,138 @@
+# coding: utf-8
+
+"""
+    faasnap
+
+    Readiness helpers built on top of DefaultApi.
+
+    Each helper polls the daemon until a condition holds, and raises
+    TimeoutError if it does not hold within `timeout` seconds. They replace
+    fixed sleeps between steps of a benchmark run.
+"""
+
+from __future__ import absolute_import
+
+import time
+
+from urllib3.exceptions import HTTPError
+
+from swagger_client.rest import ApiException
+
+
+def poll(check, timeout=30, interval=0.05, what='condition'):
+    """Calls `check` until it returns a value other than None.
+
+    :param check: callable taking no arguments.
+    :param timeout: seconds to wait before giving up.
+    :param interval: seconds between two calls of `check`.
+    :param what: description used in the timeout error.
+    :return: the first value returned by `check` that is not None.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        result = check()
+        if result is not None:
+            return result
+        if time.monotonic() >= deadline:
+            raise TimeoutError('timed out after %gs waiting for %s'
+                               % (timeout, what))
+        time.sleep(interval)
+
+
+def wait_for_daemon(api, timeout=30, interval=0.05):
+    """Waits until the daemon answers requests.
+
+    :param api: DefaultApi
+    :return: list[VM] currently known to the daemon.
+    """
+    def check():
+        try:
+            return api.vms_get(_request_timeout=max(interval, 1))
+        except (HTTPError, OSError):
+            return None
+    return poll(check, timeout, interval, 'daemon at %s'
+                % api.api_client.configuration.host)
+
+
+def wait_for_vm_state(api, vm_id, states=('running',), timeout=30,
+                      interval=0.05):
+    """Waits until a VM reaches one of `states`.
+
+    A VM that exits while waiting raises ApiException.
+
+    :param api: DefaultApi
+    :param vm_id: id of the VM.
+    :param states: acceptable states, e.g. ('running',).
+    :return: VM
+    """
+    if isinstance(states, str):
+        states = (states,)
+
+    def check():
+        vm = api.vms_vm_id_get(vm_id)
+        return vm if vm.state in states else None
+    return poll(check, timeout, interval, 'VM %s to be %s'
+                % (vm_id, '/'.join(states)))
+
+
+def wait_for_vm_stopped(api, vm_id, timeout=30, interval=0.05):
+    """Waits until a VM has exited and is no longer known to the daemon.
+
+    :param api: DefaultApi
+    :param vm_id: id of the VM.
+    """
+    def check():
+        try:
+            api.vms_vm_id_get(vm_id)
+        except ApiException as e:
+            if e.status == 400:
+                return True
+            raise
+        return None
+    poll(check, timeout, interval, 'VM %s to stop' % vm_id)
+
+
+def wait_for_vms_stopped(api, timeout=30, interval=0.05):
+    """Waits until no VM is left, e.g. after `vms_delete`.
+
+    :param api: DefaultApi
+    """
+    poll(lambda: True if not api.vms_get() else None, timeout, interval,
+         'all VMs to stop')
+
+
+def wait_for_snapshot_cache_dropped(api, ss_id, max_cached_pages=0,
+                                    mem_file=True, ws_file=False, timeout=30,
+                                    interval=0.05):
+    """Waits until a snapshot's files are out of the page cache.
+
+    :param api: DefaultApi
+    :param ss_id: id of the snapshot.
+    :param max_cached_pages: pages allowed to remain cached, per file.
+    :param mem_file: wait for the memory file.
+    :param ws_file: wait for the working set file.
+    :return: SnapshotStatus
+    """
+    def check():
+        status = api.snapshots_ss_id_get(ss_id)
+        if mem_file and (status.cached_pages or 0) > max_cached_pages:
+            return None
+        if ws_file and (status.ws_cached_pages or 0) > max_cached_pages:
+            return None
+        return status
+    return poll(check, timeout, interval, 'snapshot %s cache to drop'
+                % ss_id)
+
+
+def wait_for_pool_ready(api, ss_id, timeout=60, interval=0.1):
+    """Waits until every VM of a snapshot's pool is restored and idle.
+
+    :param api: DefaultApi
+    :param ss_id: id of the snapshot.
+    :return: PoolStatus
+    """
+    def check():
+        status = api.snapshots_ss_id_pool_get(ss_id)
+        return status if status.idle == status.size else None
+    return poll(check, timeout, interval, 'pool of snapshot %s to fill'
+                % ss_id)
@@ -0,0 +1,213 @@
+# coding: utf-8
+
+"""
+    faasnap
+
+    FaaSnap API  # noqa: E501
+
+    OpenAPI spec version: 1.0.0
+
+    Generated by: https://github.com/swagger-api/swagger-codegen.git
+"""
+
+
+from __future__ import absolute_import
+
+import datetime
+import json
+import threading
+import unittest
+from six.moves import BaseHTTPServer
+from six.moves import socketserver
+
+import swagger_client
+from swagger_client.api_client import ApiClient
+from swagger_client.configuration import Configuration
+
+
+class FakeResponse(object):
+
+    def __init__(self, data):
+        self.data = json.dumps(data)
+
+
+class BatchHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # set by the test to block the second element until the first is read
+    release = None
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        self.write_chunk('[\n')
+        sep = ''
+        for i, invoc in enumerate(body):
+            if i == 1:
+                self.release.wait(5)
+            item = json.dumps({'index': i, 'result': invoc['func_name'],
+                               'traceId': 't%d' % i, 'duration': 1})
+            self.write_chunk(sep + item + '\n')
+            sep = ','
+        self.write_chunk(']\n')
+        self.wfile.write(b'0\r\n\r\n')
+
+    def write_chunk(self, data):
+        data = data.encode()
+        self.wfile.write(b'%x\r\n%s\r\n' % (len(data), data))
+        self.wfile.flush()
+
+    def log_message(self, *args):
+        pass
+
+
+class BatchServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+
+class TestApiClient(unittest.TestCase):
+    """ApiClient deserialization unit tests"""
+
+    def setUp(self):
+        self.client = ApiClient()
+
+    def tearDown(self):
+        pass
+
+    def deserialize(self, data, response_type):
+        return self.client.deserialize(FakeResponse(data), response_type)
+
+    def test_deserialize_model_list(self):
+        vms = self.deserialize([{'vmId': 'vm-%d' % i, 'state': 'running',
+                                 'vmConf': {'vcpu': 2}}
+                                for i in range(3)] + [None], 'list[VM]')
+        self.assertEqual(len(vms), 4)
+        self.assertIsInstance(vms[0], swagger_client.VM)
+        self.assertEqual(vms[1].vm_id, 'vm-1')
+        self.assertEqual(vms[2].vm_conf, {'vcpu': 2})
+        self.assertIsNone(vms[0].vm_path)
+        self.assertIsNone(vms[3])
+
+    def test_deserialize_nested(self):
+        data = {'a': [{'duration': 1, 'result': 'ok', 'vmId': 'x'}]}
+        result = self.deserialize(data, 'dict(str, list[InlineResponse2001])')
+        resp = result['a'][0]
+        self.assertIsInstance(resp, swagger_client.InlineResponse2001)
+        self.assertEqual(resp.duration, 1.0)
+        self.assertIsInstance(resp.duration, float)
+        self.assertEqual(resp.vm_id, 'x')
+
+    def test_deserialize_primitives(self):
+        self.assertEqual(self.deserialize(['1', 2], 'list[int]'), [1, 2])
+        self.assertEqual(self.deserialize('2022-01-02', 'date'),
+                         datetime.date(2022, 1, 2))
+        self.assertEqual(self.deserialize({'a': 1}, 'object'), {'a': 1})
+        self.assertIsNone(self.deserialize(None, 'VM'))
+
+    def test_deserializer_cache(self):
+        self.deserialize([{'vmId': 'a'}], 'list[VM]')
+        cache = ApiClient._deserializers
+        self.assertIn('list[VM]', cache)
+        self.assertIn(swagger_client.VM, cache)
+        # shared across clients
+        compiled = cache['list[VM]']
+        ApiClient().deserialize(FakeResponse([]), 'list[VM]')
+        self.assertIs(ApiClient._deserializers['list[VM]'], compiled)
+
+    def test_self_referencing_model_published_complete(self):
+        seen = []
+
+        class Fields(dict):
+            # records whether the model was published while its fields
+            # are being compiled
+            def items(self):
+                seen.append(Node in ApiClient._deserializers)
+                return dict.items(self)
+
+        class Node(object):
+            swagger_types = Fields(name='str', children='list[Node]')
+            attribute_map = {'name': 'name', 'children': 'children'}
+
+            def __init__(self, name=None, children=None):
+                self.name = name
+                self.children = children
+
+        swagger_client.models.Node = Node
+        try:
+            node = self.deserialize(
+                {'name': 'a', 'children': [{'name': 'b'}]}, 'Node')
+        finally:
+            del swagger_client.models.Node
+            for key in (Node, 'Node', 'list[Node]'):
+                ApiClient._deserializers.pop(key, None)
+        self.assertEqual(seen, [False])
+        self.assertEqual(node.name, 'a')
+        self.assertEqual(node.children[0].name, 'b')
+        self.assertIsNone(node.children[0].children)
+
+    def test_unknown_type(self):
+        with self.assertRaises(AttributeError):
+            self.deserialize({}, 'NoSuchModel')
+        self.assertNotIn('NoSuchModel', ApiClient._deserializers)
+
+    def test_models_share_default_configuration(self):
+        a = swagger_client.VM(vm_id='a')
+        b = swagger_client.Invocation(func_name='f')
+        self.assertIs(a._configuration, b._configuration)
+        self.assertIs(a._configuration, Configuration.get_default())
+
+    def test_models_use_set_default(self):
+        configuration = Configuration()
+        configuration.client_side_validation = False
+        Configuration.set_default(configuration)
+        try:
+            self.assertIs(Configuration.get_default(), configuration)
+            # func_name is required, but validation is off
+            swagger_client.Invocation()
+        finally:
+            Configuration.set_default(None)
+
+    def test_parse_stream_line(self):
+        self.assertIsNone(ApiClient.parse_stream_line(b'['))
+        self.assertIsNone(ApiClient.parse_stream_line(b']'))
+        self.assertIsNone(ApiClient.parse_stream_line(b''))
+        self.assertEqual(ApiClient.parse_stream_line(b'[{"a": 1}'), {'a': 1})
+        self.assertEqual(ApiClient.parse_stream_line(',{"a": [2]}'),
+                         {'a': [2]})
+        self.assertEqual(ApiClient.parse_stream_line(b'[{"a": 1}]'), {'a': 1})
+
+    def test_invocations_batch_post_stream(self):
+        BatchHandler.release = threading.Event()
+        server = BatchServer(('127.0.0.1', 0), BatchHandler)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        try:
+            configuration = Configuration()
+            configuration.host = 'http://127.0.0.1:%d' % server.server_port
+            api = swagger_client.DefaultApi(ApiClient(configuration))
+            invocs = [swagger_client.Invocation(func_name='f%d' % i)
+                      for i in range(3)]
+            results = api.invocations_batch_post(invocations=invocs,
+                                                 _stream=True)
+            first = next(results)
+            # the server holds back the rest until the first was consumed
+            BatchHandler.release.set()
+            rest = list(results)
+            self.assertIsInstance(first, swagger_client.BatchInvocationResult)
+            self.assertEqual(first.result, 'f0')
+            self.assertEqual([r.index for r in rest], [1, 2])
+            self.assertEqual(rest[-1].trace_id, 't2')
+
+            BatchHandler.release.set()
+            results = api.invocations_batch_post(invocations=invocs)
+            self.assertEqual([r.result for r in results], ['f0', 'f1', 'f2'])
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,269 @@
+# coding: utf-8
+
+"""
+    faasnap
+
+    FaaSnap API  # noqa: E501
+
+    OpenAPI spec version: 1.0.0
+
+    Generated by: https://github.com/swagger-api/swagger-codegen.git
+"""
+
+
+from __future__ import absolute_import
+
+import asyncio
+import json
+import unittest
+
+try:
+    from aiohttp import web
+except ImportError:
+    web = None
+
+import swagger_client
+from swagger_client.rest import ApiException
+
+if web is not None:
+    from swagger_client.api.async_default_api import AsyncDefaultApi  # noqa: E501
+    from swagger_client.async_api_client import AsyncApiClient
+
+
+@unittest.skipIf(web is None, "aiohttp is not installed")
+class TestAsyncDefaultApi(unittest.IsolatedAsyncioTestCase):
+    """AsyncDefaultApi unit tests against a local aiohttp server"""
+
+    async def asyncSetUp(self):
+        self.requests = []
+        app = web.Application()
+        app.router.add_post('/invocations', self.invocations)
+        app.router.add_post('/invocations/batch', self.invocations_batch)
+        app.router.add_get('/vms', self.vms)
+        app.router.add_get('/vms/{vmId}', self.vm)
+        app.router.add_get('/snapshots', self.snapshots)
+        app.router.add_put('/snapshots/{ssId}/pool', self.pool_put)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+
+        configuration = swagger_client.Configuration()
+        configuration.host = 'http://127.0.0.1:%d' % port
+        configuration.connection_pool_maxsize = 2
+        self.client = AsyncApiClient(configuration)
+        self.api = AsyncDefaultApi(self.client)
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        await self.runner.cleanup()
+
+    async def invocations(self, request):
+        body = await request.json()
+        self.requests.append(body)
+        if body.get('params') == 'slow':
+            await asyncio.sleep(2)
+        output = {'latency': 0.25, 'data': '<td>%s</td>' % body.get('func_name') * 1000}
+        if body.get('result_mode') == 'json':
+            return web.json_response({'output': output, 'vmId': 'vm-1', 'traceId': 'trace-1'})
+        if body.get('result_mode') == 'raw':
+            return web.Response(body=json.dumps(output).encode(), content_type='application/json',
+                                headers={'X-Faasnap-Vm-Id': 'vm-1', 'X-Faasnap-Trace-Id': 'trace-1'})
+        return web.json_response({
+            'duration': 1.5,
+            'result': body.get('func_name'),
+            'vmId': 'vm-1',
+            'traceId': 'trace-1',
+        })
+
+    async def invocations_batch(self, request):
+        body = await request.json()
+        resp = web.StreamResponse()
+        resp.content_type = 'application/json'
+        await resp.prepare(request)
+        await resp.write(b'[\n')
+        sep = ''
+        for i in reversed(range(len(body))):
+            item = {'index': i, 'result': body[i]['func_name']}
+            await resp.write((sep + json.dumps(item) + '\n').encode())
+            sep = ','
+        await resp.write(b']\n')
+        await resp.write_eof()
+        return resp
+
+    async def vms(self, request):
+        return web.json_response([{'vmId': 'vm-%d' % i, 'state': 'running'}
+                                  for i in range(3)])
+
+    async def vm(self, request):
+        return web.json_response({'message': 'not found'}, status=400)
+
+    async def snapshots(self, request):
+        return web.json_response([
+            {'ssId': 'ss_a', 'function': 'hello', 'size': 4096,
+             'nlayers': 3, 'records': 0},
+            {'ssId': 'ss_b', 'function': 'hello', 'copied_from': 'ss_a',
+             'ws_compressed': True, 'records': 12},
+        ])
+
+    async def pool_put(self, request):
+        body = await request.json()
+        self.requests.append(body)
+        return web.json_response({'ssId': request.match_info['ssId'],
+                                  'size': len(body['namespaces']), 'idle': 0,
+                                  'restoring': 1, 'refill_ms': 0})
+
+    async def test_invocations_post(self):
+        """Test case for invocations_post
+
+        """
+        invocation = swagger_client.Invocation(func_name='hello',
+                                               params='{}')
+        resp = await self.api.invocations_post(invocation=invocation)
+        self.assertIsInstance(resp, swagger_client.InlineResponse2001)
+        self.assertEqual(resp.result, 'hello')
+        self.assertEqual(resp.vm_id, 'vm-1')
+        self.assertEqual(resp.trace_id, 'trace-1')
+        self.assertEqual(self.requests[0]['func_name'], 'hello')
+
+    async def test_invocations_post_json_output(self):
+        """The json result mode returns the body parsed in output
+
+        """
+        invocation = swagger_client.Invocation(func_name='hello',
+                                               result_mode='json')
+        resp = await self.api.invocations_post(invocation=invocation)
+        self.assertIsNone(resp.result)
+        self.assertEqual(resp.output['latency'], 0.25)
+        self.assertEqual(len(resp.output['data']), 14000)
+        self.assertEqual(resp.vm_id, 'vm-1')
+        self.assertEqual(self.requests[0]['result_mode'], 'json')
+
+    async def test_invocations_post_raw(self):
+        """The raw result mode returns the response unread
+
+        """
+        invocation = swagger_client.Invocation(func_name='hello',
+                                               result_mode='raw')
+        resp = await self.api.invocations_post(invocation=invocation)
+        try:
+            self.assertEqual(resp.headers['X-Faasnap-Vm-Id'], 'vm-1')
+            self.assertEqual(resp.headers['X-Faasnap-Trace-Id'], 'trace-1')
+            output = json.loads(await resp.read())
+        finally:
+            resp.release()
+        self.assertEqual(output['latency'], 0.25)
+
+    def test_invocation_result_mode(self):
+        """result_mode only takes the modes the daemon knows
+
+        """
+        with self.assertRaises(ValueError):
+            swagger_client.Invocation(func_name='hello', result_mode='binary')
+
+    async def test_invocations_post_concurrent(self):
+        """Concurrent calls share the bounded session
+
+        """
+        calls = [self.api.invocations_post(
+            invocation=swagger_client.Invocation(func_name='f%d' % i))
+            for i in range(20)]
+        results = await asyncio.gather(*calls)
+        self.assertEqual([r.result for r in results],
+                         ['f%d' % i for i in range(20)])
+
+    async def test_request_timeout(self):
+        """A per-call timeout aborts the request
+
+        """
+        invocation = swagger_client.Invocation(func_name='f', params='slow')
+        with self.assertRaises(asyncio.TimeoutError):
+            await self.api.invocations_post(invocation=invocation,
+                                            _request_timeout=0.2)
+
+    async def test_cancellation(self):
+        """A cancelled call does not hold on to its connection
+
+        """
+        invocation = swagger_client.Invocation(func_name='f', params='slow')
+        tasks = [asyncio.ensure_future(
+            self.api.invocations_post(invocation=invocation))
+            for _ in range(2)]
+        await asyncio.sleep(0.2)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        resp = await asyncio.wait_for(self.api.invocations_post(
+            invocation=swagger_client.Invocation(func_name='g')), 2)
+        self.assertEqual(resp.result, 'g')
+
+    async def test_invocations_batch_post_stream(self):
+        """Test case for invocations_batch_post streaming
+
+        """
+        invocs = [swagger_client.Invocation(func_name='f%d' % i)
+                  for i in range(3)]
+        results = [r async for r in self.api.invocations_batch_post(
+            invocations=invocs, _stream=True)]
+        self.assertEqual([r.index for r in results], [2, 1, 0])
+        self.assertEqual(results[0].result, 'f2')
+        results = await self.api.invocations_batch_post(invocations=invocs)
+        self.assertEqual(len(results), 3)
+
+    async def test_vms_get(self):
+        """Test case for vms_get
+
+        """
+        vms = await self.api.vms_get()
+        self.assertEqual(len(vms), 3)
+        self.assertIsInstance(vms[0], swagger_client.VM)
+        self.assertEqual(vms[2].vm_id, 'vm-2')
+
+    async def test_snapshots_get(self):
+        """Test case for snapshots_get
+
+        """
+        snaps = await self.api.snapshots_get()
+        self.assertEqual([s.ss_id for s in snaps], ['ss_a', 'ss_b'])
+        self.assertIsInstance(snaps[0], swagger_client.SnapshotInfo)
+        self.assertEqual(snaps[0].nlayers, 3)
+        self.assertEqual(snaps[1].copied_from, 'ss_a')
+        self.assertTrue(snaps[1].ws_compressed)
+
+    async def test_snapshots_ss_id_pool_put(self):
+        """Test case for snapshots_ss_id_pool_put
+
+        """
+        pool = swagger_client.PoolConfig(
+            namespaces=['fc3', 'fc4'],
+            invocation=swagger_client.Invocation(func_name='hello',
+                                                 use_ws_file=True))
+        status = await self.api.snapshots_ss_id_pool_put('ss_a', pool)
+        self.assertIsInstance(status, swagger_client.PoolStatus)
+        self.assertEqual(status.ss_id, 'ss_a')
+        self.assertEqual(status.size, 2)
+        self.assertEqual(status.restoring, 1)
+        self.assertEqual(self.requests[0],
+                         {'namespaces': ['fc3', 'fc4'],
+                          'invocation': {'func_name': 'hello',
+                                         'use_ws_file': True}})
+
+    def test_pool_config_namespaces(self):
+        """PoolConfig requires namespaces"""
+        with self.assertRaises(ValueError):
+            swagger_client.PoolConfig()
+
+    async def test_vms_vm_id_get_error(self):
+        """Test case for vms_vm_id_get error responses
+
+        """
+        with self.assertRaises(ApiException) as cm:
+            await self.api.vms_vm_id_get('vm-x')
+        self.assertEqual(cm.exception.status, 400)
+        self.assertEqual(json.loads(cm.exception.body)['message'],
+                         'not found')
+
+
+if __name__ == '__main__':
+    unittest.main()
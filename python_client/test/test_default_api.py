@@ -41,6 +41,12 @@ class TestDefaultApi(unittest.TestCase):
         """
         pass
 
+    def test_invocations_batch_post(self):
+        """Test case for invocations_batch_post
+
+        """
+        pass
+
     def test_invocations_post(self):
         """Test case for invocations_post
 
@@ -59,6 +65,12 @@ class TestDefaultApi(unittest.TestCase):
         """
         pass
 
+    def test_snapshots_get(self):
+        """Test case for snapshots_get
+
+        """
+        pass
+
     def test_snapshots_post(self):
         """Test case for snapshots_post
 
@@ -71,6 +83,12 @@ class TestDefaultApi(unittest.TestCase):
         """
         pass
 
+    def test_snapshots_ss_id_get(self):
+        """Test case for snapshots_ss_id_get
+
+        """
+        pass
+
     def test_snapshots_ss_id_mincore_get(self):
         """Test case for snapshots_ss_id_mincore_get
 
@@ -101,6 +119,24 @@ class TestDefaultApi(unittest.TestCase):
         """
         pass
 
+    def test_snapshots_ss_id_pool_delete(self):
+        """Test case for snapshots_ss_id_pool_delete
+
+        """
+        pass
+
+    def test_snapshots_ss_id_pool_get(self):
+        """Test case for snapshots_ss_id_pool_get
+
+        """
+        pass
+
+    def test_snapshots_ss_id_pool_put(self):
+        """Test case for snapshots_ss_id_pool_put
+
+        """
+        pass
+
     def test_snapshots_ss_id_reap_delete(self):
         """Test case for snapshots_ss_id_reap_delete
 
@@ -137,6 +173,12 @@ class TestDefaultApi(unittest.TestCase):
         """
         pass
 
+    def test_vms_delete(self):
+        """Test case for vms_delete
+
+        """
+        pass
+
     def test_vms_get(self):
         """Test case for vms_get
 
@@ -0,0 +1,101 @@
+# coding: utf-8
+
+"""
+    faasnap
+
+    FaaSnap API  # noqa: E501
+
+    OpenAPI spec version: 1.0.0
+
+    Generated by: https://github.com/swagger-api/swagger-codegen.git
+"""
+
+
+from __future__ import absolute_import
+
+import json
+import threading
+import unittest
+from six.moves import BaseHTTPServer
+from six.moves import socketserver
+
+import swagger_client
+from swagger_client import guest
+from swagger_client.api_client import ApiClient
+from swagger_client.configuration import Configuration
+from swagger_client.rest import ApiException
+
+
+class InvocationHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # (status, body) served for POST /invocations, and the requests seen
+    response = (200, {})
+    requests = []
+
+    def do_POST(self):
+        length = int(self.headers['Content-Length'])
+        self.requests.append(json.loads(self.rfile.read(length).decode()))
+        status, body = self.response
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class InvocationServer(socketserver.ThreadingMixIn,
+                       BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+
+class TestGuest(unittest.TestCase):
+    """guest route helpers unit tests against a local HTTP server"""
+
+    def setUp(self):
+        InvocationHandler.requests = []
+        self.server = InvocationServer(('127.0.0.1', 0), InvocationHandler)
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        configuration = Configuration()
+        configuration.host = 'http://127.0.0.1:%d' % self.server.server_port
+        self.api = swagger_client.DefaultApi(ApiClient(configuration))
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_quiesce(self):
+        InvocationHandler.response = (200, {'vmId': 'a', 'output': {
+            'handler': 'handler', 'frozen': 12,
+            'rss_delta_kb': {'VmRSS': -40}}})
+        line = guest.quiesce(self.api, 'a', 'image-recognition')
+        self.assertEqual(line,
+                         'quiesced handler: 12 objects frozen, rss -40 KiB')
+        request = InvocationHandler.requests[0]
+        self.assertEqual(request['func_name'], 'quiesce')
+        self.assertEqual(request['vmId'], 'a')
+        self.assertEqual(json.loads(request['params']),
+                         {'function': 'image-recognition'})
+        self.assertEqual(request['result_mode'], 'json')
+
+    def test_preload_result_string(self):
+        body = {'handler': 'handler', 'import': 0.5, 'warm': 0.25}
+        InvocationHandler.response = (200, {'result': json.dumps(body)})
+        line = guest.preload(self.api, 'a', 'pagerank')
+        self.assertEqual(line,
+                         'preloaded handler: import 500.0 ms, warm 250.0 ms')
+        self.assertEqual(InvocationHandler.requests[0]['func_name'], 'preload')
+
+    def test_error(self):
+        InvocationHandler.response = (400, {'message': 'no handler'})
+        with self.assertRaises(ApiException):
+            guest.call_route(self.api, 'a', 'preload', 'missing')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+# coding: utf-8
+
+"""
+    faasnap
+
+    FaaSnap API  # noqa: E501
+
+    OpenAPI spec version: 1.0.0
+    
+    Generated by: https://github.com/swagger-api/swagger-codegen.git
+"""
+
+
+from __future__ import absolute_import
+
+import unittest
+
+import swagger_client
+from swagger_client.models.pool_config import PoolConfig  # noqa: E501
+from swagger_client.rest import ApiException
+
+
+class TestPoolConfig(unittest.TestCase):
+    """PoolConfig unit test stubs"""
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def testPoolConfig(self):
+        """Test PoolConfig"""
+        # FIXME: construct object with mandatory attributes with example values
+        # model = swagger_client.models.pool_config.PoolConfig()  # noqa: E501
+        pass
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,167 @@
+# coding: utf-8
+
+"""
+    faasnap
+
+    FaaSnap API  # noqa: E501
+
+    OpenAPI spec version: 1.0.0
+
+    Generated by: https://github.com/swagger-api/swagger-codegen.git
+"""
+
+
+from __future__ import absolute_import
+
+import json
+import socket
+import threading
+import unittest
+from six.moves import BaseHTTPServer
+from six.moves import socketserver
+
+import swagger_client
+from swagger_client import wait
+from swagger_client.api_client import ApiClient
+from swagger_client.configuration import Configuration
+from swagger_client.rest import ApiException
+
+
+class DaemonHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # responses served in turn for each path, the last one is repeated
+    responses = {}
+
+    def do_GET(self):
+        queue = self.responses.get(self.path)
+        if not queue:
+            status, body = 404, {'message': 'no route'}
+        elif len(queue) > 1:
+            status, body = queue.pop(0)
+        else:
+            status, body = queue[0]
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class DaemonServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+
+class TestWait(unittest.TestCase):
+    """wait helpers unit tests against a local HTTP server"""
+
+    def setUp(self):
+        DaemonHandler.responses = {}
+        self.server = DaemonServer(('127.0.0.1', 0), DaemonHandler)
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.api = self.make_api(self.server.server_port)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def make_api(self, port):
+        configuration = Configuration()
+        configuration.host = 'http://127.0.0.1:%d' % port
+        return swagger_client.DefaultApi(ApiClient(configuration))
+
+    def test_poll_timeout(self):
+        with self.assertRaises(TimeoutError):
+            wait.poll(lambda: None, timeout=0.1, interval=0.01)
+        self.assertEqual(wait.poll(lambda: 0, timeout=0), 0)
+
+    def test_wait_for_daemon(self):
+        DaemonHandler.responses['/vms'] = [(200, [{'vmId': 'a'}])]
+        vms = wait.wait_for_daemon(self.api, timeout=1)
+        self.assertEqual(vms[0].vm_id, 'a')
+
+    def test_wait_for_daemon_timeout(self):
+        sock = socket.socket()
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+        sock.close()
+        api = self.make_api(port)
+        api.api_client.rest_client.pool_manager.connection_pool_kw[
+            'retries'] = False
+        with self.assertRaises(TimeoutError):
+            wait.wait_for_daemon(api, timeout=0.2, interval=0.05)
+
+    def test_wait_for_vm_state(self):
+        DaemonHandler.responses['/vms/a'] = [
+            (200, {'vmId': 'a', 'state': 'starting'}),
+            (200, {'vmId': 'a', 'state': 'starting'}),
+            (200, {'vmId': 'a', 'state': 'running'})]
+        vm = wait.wait_for_vm_state(self.api, 'a', 'running', timeout=1,
+                                    interval=0.01)
+        self.assertEqual(vm.state, 'running')
+        self.assertEqual(len(DaemonHandler.responses['/vms/a']), 1)
+
+    def test_wait_for_vm_state_gone(self):
+        DaemonHandler.responses['/vms/a'] = [(400, {'message': 'gone'})]
+        with self.assertRaises(ApiException):
+            wait.wait_for_vm_state(self.api, 'a', timeout=1)
+
+    def test_wait_for_vm_stopped(self):
+        DaemonHandler.responses['/vms/a'] = [
+            (200, {'vmId': 'a', 'state': 'stopping'}),
+            (400, {'message': 'vmID a not exists'})]
+        wait.wait_for_vm_stopped(self.api, 'a', timeout=1, interval=0.01)
+        DaemonHandler.responses['/vms/a'] = [
+            (200, {'vmId': 'a', 'state': 'stopping'})]
+        with self.assertRaises(TimeoutError):
+            wait.wait_for_vm_stopped(self.api, 'a', timeout=0.1,
+                                     interval=0.01)
+
+    def test_wait_for_vms_stopped(self):
+        DaemonHandler.responses['/vms'] = [
+            (200, [{'vmId': 'a'}, {'vmId': 'b'}]),
+            (200, [{'vmId': 'b'}]),
+            (200, [])]
+        wait.wait_for_vms_stopped(self.api, timeout=1, interval=0.01)
+        self.assertEqual(DaemonHandler.responses['/vms'], [(200, [])])
+
+    def test_wait_for_snapshot_cache_dropped(self):
+        DaemonHandler.responses['/snapshots/ss'] = [
+            (200, {'ssId': 'ss', 'cachedPages': 10, 'totalPages': 10,
+                   'wsCachedPages': 5}),
+            (200, {'ssId': 'ss', 'cachedPages': 0, 'totalPages': 10,
+                   'wsCachedPages': 5}),
+            (200, {'ssId': 'ss', 'cachedPages': 0, 'totalPages': 10,
+                   'wsCachedPages': 0})]
+        status = wait.wait_for_snapshot_cache_dropped(
+            self.api, 'ss', ws_file=True, timeout=1, interval=0.01)
+        self.assertIsInstance(status, swagger_client.SnapshotStatus)
+        self.assertEqual(status.total_pages, 10)
+        self.assertEqual(status.ws_cached_pages, 0)
+
+        DaemonHandler.responses['/snapshots/ss'] = [
+            (200, {'ssId': 'ss', 'cachedPages': 10, 'wsCachedPages': 0})]
+        status = wait.wait_for_snapshot_cache_dropped(
+            self.api, 'ss', mem_file=False, ws_file=True, timeout=1)
+        self.assertEqual(status.cached_pages, 10)
+
+    def test_wait_for_pool_ready(self):
+        DaemonHandler.responses['/snapshots/ss/pool'] = [
+            (200, {'ssId': 'ss', 'size': 2, 'idle': 0, 'restoring': 2}),
+            (200, {'ssId': 'ss', 'size': 2, 'idle': 1, 'restoring': 1}),
+            (200, {'ssId': 'ss', 'size': 2, 'idle': 2, 'refills': 2,
+                   'refill_ms': 120.5})]
+        status = wait.wait_for_pool_ready(self.api, 'ss', timeout=1,
+                                          interval=0.01)
+        self.assertIsInstance(status, swagger_client.PoolStatus)
+        self.assertEqual(status.refills, 2)
+        self.assertEqual(status.refill_ms, 120.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -81,13 +81,18 @@ func RandStringRunes(n int) string {
 }
 
 // RegisterVM Registers a VM within the memory manager
-func (m *MemoryManager) RegisterVM(ssId, vmmStatePath, guestMemPath, baseDir string, memSize int, wsFileDirectIO bool, wsSingleRead bool) (string, error) {
+func (m *MemoryManager) RegisterVM(ssId, vmmStatePath, guestMemPath, baseDir string, memSize int, wsFileDirectIO bool, wsSingleRead bool, wsCompress bool) (string, error) {
 	m.Lock()
 	defer m.Unlock()
 	logger := log.WithFields(log.Fields{"ssID": ssId})
 
 	if existing, ok := m.instances[ssId]; ok {
 		logger.Info("Already registered, making a copy")
+		if existing.restored {
+			existing.WSFileDirectIO = wsFileDirectIO
+			existing.WSSingleRead = wsSingleRead
+			existing.restored = false
+		}
 		state := NewSnapshotState(existing.SnapshotStateCfg)
 		state.VMID = ssId + "-" + RandStringRunes(4)
 		state.InstanceSockAddr = state.BaseDir + "/uffd-" + state.VMID + ".sock"
@@ -105,11 +110,21 @@ func (m *MemoryManager) RegisterVM(ssId, vmmStatePath, guestMemPath, baseDir str
 		return state.VMID, nil
 	}
 
-	cfg := SnapshotStateCfg{
+	cfg := newSnapshotStateCfg(ssId, vmmStatePath, guestMemPath, baseDir, memSize, wsFileDirectIO, wsSingleRead, wsCompress)
+	cfg.metricsModeOn = m.MetricsModeOn
+	state := NewSnapshotState(cfg)
+
+	m.instances[cfg.VMID] = state
+
+	return ssId, nil
+}
+
+func newSnapshotStateCfg(ssId, vmmStatePath, guestMemPath, baseDir string, memSize int, wsFileDirectIO bool, wsSingleRead bool, wsCompress bool) SnapshotStateCfg {
+	return SnapshotStateCfg{
 		VMID:             ssId,
 		VMMStatePath:     vmmStatePath,
 		GuestMemPath:     guestMemPath,
-		WorkingSetPath:   baseDir + "/working_set",
+		WorkingSetPath:   WorkingSetPath(baseDir),
 		InstanceSockAddr: baseDir + "/uffd-" + ssId + ".sock",
 		BaseDir:          baseDir + "/",        // base directory for the instance
 		MetricsPath:      baseDir + "/metrics", // path to csv file where the metrics should be stored
@@ -118,14 +133,34 @@ func (m *MemoryManager) RegisterVM(ssId, vmmStatePath, guestMemPath, baseDir str
 		metricsModeOn:    false,
 		WSFileDirectIO:   wsFileDirectIO,
 		WSSingleRead:     wsSingleRead,
+		WSCompress:       wsCompress,
 	}
+}
+
+// RestoreVM registers a snapshot whose working set an earlier daemon recorded,
+// from the page offsets of its trace, so that it is replayed rather than
+// recorded again. The ws file flags are those of the first RegisterVM after it.
+func (m *MemoryManager) RestoreVM(ssId, vmmStatePath, guestMemPath, baseDir string, memSize int, wsCompress bool, offsets []uint64) error {
+	m.Lock()
+	defer m.Unlock()
 
+	if _, ok := m.instances[ssId]; ok {
+		return fmt.Errorf("reap snapshot %s already registered", ssId)
+	}
+	cfg := newSnapshotStateCfg(ssId, vmmStatePath, guestMemPath, baseDir, memSize, false, false, wsCompress)
+	if _, err := os.Stat(cfg.WorkingSetPath); err != nil {
+		return err
+	}
 	cfg.metricsModeOn = m.MetricsModeOn
 	state := NewSnapshotState(cfg)
-
+	for _, offset := range offsets {
+		state.trace.AppendRecord(Record{offset: offset})
+	}
+	state.trace.buildRegions()
+	state.isRecordReady = true
+	state.restored = true
 	m.instances[cfg.VMID] = state
-
-	return ssId, nil
+	return nil
 }
 
 // DeregisterVM Deregisters a VM from the memory manager
@@ -304,7 +339,7 @@ func (m *MemoryManager) Deactivate(vmID string) ([]uint64, error) {
 
 	state.userFaultFD.Close()
 	if !state.isRecordReady && !state.IsLazyMode {
-		state.trace.ProcessRecord(state.GuestMemPath, state.WorkingSetPath)
+		state.trace.ProcessRecord(state.GuestMemPath, state.WorkingSetPath, state.WSCompress)
 	}
 
 	state.isRecordReady = true
@@ -66,11 +66,22 @@ func Deactivate(id string) ([]uint64, error) {
 	// mmanager.DumpUPFPageStats(vmID, "fn1", mmanager.instances[vmID].MetricsPath)
 }
 
-func Register(ctx context.Context, ssId string, baseDir string, vmmStatePath string, guestMemPath string, memSize int, wsFileDirectIO, wsSingleRead bool) (string, error) {
+func Register(ctx context.Context, ssId string, baseDir string, vmmStatePath string, guestMemPath string, memSize int, wsFileDirectIO, wsSingleRead, wsCompress bool) (string, error) {
 	_, span := trace.StartSpan(ctx, "reap.Register")
 	defer span.End()
 
-	return mmanager.RegisterVM(ssId, vmmStatePath, guestMemPath, baseDir, memSize, wsFileDirectIO, wsSingleRead)
+	return mmanager.RegisterVM(ssId, vmmStatePath, guestMemPath, baseDir, memSize, wsFileDirectIO, wsSingleRead, wsCompress)
+}
+
+// Restore registers a snapshot recorded by an earlier daemon from the page
+// offsets of its trace
+func Restore(ssId string, baseDir string, vmmStatePath string, guestMemPath string, memSize int, wsCompress bool, offsets []uint64) error {
+	return mmanager.RestoreVM(ssId, vmmStatePath, guestMemPath, baseDir, memSize, wsCompress, offsets)
+}
+
+// WorkingSetPath returns where the working set of the snapshot in baseDir is recorded
+func WorkingSetPath(baseDir string) string {
+	return baseDir + "/working_set"
 }
 
 func ClearCache(ctx context.Context, ssId string) error {
@@ -78,11 +89,17 @@ func ClearCache(ctx context.Context, ssId string) error {
 }
 
 func Activate(req *http.Request, id string) error {
+	return ActivateContext(req.Context(), id)
+}
+
+// ActivateContext is Activate outside of a request, e.g. for the VMs a
+// snapshot pool restores in the background.
+func ActivateContext(ctx context.Context, id string) error {
 	log.Println("reap.Activate")
-	_, span := trace.StartSpan(req.Context(), "reap.Activate")
+	_, span := trace.StartSpan(ctx, "reap.Activate")
 	defer span.End()
-	if err := mmanager.FetchState(req.Context(), id); err != nil {
+	if err := mmanager.FetchState(ctx, id); err != nil {
 		return err
 	}
-	return mmanager.Activate(req.Context(), id)
+	return mmanager.Activate(ctx, id)
 }
@@ -31,6 +31,7 @@ import (
 	"context"
 	"encoding/binary"
 	"errors"
+	"fmt"
 	"io/ioutil"
 	"net"
 	"os"
@@ -45,6 +46,7 @@ import (
 	"golang.org/x/sys/unix"
 
 	"github.com/ease-lab/vhive/metrics"
+	"github.com/ucsdsysnet/faasnap/wsfile"
 
 	"unsafe"
 )
@@ -63,6 +65,7 @@ type SnapshotStateCfg struct {
 	metricsModeOn    bool
 	WSFileDirectIO   bool
 	WSSingleRead     bool
+	WSCompress       bool // the working set file is compressed, see package wsfile
 }
 
 // SnapshotState Stores the state of the snapshot
@@ -83,6 +86,9 @@ type SnapshotState struct {
 	isActive bool
 
 	isRecordReady bool
+	// registered from the catalog; the first Register sets its ws read
+	// flags, which the catalog does not keep
+	restored bool
 
 	guestMem   []byte
 	workingSet *[]byte
@@ -273,20 +279,14 @@ func (s *SnapshotState) fetchState() error {
 	if s.SnapshotStateCfg.WSSingleRead {
 		s.wsReadOnce.Do(func() {
 			log.Info("Fetching the working set with sync.Once")
-			*s.workingSet = AlignedBlock(size) // direct io requires aligned buffer
-			if n, err := f.Read(*s.workingSet); n != size || err != nil {
-				log.Errorf("Reading working set file failed: %v\n", err)
-				*s.wsReadErr = err
-			}
+			*s.workingSet, *s.wsReadErr = s.readWorkingSet(f, size)
 		})
 		if *s.wsReadErr != nil {
 			return *s.wsReadErr
 		}
 	} else {
 		log.Info("Fetching the working set")
-		*s.workingSet = AlignedBlock(size)
-		if n, err := f.Read(*s.workingSet); n != size || err != nil {
-			log.Errorf("Reading working set file failed: %v\n", err)
+		if *s.workingSet, err = s.readWorkingSet(f, size); err != nil {
 			return err
 		}
 	}
@@ -299,6 +299,36 @@ func (s *SnapshotState) fetchState() error {
 	return nil
 }
 
+// readWorkingSet reads the working set file, inflating it if compressed
+func (s *SnapshotState) readWorkingSet(f *os.File, size int) ([]byte, error) {
+	if !s.WSCompress {
+		ws := AlignedBlock(size) // direct io requires aligned buffer
+		if n, err := f.Read(ws); n != size || err != nil {
+			log.Errorf("Reading working set file failed: %v\n", err)
+			return ws, err
+		}
+		return ws, nil
+	}
+
+	fi, err := f.Stat()
+	if err != nil {
+		log.Errorf("Failed to stat the working set file: %v\n", err)
+		return nil, err
+	}
+	pagesize := os.Getpagesize()
+	compressed := AlignedBlock((int(fi.Size()) + pagesize - 1) / pagesize * pagesize) // direct io reads whole blocks
+	if n, err := f.Read(compressed); int64(n) != fi.Size() || err != nil {
+		log.Errorf("Reading working set file failed: %v\n", err)
+		return nil, fmt.Errorf("read %d of %d bytes of the working set file: %v", n, fi.Size(), err)
+	}
+	ws := AlignedBlock(size)
+	if err := wsfile.Inflate(compressed[:fi.Size()], ws); err != nil {
+		log.Errorf("Inflating working set file failed: %v\n", err)
+		return nil, err
+	}
+	return ws, nil
+}
+
 func (s *SnapshotState) pollUserPageFaults(readyCh chan int) {
 	logger := log.WithFields(log.Fields{"vmID": s.VMID})
 
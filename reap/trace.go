@@ -30,6 +30,7 @@ import (
 	"sync"
 
 	log "github.com/sirupsen/logrus"
+	"github.com/ucsdsysnet/faasnap/wsfile"
 )
 
 // Record A tuple with an address
@@ -131,9 +132,16 @@ func (t *Trace) containsRecord(rec Record) bool {
 
 // ProcessRecord Prepares the trace, the regions map, and the working set file for replay
 // Must be called when record is done (i.e., it is not concurrency-safe vs. AppendRecord)
-func (t *Trace) ProcessRecord(GuestMemPath, WorkingSetPath string) {
+func (t *Trace) ProcessRecord(GuestMemPath, WorkingSetPath string, compress bool) {
 	log.Debug("Preparing replay structures")
 
+	t.buildRegions()
+	t.writeWorkingSetPagesToFile(GuestMemPath, WorkingSetPath, compress)
+}
+
+// buildRegions sorts the records and maps the start of each run of
+// contiguous pages to its length in pages
+func (t *Trace) buildRegions() {
 	// sort trace records in the ascending order by offset
 	sort.Slice(t.trace, func(i, j int) bool {
 		return t.trace[i].offset < t.trace[j].offset
@@ -151,11 +159,9 @@ func (t *Trace) ProcessRecord(GuestMemPath, WorkingSetPath string) {
 
 		last = rec.offset
 	}
-
-	t.writeWorkingSetPagesToFile(GuestMemPath, WorkingSetPath)
 }
 
-func (t *Trace) writeWorkingSetPagesToFile(guestMemFileName, WorkingSetPath string) {
+func (t *Trace) writeWorkingSetPagesToFile(guestMemFileName, WorkingSetPath string, compress bool) {
 	log.Info("Writing the working set pages to a disk", WorkingSetPath)
 
 	fSrc, err := os.Open(guestMemFileName)
@@ -181,6 +187,7 @@ func (t *Trace) writeWorkingSetPagesToFile(guestMemFileName, WorkingSetPath stri
 	}
 	sort.Slice(keys, func(i, j int) bool { return keys[i] < keys[j] })
 
+	var bufs [][]byte
 	for _, offset := range keys {
 		regLength := t.regions[offset]
 		copyLen := regLength * os.Getpagesize()
@@ -191,7 +198,9 @@ func (t *Trace) writeWorkingSetPagesToFile(guestMemFileName, WorkingSetPath stri
 			log.Fatalf("Read file failed for src")
 		}
 
-		if n, err := fDst.WriteAt(buf, dstOffset); n != copyLen || err != nil {
+		if compress {
+			bufs = append(bufs, buf)
+		} else if n, err := fDst.WriteAt(buf, dstOffset); n != copyLen || err != nil {
 			log.Fatalf("Write file failed for dst")
 		}
 
@@ -200,5 +209,13 @@ func (t *Trace) writeWorkingSetPagesToFile(guestMemFileName, WorkingSetPath stri
 		count += regLength
 	}
 
+	if compress {
+		raw, compressed, err := wsfile.Write(fDst, bufs)
+		if err != nil {
+			log.Fatalf("Write compressed ws file failed: %v", err)
+		}
+		log.Infof("Compressed the working set %d -> %d bytes", raw, compressed)
+	}
+
 	fDst.Sync()
 }
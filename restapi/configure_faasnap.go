@@ -6,6 +6,7 @@ import (
 	"crypto/tls"
 	"encoding/json"
 	"fmt"
+	"io"
 	"log"
 	"net/http"
 
@@ -49,6 +50,7 @@ func configureAPI(api *operations.FaasnapAPI) http.Handler {
 	api.JSONConsumer = runtime.JSONConsumer()
 
 	api.JSONProducer = runtime.JSONProducer()
+	api.TextProducer = runtime.TextProducer()
 
 	api.DeleteVmsVMIDHandler = operations.DeleteVmsVMIDHandlerFunc(func(params operations.DeleteVmsVMIDParams) middleware.Responder {
 		if err := daemon.StopVM(params.HTTPRequest, params.VMID); err != nil {
@@ -57,21 +59,26 @@ func configureAPI(api *operations.FaasnapAPI) http.Handler {
 		return operations.NewDeleteVmsVMIDOK()
 	})
 
-	if api.GetFunctionsHandler == nil {
-		api.GetFunctionsHandler = operations.GetFunctionsHandlerFunc(func(params operations.GetFunctionsParams) middleware.Responder {
-			return middleware.NotImplemented("operation operations.GetFunctions has not yet been implemented")
-		})
-	}
-	if api.GetVmsHandler == nil {
-		api.GetVmsHandler = operations.GetVmsHandlerFunc(func(params operations.GetVmsParams) middleware.Responder {
-			return middleware.NotImplemented("operation operations.GetVms has not yet been implemented")
-		})
-	}
-	if api.GetVmsVMIDHandler == nil {
-		api.GetVmsVMIDHandler = operations.GetVmsVMIDHandlerFunc(func(params operations.GetVmsVMIDParams) middleware.Responder {
-			return middleware.NotImplemented("operation operations.GetVmsVMID has not yet been implemented")
-		})
-	}
+	api.DeleteVmsHandler = operations.DeleteVmsHandlerFunc(func(params operations.DeleteVmsParams) middleware.Responder {
+		if err := daemon.StopVMs(params.HTTPRequest); err != nil {
+			return operations.NewDeleteVmsBadRequest().WithPayload(&operations.DeleteVmsBadRequestBody{Message: err.Error()})
+		}
+		return operations.NewDeleteVmsOK()
+	})
+
+	api.GetFunctionsHandler = operations.GetFunctionsHandlerFunc(func(params operations.GetFunctionsParams) middleware.Responder {
+		return operations.NewGetFunctionsOK().WithPayload(daemon.GetFunctions(params.HTTPRequest))
+	})
+	api.GetVmsHandler = operations.GetVmsHandlerFunc(func(params operations.GetVmsParams) middleware.Responder {
+		return operations.NewGetVmsOK().WithPayload(daemon.GetVMs(params.HTTPRequest))
+	})
+	api.GetVmsVMIDHandler = operations.GetVmsVMIDHandlerFunc(func(params operations.GetVmsVMIDParams) middleware.Responder {
+		vm, err := daemon.GetVM(params.HTTPRequest, params.VMID)
+		if err != nil {
+			return operations.NewGetVmsVMIDBadRequest().WithPayload(&operations.GetVmsVMIDBadRequestBody{Message: err.Error()})
+		}
+		return operations.NewGetVmsVMIDOK().WithPayload(vm)
+	})
 	api.PostFunctionsHandler = operations.PostFunctionsHandlerFunc(func(params operations.PostFunctionsParams) middleware.Responder {
 		if err := daemon.CreateFunction(params); err != nil {
 			return operations.NewPostFunctionsBadRequest().WithPayload(&operations.PostFunctionsBadRequestBody{Message: err.Error()})
@@ -87,12 +94,37 @@ func configureAPI(api *operations.FaasnapAPI) http.Handler {
 		if err != nil {
 			return operations.NewPostInvocationsBadRequest().WithPayload(&operations.PostInvocationsBadRequestBody{Message: err.Error()})
 		}
-		return operations.NewPostInvocationsOK().WithPayload(&operations.PostInvocationsOKBody{
-			Duration: 0, VMID: vmId, Result: result, TraceID: traceId})
+		if result.Stream != nil {
+			return CustomResponder(func(w http.ResponseWriter, _ runtime.Producer) {
+				streamResult(w, result, vmId, traceId)
+			})
+		}
+		payload := &operations.PostInvocationsOKBody{Duration: 0, VMID: vmId, TraceID: traceId}
+		if params.Invocation.ResultMode == daemon.ResultJSON {
+			payload.Output = result.Output()
+		}
+		if payload.Output == nil {
+			payload.Result = result.String()
+		}
+		return operations.NewPostInvocationsOK().WithPayload(payload)
+	})
+	api.PostInvocationsBatchHandler = operations.PostInvocationsBatchHandlerFunc(func(params operations.PostInvocationsBatchParams) middleware.Responder {
+		if len(params.Invocations) == 0 {
+			return operations.NewPostInvocationsBatchBadRequest().WithPayload(&operations.PostInvocationsBatchBadRequestBody{Message: "empty batch"})
+		}
+		for _, invoc := range params.Invocations {
+			if invoc.ResultMode == daemon.ResultRaw {
+				return operations.NewPostInvocationsBatchBadRequest().WithPayload(&operations.PostInvocationsBatchBadRequestBody{Message: "raw results are not supported in batches"})
+			}
+		}
+		results := daemon.InvokeFunctions(params.HTTPRequest, params.Invocations)
+		return CustomResponder(func(w http.ResponseWriter, _ runtime.Producer) {
+			streamBatchResults(w, params.Invocations, results)
+		})
 	})
 	api.PostSnapshotsHandler = operations.PostSnapshotsHandlerFunc(func(params operations.PostSnapshotsParams) middleware.Responder {
 		ssId, err := daemon.TakeSnapshot(params.HTTPRequest, *params.Snapshot.VMID, params.Snapshot.SnapshotType, params.Snapshot.SnapshotPath,
-			params.Snapshot.MemFilePath, params.Snapshot.Version, params.Snapshot.RecordRegions, int(params.Snapshot.SizeThreshold), int(params.Snapshot.IntervalThreshold))
+			params.Snapshot.MemFilePath, params.Snapshot.Version, params.Snapshot.RecordRegions, int(params.Snapshot.SizeThreshold), int(params.Snapshot.IntervalThreshold), params.Snapshot.CompressWs)
 		if err != nil {
 			return &operations.PostSnapshotsBadRequest{Payload: &operations.PostSnapshotsBadRequestBody{Message: err.Error()}}
 		}
@@ -101,13 +133,28 @@ func configureAPI(api *operations.FaasnapAPI) http.Handler {
 		return &operations.PostSnapshotsOK{Payload: &ret}
 	})
 
+	api.GetMetricsHandler = operations.GetMetricsHandlerFunc(func(params operations.GetMetricsParams) middleware.Responder {
+		return CustomResponder(func(w http.ResponseWriter, _ runtime.Producer) {
+			daemon.MetricsHandler().ServeHTTP(w, params.HTTPRequest)
+		})
+	})
+	api.GetSnapshotsHandler = operations.GetSnapshotsHandlerFunc(func(params operations.GetSnapshotsParams) middleware.Responder {
+		return operations.NewGetSnapshotsOK().WithPayload(daemon.GetSnapshots(params.HTTPRequest))
+	})
 	api.PutSnapshotsHandler = operations.PutSnapshotsHandlerFunc(func(params operations.PutSnapshotsParams) middleware.Responder {
-		snap, err := daemon.CopySnapshot(params.HTTPRequest.Context(), params.FromSnapshot, params.MemFilePath)
+		snap, err := daemon.CopySnapshot(params.HTTPRequest.Context(), params.FromSnapshot, params.MemFilePath, *params.CopyMode)
 		if err != nil {
 			return &operations.PutSnapshotsBadRequest{Payload: &operations.PutSnapshotsBadRequestBody{Message: err.Error()}}
 		}
 		return &operations.PutSnapshotsOK{Payload: snap}
 	})
+	api.GetSnapshotsSsIDHandler = operations.GetSnapshotsSsIDHandlerFunc(func(params operations.GetSnapshotsSsIDParams) middleware.Responder {
+		status, err := daemon.GetSnapshotStatus(params.HTTPRequest, params.SsID)
+		if err != nil {
+			return operations.NewGetSnapshotsSsIDBadRequest().WithPayload(&operations.GetSnapshotsSsIDBadRequestBody{Message: err.Error()})
+		}
+		return operations.NewGetSnapshotsSsIDOK().WithPayload(status)
+	})
 	api.PatchSnapshotsSsIDHandler = operations.PatchSnapshotsSsIDHandlerFunc(func(params operations.PatchSnapshotsSsIDParams) middleware.Responder {
 		if err := daemon.ChangeSnapshot(params.HTTPRequest, params.SsID, params.State.DigHole, params.State.LoadCache, params.State.DropCache); err != nil {
 			return &operations.PatchSnapshotsSsIDBadRequest{Payload: &operations.PatchSnapshotsSsIDBadRequestBody{Message: err.Error()}}
@@ -135,7 +182,7 @@ func configureAPI(api *operations.FaasnapAPI) http.Handler {
 		return &operations.PostSnapshotsSsIDMincoreOK{}
 	})
 	api.PatchSnapshotsSsIDMincoreHandler = operations.PatchSnapshotsSsIDMincoreHandlerFunc(func(params operations.PatchSnapshotsSsIDMincoreParams) middleware.Responder {
-		if err := daemon.ChangeMincoreState(params.HTTPRequest.Context(), params.SsID, int(params.State.FromRecordsSize), params.State.TrimRegions, params.State.ToWsFile, params.State.InactiveWs, params.State.ZeroWs, int(params.State.SizeThreshold), int(params.State.IntervalThreshold), params.State.MincoreCache, params.State.DropWsCache); err != nil {
+		if err := daemon.ChangeMincoreState(params.HTTPRequest.Context(), params.SsID, int(params.State.FromRecordsSize), params.State.TrimRegions, params.State.ToWsFile, params.State.CompressWs, params.State.InactiveWs, params.State.ZeroWs, int(params.State.SizeThreshold), int(params.State.IntervalThreshold), params.State.MincoreCache, params.State.DropWsCache, params.State.ResetLoad); err != nil {
 			return &operations.PatchSnapshotsSsIDMincoreBadRequest{Payload: &operations.PatchSnapshotsSsIDMincoreBadRequestBody{Message: err.Error()}}
 		}
 		return &operations.PatchSnapshotsSsIDMincoreOK{}
@@ -177,6 +224,26 @@ func configureAPI(api *operations.FaasnapAPI) http.Handler {
 		return operations.NewPostVmmsOK().WithPayload(&models.VM{VMID: &vmId})
 	})
 
+	api.GetSnapshotsSsIDPoolHandler = operations.GetSnapshotsSsIDPoolHandlerFunc(func(params operations.GetSnapshotsSsIDPoolParams) middleware.Responder {
+		status, err := daemon.GetPool(params.HTTPRequest, params.SsID)
+		if err != nil {
+			return operations.NewGetSnapshotsSsIDPoolBadRequest().WithPayload(&operations.GetSnapshotsSsIDPoolBadRequestBody{Message: err.Error()})
+		}
+		return operations.NewGetSnapshotsSsIDPoolOK().WithPayload(status)
+	})
+	api.PutSnapshotsSsIDPoolHandler = operations.PutSnapshotsSsIDPoolHandlerFunc(func(params operations.PutSnapshotsSsIDPoolParams) middleware.Responder {
+		status, err := daemon.PutPool(params.HTTPRequest, params.SsID, params.Pool)
+		if err != nil {
+			return operations.NewPutSnapshotsSsIDPoolBadRequest().WithPayload(&operations.PutSnapshotsSsIDPoolBadRequestBody{Message: err.Error()})
+		}
+		return operations.NewPutSnapshotsSsIDPoolOK().WithPayload(status)
+	})
+	api.DeleteSnapshotsSsIDPoolHandler = operations.DeleteSnapshotsSsIDPoolHandlerFunc(func(params operations.DeleteSnapshotsSsIDPoolParams) middleware.Responder {
+		if err := daemon.DeletePool(params.HTTPRequest, params.SsID); err != nil {
+			return operations.NewDeleteSnapshotsSsIDPoolBadRequest().WithPayload(&operations.DeleteSnapshotsSsIDPoolBadRequestBody{Message: err.Error()})
+		}
+		return operations.NewDeleteSnapshotsSsIDPoolOK()
+	})
 	api.PatchSnapshotsSsIDReapHandler = operations.PatchSnapshotsSsIDReapHandlerFunc(func(params operations.PatchSnapshotsSsIDReapParams) middleware.Responder {
 		if err := daemon.ChangeReapCacheState(params.HTTPRequest, params.SsID, params.Cache); err != nil {
 			return operations.NewPatchSnapshotsSsIDReapBadRequest().WithPayload(&operations.PatchSnapshotsSsIDReapBadRequestBody{Message: err.Error()})
@@ -276,6 +343,62 @@ func handleUiData(w http.ResponseWriter, req *http.Request) {
 	}
 }
 
+// streamResult writes the guest's body of a raw mode invocation as the
+// response body, as it arrives, with the VM and trace ids in headers.
+func streamResult(w http.ResponseWriter, result *daemon.Result, vmId, traceId string) {
+	defer result.Stream.Close()
+	if result.ContentType != "" {
+		w.Header().Set("Content-Type", result.ContentType)
+	}
+	w.Header().Set("X-Faasnap-Vm-Id", vmId)
+	w.Header().Set("X-Faasnap-Trace-Id", traceId)
+	w.WriteHeader(200)
+	if _, err := io.Copy(w, result.Stream); err != nil {
+		log.Println("Failed to stream result:", err)
+	}
+}
+
+// streamBatchResults writes batch results as a JSON array with one element
+// per line, flushing each element as soon as its invocation completes.
+func streamBatchResults(w http.ResponseWriter, invocs []*models.Invocation, results <-chan *daemon.BatchResult) {
+	flusher, _ := w.(http.Flusher)
+	w.Header().Set("Content-Type", "application/json")
+	w.WriteHeader(200)
+	w.Write([]byte("[\n"))
+	sep := ""
+	for r := range results {
+		item := &models.BatchInvocationResult{
+			Index:    int64(r.Index),
+			Duration: float64(r.Duration.Microseconds()) / 1000,
+			VMID:     r.VmId,
+			TraceID:  r.TraceId,
+		}
+		if invocs[r.Index].ResultMode == daemon.ResultJSON {
+			item.Output = r.Result.Output()
+		}
+		if item.Output == nil {
+			item.Result = r.Result.String()
+		}
+		if r.Err != nil {
+			item.Error = r.Err.Error()
+		}
+		marshalled, err := json.Marshal(item)
+		if err != nil {
+			log.Println("failed to marshal batch result", err)
+			continue
+		}
+		line := append([]byte(sep), marshalled...)
+		if _, err := w.Write(append(line, '\n')); err != nil {
+			log.Println("Failed to write batch result")
+		}
+		if flusher != nil {
+			flusher.Flush()
+		}
+		sep = ","
+	}
+	w.Write([]byte("]\n"))
+}
+
 func FileServerMiddleware(next http.Handler) http.Handler {
 	return http.HandlerFunc(func(w http.ResponseWriter, r *http.Request) {
 		log.Println("serving", r.Method, r.URL.Path)
@@ -7,6 +7,7 @@
 const express = require("express");
 const app = express();
 const bodyParser = require("body-parser");
+const fs = require("fs");
 
 const defaultMaxSize = "100kb"; // body-parser default
 
@@ -159,6 +160,18 @@ app.options("/*", middleware);
 
 const port = process.env.upstream_port || 5000;
 
-app.listen(port, () => {
+// the host waits for this line on the serial console before invoking a
+// cold-booted VM
+const readyMarker = "faasnap-guest-ready";
+
+const server = app.listen(port, () => {
   console.log(`node18 listening on port: ${port}`);
+  fs.writeFile("/dev/ttyS0", readyMarker + "\n", (err) => {
+    if (err) {
+      console.error(err);
+    }
+  });
 });
+// the host keeps idle connections for 50s; close them only after it does
+server.keepAliveTimeout = 65000;
+server.headersTimeout = 66000;
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""Precompile the function daemon and its handlers when the rootfs is built.
+
+Without it, the first import of a handler after boot or restore stats and
+compiles its sources, writes __pycache__ into the image, and faults in the
+pages of all of it. Run in the image by scripts/ready-debian-rootfs.sh, with
+the interpreter of the daemon, it:
+
+- compiles /app and the virtualenvs (/root/faas, /root/ir) into
+  unchecked-hash pycs, which Python loads without looking at the sources;
+- imports each handler of handlers.json in a fresh interpreter with
+  `-X importtime`, after importing the daemon as the daemon would, and saves
+  the report of the handler's own imports in importtime/<prefix>.txt;
+- saves the sys.path the daemon and each handler resolved, without the
+  entries that do not exist, in sys_path.json. The daemon sets it before
+  importing, so imports scan no missing or unneeded directories;
+- saves the files the daemon and each handler read while importing, in
+  the order they were first read, in reads/<prefix>.txt and
+  reads/daemon.txt, from which scripts/layers.py lays out the per-function
+  overlay drives.
+
+The pycs are not checked against the sources again: run it again on every
+change to /app or a virtualenv, i.e. rebuild the rootfs.
+
+    /root/faas/bin/python /app/bake.py
+"""
+
+import argparse
+import compileall
+import json
+import os
+import py_compile
+import subprocess
+import sys
+
+APP = os.path.dirname(os.path.abspath(__file__))
+VIRTUALENVS = ["/root/faas", "/root/ir"]
+MARKER = "faasnap-bake-handler"
+
+# imports the daemon and then the handler, and prints both import paths and
+# the files each read: opened, in order, then the mapped ones, e.g. libraries
+IMPORT = """
+import json, os, sys
+opened = []
+sys.addaudithook(lambda event, args: event == "open" and isinstance(args[0], str) and opened.append(args[0]))
+def reads():
+    with open("/proc/self/maps") as f:
+        mapped = [line.split(None, 5)[5].strip() for line in f if len(line.split(None, 5)) == 6]
+    files = [os.path.abspath(p) for p in opened + mapped if not p.startswith("[")]
+    files = [p for p in files if not p.startswith(("/proc/", "/sys/", "/dev/"))]
+    del opened[:]
+    return files
+sys.path[0] = {app!r}
+import daemon
+base = list(sys.path)
+daemon_reads = reads()
+sys.stderr.write({marker!r} + "\\n")
+sys.stderr.flush()
+daemon.registry.load({prefix!r})
+handler_reads = [p for p in reads() if p not in set(daemon_reads)]
+print(json.dumps({{"daemon": base, "handler": sys.path, "reads": [daemon_reads, handler_reads]}}))
+"""
+
+
+def compile_tree(path):
+    """Compiles all sources under path, replacing the timestamp pycs pip
+    wrote. :return: whether all compiled; some packages ship sources of
+    other Python versions, e.g. in their tests."""
+    return compileall.compile_dir(path, quiet=2, force=True, workers=0,
+                                  invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH)
+
+
+def existing(paths):
+    """paths that exist, without repeats, in order."""
+    seen = set()
+    result = []
+    for p in paths:
+        if p and p not in seen and os.path.exists(p):
+            seen.add(p)
+            result.append(p)
+    return result
+
+
+def parse_importtime(lines):
+    """(self us, cumulative us, module, depth) of -X importtime lines."""
+    modules = []
+    for line in lines:
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        modules.append((int(self_us), int(cumulative), name.strip(), depth))
+    return modules
+
+
+def import_handler(entry, reports):
+    """Imports the handler of entry with -X importtime; returns its and the
+    daemon's import paths."""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    code = IMPORT.format(app=APP, marker=MARKER, prefix=entry["prefix"])
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=APP, env=env,
+                          stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+    lines = proc.stderr.splitlines()
+    if MARKER in lines:
+        lines = lines[lines.index(MARKER) + 1:]
+    with open(os.path.join(reports, entry["prefix"] + ".txt"), "w") as f:
+        f.write("\n".join(lines) + "\n")
+    if proc.returncode != 0:
+        print("import of", entry["module"], "failed:", proc.stderr.strip().splitlines()[-1], file=sys.stderr)
+        return None
+    return json.loads(proc.stdout.splitlines()[-1])
+
+
+def summarize(prefix, modules, top):
+    total = sum(cumulative for _, cumulative, _, depth in modules if depth == 0)
+    slowest = sorted(modules, reverse=True)[:top]
+    print("%s: %d modules imported in %.1f ms, slowest: %s" % (
+        prefix, len(modules), total / 1000,
+        ", ".join("%s %.1f ms" % (name, self_us / 1000) for self_us, _, name, _ in slowest)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompile the function daemon and its handlers")
+    parser.add_argument("--venv", nargs="*", default=VIRTUALENVS, help="virtualenvs to compile")
+    parser.add_argument("--top", type=int, default=5, help="slowest imports printed per handler")
+    args = parser.parse_args(argv)
+
+    frozen = os.path.join(APP, "sys_path.json")
+    if os.path.exists(frozen):
+        os.remove(frozen)  # resolve the paths afresh
+    for path in [APP] + [os.path.join(venv, "lib") for venv in args.venv]:
+        if os.path.isdir(path) and not compile_tree(path):
+            print("some sources under", path, "did not compile", file=sys.stderr)
+
+    reports = os.path.join(APP, "importtime")
+    os.makedirs(reports, exist_ok=True)
+    with open(os.path.join(APP, "handlers.json")) as f:
+        entries = json.load(f)
+    reads = os.path.join(APP, "reads")
+    os.makedirs(reads, exist_ok=True)
+    paths = {"daemon": None, "handlers": {}}
+    for entry in entries:
+        resolved = import_handler(entry, reports)
+        with open(os.path.join(reports, entry["prefix"] + ".txt")) as f:
+            summarize(entry["prefix"], parse_importtime(f), args.top)
+        if resolved is None:
+            continue
+        paths["daemon"] = existing(resolved["daemon"])
+        paths["handlers"][entry["module"]] = existing(resolved["handler"])
+        for name, files in zip(["daemon", entry["prefix"]], resolved["reads"]):
+            with open(os.path.join(reads, name + ".txt"), "w") as f:
+                f.writelines(p + "\n" for p in existing(files) if os.path.isfile(p))
+    if paths["daemon"]:
+        with open(frozen, "w") as f:
+            json.dump(paths, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
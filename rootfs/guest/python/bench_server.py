@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""Compare the request overhead of the guest server backends.
+
+Starts daemon.py once per backend (FAASNAP_GUEST_SERVER=flask|lean) and, for
+one function, measures:
+
+- latency: round trip of sequential keep-alive requests, minus the time the
+  handler itself reported in X-Faasnap-Handler-Ms, i.e. the overhead of the
+  server;
+- faults: minor page faults of the server per request;
+- touched: pages the server references to serve one request, counted by
+  clearing the referenced bits of the process (/proc/<pid>/clear_refs)
+  before each request. After a restore each of these pages is a page fault,
+  so this is the working set a backend adds to every invocation.
+
+Run it inside the guest (or anywhere flask and waitress are installed):
+
+    python3 bench_server.py --function h-hello-world --requests 2000
+"""
+
+import argparse
+import http.client
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PAGE_KB = os.sysconf("SC_PAGE_SIZE") // 1024
+
+
+def start(backend, port):
+    env = dict(os.environ, FAASNAP_GUEST_SERVER=backend, upstream_port=str(port))
+    proc = subprocess.Popen([sys.executable, os.path.join(HERE, "daemon.py")], cwd=HERE, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            return proc
+        except OSError:
+            if proc.poll() is not None:
+                break
+            time.sleep(0.02)
+    proc.kill()
+    raise RuntimeError("%s server did not start" % backend)
+
+
+def minflt(pid):
+    with open("/proc/%d/stat" % pid) as f:
+        return int(f.read().rsplit(")", 1)[1].split()[7])
+
+
+def referenced_kb(pid):
+    with open("/proc/%d/smaps_rollup" % pid) as f:
+        for line in f:
+            if line.startswith("Referenced:"):
+                return int(line.split()[1])
+    return 0
+
+
+def rss_kb(pid):
+    with open("/proc/%d/status" % pid) as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+def request(conn, function, body):
+    t1 = time.perf_counter()
+    conn.request("POST", "/invoke?function=" + function, body, {"Content-Type": "application/json"})
+    resp = conn.getresponse()
+    resp.read()
+    elapsed = time.perf_counter() - t1
+    if resp.status >= 300:
+        raise RuntimeError("%s: %d" % (function, resp.status))
+    handler = float(resp.getheader("X-Faasnap-Handler-Ms", 0)) / 1000
+    return elapsed - handler
+
+
+def bench(backend, port, function, body, requests, rounds):
+    proc = start(backend, port)
+    try:
+        conn = http.client.HTTPConnection("127.0.0.1", port)
+        for _ in range(20):  # import the handler, warm the caches
+            request(conn, function, body)
+        faults = minflt(proc.pid)
+        overheads = [request(conn, function, body) for _ in range(requests)]
+        faults = (minflt(proc.pid) - faults) / requests
+        touched = []
+        for _ in range(rounds):
+            with open("/proc/%d/clear_refs" % proc.pid, "w") as f:
+                f.write("1")
+            request(conn, function, body)
+            touched.append(referenced_kb(proc.pid) // PAGE_KB)
+        conn.close()
+        overheads.sort()
+        return {
+            "backend": backend,
+            "p50_us": overheads[len(overheads) // 2] * 1e6,
+            "p99_us": overheads[int(len(overheads) * 0.99)] * 1e6,
+            "faults": faults,
+            "touched": statistics.median(touched),
+            "rss_kb": rss_kb(proc.pid),
+        }
+    finally:
+        proc.kill()
+        proc.wait()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the request overhead of the guest server backends")
+    parser.add_argument("--function", default="h-hello-world")
+    parser.add_argument("--params", default="{}", help="request body")
+    parser.add_argument("--backends", nargs="+", default=["flask", "lean"])
+    parser.add_argument("--requests", type=int, default=1000, help="requests timed per backend")
+    parser.add_argument("--rounds", type=int, default=50, help="requests whose touched pages are counted")
+    parser.add_argument("--port", type=int, default=5099)
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args(argv)
+
+    results = [bench(backend, args.port, args.function, args.params, args.requests, args.rounds)
+               for backend in args.backends]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print("%-8s %10s %10s %12s %14s %10s" % ("backend", "p50 us", "p99 us", "faults/req", "touched pages", "rss KiB"))
+    for r in results:
+        print("%-8s %10.1f %10.1f %12.2f %14d %10d" % (
+            r["backend"], r["p50_us"], r["p99_us"], r["faults"], r["touched"], r["rss_kb"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -20,22 +20,21 @@ except Exception:
     sys.exit(1)
 
 
-from flask import Flask, request, jsonify
-from waitress import serve
+import ctypes
+import gc
+import importlib
 import os
 import time
 import json
 
-app = Flask(__name__)
-
 
 class Event:
-    def __init__(self):
-        self.body = request.get_data()
-        self.headers = request.headers
-        self.method = request.method
-        self.query = request.args
-        self.path = request.path
+    def __init__(self, body, headers, method, query, path):
+        self.body = body
+        self.headers = headers
+        self.method = method
+        self.query = query
+        self.path = path
 
 
 class Context:
@@ -43,7 +42,109 @@ class Context:
         self.hostname = os.getenv("HOSTNAME", "localhost")
 
 
-def invoke(funcname, event, context):
+class Registry:
+    """Handler modules by function name prefix, as listed in handlers.json.
+
+    An entry may name a "warm" function of its module, which preload calls
+    to do the work a first invocation would, e.g. loading a model.
+
+    sys_path.json next to it, written by bake.py when the rootfs is built,
+    holds the import paths the daemon and each handler resolved then.
+    """
+
+    def __init__(self, path):
+        with open(path) as f:
+            self.entries = json.load(f)
+        self.sys_path = {"daemon": None, "handlers": {}}
+        frozen = os.path.join(os.path.dirname(path), "sys_path.json")
+        if os.path.exists(frozen):
+            with open(frozen) as f:
+                self.sys_path = json.load(f)
+
+    def find(self, funcname):
+        for entry in self.entries:
+            if funcname.startswith(entry["prefix"]):
+                return entry
+        return None
+
+    def load(self, funcname):
+        """Returns the handler module of funcname, or None, and the seconds
+        spent importing it (0 once it was imported)."""
+        entry = self.find(funcname)
+        if entry is None:
+            return None, 0.0
+        if entry["module"] in sys.modules:
+            return sys.modules[entry["module"]], 0.0
+        t1 = time.perf_counter()
+        frozen = self.sys_path["handlers"].get(entry["module"])
+        if frozen:
+            # the handler's paths first, as its virtualenv would put them;
+            # the others stay for the handlers already imported
+            sys.path[:] = frozen + [p for p in sys.path if p not in frozen]
+        module = importlib.import_module(entry["module"])
+        return module, time.perf_counter() - t1
+
+    def preload(self, funcname):
+        entry = self.find(funcname)
+        module, imported = self.load(funcname)
+        if module is None:
+            return {"statusCode": 404, "body": {"error": "no handler for " + funcname}}
+        t1 = time.perf_counter()
+        if entry.get("warm"):
+            getattr(module, entry["warm"])()
+        return {"statusCode": 200, "body": {
+            "handler": module.__name__,
+            "import": imported,
+            "warm": time.perf_counter() - t1,
+        }}
+
+
+registry = Registry(os.path.join(os.path.dirname(os.path.abspath(__file__)), "handlers.json"))
+if registry.sys_path["daemon"]:
+    sys.path[:] = registry.sys_path["daemon"]
+
+
+def rss_kb():
+    usage = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key in ("VmRSS", "RssAnon", "RssFile"):
+                usage[key] = int(value.split()[0])
+    return usage
+
+
+def quiesce(funcname):
+    """Settles the heap before a snapshot is taken.
+
+    Imports the handler of funcname, collects garbage and freezes every
+    surviving object into the permanent generation, so collections after
+    restore do not walk (and fault in) the pages of old objects, then
+    returns free heap memory to the kernel.
+    """
+    t1 = time.time()
+    handler, _ = registry.load(funcname)
+    before = rss_kb()
+    collected = gc.collect()
+    gc.freeze()
+    after_gc = rss_kb()
+    trimmed = ctypes.CDLL("libc.so.6").malloc_trim(0)
+    after = rss_kb()
+    t2 = time.time()
+    return {"statusCode": 200 if handler else 404, "body": {
+        "latency": t2 - t1,
+        "handler": handler.__name__ if handler else None,
+        "collected": collected,
+        "frozen": gc.get_freeze_count(),
+        "trimmed": bool(trimmed),
+        "rss_kb": {"before": before, "after_gc": after_gc, "after": after},
+        "rss_delta_kb": {k: after[k] - before[k] for k in before},
+    }}
+
+
+def invoke(funcname, event, context, timings):
+    """Calls the handler of funcname; timings gets the seconds spent in the
+    "import" and "handler" phases."""
     if funcname.startswith("run"):
         t1 = time.time()
         import subprocess
@@ -51,37 +152,72 @@ def invoke(funcname, event, context):
         subprocess.run(req["command"], shell=True, check=True)
         t2 = time.time()
         return {"statusCode": 200, "body": {"latency": t2 - t1}}
-    elif funcname.startswith("chameleon"):
-        from Chameleon import handler as chameleon
-        return chameleon.handle(event, context)
-    elif funcname.startswith("dynamic-html"):
-        from dynamic_html import handler as dynamic_html
-        return dynamic_html.handle(event, context)
-    elif funcname.startswith("h-hello-world"):
-        from h_hello_world import handler as h_hello_world
-        return h_hello_world.handle(event, context)
-    elif funcname.startswith("h-memory"):
-        from h_memory import handler as h_memory
-        return h_memory.handle(event, context)
-    elif funcname.startswith("image-processing"):
-        from image_processing import handler as image_processing
-        return image_processing.handle(event, context)
-    elif funcname.startswith("image-recognition"):
-        from image_recognition import handler as image_recognition
-        return image_recognition.handle(event, context)
-    elif funcname.startswith("pyaes"):
-        from Pyaes import handler as pyaes
-        return pyaes.handle(event, context)
-    elif funcname.startswith("video-processing"):
-        from video_processing import handler as video_processing
-        return video_processing.handle(event, context)
-    elif funcname.startswith("json-serde"):
-        from json_serde import handler as json_serde
-        return json_serde.handle(event, context)
-    elif funcname.startswith("pagerank"):
-        from pagerank import handler as pagerank
-        return pagerank.handle(event, context)
-    
+    handler, timings["import"] = registry.load(funcname)
+    if handler is None:
+        return None
+    t1 = time.perf_counter()
+    try:
+        return handler.handle(event, context)
+    finally:
+        timings["handler"] = time.perf_counter() - t1
+
+
+# pre-forked workers that run the handlers, if FAASNAP_GUEST_WORKERS is set
+pool = None
+
+
+def run_in_worker(request):
+    action, funcname, fields = request
+    timings = {}
+    if action == "invoke":
+        return invoke(funcname, Event(*fields), Context(), timings), timings
+    elif action == "quiesce":
+        return quiesce(funcname), timings
+    return registry.preload(funcname), timings
+
+
+def merge_workers(responses):
+    """One response for a quiesce or preload of every pool worker; the
+    first error, e.g. the 404 of an unknown function, as is."""
+    for res in responses:
+        if res.get("statusCode", 200) >= 400:
+            return res
+    bodies = [res["body"] for res in responses]
+    body = {"handler": bodies[0]["handler"], "workers": len(bodies)}
+    for key in ("latency", "import", "warm"):
+        if key in bodies[0]:
+            body[key] = max(b[key] for b in bodies)
+    for key in ("collected", "frozen"):
+        if key in bodies[0]:
+            body[key] = sum(b[key] for b in bodies)
+    if "rss_delta_kb" in bodies[0]:
+        body["rss_delta_kb"] = {k: sum(b["rss_delta_kb"][k] for b in bodies) for k in bodies[0]["rss_delta_kb"]}
+    return {"statusCode": 200, "body": body}
+
+
+def dispatch(path, funcname, event, timings):
+    """Response of a request, whichever server received it."""
+    action = path
+    for name in ("quiesce", "preload"):
+        if funcname.startswith(name):
+            # the host can only reach /invoke, and names the function in the body
+            try:
+                action, funcname = name, json.loads(event.body.decode())["function"]
+            except (ValueError, KeyError, TypeError):
+                return {"statusCode": 400, "body": {"error": name + " needs a JSON body with the function"}}
+    if action in ("quiesce", "preload"):
+        if pool is not None:
+            responses = pool.broadcast((action, funcname, None))
+            return merge_workers([res for res, _ in responses])
+        return quiesce(funcname) if action == "quiesce" else registry.preload(funcname)
+    if pool is None or funcname.startswith("run"):
+        return invoke(funcname, event, Context(), timings)
+    entry = registry.find(funcname)
+    fields = (event.body, dict(event.headers.items()), event.method, dict(event.query.items()), event.path)
+    (res, worker_timings), timings["queue"] = pool.submit(("invoke", funcname, fields), entry and entry["prefix"])
+    timings.update(worker_timings)
+    return res
+
 
 def format_status_code(res):
     if "statusCode" in res:
@@ -97,6 +233,7 @@ def format_body(res, content_type):
     if "body" not in res:
         return ""
     elif type(res["body"]) == dict:
+        from flask import jsonify
         return jsonify(res["body"])
     else:
         return str(res["body"])
@@ -135,22 +272,74 @@ def format_response(res):
     return (body, statusCode, headers)
 
 
-@app.route(
-    "/", defaults={"path": ""}, methods=["GET", "PUT", "POST", "PATCH", "DELETE"]
-)
-@app.route("/<path:path>", methods=["GET", "PUT", "POST", "PATCH", "DELETE"])
-def call_handler(path):
-    funcname = request.args["function"]
-    event = Event()
-    context = Context()
+def flask_app():
+    from flask import Flask, request
 
-    # Call handler
-    response_data = invoke(funcname, event, context)
+    app = Flask(__name__)
 
-    res = format_response(response_data)
-    return res
+    @app.route(
+        "/", defaults={"path": ""}, methods=["GET", "PUT", "POST", "PATCH", "DELETE"]
+    )
+    @app.route("/<path:path>", methods=["GET", "PUT", "POST", "PATCH", "DELETE"])
+    def call_handler(path):
+        funcname = request.args["function"]
+        event = Event(request.get_data(), request.headers, request.method, request.args, request.path)
+
+        # Call handler
+        timings = {}
+        response_data = dispatch(path, funcname, event, timings)
+
+        t1 = time.perf_counter()
+        res = format_response(response_data)
+        timings["serialize"] = time.perf_counter() - t1
+        response = app.make_response(res)
+        for phase, seconds in timings.items():
+            response.headers["X-Faasnap-%s-Ms" % phase.capitalize()] = "%.3f" % (seconds * 1000)
+        return response
+
+    return app
+
+
+def lean_handler(request, timings):
+    import lean
+
+    if "function" not in request.query:
+        raise lean.BadRequest("missing function")
+    event = Event(request.body, request.headers, request.method, request.query, request.path)
+    return dispatch(request.path.strip("/"), request.query["function"], event, timings)
+
+
+# the host waits for this line on the serial console before invoking a
+# cold-booted VM
+READY_MARKER = "faasnap-guest-ready"
+
+
+def notify_ready():
+    try:
+        with open("/dev/ttyS0", "w") as console:
+            console.write(READY_MARKER + "\n")
+    except OSError:
+        traceback.print_exc(file=sys.stderr, limit=0)
 
 
 if __name__ == "__main__":
-    port = os.environ.get("upstream_port", 5000)
-    serve(app, host="0.0.0.0", port=port)
+    port = int(os.environ.get("upstream_port", 5000))
+    # number of pre-forked workers, or "auto" for one per CPU; 0 runs the
+    # handlers in the server process. Set per rootfs build.
+    workers = os.environ.get("FAASNAP_GUEST_WORKERS", "0")
+    workers = os.cpu_count() if workers == "auto" else int(workers)
+    if workers > 0:
+        import pool as worker_pool
+        # forked before the server is imported and starts its threads
+        pool = worker_pool.Pool(workers, run_in_worker, {
+            entry["prefix"]: entry["concurrency"] for entry in registry.entries if entry.get("concurrency")})
+    # "flask" (Flask on waitress) or "lean" (lean.py), set per rootfs build
+    if os.environ.get("FAASNAP_GUEST_SERVER", "flask") == "lean":
+        import lean
+        server = lean.Server(("0.0.0.0", port), lean_handler)
+    else:
+        from waitress.server import create_server
+        # connections queue on the socket as soon as it is bound
+        server = create_server(flask_app(), host="0.0.0.0", port=port, threads=max(4, workers))
+    notify_ready()
+    server.run()
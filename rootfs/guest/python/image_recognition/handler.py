@@ -39,11 +39,10 @@ class_idx = None
 idx2label = None
 model = None
 
-def handle(event, context):
+def warm():
     global model
     global class_idx
     global idx2label
-    model_process_begin = time()
     if model is None:
         model = resnet50()
         model.load_state_dict(torch.load(MODEL_PATH))
@@ -51,6 +50,10 @@ def handle(event, context):
     if class_idx is None:
         class_idx = json.load(open(CLASS_IDX_PATH, 'r'))
         idx2label = [class_idx[str(k)][1] for k in range(len(class_idx))]
+
+def handle(event, context):
+    model_process_begin = time()
+    warm()
     model_process_end = time()
    
     process_begin = time()
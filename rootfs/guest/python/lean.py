@@ -0,0 +1,184 @@
+"""Minimal HTTP/1.1 server for the function daemon, without Flask.
+
+Serves the same contract as the Flask server, e.g. POST /invoke?function=,
+and sends handler responses as Flask would, but parses requests straight off
+the socket: one thread per connection, keep-alive, Content-Length or chunked
+request bodies. Only the modules below are imported, so restored VMs touch
+far fewer pages per request.
+"""
+
+import json
+import socket
+import sys
+import threading
+import time
+import traceback
+from http import HTTPStatus
+from urllib.parse import parse_qsl, unquote
+
+MAX_LINE = 65536
+
+
+class Headers(dict):
+    """Request headers, looked up case-insensitively."""
+
+    def __getitem__(self, key):
+        return dict.__getitem__(self, key.lower())
+
+    def __contains__(self, key):
+        return dict.__contains__(self, key.lower())
+
+    def get(self, key, default=None):
+        return dict.get(self, key.lower(), default)
+
+
+class Request:
+    def __init__(self, method, path, query, headers, body):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers
+        self.body = body
+
+
+class BadRequest(Exception):
+    pass
+
+
+def read_request(rfile):
+    """Reads one request from rfile, or returns None at the end of the stream."""
+    line = rfile.readline(MAX_LINE)
+    while line in (b"\r\n", b"\n"):  # tolerate blank lines between requests
+        line = rfile.readline(MAX_LINE)
+    if not line:
+        return None
+    try:
+        method, target, version = line.decode("latin-1").split()
+    except ValueError:
+        raise BadRequest("bad request line %r" % line)
+    headers = Headers()
+    while True:
+        line = rfile.readline(MAX_LINE)
+        if line in (b"\r\n", b"\n", b""):
+            break
+        key, _, value = line.decode("latin-1").partition(":")
+        headers[key.strip().lower()] = value.strip()
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        body = read_chunked(rfile)
+    else:
+        body = rfile.read(int(headers.get("content-length", 0)))
+    path, _, query = target.partition("?")
+    request = Request(method, unquote(path), dict(parse_qsl(query, keep_blank_values=True)), headers, body)
+    request.keep_alive = keep_alive(version, headers)
+    return request
+
+
+def read_chunked(rfile):
+    chunks = []
+    while True:
+        size = int(rfile.readline(MAX_LINE).split(b";")[0], 16)
+        if size == 0:
+            while rfile.readline(MAX_LINE) not in (b"\r\n", b"\n", b""):
+                pass  # trailers
+            return b"".join(chunks)
+        chunks.append(rfile.read(size))
+        rfile.readline(MAX_LINE)
+
+
+def keep_alive(version, headers):
+    connection = headers.get("connection", "").lower()
+    if version == "HTTP/1.1":
+        return connection != "close"
+    return connection == "keep-alive"
+
+
+def encode(res):
+    """Status, headers and body of a handler response, as the Flask server sends them."""
+    if res is None:
+        return 200, [("Content-Type", "text/html; charset=utf-8")], b""
+    status = res.get("statusCode", 200)
+    headers = res.get("headers", [])
+    if isinstance(headers, dict):
+        headers = list(headers.items())
+    content_type = res["headers"].get("Content-type", "") if "headers" in res else ""
+    default_type = "text/html; charset=utf-8"
+    if content_type == "application/octet-stream":
+        body = res["body"]
+    elif "body" not in res:
+        body = ""
+    elif type(res["body"]) == dict:
+        body = json.dumps(res["body"], sort_keys=True, separators=(",", ":")) + "\n"
+        default_type = "application/json"
+    else:
+        body = str(res["body"])
+    if isinstance(body, str):
+        body = body.encode()
+    if not any(key.lower() == "content-type" for key, _ in headers):
+        headers = [("Content-Type", default_type)] + list(headers)
+    return status, headers, body
+
+
+def phrase(status):
+    try:
+        return HTTPStatus(status).phrase
+    except ValueError:
+        return ""
+
+
+class Server:
+    """Calls handle(request, timings) for each request and sends the
+    response dict it returns, with the same X-Faasnap-<Phase>-Ms timing
+    headers as the Flask server."""
+
+    def __init__(self, address, handle, backlog=128):
+        self.handle = handle
+        # connections queue on the socket as soon as it is bound
+        self.sock = socket.create_server(address, backlog=backlog)
+
+    def run(self):
+        while True:
+            conn, _ = self.sock.accept()
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            threading.Thread(target=self.serve_connection, args=(conn,), daemon=True).start()
+
+    def serve_connection(self, conn):
+        rfile = conn.makefile("rb")
+        try:
+            while True:
+                try:
+                    request = read_request(rfile)
+                except (BadRequest, ValueError) as e:
+                    self.send(conn, 400, [], str(e).encode(), {}, False)
+                    return
+                if request is None:
+                    return
+                timings = {}
+                try:
+                    res = self.handle(request, timings)
+                except BadRequest as e:
+                    status, headers, body = 400, [], str(e).encode()
+                except Exception:
+                    traceback.print_exc(file=sys.stderr)
+                    status, headers, body = 500, [], b"Internal Server Error"
+                else:
+                    t1 = time.perf_counter()
+                    status, headers, body = encode(res)
+                    timings["serialize"] = time.perf_counter() - t1
+                self.send(conn, status, headers, body, timings, request.keep_alive)
+                if not request.keep_alive:
+                    return
+        except OSError:
+            pass  # the peer went away
+        finally:
+            rfile.close()
+            conn.close()
+
+    def send(self, conn, status, headers, body, timings, keep_alive):
+        lines = ["HTTP/1.1 %d %s" % (status, phrase(status))]
+        lines.extend("%s: %s" % (key, value) for key, value in headers)
+        lines.extend("X-Faasnap-%s-Ms: %.3f" % (phase.capitalize(), seconds * 1000)
+                     for phase, seconds in timings.items())
+        lines.append("Content-Length: %d" % len(body))
+        if not keep_alive:
+            lines.append("Connection: close")
+        conn.sendall(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
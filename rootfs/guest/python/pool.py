@@ -0,0 +1,183 @@
+"""Pre-forked worker processes for the function daemon.
+
+The workers are forked when the daemon starts, long before the VM is
+snapshotted, so a warm or restored VM comes up with all of them and can run
+as many invocations in parallel as it has workers. Requests wait in a queue
+for an idle worker, and for a slot of their key (the function) when the key
+has a concurrency limit.
+
+Requests and responses are pickled over one socketpair per worker.
+"""
+
+import os
+import pickle
+import queue
+import socket
+import struct
+import sys
+import threading
+import time
+import traceback
+
+_LENGTH = struct.Struct("!I")
+
+
+class WorkerError(Exception):
+    """A request failed in a worker; the message is the worker's traceback."""
+
+
+def _write(f, obj):
+    data = pickle.dumps(obj, pickle.HIGHEST_PROTOCOL)
+    f.write(_LENGTH.pack(len(data)) + data)
+    f.flush()
+
+
+def _read(f):
+    header = f.read(_LENGTH.size)
+    if len(header) < _LENGTH.size:
+        raise EOFError("worker closed the connection")
+    return pickle.loads(f.read(_LENGTH.unpack(header)[0]))
+
+
+class Worker:
+    def __init__(self, run, siblings):
+        parent, child = socket.socketpair()
+        self.pid = os.fork()
+        if self.pid == 0:
+            parent.close()
+            for sibling in siblings:  # so workers see EOF when the daemon exits
+                sibling.file.close()
+                sibling.sock.close()
+            self.serve(child.makefile("rwb"), run)
+        child.close()
+        self.sock = parent
+        self.file = parent.makefile("rwb")
+
+    @staticmethod
+    def serve(f, run):
+        """Main loop of the worker process: runs each request it is sent."""
+        status = 0
+        try:
+            while True:
+                request = _read(f)
+                try:
+                    reply = (run(request), None)
+                    data = pickle.dumps(reply, pickle.HIGHEST_PROTOCOL)
+                except Exception:
+                    reply = (None, traceback.format_exc())
+                    data = pickle.dumps(reply, pickle.HIGHEST_PROTOCOL)
+                f.write(_LENGTH.pack(len(data)) + data)
+                f.flush()
+        except EOFError:
+            pass
+        except BaseException:
+            traceback.print_exc(file=sys.stderr)
+            status = 1
+        finally:
+            os._exit(status)
+
+    def send(self, request):
+        _write(self.file, request)
+
+    def receive(self):
+        result, error = _read(self.file)
+        if error is not None:
+            raise WorkerError(error)
+        return result
+
+    def close(self):
+        try:
+            self.file.close()
+        except OSError:
+            pass  # unsent data of a request to a dead worker
+        self.sock.close()
+        try:
+            os.waitpid(self.pid, 0)
+        except ChildProcessError:
+            pass
+
+
+class Pool:
+    """size workers calling run(request) and returning its result.
+
+    limits maps keys, e.g. function name prefixes, to the most requests of
+    that key run at once.
+    """
+
+    def __init__(self, size, run, limits=None):
+        self.size = size
+        self.run = run
+        self.limits = {key: threading.BoundedSemaphore(n) for key, n in (limits or {}).items()}
+        self.workers = []
+        self.idle = queue.Queue()
+        self.broadcast_lock = threading.Lock()
+        for _ in range(size):
+            self.idle.put(self.spawn())
+
+    def spawn(self):
+        worker = Worker(self.run, self.workers)
+        self.workers.append(worker)
+        return worker
+
+    def replace(self, worker):
+        """Forks a new worker for one that died mid-request."""
+        print("pool worker %d died, replacing it" % worker.pid, file=sys.stderr)
+        self.workers.remove(worker)
+        worker.close()
+        return self.spawn()
+
+    def submit(self, request, key=None):
+        """Runs request on the next idle worker.
+
+        :return: (result, seconds spent waiting for a worker)
+        """
+        t1 = time.perf_counter()
+        limit = self.limits.get(key)
+        if limit is not None:
+            limit.acquire()
+        try:
+            worker = self.idle.get()
+            waited = time.perf_counter() - t1
+            try:
+                worker.send(request)
+                return worker.receive(), waited
+            except (OSError, EOFError):
+                worker = self.replace(worker)
+                raise
+            finally:
+                self.idle.put(worker)
+        finally:
+            if limit is not None:
+                limit.release()
+
+    def broadcast(self, request):
+        """Runs request on every worker once they are idle, e.g. to warm or
+        quiesce all of them before a snapshot.
+
+        :return: results, one per worker
+        """
+        with self.broadcast_lock:
+            workers = [self.idle.get() for _ in range(self.size)]
+            try:
+                results, error, sent = [], None, []
+                for i, worker in enumerate(workers):
+                    try:
+                        worker.send(request)
+                        sent.append(i)
+                    except OSError as e:
+                        workers[i] = self.replace(worker)
+                        error = error or e
+                for i in sent:
+                    try:
+                        results.append(workers[i].receive())
+                    except WorkerError as e:
+                        error = error or e
+                    except (OSError, EOFError) as e:
+                        workers[i] = self.replace(workers[i])
+                        error = error or e
+                if error is not None:
+                    raise error
+                return results
+            finally:
+                for worker in workers:
+                    self.idle.put(worker)
@@ -0,0 +1,76 @@
+#! /usr/bin/env bash
+
+# Splits a baked python rootfs into a slim base image, shared by all
+# functions, and one overlay drive per function with the packages only it
+# reads, laid out in the order it reads them. See scripts/layers.py. The
+# guest mounts the overlay drive (/dev/vdb) over the base at boot.
+
+set -ex
+
+IN=$1
+OUT=$2
+OVERLAYS=$3
+LAYERS=layers
+
+sudo umount ./mountpoint || true
+sudo rm -rf ./mountpoint ./staging ./overlaymount
+mkdir -p ./mountpoint ./overlaymount $OVERLAYS
+sudo mount -o ro $IN mountpoint
+
+rm -rf $LAYERS
+sudo python3 scripts/layers.py mountpoint $LAYERS
+sudo chown -R $(id -u):$(id -g) $LAYERS
+
+# base: everything but the overlays, written afresh so it is compact
+sudo rsync -aHAX --exclude-from=$LAYERS/base.exclude mountpoint/ staging/
+sudo mkdir -p staging/overlay staging/usr/local/sbin
+cat <<'EOF' | sudo tee staging/usr/local/sbin/faasnap-overlay
+#! /bin/sh
+# mounts the function's overlay drive, if the VM has one, over the image
+[ -b /dev/vdb ] || exit 0
+set -e
+mount -o ro /dev/vdb /overlay
+for dir in /overlay/*/; do
+    dir=${dir%/}
+    [ "$dir" = /overlay/lost+found ] && continue
+    target=/${dir#/overlay/}
+    mount -t overlay overlay -o ro,lowerdir=$dir:$target $target
+done
+EOF
+sudo chmod 755 staging/usr/local/sbin/faasnap-overlay
+cat <<EOF | sudo tee staging/etc/systemd/system/function-overlay.service
+[Unit]
+Description=Mount the function overlay drive
+DefaultDependencies=no
+After=local-fs.target
+Before=function-daemon.service
+[Service]
+Type=oneshot
+RemainAfterExit=yes
+ExecStart=/usr/local/sbin/faasnap-overlay
+[Install]
+WantedBy=multi-user.target
+EOF
+sudo mkdir -p staging/etc/systemd/system/multi-user.target.wants staging/etc/systemd/system/function-daemon.service.d
+sudo ln -sf /etc/systemd/system/function-overlay.service staging/etc/systemd/system/multi-user.target.wants/function-overlay.service
+printf '[Unit]\nRequires=function-overlay.service\nAfter=function-overlay.service\n' | sudo tee staging/etc/systemd/system/function-daemon.service.d/overlay.conf
+SIZE=$(( $(sudo du -sm staging | cut -f1) * 11 / 10 + 64 ))
+rm -f $OUT
+truncate -s ${SIZE}M $OUT
+sudo mkfs.ext4 -F -q -d staging $OUT
+sudo rm -rf staging
+
+# overlays: files written in read order, so ext4 allocates them in that order
+for files in $LAYERS/*.files; do
+    prefix=$(basename $files .files)
+    overlay=$OVERLAYS/$prefix.ext4
+    SIZE=$(( $(sudo du -csm $(sed 's|^|mountpoint|' $LAYERS/$prefix.units) | tail -1 | cut -f1) * 11 / 10 + 16 ))
+    rm -f $overlay
+    truncate -s ${SIZE}M $overlay
+    mkfs.ext4 -F -q $overlay
+    sudo mount $overlay overlaymount
+    sudo tar -C mountpoint --no-recursion -cf - -T $files | sudo tar -C overlaymount -xpf -
+    sudo umount overlaymount
+done
+
+sudo umount mountpoint
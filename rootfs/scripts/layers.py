@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""Split a baked python rootfs into a shared base and per-function overlays.
+
+Reads the files the daemon and each handler read while importing, as
+guest/python/bake.py saved them in /app/reads, from the image mounted at
+ROOT. The unit of the split is an entry of a virtualenv's site-packages (a
+package directory or module), or a whole virtualenv:
+
+- a virtualenv only one function reads (e.g. /root/ir) goes to its overlay;
+- a site-packages entry only one function reads (e.g. torch, cv2, igraph)
+  goes to its overlay;
+- the rest, including what the daemon reads and what nothing reads, stays
+  in the base.
+
+Writes to OUT base.exclude, the rsync patterns of the units left out of the
+base; <prefix>.units, the units of each overlay; and <prefix>.files, the
+paths of each overlay relative to ROOT in the order to write them: the
+files the function read, in the order it read them, then the rest of its
+units. Called by layer-debian-rootfs.sh:
+
+    sudo scripts/layers.py mountpoint layers
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+
+
+def virtualenvs(root):
+    """Guest paths of the virtualenvs under /root."""
+    return sorted("/" + os.path.relpath(os.path.dirname(p), root)
+                  for p in glob.glob(os.path.join(root, "root", "*", "pyvenv.cfg")))
+
+
+def site_dirs(root, venv):
+    return sorted("/" + os.path.relpath(p, root)
+                  for p in glob.glob(os.path.join(root, venv.lstrip("/"), "lib", "python*", "site-packages")))
+
+
+def read_list(path):
+    with open(path) as f:
+        return [line.rstrip("\n") for line in f if line.strip()]
+
+
+class Units(object):
+    """Maps guest paths to the unit of the split they belong to."""
+
+    def __init__(self, root):
+        self.venvs = virtualenvs(root)
+        self.sites = {venv: site_dirs(root, venv) for venv in self.venvs}
+
+    def venv(self, path):
+        for venv in self.venvs:
+            if path.startswith(venv + "/"):
+                return venv
+        return None
+
+    def entry(self, path):
+        """The site-packages entry path is in, or None."""
+        venv = self.venv(path)
+        for site in self.sites.get(venv, []):
+            if path.startswith(site + "/"):
+                return site + "/" + path[len(site) + 1:].split("/", 1)[0]
+        return None
+
+
+def plan(units, reads):
+    """:return: {prefix: units of its overlay}, from reads, {name: files}
+    with the daemon's under "daemon"."""
+    venv_users, entry_users = {}, {}
+    for name, files in reads.items():
+        for path in files:
+            venv = units.venv(path)
+            if venv:
+                venv_users.setdefault(venv, set()).add(name)
+            entry = units.entry(path)
+            if entry:
+                entry_users.setdefault(entry, set()).add(name)
+    overlays = {name: [] for name in reads if name != "daemon"}
+    for venv, users in sorted(venv_users.items()):
+        if len(users) == 1 and "daemon" not in users:
+            overlays[next(iter(users))].append(venv)
+    moved = set(u for us in overlays.values() for u in us)
+    for entry, users in sorted(entry_users.items()):
+        if len(users) == 1 and "daemon" not in users and units.venv(entry) not in moved:
+            overlays[next(iter(users))].append(entry)
+    return overlays
+
+
+def walk(root, unit):
+    """Guest paths of unit and everything under it, directories first."""
+    host = os.path.join(root, unit.lstrip("/"))
+    yield unit
+    if os.path.islink(host) or not os.path.isdir(host):
+        return
+    for dirpath, dirnames, filenames in os.walk(host):
+        dirnames.sort()
+        guest = "/" + os.path.relpath(dirpath, root)
+        for name in dirnames + sorted(filenames):
+            yield guest + "/" + name
+
+
+def overlay_files(root, unit_list, files):
+    """Paths of the overlay in write order: files read first, in order."""
+    inside = lambda p: any(p == u or p.startswith(u + "/") for u in unit_list)
+    ordered, seen = [], set()
+    for path in [p for p in files if inside(p)] + [p for u in unit_list for p in walk(root, u)]:
+        if path not in seen:
+            seen.add(path)
+            ordered.append(path)
+    return ordered
+
+
+def size(root, paths):
+    total = 0
+    for p in paths:
+        host = os.path.join(root, p.lstrip("/"))
+        if os.path.isfile(host) and not os.path.islink(host):
+            total += os.path.getsize(host)
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Split a baked python rootfs into a base and per-function overlays")
+    parser.add_argument("root", help="the rootfs image, mounted")
+    parser.add_argument("out", help="directory of the lists to write")
+    args = parser.parse_args(argv)
+
+    reads_dir = os.path.join(args.root, "app", "reads")
+    if not os.path.isfile(os.path.join(reads_dir, "daemon.txt")):
+        sys.exit("%s has no import reads; build the rootfs with BAKE_PYC=1" % reads_dir)
+    with open(os.path.join(args.root, "app", "handlers.json")) as f:
+        prefixes = [entry["prefix"] for entry in json.load(f)]
+    reads = {"daemon": read_list(os.path.join(reads_dir, "daemon.txt"))}
+    for prefix in prefixes:
+        path = os.path.join(reads_dir, prefix + ".txt")
+        if os.path.isfile(path):
+            reads[prefix] = read_list(path)
+
+    units = Units(args.root)
+    overlays = plan(units, reads)
+    os.makedirs(args.out, exist_ok=True)
+    with open(os.path.join(args.out, "base.exclude"), "w") as f:
+        f.writelines(u + "\n" for us in overlays.values() for u in us)
+    print("%-20s %6s %9s %9s  %s" % ("function", "files", "MiB", "read MiB", "units"))
+    for prefix, unit_list in sorted(overlays.items()):
+        if not unit_list:
+            continue
+        paths = overlay_files(args.root, unit_list, reads[prefix])
+        with open(os.path.join(args.out, prefix + ".files"), "w") as f:
+            f.writelines(p.lstrip("/") + "\n" for p in paths)
+        with open(os.path.join(args.out, prefix + ".units"), "w") as f:
+            f.writelines(u + "\n" for u in unit_list)
+        read = [p for p in reads[prefix] if any(p.startswith(u + "/") or p == u for u in unit_list)]
+        print("%-20s %6d %9.1f %9.1f  %s" % (prefix, len(paths), size(args.root, paths) / 2**20,
+                                            size(args.root, read) / 2**20, " ".join(unit_list)))
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,9 @@ set -ex
 IN=$1
 OUT=$2
 LANGUAGE_ENV=$3
+GUEST_SERVER=${4:-flask}
+GUEST_WORKERS=${5:-0}
+BAKE_PYC=${6:-1}
 TMPOUT=.$OUT
 
 sudo umount ./mountpoint || true
@@ -15,6 +18,22 @@ cp $IN $TMPOUT
 sudo mount $TMPOUT mountpoint
 sudo mkdir -p mountpoint/app
 sudo cp -r guest/$LANGUAGE_ENV/* mountpoint/app/
+if [ "$LANGUAGE_ENV" = python ]; then
+    # server backend and worker pool of daemon.py, see guest/python/bench_server.py and pool.py
+    sudo mkdir -p mountpoint/etc/systemd/system/function-daemon.service.d
+    printf '[Service]\nEnvironment=FAASNAP_GUEST_SERVER=%s\nEnvironment=FAASNAP_GUEST_WORKERS=%s\n' $GUEST_SERVER $GUEST_WORKERS | sudo tee mountpoint/etc/systemd/system/function-daemon.service.d/server.conf
+    if [ "$BAKE_PYC" = 1 ]; then
+        # unchecked-hash pycs, frozen import paths and import-time reports, see guest/python/bake.py
+        sudo mount -t proc proc mountpoint/proc
+        baked=0
+        sudo chroot mountpoint /root/faas/bin/python /app/bake.py || baked=$?
+        sudo umount mountpoint/proc
+        [ $baked = 0 ]
+        rm -rf importtime && cp -r mountpoint/app/importtime importtime
+        # the image holds every pyc the functions need; nothing is written at runtime
+        printf 'Environment=PYTHONDONTWRITEBYTECODE=1\n' | sudo tee -a mountpoint/etc/systemd/system/function-daemon.service.d/server.conf
+    fi
+fi
 
 sudo umount mountpoint
 mv $TMPOUT $OUT
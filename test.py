@@ -15,6 +15,8 @@ sys.path.extend(["./python_client"])
 from swagger_client.api.default_api import DefaultApi
 import swagger_client as faasnap
 from swagger_client.configuration import Configuration
+from swagger_client import wait
+from swagger_client import guest
 from types import SimpleNamespace
 
 bpf_map = {
@@ -34,6 +36,18 @@ PAUSE = None
 TESTID = None
 RESULT_DIR = None
 BPF = None
+BATCH = None
+FIXED_SLEEP = None
+WAIT_TIMEOUT = 60
+SESSION = None
+SHARED_VM = None
+COPY_MODE = 'auto'
+QUIESCE = False
+PRELOAD = False
+# seconds a REAP recording VM runs on after answering, before it is stopped:
+# StopVM ends the recording, and the guest still faults pages in after the
+# response, e.g. while the handler's objects are freed
+REAP_TAIL = 1
 os.umask(0o777)
 
 def addNetwork(client: DefaultApi, idx: int):
@@ -50,244 +64,476 @@ def addNetwork(client: DefaultApi, idx: int):
     })
 
 clients = {}
+daemon = None # the faasnap daemon process
+registered_functions = {} # func name -> definition registered with the daemon
+registered_networks = set()
+prepared = {} # prepared snapshot ids by cell, reused across repeats in session mode
+
+def settle(seconds, wait_fn, *args, **kwargs):
+    """Block until wait_fn's condition holds, or for the old fixed time if FIXED_SLEEP is set."""
+    if FIXED_SLEEP:
+        time.sleep(seconds)
+    else:
+        kwargs.setdefault('timeout', WAIT_TIMEOUT)
+        wait_fn(*args, **kwargs)
+
+def wait_dropped(client: DefaultApi, ss_ids, state, ws_file=False, timeout=None):
+    """Wait for the snapshots' page cache to be dropped, if state drops it."""
+    mem_file = bool(state.get('drop_cache'))
+    if not mem_file and not ws_file:
+        return
+    for ss_id in ss_ids:
+        wait.wait_for_snapshot_cache_dropped(client, ss_id, mem_file=mem_file, ws_file=ws_file, timeout=timeout or WAIT_TIMEOUT)
+
+def format_dedup(allocated, owned):
+    """Dedup ratio of a copy as the daemon defines it: allocated over owned bytes."""
+    if not allocated:
+        return 'n/a'
+    if not owned:
+        return 'fully shared'
+    return '%.2f' % (allocated / owned)
+
+def print_dedup(client: DefaultApi, copies):
+    """One line per snapshot copy, then the total over the copies."""
+    if not copies:
+        return
+    saved = allocated = shared = 0
+    for snap in copies:
+        status = client.snapshots_ss_id_get(snap.ss_id)
+        saved += status.bytes_saved or 0
+        allocated += status.allocated_bytes or 0
+        shared += status.shared_bytes or 0
+        ratio = 'n/a' if status.dedup_ratio is None else 'fully shared' if status.dedup_ratio == 0 else '%.2f' % status.dedup_ratio
+        print('copied %s by %s, %d MiB saved, dedup ratio %s' % (snap.ss_id, status.copy_method, (status.bytes_saved or 0) >> 20, ratio))
+    print('copied %d snapshots, %d MiB saved, dedup ratio %s' % (len(copies), saved >> 20, format_dedup(allocated, allocated - shared)))
+
+def print_ws_compression(client: DefaultApi, ss_id):
+    status = client.snapshots_ss_id_get(ss_id)
+    if status.ws_compressed:
+        print('ws file compressed %d MiB -> %.1f MiB, ratio %.2f' % (status.ws_raw_bytes >> 20, status.ws_raw_bytes / status.ws_compress_ratio / 2**20, status.ws_compress_ratio))
+
+def output(ret):
+    """The function's JSON body of an invocation made with result_mode='json'.
+
+    The daemon embeds it as is in output; bodies that are not JSON come back
+    as the result string.
+    """
+    if ret.output is not None:
+        return ret.output
+    return json.loads(ret.result)
+
+def quiesce(client: DefaultApi, vm_id, func_name):
+    """Freezes the guest heap after the function ran, before a warm snapshot is taken."""
+    if not QUIESCE:
+        return
+    try:
+        print(guest.quiesce(client, vm_id, func_name))
+    except Exception as e:
+        print(f'quiesce err: {e}')
+
+def preload(client: DefaultApi, vm_id, func_name, force=False):
+    """Imports and warms the handler in a freshly booted VM before its snapshot is taken."""
+    if not (PRELOAD or force):
+        return
+    try:
+        print(guest.preload(client, vm_id, func_name))
+    except Exception as e:
+        print(f'preload err: {e}')
 
 def prepareVanilla(params, client: DefaultApi, setting, func, func_param, par_snap):
     all_snaps = []
     vm = client.vms_post(vm={'func_name': func.name, 'namespace': 'fc%d' % 1})
-    time.sleep(5)
+    settle(5, wait.wait_for_vm_state, client, vm.vm_id, 'running')
     invoc = faasnap.Invocation(func_name=func.name, vm_id=vm.vm_id, params=func_param, mincore=-1, enable_reap=False)
     ret = client.invocations_post(invocation=invoc)
+    quiesce(client, vm.vm_id, func.name)
     print('prepare invoc ret:', ret)
     base = faasnap.Snapshot(vm_id=vm.vm_id, snapshot_type='Full', snapshot_path=params.test_dir+'/Full.snapshot', mem_file_path=params.test_dir+'/Full.memfile', version='0.23.0', **vars(setting.record_regions))
     base_snap = client.snapshots_post(snapshot=base)
     all_snaps.append(base_snap)
     client.vms_vm_id_delete(vm_id=vm.vm_id)
-    time.sleep(2)
+    settle(2, wait.wait_for_vm_stopped, client, vm.vm_id)
     for i in range(par_snap-1):
-        all_snaps.append(client.snapshots_put(base_snap.ss_id, '%s/Full.memfile.%d' % (params.test_dir, i)))
+        all_snaps.append(client.snapshots_put(base_snap.ss_id, '%s/Full.memfile.%d' % (params.test_dir, i), copy_mode=COPY_MODE))
+    print_dedup(client, all_snaps[1:])
     for snap in all_snaps:
         client.snapshots_ss_id_patch(ss_id=snap.ss_id, state=vars(setting.patch_state)) # drop cache
-    time.sleep(1)
+    settle(1, wait_dropped, client, [snap.ss_id for snap in all_snaps], vars(setting.patch_state))
     return [snap.ss_id for snap in all_snaps]
 
 def prepareMincore(params, client: DefaultApi, setting, func, func_param, par_snap):
     all_snaps = []
     vm = client.vms_post(vm={'func_name': func.name, 'namespace': 'fc%d' % 1})
-    time.sleep(5)
+    settle(5, wait.wait_for_vm_state, client, vm.vm_id, 'running')
+    preload(client, vm.vm_id, func.name)
     base_snap = client.snapshots_post(snapshot=faasnap.Snapshot(vm_id=vm.vm_id, snapshot_type='Full', snapshot_path=params.test_dir+'/Full.snapshot', mem_file_path=params.test_dir+'/Full.memfile', version='0.23.0'))
     client.vms_vm_id_delete(vm_id=vm.vm_id)
+    settle(0, wait.wait_for_vm_stopped, client, vm.vm_id)
     client.snapshots_ss_id_patch(ss_id=base_snap.ss_id, state=vars(setting.patch_base_state)) # drop cache
-    time.sleep(2)
+    settle(2, wait_dropped, client, [base_snap.ss_id], vars(setting.patch_base_state))
     # input("Press Enter to start 1st invocation...")
     if setting.mincore_size > 0:
         mincore = -1
     else:
         mincore = 100
-    invoc = faasnap.Invocation(func_name=func.name, ss_id=base_snap.ss_id, params=func_param, mincore=mincore, mincore_size=setting.mincore_size, enable_reap=False, namespace='fc%d'%1, use_mem_file=True)
+    invoc = faasnap.Invocation(func_name=func.name, ss_id=base_snap.ss_id, params=func_param, mincore=mincore, mincore_size=setting.mincore_size, enable_reap=False, namespace='fc%d'%1, use_mem_file=True, result_mode='json')
     ret = client.invocations_post(invocation=invoc)
     newVmID = ret.vm_id
     try:
-        r = ret.to_dict()['result']
-        r = json.loads(r)
+        r = output(ret)
         print(f"prepare invoc func lat: {r['latency']}")
     except Exception as e:
         print(f'prepare invoc func err: {e}')
     # print('prepare invoc ret:', ret)
+    quiesce(client, newVmID, func.name)
     ret = client.invocations_post(invocation=faasnap.Invocation(func_name='run', vm_id=newVmID, params="{\"command\": \"echo 8 > /proc/sys/vm/drop_caches\"}", mincore=-1, enable_reap=False)) # disable sanitizing
     warm_snap = client.snapshots_post(snapshot=faasnap.Snapshot(vm_id=newVmID, snapshot_type='Full', snapshot_path=params.test_dir+'/Warm.snapshot', mem_file_path=params.test_dir+'/Warm.memfile', version='0.23.0', **vars(setting.record_regions)))
     all_snaps.append(warm_snap)
     client.vms_vm_id_delete(vm_id=newVmID)
-    time.sleep(2)
+    settle(2, wait.wait_for_vm_stopped, client, newVmID)
     client.snapshots_ss_id_mincore_put(ss_id=warm_snap.ss_id, source=base_snap.ss_id) # carry over mincore to new snapshot
     client.snapshots_ss_id_mincore_patch(ss_id=warm_snap.ss_id, state=vars(setting.patch_mincore))
     for i in range(par_snap-1):
-        all_snaps.append(client.snapshots_put(warm_snap.ss_id, '%s/Full.memfile.%d' % (params.test_dir, i)))
+        all_snaps.append(client.snapshots_put(warm_snap.ss_id, '%s/Full.memfile.%d' % (params.test_dir, i), copy_mode=COPY_MODE))
+    print_dedup(client, all_snaps[1:])
     client.snapshots_ss_id_patch(ss_id=base_snap.ss_id, state=vars(setting.patch_base_state)) # drop cache
     for snap in all_snaps:
         client.snapshots_ss_id_patch(ss_id=snap.ss_id, state=vars(setting.patch_state)) # drop cache
         client.snapshots_ss_id_mincore_patch(ss_id=warm_snap.ss_id, state={'drop_ws_cache': True})
     # input("Press Enter to start finish invocation...")
-    time.sleep(1)
+    settle(1, wait_dropped, client, [snap.ss_id for snap in all_snaps], vars(setting.patch_state))
+    settle(0, wait_dropped, client, [warm_snap.ss_id], {}, ws_file=True)
+    print_ws_compression(client, warm_snap.ss_id)
 
     return [snap.ss_id for snap in all_snaps]
 
 def prepareReap(params, client: DefaultApi, setting, func, func_param, idx):
     vm = client.vms_post(vm={'func_name': func.name, 'namespace': 'fc%d' % idx})
-    time.sleep(5)
+    settle(5, wait.wait_for_vm_state, client, vm.vm_id, 'running')
     invoc = faasnap.Invocation(func_name=func.name, vm_id=vm.vm_id, params=func_param, mincore=-1, enable_reap=False)
     ret = client.invocations_post(invocation=invoc)
+    quiesce(client, vm.vm_id, func.name)
     print('1st prepare invoc ret:', ret)
-    base = faasnap.Snapshot(vm_id=vm.vm_id, snapshot_type='Full', snapshot_path=params.test_dir+'/Full.snapshot'+str(idx), mem_file_path=params.test_dir+'/Full.memfile'+str(idx), version='0.23.0')
+    base = faasnap.Snapshot(vm_id=vm.vm_id, snapshot_type='Full', snapshot_path=params.test_dir+'/Full.snapshot'+str(idx), mem_file_path=params.test_dir+'/Full.memfile'+str(idx), version='0.23.0', compress_ws=getattr(setting, 'compress_ws', False))
     base_snap = client.snapshots_post(snapshot=base)
     client.vms_vm_id_delete(vm_id=vm.vm_id)
-    time.sleep(1)
+    settle(1, wait.wait_for_vm_stopped, client, vm.vm_id)
     client.snapshots_ss_id_patch(ss_id=base_snap.ss_id, state=vars(setting.patch_state)) # drop cache
-    time.sleep(1)
+    settle(1, wait_dropped, client, [base_snap.ss_id], vars(setting.patch_state))
     invoc = faasnap.Invocation(func_name=func.name, ss_id=base_snap.ss_id, params=func_param, mincore=-1, enable_reap=True, ws_file_direct_io=True, namespace='fc%d'%1)
     ret = client.invocations_post(invocation=invoc)
     print('2nd prepare invoc ret:', ret)
-    time.sleep(1)
+    time.sleep(REAP_TAIL)
     client.vms_vm_id_delete(vm_id=ret.vm_id)
-    time.sleep(2)
+    settle(2, wait.wait_for_vm_stopped, client, ret.vm_id)
     client.snapshots_ss_id_patch(ss_id=base_snap.ss_id, state=vars(setting.patch_state)) # drop cache
     client.snapshots_ss_id_reap_patch(ss_id=base_snap.ss_id, cache=False) # drop reap cache
-    time.sleep(1)
+    settle(1, wait_dropped, client, [base_snap.ss_id], vars(setting.patch_state))
+    print_ws_compression(client, base_snap.ss_id)
     return [base_snap.ss_id]
 
 def prepareEmuMincore(params, client: DefaultApi, setting, func, func_param):
     vm = client.vms_post(vm={'func_name': func.name, 'namespace': 'fc%d' % 1})
-    time.sleep(5)
+    settle(5, wait.wait_for_vm_state, client, vm.vm_id, 'running')
     invoc = faasnap.Invocation(func_name=func.name, vm_id=vm.vm_id, params=func_param, mincore=-1, enable_reap=False)
     ret = client.invocations_post(invocation=invoc)
+    quiesce(client, vm.vm_id, func.name)
     print('1st prepare invoc ret:', ret)
     snapshot = client.snapshots_post(snapshot=faasnap.Snapshot(vm_id=vm.vm_id, snapshot_type='Full', snapshot_path=params.test_dir+'/Full.snapshot', mem_file_path=params.test_dir+'/Full.memfile', version='0.23.0', **vars(setting.record_regions)))
     client.vms_vm_id_delete(vm_id=vm.vm_id)
-    time.sleep(1)
+    settle(1, wait.wait_for_vm_stopped, client, vm.vm_id)
     client.snapshots_ss_id_patch(ss_id=snapshot.ss_id, state=vars(setting.patch_state)) # drop cache
-    time.sleep(1)
+    settle(1, wait_dropped, client, [snapshot.ss_id], vars(setting.patch_state))
     invoc = faasnap.Invocation(func_name=func.name, ss_id=snapshot.ss_id, params=func_param, mincore=-1, enable_reap=True, ws_file_direct_io=True, namespace='fc%d'%1) # get emulated mincore
     ret = client.invocations_post(invocation=invoc)
     print('2nd prepare invoc ret:', ret)
-    time.sleep(1)
+    time.sleep(REAP_TAIL)
     client.vms_vm_id_delete(vm_id=ret.vm_id)
-    time.sleep(2)
+    settle(2, wait.wait_for_vm_stopped, client, ret.vm_id)
     client.snapshots_ss_id_reap_patch(ss_id=snapshot.ss_id, cache=False) # drop reap cache
     client.snapshots_ss_id_mincore_patch(ss_id=snapshot.ss_id, state=vars(setting.patch_mincore))
     client.snapshots_ss_id_patch(ss_id=snapshot.ss_id, state=vars(setting.patch_state)) # drop cache
-    time.sleep(1)
+    settle(1, wait_dropped, client, [snapshot.ss_id], vars(setting.patch_state))
     return [snapshot.ss_id]
 
-def invoke(args):
-    params, setting, func, func_param, idx, ss_id, par, par_snap, record_input, test_input = args
-    if par > 1 or par_snap > 1:
-        runId = '%s_%s_%d_%d' % (setting.name, func.id, par, par_snap)
+def start_daemon(params):
+    """Start the daemon unless it is already up. Returns True if it was started."""
+    global daemon
+    if daemon is not None and daemon.poll() is None:
+        return False
+    daemon = subprocess.Popen(['./main', '--port=8080', '--host=0.0.0.0'], cwd=params.home_dir, stdout=open('%s/%s/stdout' % (RESULT_DIR, TESTID), 'a+') if RESULT_DIR else open('/tmp/faasnap-stdout', 'a+'), stderr=subprocess.STDOUT)
+    registered_functions.clear()
+    registered_networks.clear()
+    prepared.clear()
+    return True
+
+def stop_daemon():
+    global daemon
+    if daemon is None:
+        return
+    daemon.terminate()
+    daemon.wait()
+    daemon = None
+
+def setup_cell(params, setting, func, par, startup_sleep):
+    """Bring up the daemon, clients, network namespaces and function a cell needs."""
+    if start_daemon(params):
+        settle(startup_sleep, wait.wait_for_daemon, faasnap.DefaultApi(faasnap.ApiClient(conf)))
+    for idx in range(1, 1+par):
+        if idx not in clients:
+            clients[idx] = faasnap.DefaultApi(faasnap.ApiClient(conf))
+        if idx not in registered_networks:
+            addNetwork(clients[idx], idx)
+            registered_networks.add(idx)
+    function = faasnap.Function(func_name=func.name, image=func.image, overlay=getattr(func, 'overlay', None), kernel=setting.kernel, vcpu=params.vcpu)
+    if registered_functions.get(func.name) != function:
+        clients[1].functions_post(function=function)
+        registered_functions[func.name] = function
+    return clients[1]
+
+def end_cell(client: DefaultApi, teardown_sleep):
+    """Stop the daemon, or in session mode stop every VM and keep the daemon up."""
+    if SESSION:
+        client.vms_delete()
+        settle(teardown_sleep, wait.wait_for_vms_stopped, client)
     else:
-        runId = '%s_%s_%d%d' % (setting.name, func.id, record_input, test_input)
-    bpfpipe = None
-    time.sleep(1)
+        stop_daemon() # waits for the daemon to exit
+
+def reset_snapshots(client: DefaultApi, setting, ssIds):
+    """Reset prepared snapshots to their state after preparation, for reuse by the next repeat."""
+    for ss_id in ssIds:
+        client.snapshots_ss_id_patch(ss_id=ss_id, state=vars(setting.patch_state)) # drop cache
+        if setting.prepare_steps in ('mincore', 'emumincore'):
+            client.snapshots_ss_id_mincore_patch(ss_id=ss_id, state={'drop_ws_cache': setting.prepare_steps == 'mincore', 'reset_load': True})
+        if setting.prepare_steps in ('reap', 'emumincore'):
+            client.snapshots_ss_id_reap_patch(ss_id=ss_id, cache=False) # drop reap cache
+    settle(1, wait_dropped, client, ssIds, vars(setting.patch_state), ws_file=setting.prepare_steps == 'mincore')
+
+def prepare(params, client: DefaultApi, setting, func, par_snap, record_input):
+    key = (setting.name, func.id, par_snap, record_input)
+    if key in prepared:
+        reset_snapshots(client, setting, prepared[key])
+        return prepared[key]
+    params0 = func.params[record_input]
+    ssIds = None
+    if setting.prepare_steps == 'vanilla':
+        ssIds = prepareVanilla(params, client, setting, func, params0, par_snap=par_snap)
+    elif setting.prepare_steps == 'mincore':
+        ssIds = prepareMincore(params, client, setting, func, params0, par_snap=par_snap)
+    elif setting.prepare_steps == 'reap':
+        ssIds = []
+        for idx in range(par_snap):
+            ssIds += prepareReap(params, client, setting, func, params0, idx=idx+1)
+    elif setting.prepare_steps == 'emumincore':
+        ssIds = prepareEmuMincore(params, client, setting, func, params0)
+    if SESSION:
+        # snapshot files are overwritten by the next prepare, so only the latest can be reused
+        prepared.clear()
+        prepared[key] = ssIds
+    return ssIds
+
+def run_id(setting, func, par, par_snap, record_input, test_input):
+    if par > 1 or par_snap != 1: # par_snap 0: the par invocations shared one VM
+        return '%s_%s_%d_%d' % (setting.name, func.id, par, par_snap)
+    return '%s_%s_%d%d' % (setting.name, func.id, record_input, test_input)
+
+def make_invocation(setting, func, func_param, idx, ss_id):
     mcstate = None
     if setting.invoke_steps == "vanilla":
-        invoc = faasnap.Invocation(func_name=func.name, ss_id=ss_id, params=func_param, mincore=-1, enable_reap=False, namespace='fc%d'%idx, **vars(setting.invocation))
+        invoc = faasnap.Invocation(func_name=func.name, ss_id=ss_id, params=func_param, mincore=-1, enable_reap=False, namespace='fc%d'%idx, result_mode='json', **vars(setting.invocation))
     elif setting.invoke_steps == "mincore":
         mcstate = clients[idx].snapshots_ss_id_mincore_get(ss_id=ss_id)
-        invoc = faasnap.Invocation(func_name=func.name, ss_id=ss_id, params=func_param, mincore=-1, load_mincore=[n + 1 for n in range(mcstate.nlayers)], enable_reap=False, namespace='fc%d'%idx, **vars(setting.invocation))
+        invoc = faasnap.Invocation(func_name=func.name, ss_id=ss_id, params=func_param, mincore=-1, load_mincore=[n + 1 for n in range(mcstate.nlayers)], enable_reap=False, namespace='fc%d'%idx, result_mode='json', **vars(setting.invocation))
     elif setting.invoke_steps == "reap":
-        invoc = faasnap.Invocation(func_name=func.name, ss_id=ss_id, params=func_param, mincore=-1, enable_reap=True, ws_single_read=True, namespace='fc%d'%idx)
+        invoc = faasnap.Invocation(func_name=func.name, ss_id=ss_id, params=func_param, mincore=-1, enable_reap=True, ws_single_read=True, namespace='fc%d'%idx, result_mode='json')
     else:
-        print('invoke steps undefined')
-        return
-    if BPF:
-        program = bpf_map[BPF]
-        bpffile = open('%s/%s/bpftrace' % (RESULT_DIR, TESTID), 'a+') if RESULT_DIR else open('/tmp/bpftrace', 'a+')
-        print('==== %s ====' % runId, file=bpffile, flush=True)
-        bpfpipe = subprocess.Popen(['bpftrace', '-e', program], cwd='/tmp/', stdout=bpffile, stderr=subprocess.STDOUT)
-        time.sleep(3)
+        return None, None
+    return invoc, mcstate
 
-    ret = clients[idx].invocations_post(invocation=invoc)
+def start_pools(client: DefaultApi, setting, func, func_param, ssIds, par):
+    """Fill a pool of paused VMs for each snapshot before the measured invocations, which claim them.
+
+    The pooled VMs hold namespaces fc<par+1>..fc<2*par> of their own for as long as they run.
+    """
+    pools = {}
+    for idx in range(1, 1+par):
+        ns_idx = par + idx
+        if ns_idx not in registered_networks:
+            addNetwork(client, ns_idx)
+            registered_networks.add(ns_idx)
+        pools.setdefault(ssIds[idx-1] if len(ssIds) > 1 else ssIds[0], []).append('fc%d' % ns_idx)
+    for ss_id, namespaces in pools.items():
+        invoc, _ = make_invocation(setting, func, func_param, 1, ss_id)
+        client.snapshots_ss_id_pool_put(ss_id, faasnap.PoolConfig(namespaces=namespaces, invocation=invoc))
+    for ss_id in pools:
+        status = wait.wait_for_pool_ready(client, ss_id, timeout=WAIT_TIMEOUT)
+        print('pool %s: %d VMs restored, %.1f ms each' % (ss_id, status.idle, status.refill_ms or 0))
+    return list(pools)
+
+def stop_pools(client: DefaultApi, ssIds):
+    for ss_id in ssIds:
+        status = client.snapshots_ss_id_pool_get(ss_id)
+        print('pool %s: %d hits, %d misses, %d refills' % (ss_id, status.hits or 0, status.misses or 0, status.refills or 0))
+        client.snapshots_ss_id_pool_delete(ss_id)
+
+def start_bpf(runId):
+    if not BPF:
+        return None
+    program = bpf_map[BPF]
+    bpffile = open('%s/%s/bpftrace' % (RESULT_DIR, TESTID), 'a+') if RESULT_DIR else open('/tmp/bpftrace', 'a+')
+    print('==== %s ====' % runId, file=bpffile, flush=True)
+    bpfpipe = subprocess.Popen(['bpftrace', '-e', program], cwd='/tmp/', stdout=bpffile, stderr=subprocess.STDOUT)
+    time.sleep(3)
+    return bpfpipe
+
+def stop_bpf(bpfpipe):
     if bpfpipe:
         bpfpipe.terminate()
         bpfpipe.wait()
+
+def fetch_trace(params, trace_id):
+    """Fetch a trace once its root span has been reported to the trace API."""
+    def check():
+        resp = requests.get('%s/%s' % (params.trace_api, trace_id))
+        if resp.status_code != 200:
+            return None
+        spans = resp.json()
+        return spans if any('parentId' not in span for span in spans) else None
+    if FIXED_SLEEP:
+        time.sleep(2)
+        return requests.get('%s/%s' % (params.trace_api, trace_id)).json()
+    return wait.poll(check, WAIT_TIMEOUT, 0.1, 'trace %s' % trace_id)
+
+def guest_timings(spans):
+    """{phase: ms} the guest reported for the invocation, e.g. import and handler."""
+    timings = {}
+    for span in spans or []:
+        for key, value in span.get('tags', {}).items():
+            if key.startswith('guest.') and key.endswith('_ms'):
+                timings[key[len('guest.'):-len('_ms')]] = float(value)
+    return timings
+
+def save_trace(params, runId, trace_id, mcstate=None, save_mcstate=True, ret=None):
+    if not RESULT_DIR:
+        return
+    directory = '%s/%s/%s' % (RESULT_DIR, TESTID, runId)
+    os.makedirs(directory, exist_ok=True)
+    spans = fetch_trace(params, trace_id)
+    with open('%s/%s.json' % (directory, trace_id), 'w+') as f:
+        json.dump(spans, f)
+    if ret is not None: # the function's own result, e.g. its latency
+        with open('%s/%s-result.json' % (directory, trace_id), 'w+') as f:
+            json.dump({'output': ret.output, 'result': ret.result, 'duration': ret.duration, 'guest': guest_timings(spans)}, f)
+    if save_mcstate:
+        with open('%s/%s-mcstate.json' % (directory, trace_id), 'w+') as f:
+            json.dump([mcstate], f)
+
+def invoke(args):
+    params, setting, func, func_param, idx, ss_id, par, par_snap, record_input, test_input = args
+    runId = run_id(setting, func, par, par_snap, record_input, test_input)
+    invoc, mcstate = make_invocation(setting, func, func_param, idx, ss_id)
+    if invoc is None:
+        print('invoke steps undefined')
+        return
+    bpfpipe = start_bpf(runId)
+
+    ret = clients[idx].invocations_post(invocation=invoc)
+    stop_bpf(bpfpipe)
     clients[idx].vms_vm_id_delete(vm_id=ret.vm_id)
     trace_id = ret.trace_id
     try:
-        r = ret.to_dict()['result']
-        r = json.loads(r)
+        r = output(ret)
         print(f"prepare invoc func lat: {r['latency']}")
     except Exception as e:
         print(f'prepare invoc func err: {e}')
     # print('invoke', runId, 'ret:', ret)
-    time.sleep(2)
-    if RESULT_DIR:
-        directory = '%s/%s/%s' % (RESULT_DIR, TESTID, runId)
-        os.makedirs(directory, exist_ok=True)
-        with open('%s/%s.json' % (directory, trace_id), 'w+') as f:
-            resp = requests.get('%s/%s' % (params.trace_api, trace_id))
-            json.dump(resp.json(), f)
-        with open('%s/%s-mcstate.json' % (directory, trace_id), 'w+') as f:
-            json.dump([mcstate], f)
+    save_trace(params, runId, trace_id, mcstate, ret=ret)
+
+def invoke_batch(params, setting, func, func_param, ssIds, par, par_snap, record_input, test_input):
+    """Issue all par invocations as one POST /invocations/batch from this process."""
+    runId = run_id(setting, func, par, par_snap, record_input, test_input)
+    invocs, mcstates = [], []
+    for idx in range(1, 1+par):
+        invoc, mcstate = make_invocation(setting, func, func_param, idx, ssIds[idx-1] if len(ssIds) > 1 else ssIds[0])
+        if invoc is None:
+            print('invoke steps undefined')
+            return
+        invocs.append(invoc)
+        mcstates.append(mcstate)
+    bpfpipe = start_bpf(runId)
+    results = list(clients[1].invocations_batch_post(invocations=invocs, _stream=True))
+    stop_bpf(bpfpipe)
+    for ret in results:
+        if ret.error:
+            print('batch invoc %d err: %s' % (ret.index, ret.error))
+        if ret.vm_id:
+            clients[1].vms_vm_id_delete(vm_id=ret.vm_id)
+        try:
+            r = output(ret)
+            print(f"batch invoc {ret.index} func lat: {r['latency']}, duration: {ret.duration}")
+        except Exception as e:
+            print(f'batch invoc {ret.index} func err: {e}')
+    for ret in results:
+        if not ret.error:
+            save_trace(params, runId, ret.trace_id, mcstates[ret.index], ret=ret)
 
 def run_snap(params, setting, par, par_snap, func, record_input, test_input):
     if par_snap > 1:
         assert(par == par_snap)
     client: DefaultApi
-    global clients
-    # start faasnap
-    snappipe = subprocess.Popen(['./main', '--port=8080', '--host=0.0.0.0'], cwd=params.home_dir, stdout=open('%s/%s/stdout' % (RESULT_DIR, TESTID), 'a+') if RESULT_DIR else open('/tmp/faasnap-stdout', 'a+'), stderr=subprocess.STDOUT)
-    time.sleep(5)
-    # set up
-    for idx in range(1, 1+par):
-        clients[idx] = faasnap.DefaultApi(faasnap.ApiClient(conf))
-        addNetwork(clients[idx], idx)
-    client = clients[1]
-    client.functions_post(function=faasnap.Function(func_name=func.name, image=func.image, kernel=setting.kernel, vcpu=params.vcpu))
+    client = setup_cell(params, setting, func, par, startup_sleep=5)
 
-    params0 = func.params[record_input]
     params1 = func.params[test_input]
-    if setting.prepare_steps == 'vanilla':
-        ssIds = prepareVanilla(params, client, setting, func, params0, par_snap=par_snap)
-    elif setting.prepare_steps == 'mincore':
-        ssIds = prepareMincore(params, client, setting, func, params0, par_snap=par_snap)
-    elif setting.prepare_steps == 'reap':
-        ssIds = []
-        for idx in range(par_snap):
-            ssIds += prepareReap(params, client, setting, func, params0, idx=idx+1)
-    elif setting.prepare_steps == 'emumincore':
-        ssIds = prepareEmuMincore(params, client, setting, func, params0)
+    ssIds = prepare(params, client, setting, func, par_snap, record_input)
+    pools = start_pools(client, setting, func, params1, ssIds, par) if getattr(setting, 'pool', False) else []
 
-    time.sleep(1)
     if PAUSE:
         input("Press Enter to start...")
-    with Pool(par) as p:
-        if len(ssIds) > 1:
-            vector = [(params, setting, func, params1, idx, ssIds[idx-1], par, par_snap, record_input, test_input) for idx in range(1, 1+par)]
-        else:
-            vector = [(params, setting, func, params1, idx, ssIds[0], par, par_snap, record_input, test_input) for idx in range(1, 1+par)]
-        p.map(invoke, vector)
+    if BATCH:
+        invoke_batch(params, setting, func, params1, ssIds, par, par_snap, record_input, test_input)
+    else:
+        with Pool(par) as p:
+            if len(ssIds) > 1:
+                vector = [(params, setting, func, params1, idx, ssIds[idx-1], par, par_snap, record_input, test_input) for idx in range(1, 1+par)]
+            else:
+                vector = [(params, setting, func, params1, idx, ssIds[0], par, par_snap, record_input, test_input) for idx in range(1, 1+par)]
+            p.map(invoke, vector)
     
     # input("Press Enter to finish...")
-    snappipe.terminate()
-    snappipe.wait()
-    time.sleep(1)
+    stop_pools(client, pools)
+    end_cell(client, teardown_sleep=1)
 
 def invoke_warm(args):
     client: DefaultApi
     params, setting, func, func_param, idx, vm_id = args
     client = clients[idx]
     runId = '%s_%s' % (setting.name, func.id)
-    time.sleep(1)
-    mcstate = None
-    invoc = faasnap.Invocation(func_name=func.name, vm_id=vm_id, params=func_param, mincore=-1, enable_reap=False)
-    if BPF:
-        program = bpf_map[BPF]
-        bpffile = open('%s/%s/bpftrace' % (RESULT_DIR, TESTID), 'a+') if RESULT_DIR else open('/tmp/bpftrace', 'a+')
-        print('==== %s ====' % runId, file=bpffile, flush=True)
-        bpfpipe = subprocess.Popen(['bpftrace', '-e', program], cwd='/tmp/', stdout=bpffile, stderr=subprocess.STDOUT)
-        time.sleep(3)
+    invoc = faasnap.Invocation(func_name=func.name, vm_id=vm_id, params=func_param, mincore=-1, enable_reap=False, result_mode='json')
+    bpfpipe = start_bpf(runId)
     ret = client.invocations_post(invocation=invoc)
-    if BPF:
-        bpfpipe.terminate()
-        bpfpipe.wait()
+    stop_bpf(bpfpipe)
     print('2nd invoc ret:', ret)
     trace_id = ret.trace_id
     client.vms_vm_id_delete(vm_id=vm_id)
-    time.sleep(2)
-    if RESULT_DIR:
-        directory = '%s/%s/%s' % (RESULT_DIR, TESTID, runId)
-        os.makedirs(directory, exist_ok=True)
-        with open('%s/%s.json' % (directory, trace_id), 'w+') as f:
-            resp = requests.get('%s/%s' % (params.trace_api, trace_id))
-            json.dump(resp.json(), f)
+    save_trace(params, runId, trace_id, save_mcstate=False, ret=ret)
+
+def invoke_warm_batch(params, setting, func, func_param, vms):
+    runId = '%s_%s' % (setting.name, func.id)
+    invocs = [faasnap.Invocation(func_name=func.name, vm_id=vms[idx].vm_id, params=func_param, mincore=-1, enable_reap=False, result_mode='json') for idx in sorted(vms)]
+    bpfpipe = start_bpf(runId)
+    results = list(clients[1].invocations_batch_post(invocations=invocs, _stream=True))
+    stop_bpf(bpfpipe)
+    for ret in results:
+        print('2nd invoc ret:', ret)
+    for idx in sorted(vms):
+        clients[idx].vms_vm_id_delete(vm_id=vms[idx].vm_id)
+    for ret in results:
+        if not ret.error:
+            save_trace(params, runId, ret.trace_id, save_mcstate=False, ret=ret)
 
 def run_warm(params, setting, par, par_snap, func, record_input, test_input):
     client: DefaultApi
-    snappipe = subprocess.Popen(['./main', '--port=8080', '--host=0.0.0.0'], cwd=params.home_dir, stdout=open('%s/%s/stdout' % (RESULT_DIR, TESTID), 'a+') if RESULT_DIR else open('/tmp/faasnap-stdout', 'a+'), stderr=subprocess.STDOUT)
-    time.sleep(2)
-    # set up
-    for idx in range(1, 1+par):
-        clients[idx] = faasnap.DefaultApi(faasnap.ApiClient(conf))
-        addNetwork(clients[idx], idx)
-    client = clients[1]
-    client.functions_post(function=faasnap.Function(func_name=func.name, image=func.image, kernel=setting.kernel, vcpu=params.vcpu))
+    client = setup_cell(params, setting, func, par, startup_sleep=2)
 
     params0 = func.params[record_input]
     params1 = func.params[test_input]
@@ -295,31 +541,92 @@ def run_warm(params, setting, par, par_snap, func, record_input, test_input):
     vms = {}
     for idx in range(1, 1+par):
         vms[idx] = clients[idx].vms_post(vm={'func_name': func.name, 'namespace': 'fc%d' % idx})
-    time.sleep(5)
+    for idx in range(1, 1+par):
+        settle(5 if idx == 1 else 0, wait.wait_for_vm_state, clients[idx], vms[idx].vm_id, 'running')
 
     for idx in range(1, 1+par):
         invoc = faasnap.Invocation(func_name=func.name, vm_id=vms[idx].vm_id, params=params0, mincore=-1, enable_reap=False)
         ret = clients[idx].invocations_post(invocation=invoc)
         print('1st invoc ret:', ret)
-    time.sleep(1)
 
     if PAUSE:
         input("Press Enter to start...")
-    with Pool(par) as p:
-        vector = [(params, setting, func, params1, idx, vms[idx].vm_id) for idx in range(1, 1+par)]
-        p.map(invoke_warm, vector)
+    if BATCH:
+        invoke_warm_batch(params, setting, func, params1, vms)
+    else:
+        with Pool(par) as p:
+            vector = [(params, setting, func, params1, idx, vms[idx].vm_id) for idx in range(1, 1+par)]
+            p.map(invoke_warm, vector)
+
+    end_cell(client, teardown_sleep=5)
+
+def invoke_shared(args):
+    params, func, func_param, idx, vm_id, runId = args
+    invoc = faasnap.Invocation(func_name=func.name, vm_id=vm_id, params=func_param, mincore=-1, enable_reap=False, result_mode='json')
+    bpfpipe = start_bpf(runId)
+    ret = clients[idx].invocations_post(invocation=invoc)
+    stop_bpf(bpfpipe)
+    print('shared invoc %d ret:' % idx, ret)
+    save_trace(params, runId, ret.trace_id, save_mcstate=False, ret=ret)
+
+def run_shared(params, setting, par, func, record_input, test_input):
+    """Send the par invocations of a cell concurrently to one VM, warm or restored from a snapshot.
 
-    snappipe.terminate()
-    snappipe.wait()
-    time.sleep(5)
+    The VM serves them in parallel only if its rootfs runs the guest daemon
+    with a worker pool (GUEST_WORKERS); its vcpu bounds the useful parallelism.
+    """
+    client: DefaultApi
+    client = setup_cell(params, setting, func, par, startup_sleep=5)
+    params0 = func.params[record_input]
+    params1 = func.params[test_input]
+
+    if setting.name == 'warm':
+        vm = client.vms_post(vm={'func_name': func.name, 'namespace': 'fc%d' % 1})
+        settle(5, wait.wait_for_vm_state, client, vm.vm_id, 'running')
+        vm_id = vm.vm_id
+        ret = client.invocations_post(invocation=faasnap.Invocation(func_name=func.name, vm_id=vm_id, params=params0, mincore=-1, enable_reap=False))
+        print('1st invoc ret:', ret)
+    else:
+        ssIds = prepare(params, client, setting, func, 1, record_input)
+        invoc, _ = make_invocation(setting, func, params1, 1, ssIds[0])
+        if invoc is None:
+            print('invoke steps undefined')
+            end_cell(client, teardown_sleep=1)
+            return
+        ret = client.invocations_post(invocation=invoc)
+        print('restore invoc ret:', ret)
+        vm_id = ret.vm_id
+    preload(client, vm_id, func.name, force=True) # import the handler in every worker
+
+    if PAUSE:
+        input("Press Enter to start...")
+    runId = run_id(setting, func, par, 0, record_input, test_input)
+    if BATCH:
+        invocs = [faasnap.Invocation(func_name=func.name, vm_id=vm_id, params=params1, mincore=-1, enable_reap=False, result_mode='json')] * par
+        bpfpipe = start_bpf(runId)
+        results = list(clients[1].invocations_batch_post(invocations=invocs, _stream=True))
+        stop_bpf(bpfpipe)
+        for ret in results:
+            print('shared invoc %d ret:' % ret.index, ret)
+            if not ret.error:
+                save_trace(params, runId, ret.trace_id, save_mcstate=False, ret=ret)
+    else:
+        with Pool(par) as p:
+            p.map(invoke_shared, [(params, func, params1, idx, vm_id, runId) for idx in range(1, 1+par)])
+    client.vms_vm_id_delete(vm_id=vm_id)
+    end_cell(client, teardown_sleep=1)
 
 def run(params, setting, func, par, par_snap, repeat, record_input, test_input):
     for r in range(repeat):
         print("\n=========%s %s: %d=========\n" % (setting.name, func.id, r))
-        if setting.name == 'warm':
+        start = time.monotonic()
+        if SHARED_VM:
+            run_shared(params, setting, par, func, record_input, test_input)
+        elif setting.name == 'warm':
             run_warm(params, setting, par, par_snap, func, record_input, test_input)
         else:
             run_snap(params, setting, par, par_snap, func, record_input, test_input)
+        print("cell %s %s: %.1fs" % (setting.name, func.id, time.monotonic() - start))
 
 if __name__ == '__main__':
     if len(sys.argv) != 2:
@@ -334,12 +641,22 @@ if __name__ == '__main__':
     else:
         os.makedirs('%s/%s' % (RESULT_DIR, TESTID), mode=0o777, exist_ok=True)
     BPF = os.environ.get('BPF', None)
+    BATCH = os.environ.get('BATCH', None) # issue the parallel invocations as one /invocations/batch request
+    FIXED_SLEEP = os.environ.get('FIXED_SLEEP', None) # use the old fixed sleeps between steps instead of waiting on the daemon
+    SESSION = os.environ.get('SESSION', None) # keep one daemon, and the snapshots it prepared, up across cells and repeats
+    SHARED_VM = os.environ.get('SHARED_VM', None) # send the par invocations of a cell to one VM instead of one VM each
     with open(sys.argv[1], 'r') as f:
         params = json.load(f, object_hook=lambda d: SimpleNamespace(**d))
     conf = Configuration()
     conf.host = params.host
+    WAIT_TIMEOUT = getattr(params, 'wait_timeout', WAIT_TIMEOUT)
+    COPY_MODE = getattr(params, 'copy_mode', COPY_MODE)
+    QUIESCE = getattr(params, 'quiesce', QUIESCE)
+    PRELOAD = getattr(params, 'preload', PRELOAD)
     
-    params.settings.faasnap.patch_mincore.to_ws_file = params.test_dir + '/wsfile'
+    for setting in vars(params.settings).values():
+        if hasattr(setting, 'patch_mincore'):
+            setting.patch_mincore.to_ws_file = params.test_dir + '/wsfile'
 
     if RESULT_DIR:
         n = 1
@@ -361,10 +678,15 @@ if __name__ == '__main__':
     print("vcpu:", params.vcpu)
     print("record input:", params.record_input)
     print("test input:", params.test_input)
-    
+    print("session:", "on" if SESSION else "off")
+    print("barriers:", "fixed sleep" if FIXED_SLEEP else "wait, timeout %ds" % WAIT_TIMEOUT)
+
+    sweep_start = time.monotonic()
     for func in params.function:
         for setting in params.setting:
             for par, par_snap in zip(params.parallelism, params.par_snapshots):
                 for record_input in params.record_input:
                     for test_input in params.test_input:
                         run(params, setting=vars(params.settings)[setting], func=vars(params.functions)[func], par=par, par_snap=par_snap, repeat=params.repeat, record_input=record_input, test_input=test_input)
+    stop_daemon()
+    print("sweep time: %.1fs" % (time.monotonic() - sweep_start))
@@ -0,0 +1,235 @@
+// MIT License
+//
+// Copyright (c) 2022 Lixiang Ao
+//
+// Permission is hereby granted, free of charge, to any person obtaining a copy
+// of this software and associated documentation files (the "Software"), to deal
+// in the Software without restriction, including without limitation the rights
+// to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+// copies of the Software, and to permit persons to whom the Software is
+// furnished to do so, subject to the following conditions:
+//
+// The above copyright notice and this permission notice shall be included in all
+// copies or substantial portions of the Software.
+//
+// THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+// IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+// FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+// AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+// LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+// OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+// SOFTWARE.
+
+// Package wsfile reads and writes compressed working set files.
+//
+// A compressed ws file holds the same bytes as a raw one, i.e. the ws pages
+// back to back, cut into frames of at most FrameSize bytes that are deflated
+// independently, so they can be compressed and inflated in parallel:
+//
+//	header  magic[8] frames:u32 reserved:u32 rawSize:u64
+//	index   frames * (rawLen:u32 compLen:u32)
+//	frames  deflate streams; compLen 0 marks an all-zero frame
+//
+// All integers are little endian.
+package wsfile
+
+import (
+	"bytes"
+	"compress/flate"
+	"encoding/binary"
+	"errors"
+	"fmt"
+	"io"
+	"os"
+	"runtime"
+	"sync"
+)
+
+const (
+	FrameSize = 1 << 20
+
+	magic      = "FSNPWSZ1"
+	headerSize = 24
+	indexSize  = 8
+)
+
+var ErrFormat = errors.New("not a compressed ws file")
+
+type frame struct {
+	raw  []byte
+	comp []byte
+}
+
+// Write compresses the concatenation of regions into w. It returns the raw
+// and the compressed sizes.
+func Write(w io.Writer, regions [][]byte) (int64, int64, error) {
+	var frames []*frame
+	var rawSize int64
+	for _, region := range regions {
+		for off := 0; off < len(region); off += FrameSize {
+			end := off + FrameSize
+			if end > len(region) {
+				end = len(region)
+			}
+			frames = append(frames, &frame{raw: region[off:end]})
+			rawSize += int64(end - off)
+		}
+	}
+
+	err := parallel(len(frames), func(i int) error {
+		f := frames[i]
+		if isZero(f.raw) {
+			return nil
+		}
+		var buf bytes.Buffer
+		zw, err := flate.NewWriter(&buf, flate.BestSpeed)
+		if err != nil {
+			return err
+		}
+		if _, err := zw.Write(f.raw); err != nil {
+			return err
+		}
+		if err := zw.Close(); err != nil {
+			return err
+		}
+		f.comp = buf.Bytes()
+		return nil
+	})
+	if err != nil {
+		return 0, 0, err
+	}
+
+	head := make([]byte, headerSize+indexSize*len(frames))
+	copy(head, magic)
+	binary.LittleEndian.PutUint32(head[8:], uint32(len(frames)))
+	binary.LittleEndian.PutUint64(head[16:], uint64(rawSize))
+	for i, f := range frames {
+		entry := head[headerSize+indexSize*i:]
+		binary.LittleEndian.PutUint32(entry, uint32(len(f.raw)))
+		binary.LittleEndian.PutUint32(entry[4:], uint32(len(f.comp)))
+	}
+	if _, err := w.Write(head); err != nil {
+		return 0, 0, err
+	}
+	compSize := int64(len(head))
+	for _, f := range frames {
+		if _, err := w.Write(f.comp); err != nil {
+			return 0, 0, err
+		}
+		compSize += int64(len(f.comp))
+	}
+	return rawSize, compSize, nil
+}
+
+// RawSize returns the size of the data held by the compressed file src.
+func RawSize(src []byte) (int64, error) {
+	if len(src) < headerSize || string(src[:len(magic)]) != magic {
+		return 0, ErrFormat
+	}
+	return int64(binary.LittleEndian.Uint64(src[16:])), nil
+}
+
+// Inflate decompresses the compressed file src into dst, which must be
+// RawSize(src) bytes long and zeroed, in parallel.
+func Inflate(src, dst []byte) error {
+	rawSize, err := RawSize(src)
+	if err != nil {
+		return err
+	}
+	if int64(len(dst)) != rawSize {
+		return fmt.Errorf("ws file holds %d bytes, buffer has %d", rawSize, len(dst))
+	}
+	n := int(binary.LittleEndian.Uint32(src[8:]))
+	if len(src) < headerSize+indexSize*n {
+		return ErrFormat
+	}
+	rawOffs := make([]int, n+1)
+	compOffs := make([]int, n+1)
+	compOffs[0] = headerSize + indexSize*n
+	for i := 0; i < n; i++ {
+		entry := src[headerSize+indexSize*i:]
+		rawOffs[i+1] = rawOffs[i] + int(binary.LittleEndian.Uint32(entry))
+		compOffs[i+1] = compOffs[i] + int(binary.LittleEndian.Uint32(entry[4:]))
+	}
+	if int64(rawOffs[n]) != rawSize || compOffs[n] > len(src) {
+		return ErrFormat
+	}
+
+	return parallel(n, func(i int) error {
+		if compOffs[i] == compOffs[i+1] {
+			return nil // zero frame, dst is already zeroed
+		}
+		zr := flate.NewReader(bytes.NewReader(src[compOffs[i]:compOffs[i+1]]))
+		defer zr.Close()
+		_, err := io.ReadFull(zr, dst[rawOffs[i]:rawOffs[i+1]])
+		return err
+	})
+}
+
+// Stat returns the raw and the compressed sizes of the file at path. Raw ws
+// files return ErrFormat.
+func Stat(path string) (int64, int64, error) {
+	f, err := os.Open(path)
+	if err != nil {
+		return 0, 0, err
+	}
+	defer f.Close()
+	fi, err := f.Stat()
+	if err != nil {
+		return 0, 0, err
+	}
+	head := make([]byte, headerSize)
+	if _, err := io.ReadFull(f, head); err != nil {
+		return 0, 0, ErrFormat
+	}
+	rawSize, err := RawSize(head)
+	return rawSize, fi.Size(), err
+}
+
+func isZero(b []byte) bool {
+	for _, v := range b {
+		if v != 0 {
+			return false
+		}
+	}
+	return true
+}
+
+// parallel runs fn(0..n-1) on one goroutine per CPU and returns the first error.
+func parallel(n int, fn func(i int) error) error {
+	workers := runtime.NumCPU()
+	if workers > n {
+		workers = n
+	}
+	var (
+		wg   sync.WaitGroup
+		mu   sync.Mutex
+		next int
+		ferr error
+	)
+	for w := 0; w < workers; w++ {
+		wg.Add(1)
+		go func() {
+			defer wg.Done()
+			for {
+				mu.Lock()
+				i := next
+				next++
+				stop := ferr != nil
+				mu.Unlock()
+				if i >= n || stop {
+					return
+				}
+				if err := fn(i); err != nil {
+					mu.Lock()
+					if ferr == nil {
+						ferr = err
+					}
+					mu.Unlock()
+				}
+			}
+		}()
+	}
+	wg.Wait()
+	return ferr
+}